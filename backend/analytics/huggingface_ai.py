@@ -12,6 +12,11 @@ from huggingface_hub import InferenceClient
 import requests
 from dotenv import load_dotenv
 
+try:
+    from ..core.cache import AsyncLRUCache
+except ImportError:
+    from core.cache import AsyncLRUCache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -42,8 +47,9 @@ class HuggingFaceAI:
         }
         
         # Cache for model responses
-        self.cache = {}
         self.cache_ttl = 300  # 5 minutes
+        self.cache = AsyncLRUCache(max_entries=1024, max_bytes=16 * 1024 * 1024,
+                                   ttl=self.cache_ttl, name="huggingface")
         
     async def initialize_models(self):
         """Initialize local models for better performance"""
@@ -286,12 +292,17 @@ class HuggingFaceAI:
         """Make API call to Hugging Face Inference API"""
         cache_key = f"{model}_{hash(str(inputs))}"
         
-        # Check cache
-        if cache_key in self.cache:
-            cached_result, timestamp = self.cache[cache_key]
-            if datetime.now().timestamp() - timestamp < self.cache_ttl:
-                return cached_result
-        
+        # Identical concurrent requests share one API call
+        try:
+            return await self.cache.get_or_set(
+                cache_key, lambda: self._request_inference(model, inputs, parameters)
+            )
+        except Exception as e:
+            logger.error(f"Error making API request: {e}")
+            return None
+    
+    async def _request_inference(self, model: str, inputs: Any, parameters: Optional[Dict] = None) -> Any:
+        """Uncached Inference API request; raises on failure so errors aren't cached"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -301,26 +312,16 @@ class HuggingFaceAI:
         if parameters:
             payload["parameters"] = parameters
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/{model}",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        # Cache the result
-                        self.cache[cache_key] = (result, datetime.now().timestamp())
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"API error {response.status}: {error_text}")
-                        return None
-                        
-        except Exception as e:
-            logger.error(f"Error making API request: {e}")
-            return None
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{self.base_url}/{model}",
+                headers=headers,
+                json=payload
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise RuntimeError(f"API error {response.status}: {error_text}")
+                return await response.json()
     
     def _create_market_analysis_prompt(self, market_data: Dict[str, Any]) -> str:
         """Create a structured prompt for market analysis"""
@@ -6,13 +6,14 @@ Features:
 - Auto-selection between Numba and Pandas implementations
 - LRU caching for expensive calculations
 - Batch computation for efficiency
+- Incremental (streaming) mode with O(1) per-bar updates
 - Type-safe outputs
 """
 
 import pandas as pd
 import numpy as np
 from typing import Dict, Optional, List
-from functools import lru_cache
+from functools import lru_cache, wraps
 import hashlib
 import logging
 
@@ -23,11 +24,36 @@ from .indicators import (
 from .indicators_numba import (
     calculate_rsi_numba, calculate_ema_numba, calculate_sma_numba,
     calculate_atr_numba, calculate_macd_numba, calculate_bollinger_bands_numba,
-    calculate_psar_numba, calculate_stochastic_numba, calculate_adx_numba
+    calculate_psar_numba, calculate_stochastic_numba, calculate_adx_numba,
+    calculate_rsi_batch_numba, calculate_ema_batch_numba, calculate_sma_batch_numba,
+    calculate_atr_batch_numba, calculate_macd_batch_numba,
+    calculate_bollinger_bands_batch_numba, calculate_stochastic_batch_numba,
+    calculate_psar_batch_numba, calculate_adx_batch_numba
 )
+from .streaming_indicators import IndicatorStream
+
+try:
+    from ..core.cache import AsyncLRUCache
+    from ..core.metrics import metrics
+except ImportError:
+    from core.cache import AsyncLRUCache
+    from core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+INDICATOR_SECONDS = metrics.histogram("hts_indicator_seconds", "Indicator computation time, cache hits included", ["method"])
+
+
+def _timed(method: str):
+    """Time an IndicatorEngine entry point into INDICATOR_SECONDS"""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with INDICATOR_SECONDS.time(method=method):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
 class IndicatorEngine:
     """
     Centralized indicator computation engine
@@ -51,10 +77,14 @@ class IndicatorEngine:
         """
         self.use_numba = use_numba
         self.cache_size = cache_size
-        self._cache = {}
+        # Keys are (last timestamp, last close, length), not a full content hash: two windows that
+        # agree on those share an entry. Entries never expire; only the LRU bound applies
+        self._cache = AsyncLRUCache(max_entries=cache_size, ttl=float('inf'), name="indicators")
+        self._streams: Dict[str, IndicatorStream] = {}
         
         logger.info(f"IndicatorEngine initialized (numba={'enabled' if use_numba else 'disabled'})")
     
+    @_timed("compute_all")
     def compute_all(self, ohlcv_data: pd.DataFrame) -> Dict:
         """
         Compute full indicator suite efficiently
@@ -73,9 +103,10 @@ class IndicatorEngine:
         
         # Check cache
         data_hash = self._hash_dataframe(ohlcv_data)
-        if data_hash in self._cache:
+        cached = self._cache.get(data_hash)
+        if cached is not None:
             logger.debug("Cache hit for indicators")
-            return self._cache[data_hash]
+            return cached
         
         try:
             if self.use_numba and len(ohlcv_data) >= 50:
@@ -83,14 +114,8 @@ class IndicatorEngine:
             else:
                 indicators = self._compute_all_pandas(ohlcv_data)
             
-            # Cache result
-            self._cache[data_hash] = indicators
-            
-            # Limit cache size
-            if len(self._cache) > self.cache_size:
-                # Remove oldest entry
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
+            # Cache result (least recently used entry evicted past cache_size)
+            self._cache.set(data_hash, indicators)
             
             return indicators
             
@@ -149,6 +174,79 @@ class IndicatorEngine:
         logger.debug(f"Computed {len(indicators)} indicators using Numba")
         return indicators
     
+    @_timed("compute_all_batch")
+    def compute_all_batch(self, ohlcv_by_symbol: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Compute the full indicator suite for many symbols in one pass
+        
+        Stacks all series into right-aligned (symbols x bars) matrices and runs
+        each batched Numba kernel once, parallelised across symbols. Results
+        match ``compute_all`` for every symbol.
+        
+        Args:
+            ohlcv_by_symbol: Dict of symbol -> OHLCV DataFrame
+        
+        Returns:
+            Dict of symbol -> indicator dict (symbols failing validation are
+            skipped with a warning)
+        """
+        valid = {}
+        for symbol, df in ohlcv_by_symbol.items():
+            try:
+                self._validate_ohlcv(df)
+                valid[symbol] = df
+            except ValueError as e:
+                logger.warning(f"Skipping {symbol} in batch indicator computation: {e}")
+        
+        if not valid:
+            return {}
+        
+        if not self.use_numba:
+            return {symbol: self.compute_all(df) for symbol, df in valid.items()}
+        
+        symbols = list(valid.keys())
+        lengths = np.array([len(valid[s]) for s in symbols], dtype=np.int64)
+        n_cols = int(lengths.max())
+        
+        closes = np.full((len(symbols), n_cols), np.nan)
+        highs = np.full((len(symbols), n_cols), np.nan)
+        lows = np.full((len(symbols), n_cols), np.nan)
+        for row, symbol in enumerate(symbols):
+            df = valid[symbol]
+            start = n_cols - lengths[row]
+            closes[row, start:] = df['close'].to_numpy(dtype=np.float64)
+            highs[row, start:] = df['high'].to_numpy(dtype=np.float64)
+            lows[row, start:] = df['low'].to_numpy(dtype=np.float64)
+        
+        matrices = {
+            'ema_12': calculate_ema_batch_numba(closes, lengths, 12),
+            'ema_26': calculate_ema_batch_numba(closes, lengths, 26),
+            'ema_50': calculate_ema_batch_numba(closes, lengths, 50),
+            'ema_200': calculate_ema_batch_numba(closes, lengths, 200),
+            'sma_20': calculate_sma_batch_numba(closes, lengths, 20),
+            'sma_50': calculate_sma_batch_numba(closes, lengths, 50),
+            'rsi': calculate_rsi_batch_numba(closes, lengths, 14),
+            'atr': calculate_atr_batch_numba(highs, lows, closes, lengths, 14),
+            'psar': calculate_psar_batch_numba(highs, lows, lengths, 0.02, 0.02, 0.2),
+        }
+        (matrices['macd_line'], matrices['macd_signal'],
+         matrices['macd_histogram']) = calculate_macd_batch_numba(closes, lengths, 12, 26, 9)
+        (matrices['bb_upper'], matrices['bb_middle'],
+         matrices['bb_lower']) = calculate_bollinger_bands_batch_numba(closes, lengths, 20, 2.0)
+        (matrices['adx'], matrices['plus_di'],
+         matrices['minus_di']) = calculate_adx_batch_numba(highs, lows, closes, lengths, 14)
+        (matrices['stoch_k'],
+         matrices['stoch_d']) = calculate_stochastic_batch_numba(highs, lows, closes, lengths, 14, 3, 3)
+        
+        # Per-symbol results are views into the shared matrices
+        results = {}
+        for row, symbol in enumerate(symbols):
+            start = n_cols - lengths[row]
+            results[symbol] = {name: matrix[row, start:] for name, matrix in matrices.items()}
+        
+        logger.debug(f"Computed {len(matrices)} indicators for {len(symbols)} symbols in batch")
+        return results
+    
     def _compute_all_pandas(self, df: pd.DataFrame) -> Dict:
         """Compute all indicators using Pandas (safe fallback)"""
         closes = df['close']
@@ -186,6 +284,57 @@ class IndicatorEngine:
         logger.debug(f"Computed {len(indicators)} indicators using Pandas")
         return indicators
     
+    @_timed("compute_latest")
+    def compute_latest(self, key: str, ohlcv_data) -> Dict[str, float]:
+        """
+        Latest indicator values using the incremental (streaming) mode
+        
+        Keeps one IndicatorStream per ``key`` (e.g. "BTCUSDT:1h"). When the
+        window only changed in its forming candle or gained new candles, the
+        stream advances in constant time per bar instead of recomputing the
+        whole history. Values match ``compute_all(...)[name][-1]`` over the full
+        history fed to ``key`` so far, not over the window passed in: for a
+        sliding window the stream still carries state from bars that have
+        since left the window.
+        
+        Args:
+            key: Series identifier
+            ohlcv_data: DataFrame or CandleView with timestamp/high/low/close
+        
+        Returns:
+            Dict of indicator name -> latest value
+        """
+        timestamps, highs, lows, closes = self._stream_columns(ohlcv_data)
+        
+        stream = self._streams.get(key)
+        if stream is None or not stream.sync(timestamps, highs, lows, closes):
+            # New series or the window no longer overlaps: rebuild from history
+            stream = IndicatorStream.from_arrays(highs, lows, closes, timestamps)
+            self._streams[key] = stream
+        
+        return stream.latest()
+    
+    def get_stream(self, key: str) -> Optional[IndicatorStream]:
+        """Get the incremental indicator stream for a series, if any"""
+        return self._streams.get(key)
+    
+    def _stream_columns(self, ohlcv_data):
+        """Extract int64 timestamps and float64 high/low/close arrays"""
+        if isinstance(ohlcv_data, pd.DataFrame):
+            ts = ohlcv_data['timestamp']
+            if pd.api.types.is_datetime64_any_dtype(ts):
+                timestamps = ts.values.astype('datetime64[ms]').astype(np.int64)
+            else:
+                timestamps = ts.to_numpy(dtype=np.int64)
+            return (
+                timestamps,
+                ohlcv_data['high'].to_numpy(dtype=np.float64),
+                ohlcv_data['low'].to_numpy(dtype=np.float64),
+                ohlcv_data['close'].to_numpy(dtype=np.float64),
+            )
+        return ohlcv_data.timestamp, ohlcv_data.high, ohlcv_data.low, ohlcv_data.close
+    
+    @_timed("compute_single")
     def compute_single(self, ohlcv_data: pd.DataFrame, indicator_name: str, **kwargs) -> np.ndarray:
         """
         Compute a single indicator
@@ -360,12 +509,18 @@ class IndicatorEngine:
     def clear_cache(self):
         """Clear indicator cache"""
         self._cache.clear()
+        self._streams.clear()
         logger.info("Indicator cache cleared")
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
+        stats = self._cache.get_stats()
         return {
             'cache_size': len(self._cache),
             'max_cache_size': self.cache_size,
-            'hit_rate': 'N/A'  # Would need hit counter
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'evictions': stats['evictions'],
+            'hit_rate': stats['hit_rate'],
+            'streams': len(self._streams)
         }
@@ -7,8 +7,10 @@ import numpy as np
 # Import existing modules (assuming they exist)
 try:
     from ..data.binance_client import binance_client
+    from ..data.candle_store import candle_store
 except ImportError:
     binance_client = None
+    candle_store = None
 
 try:
     from .core_signals import generate_rsi_macd_signal
@@ -78,7 +80,7 @@ class MultiTimeframeAnalyzer:
             tasks = []
             for tf in self.timeframes:
                 limit = self._get_limit_for_timeframe(tf)
-                task = binance_client.get_klines(symbol, tf, limit)
+                task = candle_store.get_frame('binance', symbol, tf, limit, binance_client.get_klines)
                 tasks.append(task)
             
             try:
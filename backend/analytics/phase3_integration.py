@@ -9,6 +9,7 @@ from typing import Dict, List, Any, Optional
 import asyncio
 import logging
 from detectors import HarmonicDetector, ElliottWaveDetector, SMCDetector
+from scoring.detector_protocol import timed_detect
 from .core_signals import generate_rsi_macd_signal, calculate_trend_strength
 from .indicators import calculate_rsi
 
@@ -170,7 +171,7 @@ class Phase3AnalyticsEngine:
             if len(ohlcv_list) < 100:
                 return None
             
-            result = await self.harmonic_detector.detect(ohlcv_list, context)
+            result = await timed_detect("harmonic", self.harmonic_detector, ohlcv_list, context)
             
             return {
                 'score': result.score,
@@ -191,7 +192,7 @@ class Phase3AnalyticsEngine:
             if len(ohlcv_list) < 150:
                 return None
             
-            result = await self.elliott_detector.detect(ohlcv_list, context)
+            result = await timed_detect("elliott", self.elliott_detector, ohlcv_list, context)
             
             return {
                 'score': result.score,
@@ -212,7 +213,7 @@ class Phase3AnalyticsEngine:
             if len(ohlcv_list) < 50:
                 return None
             
-            result = await self.smc_detector.detect(ohlcv_list, context)
+            result = await timed_detect("smc", self.smc_detector, ohlcv_list, context)
             
             return {
                 'score': result.score,
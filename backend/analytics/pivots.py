@@ -0,0 +1,56 @@
+"""
+Array helpers for OHLCV windows: column extraction and swing pivot detection
+Shared by the detectors and the scoring engine's feature bundle
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def ohlcv_to_arrays(ohlcv) -> Dict[str, np.ndarray]:
+    """Convert a DataFrame or list of OHLCV bars to float64 column arrays"""
+    if isinstance(ohlcv, pd.DataFrame):
+        return {name: ohlcv[name].to_numpy(dtype=np.float64) for name in OHLCV_FIELDS}
+    return {
+        name: np.fromiter((bar[name] for bar in ohlcv), dtype=np.float64, count=len(ohlcv))
+        for name in OHLCV_FIELDS
+    }
+
+
+def find_pivots(values: np.ndarray, lookback: int = 3, kind: str = "high") -> np.ndarray:
+    """
+    Indices of strict pivot highs/lows
+
+    A pivot high at ``i`` is strictly greater than the ``lookback`` values on
+    each side (strictly lower for a pivot low).
+    """
+    n = len(values)
+    if n < 2 * lookback + 1:
+        return np.empty(0, dtype=np.int64)
+
+    core = values[lookback:n - lookback]
+    mask = np.ones(len(core), dtype=bool)
+    for j in range(1, lookback + 1):
+        left = values[lookback - j:n - lookback - j]
+        right = values[lookback + j:n - lookback + j]
+        if kind == "high":
+            mask &= (core > left) & (core > right)
+        else:
+            mask &= (core < left) & (core < right)
+    return np.nonzero(mask)[0] + lookback
+
+
+def window_pivots(pivots: np.ndarray, n: int, window: int, lookback: int) -> List[int]:
+    """
+    Restrict pivots of a full series to its trailing ``window`` bars
+
+    Returns indices relative to the window, identical to running
+    ``find_pivots`` on the window itself.
+    """
+    start = max(n - window, 0)
+    selected = pivots[(pivots >= start + lookback) & (pivots < n - lookback)]
+    return (selected - start).tolist()
@@ -12,6 +12,11 @@ import logging
 from datetime import datetime, timedelta
 import json
 
+try:
+    from ..core.cache import AsyncLRUCache
+except ImportError:
+    from core.cache import AsyncLRUCache
+
 logger = logging.getLogger(__name__)
 
 class PredictiveEngine:
@@ -19,7 +24,8 @@ class PredictiveEngine:
         self.models = {}
         self.scalers = {}
         self.feature_importance = {}
-        self.prediction_cache = {}
+        # Keyed by (symbol, bar count, last close): the same bar is predicted once
+        self.prediction_cache = AsyncLRUCache(max_entries=512, ttl=300, name="predictions")
         self.strategy_templates = self._load_strategy_templates()
         
     def _load_strategy_templates(self) -> Dict[str, Any]:
@@ -134,6 +140,9 @@ class PredictiveEngine:
                 'features': feature_cols
             }
             self.scalers[symbol] = scaler
+            for key in self.prediction_cache.keys():
+                if key[0] == symbol:
+                    self.prediction_cache.delete(key)
             
             # Feature importance
             self.feature_importance[symbol] = dict(zip(feature_cols, rf_model.feature_importances_))
@@ -151,6 +160,11 @@ class PredictiveEngine:
             if symbol not in self.models:
                 return {"error": "Model not trained for symbol"}
             
+            cache_key = (symbol, len(current_data), float(current_data['close'].iloc[-1]))
+            cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Generate features for current data
             df = await self.generate_features(current_data)
             if df.empty:
@@ -193,7 +207,7 @@ class PredictiveEngine:
             }
             
             # Cache prediction
-            self.prediction_cache[symbol] = prediction
+            self.prediction_cache.set(cache_key, prediction)
             return prediction
             
         except Exception as e:
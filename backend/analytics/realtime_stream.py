@@ -14,8 +14,21 @@ from concurrent.futures import ThreadPoolExecutor
 import threading
 from .predictive_engine import PredictiveEngine
 
+try:
+    from ..core.encoding import EncodedMessage, DEFAULT_ENCODING, negotiate
+    from ..core.metrics import metrics
+    from ..data.market_stream import TickerEvent
+except ImportError:
+    from core.encoding import EncodedMessage, DEFAULT_ENCODING, negotiate
+    from core.metrics import metrics
+    from data.market_stream import TickerEvent
+
 logger = logging.getLogger(__name__)
 
+# Age of a market data update (exchange/generation time to broadcast)
+STREAM_LATENCY_SECONDS = metrics.histogram("hts_stream_update_latency_seconds",
+                                           "Market data age when broadcast to stream subscribers")
+
 @dataclass
 class MarketData:
     symbol: str
@@ -41,6 +54,8 @@ class RealTimeStreamManager:
     def __init__(self):
         self.connections: Set[websockets.WebSocketServerProtocol] = set()
         self.subscriptions: Dict[str, Set[websockets.WebSocketServerProtocol]] = {}
+        # Negotiated per-client encoding (json unless the client asks for msgpack)
+        self.encodings: Dict[Any, str] = {}
         self.market_data_cache: Dict[str, MarketData] = {}
         self.signal_cache: Dict[str, Signal] = {}
         self.predictive_engine = PredictiveEngine()
@@ -48,11 +63,14 @@ class RealTimeStreamManager:
         self.data_sources = {}
         self.running = False
         self.executor = ThreadPoolExecutor(max_workers=4)
+        # Exchange WebSocket ingestor; while connected it replaces simulated Binance ticks
+        self.ingestor = None
         
         # Performance metrics
         self.message_count = 0
         self.last_performance_check = time.time()
-        self.latency_measurements = []
+        self.latency = STREAM_LATENCY_SECONDS
+        self._latency_window = (0, 0.0)  # (count, sum) at the last performance check
         
     async def initialize(self):
         """Initialize Redis connection and data sources"""
@@ -115,6 +133,7 @@ class RealTimeStreamManager:
             logger.error(f"Error handling client: {e}")
         finally:
             self.connections.discard(websocket)
+            self.encodings.pop(websocket, None)
             # Remove from all subscriptions
             for symbol_subs in self.subscriptions.values():
                 symbol_subs.discard(websocket)
@@ -155,6 +174,9 @@ class RealTimeStreamManager:
                 await self._handle_prediction_request(websocket, data)
             elif action == 'generate_strategy':
                 await self._handle_strategy_generation(websocket, data)
+            elif action == 'set_encoding':
+                self.encodings[websocket] = negotiate(data.get('encoding'))
+                await websocket.send(json.dumps({"type": "encoding_set", "encoding": self.encodings[websocket]}))
             elif action == 'ping':
                 await websocket.send(json.dumps({"type": "pong", "timestamp": time.time()}))
                 
@@ -237,10 +259,32 @@ class RealTimeStreamManager:
                 logger.error(f"Error in market data loop: {e}")
                 await asyncio.sleep(1)
     
+    def attach_ingestor(self, ingestor):
+        """Take Binance market data from a MarketStreamIngestor instead of simulating it"""
+        self.ingestor = ingestor
+        ingestor.add_listener(self._on_stream_event)
+    
+    async def _on_stream_event(self, event):
+        """Forward streamed tickers for the configured Binance symbols"""
+        if not isinstance(event, TickerEvent) or event.symbol not in self.data_sources.get('binance', {}).get('symbols', []):
+            return
+        await self._update_market_data(MarketData(
+            symbol=event.symbol,
+            timestamp=event.timestamp / 1000,
+            price=event.price,
+            volume=event.volume,
+            bid=event.price,
+            ask=event.price,
+            spread=0.0,
+            depth={"bids": [], "asks": []}
+        ))
+    
     async def _process_binance_data(self):
         """Process real market data from Binance"""
-        # This would connect to actual Binance WebSocket
-        # For now, we'll simulate with realistic data
+        if self.ingestor is not None and self.ingestor.connected:
+            return  # live ticks arrive through _on_stream_event
+        
+        # Simulate realistic data while no exchange stream is connected
         symbols = self.data_sources['binance']['symbols']
         
         for symbol in symbols:
@@ -383,6 +427,7 @@ class RealTimeStreamManager:
             "data": asdict(market_data)
         })
         
+        self.latency.observe(max(0.0, time.time() - market_data.timestamp))
         self.message_count += 1
     
     async def _signal_generation_loop(self):
@@ -526,12 +571,13 @@ class RealTimeStreamManager:
         if symbol not in self.subscriptions:
             return
         
-        message_json = json.dumps(message)
+        # Encoded at most once per encoding, shared by every subscriber
+        encoded = EncodedMessage(message)
         disconnected = set()
         
         for websocket in self.subscriptions[symbol]:
             try:
-                await websocket.send(message_json)
+                await websocket.send(encoded.get(self.encodings.get(websocket, DEFAULT_ENCODING)))
             except websockets.exceptions.ConnectionClosed:
                 disconnected.add(websocket)
             except Exception as e:
@@ -549,7 +595,12 @@ class RealTimeStreamManager:
                 current_time = time.time()
                 if current_time - self.last_performance_check >= 10:  # Every 10 seconds
                     messages_per_second = self.message_count / 10
-                    avg_latency = np.mean(self.latency_measurements) if self.latency_measurements else 0
+                    # Mean over the window from the histogram's running count and sum
+                    summary = self.latency.summary()
+                    count, total = summary['count'], summary['mean'] * summary['count']
+                    last_count, last_total = self._latency_window
+                    avg_latency = (total - last_total) / (count - last_count) * 1000 if count > last_count else 0
+                    self._latency_window = (count, total)
                     
                     logger.info(f"Performance: {messages_per_second:.1f} msg/s, "
                               f"Avg latency: {avg_latency:.2f}ms, "
@@ -558,7 +609,6 @@ class RealTimeStreamManager:
                     # Reset counters
                     self.message_count = 0
                     self.last_performance_check = current_time
-                    self.latency_measurements = []
                 
                 await asyncio.sleep(1)
                 
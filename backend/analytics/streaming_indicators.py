@@ -0,0 +1,529 @@
+"""
+Streaming (incremental) technical indicators
+Constant-time per-bar updates that reproduce the batch kernels in indicators_numba.py
+
+Every indicator keeps the recursive state as of the last *closed* bar plus a
+pending state for the still-forming bar:
+- append(...)  closes the pending bar and starts a new one
+- update(...)  recomputes the forming bar from the closed state (live tick)
+
+Values are bit-for-bit identical to the batch kernels, including their warm-up
+behaviour (NaN / neutral defaults). Window indicators (Bollinger, Stochastic)
+do a fixed amount of work over their look-back window per bar, independent of
+history length.
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """Base class implementing the closed/pending bar protocol"""
+
+    def __init__(self):
+        self._count = 0          # closed bars
+        self._pending = None     # (value, new_state) for the forming bar
+        self.value = NAN
+
+    def __len__(self) -> int:
+        return self._count + (1 if self._pending is not None else 0)
+
+    def append(self, *bar):
+        """Start a new bar (closing the current forming bar, if any)"""
+        if self._pending is not None:
+            self._commit(self._pending[1])
+            self._count += 1
+        self._pending = self._step(*bar)
+        self.value = self._pending[0]
+        return self.value
+
+    def update(self, *bar):
+        """Replace the forming bar with new values (live candle tick)"""
+        if self._pending is None:
+            return self.append(*bar)
+        self._pending = self._step(*bar)
+        self.value = self._pending[0]
+        return self.value
+
+    def _step(self, *bar):
+        raise NotImplementedError
+
+    def _commit(self, state):
+        raise NotImplementedError
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA seeded with the SMA of the first ``period`` values"""
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.multiplier = 2.0 / (period + 1.0)
+        self._seed_sum = 0.0
+        self._prev = NAN
+
+    def _step(self, x):
+        i, p = self._count, self.period
+        if i < p - 1:
+            return NAN, (self._seed_sum + x, NAN)
+        if i == p - 1:
+            s = self._seed_sum + x
+            return s / p, (s, s / p)
+        ema = (x - self._prev) * self.multiplier + self._prev
+        return ema, (self._seed_sum, ema)
+
+    def _commit(self, state):
+        self._seed_sum, self._prev = state
+
+
+class StreamingSMA(StreamingIndicator):
+    """SMA with the same recursive update as calculate_sma_numba"""
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self._seed_sum = 0.0
+        self._prev = NAN
+        self._window = deque(maxlen=period)  # last ``period`` closed values
+
+    def _step(self, x):
+        i, p = self._count, self.period
+        if i < p - 1:
+            return NAN, (self._seed_sum + x, NAN, x)
+        if i == p - 1:
+            s = self._seed_sum + x
+            return s / p, (s, s / p, x)
+        sma = self._prev + (x - self._window[0]) / p
+        return sma, (self._seed_sum, sma, x)
+
+    def _commit(self, state):
+        self._seed_sum, self._prev, x = state
+        self._window.append(x)
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI (neutral 50 during warm-up)"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev_close = NAN
+        self._sum_gain = 0.0
+        self._sum_loss = 0.0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def _step(self, close):
+        i, p = self._count, self.period
+        if i == 0:
+            return 50.0, (close, 0.0, 0.0, 0.0, 0.0)
+
+        delta = close - self._prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if i < p:
+            return 50.0, (close, self._sum_gain + gain, self._sum_loss + loss, 0.0, 0.0)
+
+        if i == p:
+            avg_gain = (self._sum_gain + gain) / p
+            avg_loss = (self._sum_loss + loss) / p
+        else:
+            avg_gain, avg_loss = self._avg_gain, self._avg_loss
+        avg_gain = (avg_gain * (p - 1) + gain) / p
+        avg_loss = (avg_loss * (p - 1) + loss) / p
+
+        if avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+        return rsi, (close, self._sum_gain, self._sum_loss, avg_gain, avg_loss)
+
+    def _commit(self, state):
+        self._prev_close, self._sum_gain, self._sum_loss, self._avg_gain, self._avg_loss = state
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class StreamingATR(StreamingIndicator):
+    """Wilder ATR seeded with the mean of the first ``period`` true ranges"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev_close = NAN
+        self._tr_sum = 0.0
+        self._prev = NAN
+
+    def _step(self, high, low, close):
+        i, p = self._count, self.period
+        if i == 0:
+            return NAN, (close, 0.0, NAN)
+        tr = _true_range(high, low, self._prev_close)
+        if i < p:
+            return NAN, (close, self._tr_sum + tr, NAN)
+        if i == p:
+            atr = (self._tr_sum + tr) / p
+        else:
+            atr = (self._prev * (p - 1) + tr) / p
+        return atr, (close, self._tr_sum, atr)
+
+    def _commit(self, state):
+        self._prev_close, self._tr_sum, self._prev = state
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal and histogram built from streaming EMAs"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def append(self, close):
+        macd = self.fast.append(close) - self.slow.append(close)
+        signal = self.signal.append(macd)
+        self.value = (macd, signal, macd - signal)
+        return self.value
+
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        self.value = (macd, signal, macd - signal)
+        return self.value
+
+    def __len__(self) -> int:
+        return len(self.fast)
+
+
+def _population_std(window) -> float:
+    # Sequential two-pass variance, matching the kernels' np.std
+    n = len(window)
+    mean = 0.0
+    for v in window:
+        mean += v
+    mean /= n
+    ssd = 0.0
+    for v in window:
+        d = v - mean
+        ssd += d * d
+    return math.sqrt(ssd / n)
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger Bands: recursive SMA middle band and population std"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        super().__init__()
+        self.period = period
+        self.std_dev = std_dev
+        self.middle = StreamingSMA(period)
+        self._closes = deque(maxlen=period - 1) if period > 1 else deque(maxlen=0)
+        self._last = None
+        self.value = (NAN, NAN, NAN)
+
+    def _bands(self, close, middle):
+        if len(self._closes) < self.period - 1:
+            return (NAN, middle, NAN)
+        std = _population_std(list(self._closes) + [close])
+        return (middle + self.std_dev * std, middle, middle - self.std_dev * std)
+
+    def append(self, close):
+        if self._last is not None:
+            self._closes.append(self._last)
+        self._last = close
+        self.value = self._bands(close, self.middle.append(close))
+        return self.value
+
+    def update(self, close):
+        if self._last is None:
+            return self.append(close)
+        self._last = close
+        self.value = self._bands(close, self.middle.update(close))
+        return self.value
+
+    def __len__(self) -> int:
+        return len(self.middle)
+
+
+class StreamingStochastic(StreamingIndicator):
+    """Stochastic %K/%D with SMA smoothing"""
+
+    def __init__(self, period: int = 14, smooth_k: int = 3, smooth_d: int = 3):
+        super().__init__()
+        self.period = period
+        self._highs = deque(maxlen=max(period - 1, 0))
+        self._lows = deque(maxlen=max(period - 1, 0))
+        self._last = None
+        self.k = StreamingSMA(smooth_k)
+        self.d = StreamingSMA(smooth_d)
+        self.value = (NAN, NAN)
+
+    def _raw_k(self, high, low, close):
+        if len(self._highs) < self.period - 1:
+            return NAN
+        highest = max(max(self._highs, default=high), high)
+        lowest = min(min(self._lows, default=low), low)
+        if highest - lowest == 0:
+            return 50.0
+        return ((close - lowest) / (highest - lowest)) * 100.0
+
+    def append(self, high, low, close):
+        if self._last is not None:
+            self._highs.append(self._last[0])
+            self._lows.append(self._last[1])
+        self._last = (high, low)
+        k = self.k.append(self._raw_k(high, low, close))
+        self.value = (k, self.d.append(k))
+        return self.value
+
+    def update(self, high, low, close):
+        if self._last is None:
+            return self.append(high, low, close)
+        self._last = (high, low)
+        k = self.k.update(self._raw_k(high, low, close))
+        self.value = (k, self.d.update(k))
+        return self.value
+
+    def __len__(self) -> int:
+        return len(self.k)
+
+
+class StreamingPSAR(StreamingIndicator):
+    """Parabolic SAR tracking the extreme point and acceleration factor"""
+
+    def __init__(self, af_start: float = 0.02, af_increment: float = 0.02, af_max: float = 0.2):
+        super().__init__()
+        self.af_start = af_start
+        self.af_increment = af_increment
+        self.af_max = af_max
+        self._psar = NAN
+        self._trend = 1
+        self._ep = NAN
+        self._af = af_start
+        self._bar1 = None  # (high, low) of bar i-1
+        self._bar2 = None  # (high, low) of bar i-2
+
+    @property
+    def trend(self) -> int:
+        return self._pending[1][1] if self._pending is not None else self._trend
+
+    def _step(self, high, low):
+        if self._count == 0:
+            return low, (low, 1, high, self.af_start, (high, low))
+
+        ep, af = self._ep, self._af
+        psar = self._psar + af * (ep - self._psar)
+        prev_high, prev_low = self._bar1
+
+        if self._trend == 1:
+            if low < psar:
+                trend, psar, ep, af = -1, ep, low, self.af_start
+            else:
+                trend = 1
+                if high > ep:
+                    ep = high
+                    af = min(af + self.af_increment, self.af_max)
+                psar = min(psar, prev_low)
+                if self._bar2 is not None:
+                    psar = min(psar, self._bar2[1])
+        else:
+            if high > psar:
+                trend, psar, ep, af = 1, ep, high, self.af_start
+            else:
+                trend = -1
+                if low < ep:
+                    ep = low
+                    af = min(af + self.af_increment, self.af_max)
+                psar = max(psar, prev_high)
+                if self._bar2 is not None:
+                    psar = max(psar, self._bar2[0])
+
+        return psar, (psar, trend, ep, af, (high, low))
+
+    def _commit(self, state):
+        self._psar, self._trend, self._ep, self._af, bar = state
+        self._bar2 = self._bar1
+        self._bar1 = bar
+
+
+class StreamingADX(StreamingIndicator):
+    """ADX with +DI/-DI using Wilder smoothing"""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev_bar = None  # (high, low, close)
+        self._sums = (0.0, 0.0, 0.0)
+        self._smooth = (0.0, 0.0, 0.0)
+        self._adx = NAN
+        self.value = (NAN, NAN, NAN)
+
+    def _step(self, high, low, close):
+        i, p = self._count, self.period
+        bar = (high, low, close)
+        if i == 0:
+            return (NAN, NAN, NAN), (bar, self._sums, self._smooth, NAN)
+
+        prev_high, prev_low, prev_close = self._prev_bar
+        tr = _true_range(high, low, prev_close)
+        high_diff = high - prev_high
+        low_diff = prev_low - low
+        plus_dm = high_diff if (high_diff > low_diff and high_diff > 0) else 0.0
+        minus_dm = low_diff if (low_diff > high_diff and low_diff > 0) else 0.0
+
+        if i < p:
+            sums = (self._sums[0] + tr, self._sums[1] + plus_dm, self._sums[2] + minus_dm)
+            return (NAN, NAN, NAN), (bar, sums, self._smooth, NAN)
+
+        if i == p:
+            atr, plus_s, minus_s = (
+                (self._sums[0] + tr) / p,
+                (self._sums[1] + plus_dm) / p,
+                (self._sums[2] + minus_dm) / p,
+            )
+        else:
+            atr, plus_s, minus_s = self._smooth
+        atr = (atr * (p - 1) + tr) / p
+        plus_s = (plus_s * (p - 1) + plus_dm) / p
+        minus_s = (minus_s * (p - 1) + minus_dm) / p
+
+        plus_di = minus_di = NAN
+        if atr > 0:
+            plus_di = (plus_s / atr) * 100
+            minus_di = (minus_s / atr) * 100
+
+        adx = NAN
+        di_sum = plus_di + minus_di
+        if di_sum > 0:
+            dx = abs(plus_di - minus_di) / di_sum * 100
+            adx = dx if i == p else (self._adx * (p - 1) + dx) / p
+
+        return (adx, plus_di, minus_di), (bar, self._sums, (atr, plus_s, minus_s), adx)
+
+    def _commit(self, state):
+        self._prev_bar, self._sums, self._smooth, self._adx = state
+
+
+class IndicatorStream:
+    """
+    Incremental version of the IndicatorEngine indicator suite for one series
+
+    Produces the same keys as ``IndicatorEngine._compute_all_numba`` but only
+    for the latest bar.
+
+    Example:
+        stream = IndicatorStream.from_arrays(highs, lows, closes, timestamps)
+        stream.update(high, low, close)            # live tick
+        stream.append(high, low, close, ts=next_ts)  # new candle
+        latest = stream.latest()
+    """
+
+    def __init__(self):
+        self.ema_12 = StreamingEMA(12)
+        self.ema_26 = StreamingEMA(26)
+        self.ema_50 = StreamingEMA(50)
+        self.ema_200 = StreamingEMA(200)
+        self.sma_20 = StreamingSMA(20)
+        self.sma_50 = StreamingSMA(50)
+        self.rsi = StreamingRSI(14)
+        self.macd = StreamingMACD(12, 26, 9)
+        self.atr = StreamingATR(14)
+        self.bollinger = StreamingBollinger(20, 2.0)
+        self.adx = StreamingADX(14)
+        self.psar = StreamingPSAR(0.02, 0.02, 0.2)
+        self.stochastic = StreamingStochastic(14, 3, 3)
+        self.last_ts: Optional[int] = None
+        self.bars = 0
+
+    def _apply(self, method: str, high: float, low: float, close: float):
+        for ind in (self.ema_12, self.ema_26, self.ema_50, self.ema_200,
+                    self.sma_20, self.sma_50, self.rsi, self.macd, self.bollinger):
+            getattr(ind, method)(close)
+        getattr(self.atr, method)(high, low, close)
+        getattr(self.adx, method)(high, low, close)
+        getattr(self.stochastic, method)(high, low, close)
+        getattr(self.psar, method)(high, low)
+
+    def append(self, high: float, low: float, close: float, ts: Optional[int] = None) -> Dict[str, float]:
+        """Add a new candle"""
+        self._apply('append', float(high), float(low), float(close))
+        self.last_ts = ts
+        self.bars += 1
+        return self.latest()
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """Update the forming (last) candle"""
+        if self.bars == 0:
+            return self.append(high, low, close)
+        self._apply('update', float(high), float(low), float(close))
+        return self.latest()
+
+    def sync(self, timestamps: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> bool:
+        """
+        Catch up with a candle window (e.g. a CandleStore view)
+
+        Updates the forming candle and appends any newer candles. Returns
+        False if the window does not contain the stream's last candle (the
+        caller should rebuild the stream).
+        """
+        if self.last_ts is None:
+            for i in range(len(closes)):
+                self.append(highs[i], lows[i], closes[i], ts=int(timestamps[i]))
+            return True
+
+        idx = int(np.searchsorted(timestamps, self.last_ts))
+        if idx >= len(timestamps) or int(timestamps[idx]) != self.last_ts:
+            return False
+        self.update(highs[idx], lows[idx], closes[idx])
+        for i in range(idx + 1, len(closes)):
+            self.append(highs[i], lows[i], closes[i], ts=int(timestamps[i]))
+        return True
+
+    @classmethod
+    def from_arrays(cls, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                    timestamps: Optional[np.ndarray] = None) -> 'IndicatorStream':
+        """Build a stream by replaying history (one-off O(n))"""
+        stream = cls()
+        if timestamps is None:
+            timestamps = np.arange(len(closes), dtype=np.int64)
+        stream.sync(timestamps, highs, lows, closes)
+        return stream
+
+    def latest(self) -> Dict[str, float]:
+        """Latest value of every indicator, keyed like IndicatorEngine.compute_all"""
+        macd_line, macd_signal, macd_hist = self.macd.value
+        bb_upper, bb_middle, bb_lower = self.bollinger.value
+        adx, plus_di, minus_di = self.adx.value
+        stoch_k, stoch_d = self.stochastic.value
+        return {
+            'ema_12': self.ema_12.value,
+            'ema_26': self.ema_26.value,
+            'ema_50': self.ema_50.value,
+            'ema_200': self.ema_200.value,
+            'sma_20': self.sma_20.value,
+            'sma_50': self.sma_50.value,
+            'rsi': self.rsi.value,
+            'macd_line': macd_line,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_hist,
+            'atr': self.atr.value,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'adx': adx,
+            'plus_di': plus_di,
+            'minus_di': minus_di,
+            'psar': self.psar.value,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+        }
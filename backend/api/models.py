@@ -97,4 +97,17 @@ class ScanResponse(BaseModel):
     scan_time: str
     symbols_scanned: int
     opportunities_found: int
-    results: List[ScanResult]
\ No newline at end of file
+    results: List[ScanResult]
+class SweepRequest(BaseModel):
+    """Request model for a backtest parameter sweep"""
+    symbol: str = Field(default="BTCUSDT", min_length=1)
+    timeframe: str = "1h"
+    start_date: str = "2024-01-01"
+    end_date: str = "2024-02-01"
+    initial_capital: float = Field(default=10000.0, gt=0)
+    grid: Dict[str, List[Any]] = Field(..., description="Parameter -> candidate values")
+    samples: Optional[int] = Field(default=None, gt=0, description="Random sample size instead of the full grid")
+    seed: int = 0
+    rank_by: str = "sharpe_ratio"
+    top: Optional[int] = Field(default=20, gt=0)
+    stream: bool = Field(default=False, description="Stream NDJSON results as they finish")
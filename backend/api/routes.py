@@ -3,16 +3,19 @@ Enhanced API Routes for Phases 7, 8, and 9
 """
 
 import asyncio
+import json
 import logging
+from dataclasses import asdict
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from .models import (
     ScoreRequest, ScanRequest, ScoreResponse, ScanResponse, 
-    HealthResponse, WeightConfig, ScanRule
+    HealthResponse, WeightConfig, ScanRule, SweepRequest
 )
 from ..detectors.harmonic import HarmonicDetector
 from ..detectors.elliott import ElliottWaveDetector
@@ -27,8 +30,9 @@ from ..scoring.engine import DynamicScoringEngine
 from ..scoring.scanner import MultiTimeframeScanner
 from ..backtesting.engine import BacktestEngine
 from ..backtesting.models import BacktestConfig
+from ..backtesting.sweep import ParameterSweep, SweepSpace
 from ..websocket.manager import manager
-from ..websocket.live_scanner import live_scanner
+from ..websocket.live_scanner import live_scanner, get_live_scanner
 from ..data.data_manager import data_manager
 
 logger = logging.getLogger(__name__)
@@ -79,7 +83,8 @@ async def score_signal(request: ScoreRequest):
             scoring_engine.update_weights(request.weights)
         
         # Score the data
-        result = await scoring_engine.score(ohlcv, request.context)
+        context = {"symbol": request.symbol, "timeframe": request.timeframe, **(request.context or {})}
+        result = await scoring_engine.score(ohlcv, context)
         
         return ScoreResponse(
             symbol=request.symbol,
@@ -168,9 +173,15 @@ async def run_backtest(
     end_date: str = "2024-02-01",
     initial_capital: float = 10000.0,
     min_score: float = 0.65,
-    min_confidence: float = 0.6
+    min_confidence: float = 0.6,
+    mode: Literal["event", "fast"] = "event"
 ):
-    """Run a comprehensive backtest"""
+    """
+    Run a comprehensive backtest
+
+    mode="fast" uses the vectorized walk-forward path, which scores with
+    heuristic stand-ins for the detectors; its response has "approximate": true.
+    """
     try:
         # Parse dates
         start_dt = datetime.fromisoformat(start_date)
@@ -196,7 +207,8 @@ async def run_backtest(
             scoring_engine=scoring_engine,
             risk_manager=None,  # Would use real risk manager
             entry_rules=entry_rules,
-            exit_rules=exit_rules
+            exit_rules=exit_rules,
+            mode=mode
         )
         
         return result
@@ -205,6 +217,63 @@ async def run_backtest(
         logger.exception("Backtest failed")
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
+@router.post("/backtest/sweep")
+async def run_backtest_sweep(request: SweepRequest):
+    """
+    Grid/random search over detector weights, entry/exit rules and costs
+    
+    History is loaded once and shared by all configurations, which run in a
+    process pool on the vectorized backtester. With ``stream`` set, results
+    are sent as NDJSON lines as they finish, followed by the ranked table.
+    """
+    try:
+        start_dt = datetime.fromisoformat(request.start_date)
+        end_dt = datetime.fromisoformat(request.end_date)
+        space = SweepSpace(grid=request.grid, samples=request.samples, seed=request.seed)
+        ParameterSweep.rank([], by=request.rank_by)  # validate before loading data
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        ohlcv = await backtest_engine._load_historical_data(
+            request.symbol, request.timeframe, start_dt, end_dt
+        )
+    except Exception as e:
+        logger.exception("Backtest sweep failed")
+        raise HTTPException(status_code=500, detail=f"Backtest sweep failed: {str(e)}")
+    
+    # Everything that can be rejected is checked before a streamed 200 goes out
+    try:
+        ParameterSweep.check_history(ohlcv)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sweep = ParameterSweep(initial_capital=request.initial_capital)
+    
+    if not request.stream:
+        try:
+            table = await sweep.run(
+                ohlcv, space, start_dt, end_dt, rank_by=request.rank_by, top=request.top
+            )
+        except Exception as e:
+            logger.exception("Backtest sweep failed")
+            raise HTTPException(status_code=500, detail=f"Backtest sweep failed: {str(e)}")
+        return {"symbol": request.symbol, "configurations": len(space), "results": table}
+    
+    async def _results():
+        finished = []
+        try:
+            async for result in sweep.stream(ohlcv, space, start_dt, end_dt):
+                finished.append(result)
+                yield json.dumps({"type": "result", "done": len(finished), "total": len(space), **asdict(result)}) + "\n"
+            table = ParameterSweep.rank(finished, by=request.rank_by, top=request.top)
+            yield json.dumps({"type": "ranked", "results": table}) + "\n"
+        except Exception as e:
+            # Headers are already sent; end the stream with an error line the client can see
+            logger.exception("Backtest sweep failed")
+            yield json.dumps({"type": "error", "done": len(finished), "detail": f"Backtest sweep failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(_results(), media_type="application/x-ndjson")
+
 @router.get("/backtest/results/{backtest_id}")
 async def get_backtest_results(backtest_id: str):
     """Get detailed backtest results"""
@@ -317,6 +386,28 @@ async def websocket_endpoint(websocket):
                 if symbol:
                     await manager.unsubscribe(websocket, symbol)
             
+            elif action == "subscribe_scan":
+                # Delta mode: snapshot now, then sequenced per-symbol diffs
+                scanner = await get_live_scanner()
+                if scanner is not None:
+                    await scanner.deltas.attach(websocket)
+            
+            elif action == "resync":
+                # Client saw a sequence gap; resend the snapshot
+                scanner = await get_live_scanner()
+                if scanner is not None:
+                    await scanner.deltas.send_snapshot(websocket, data.get("symbols"))
+            
+            elif action == "unsubscribe_scan":
+                scanner = await get_live_scanner()
+                if scanner is not None:
+                    scanner.deltas.detach(websocket)
+            
+            elif action == "set_encoding":
+                # Later frames use the negotiated encoding (json or msgpack)
+                encoding = manager.set_encoding(websocket, data.get("encoding"))
+                await websocket.send_json({"type": "encoding_set", "encoding": encoding})
+            
             elif action == "ping":
                 await websocket.send_json({"type": "pong"})
             
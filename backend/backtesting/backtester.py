@@ -6,7 +6,8 @@ import pandas as pd
 import numpy as np
 from dataclasses import dataclass
 
-from ..data.kucoin_client import kucoin_client
+from ..data.candle_store import view_to_frame
+from ..data.history_store import history_store, fetch_binance_range
 from ..analytics.core_signals import generate_rsi_macd_signal, calculate_trend_strength
 from ..analytics.smc_analysis import analyze_smart_money_concepts
 from ..analytics.pattern_detection import detect_candlestick_patterns
@@ -143,50 +144,26 @@ class BacktestEngine:
             raise
     
     async def _fetch_historical_data(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """Fetch historical OHLCV data from KuCoin"""
+        """Fetch historical hourly OHLCV data through the local history store"""
         try:
             # Convert dates to timestamps
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
             end_dt = datetime.strptime(end_date, '%Y-%m-%d')
             
-            start_timestamp = int(start_dt.timestamp())
-            end_timestamp = int(end_dt.timestamp())
-            
-            # Fetch data in chunks (KuCoin has limits)
-            all_data = []
-            current_start = start_timestamp
-            chunk_size = 7 * 24 * 60 * 60  # 7 days in seconds
-            
-            while current_start < end_timestamp:
-                current_end = min(current_start + chunk_size, end_timestamp)
-                
-                data = await kucoin_client.get_historical_ohlcv(
-                    symbol, 
-                    timeframe='1hour',
-                    start_time=current_start,
-                    end_time=current_end
-                )
-                
-                if data:
-                    all_data.extend(data)
-                
-                current_start = current_end
-                await asyncio.sleep(0.1)  # Rate limiting
+            # Only ranges missing on disk are downloaded (in 1000-bar chunks)
+            view = await history_store.get_range(
+                'binance',
+                symbol,
+                '1h',
+                int(start_dt.timestamp() * 1000),
+                int(end_dt.timestamp() * 1000),
+                fetch_binance_range
+            )
             
-            if not all_data:
+            if len(view) == 0:
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            df = pd.DataFrame(all_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-            df = df.sort_values('timestamp').reset_index(drop=True)
-            
-            # Convert price columns to float
-            price_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in price_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            return df
+            return view_to_frame(view)
             
         except Exception as e:
             print(f"Error fetching historical data: {str(e)}")
@@ -5,7 +5,7 @@ Advanced Backtesting Engine for strategy validation
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Literal, Tuple
 import pandas as pd
 import numpy as np
 from dataclasses import asdict
@@ -14,9 +14,11 @@ from .models import (
     Trade, BacktestMetrics, BacktestConfig, BacktestResult, 
     OHLCVBar
 )
-from ..scoring.engine import DynamicScoringEngine
+from ..scoring.engine import DynamicScoringEngine, WeightConfig
 from ..risk.risk_manager import risk_manager
 from ..analytics.indicators import calculate_atr
+from ..analytics.pivots import ohlcv_to_arrays
+from . import vectorized
 
 class BacktestEngine:
     """Historical strategy validation engine"""
@@ -41,7 +43,9 @@ class BacktestEngine:
         scoring_engine: DynamicScoringEngine,
         risk_manager: Any,
         entry_rules: dict,
-        exit_rules: dict
+        exit_rules: dict,
+        mode: Literal["event", "fast"] = "event",
+        signals: Optional[Dict[str, np.ndarray]] = None
     ) -> Dict:
         """
         Run backtest on historical data
@@ -54,6 +58,12 @@ class BacktestEngine:
             risk_manager: Position sizing
             entry_rules: {"min_score": 0.65, "min_confidence": 0.6}
             exit_rules: {"use_trailing": True, "time_stop_bars": 24}
+            mode: "event" rescores every bar with scoring_engine (reference path);
+                  "fast" uses precomputed causal signal columns (see run_vectorized).
+                  Fast mode scores with vectorized.detector_columns, heuristic
+                  stand-ins for the detectors, so its result is an approximation
+                  and carries ``approximate: True``
+            signals: Optional precomputed signal columns for fast mode
         
         Returns:
             {"metrics": BacktestMetrics, "trades": List[Trade], "equity_curve": List[float]}
@@ -74,108 +84,19 @@ class BacktestEngine:
             if len(ohlcv) < 200:
                 raise ValueError("Insufficient historical data")
             
-            # Initialize backtest state
-            equity = self.initial_capital
-            equity_curve = [equity]
-            trades: List[Trade] = []
-            
-            position = None  # Current open position
-            position_entry_bar = None
-            
-            # Walk through history
-            for i in range(200, len(ohlcv)):
-                current_bar = ohlcv[i]
-                current_time = datetime.fromtimestamp(current_bar['ts'] / 1000)
-                
-                # Get scoring window
-                window = ohlcv[i-200:i]
-                
-                # Check if we have open position
-                if position is not None:
-                    # Check exits
-                    exit_signal = self._check_exit_conditions(
-                        position, current_bar, i - position_entry_bar, exit_rules
-                    )
-                    
-                    if exit_signal:
-                        trade = self._close_position(
-                            position, current_bar, current_time, exit_signal['reason']
-                        )
-                        trades.append(trade)
-                        
-                        # Update equity
-                        equity += trade.pnl
-                        equity_curve.append(equity)
-                        
-                        # Reset position
-                        position = None
-                        position_entry_bar = None
-                        
-                        logger.debug(
-                            f"Closed position: {trade.direction} {trade.pnl:.2f} ({trade.exit_reason})"
-                        )
-                
-                else:
-                    # Look for entry signals
-                    try:
-                        score = await scoring_engine.score(window)
-                        
-                        entry_signal = self._check_entry_conditions(
-                            score, entry_rules
-                        )
-                        
-                        if entry_signal:
-                            # Calculate position size
-                            indicators = self._calculate_indicators(window)
-                            atr = indicators['atr']
-                            
-                            direction = "LONG" if score.direction == "BULLISH" else "SHORT"
-                            entry_price = current_bar['close']
-                            
-                            # Calculate stop loss
-                            stop_loss = self._calculate_stop_loss(
-                                entry_price,
-                                score.direction,
-                                atr
-                            )
-                            
-                            pos_size = self._calculate_position_size(
-                                symbol,
-                                entry_price,
-                                stop_loss,
-                                score,
-                                atr,
-                                equity
-                            )
-                            
-                            if pos_size:
-                                position = {
-                                    "direction": direction,
-                                    "entry_time": current_time,
-                                    "entry_price": entry_price,
-                                    "quantity": pos_size['quantity'],
-                                    "stop_loss": stop_loss,
-                                    "take_profit": pos_size['take_profit'],
-                                    "atr": atr
-                                }
-                                position_entry_bar = i
-                                
-                                logger.debug(
-                                    f"Opened {direction} position at {entry_price:.2f}"
-                                )
-                    
-                    except Exception as e:
-                        logger.warning(f"Scoring failed at bar {i}: {e}")
-                        continue
-            
-            # Close any remaining position at end
-            if position is not None:
-                trade = self._close_position(
-                    position, ohlcv[-1], end_date, "END_OF_TEST"
+            if mode == "fast":
+                trades, equity_curve = self.run_vectorized(
+                    symbol, ohlcv, end_date,
+                    weights=getattr(scoring_engine, 'weights', None),
+                    entry_rules=entry_rules,
+                    exit_rules=exit_rules,
+                    signals=signals
+                )
+            else:
+                trades, equity_curve = await self._run_event_driven(
+                    symbol, ohlcv, end_date, scoring_engine, entry_rules, exit_rules
                 )
-                trades.append(trade)
-                equity += trade.pnl
-                equity_curve.append(equity)
+            equity = equity_curve[-1]
             
             # Calculate metrics
             metrics = self._calculate_metrics(trades, equity_curve, start_date, end_date)
@@ -206,6 +127,9 @@ class BacktestEngine:
                 "equity_curve": equity_curve,
                 "final_equity": equity,
                 "total_return_pct": ((equity - self.initial_capital) / self.initial_capital) * 100,
+                "mode": mode,
+                # Fast mode scores with detector stand-ins, not scoring_engine's detectors
+                "approximate": mode == "fast" and signals is None,
                 "success": True
             }
             
@@ -217,6 +141,232 @@ class BacktestEngine:
                 "success": False
             }
     
+    async def _run_event_driven(
+        self,
+        symbol: str,
+        ohlcv: List[Dict],
+        end_date: datetime,
+        scoring_engine: DynamicScoringEngine,
+        entry_rules: dict,
+        exit_rules: dict
+    ) -> Tuple[List[Trade], List[float]]:
+        """Bar-by-bar walk that rescores the trailing 200-bar window on every bar"""
+        # Initialize backtest state
+        equity = self.initial_capital
+        equity_curve = [equity]
+        trades: List[Trade] = []
+        
+        position = None  # Current open position
+        position_entry_bar = None
+        
+        # Walk through history
+        for i in range(200, len(ohlcv)):
+            current_bar = ohlcv[i]
+            current_time = datetime.fromtimestamp(current_bar['ts'] / 1000)
+            
+            # Get scoring window
+            window = ohlcv[i-200:i]
+            
+            # Check if we have open position
+            if position is not None:
+                # Check exits
+                exit_signal = self._check_exit_conditions(
+                    position, current_bar, i - position_entry_bar, exit_rules
+                )
+                
+                if exit_signal:
+                    trade = self._close_position(
+                        position, current_bar, current_time, exit_signal['reason']
+                    )
+                    trades.append(trade)
+                    
+                    # Update equity
+                    equity += trade.pnl
+                    equity_curve.append(equity)
+                    
+                    # Reset position
+                    position = None
+                    position_entry_bar = None
+                    
+                    logger.debug(
+                        f"Closed position: {trade.direction} {trade.pnl:.2f} ({trade.exit_reason})"
+                    )
+            
+            else:
+                # Look for entry signals
+                try:
+                    score = await scoring_engine.score(window)
+                    
+                    entry_signal = self._check_entry_conditions(
+                        score, entry_rules
+                    )
+                    
+                    if entry_signal:
+                        # Calculate position size
+                        indicators = self._calculate_indicators(window)
+                        atr = indicators['atr']
+                        
+                        direction = "LONG" if score.direction == "BULLISH" else "SHORT"
+                        entry_price = current_bar['close']
+                        
+                        # Calculate stop loss
+                        stop_loss = self._calculate_stop_loss(
+                            entry_price,
+                            score.direction,
+                            atr
+                        )
+                        
+                        pos_size = self._calculate_position_size(
+                            symbol,
+                            entry_price,
+                            stop_loss,
+                            score,
+                            atr,
+                            equity
+                        )
+                        
+                        if pos_size:
+                            position = {
+                                "direction": direction,
+                                "entry_time": current_time,
+                                "entry_price": entry_price,
+                                "quantity": pos_size['quantity'],
+                                "stop_loss": stop_loss,
+                                "take_profit": pos_size['take_profit'],
+                                "atr": atr
+                            }
+                            position_entry_bar = i
+                            
+                            logger.debug(
+                                f"Opened {direction} position at {entry_price:.2f}"
+                            )
+                
+                except Exception as e:
+                    logger.warning(f"Scoring failed at bar {i}: {e}")
+                    continue
+        
+        # Close any remaining position at end
+        if position is not None:
+            trade = self._close_position(
+                position, ohlcv[-1], end_date, "END_OF_TEST"
+            )
+            trades.append(trade)
+            equity += trade.pnl
+            equity_curve.append(equity)
+        
+        return trades, equity_curve
+    
+    def compute_signals(
+        self,
+        ohlcv: List[Dict],
+        weights: Optional[WeightConfig] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Causal score columns for the whole history
+        
+        Column ``k`` is the score of the window ending at bar ``k``, i.e. what
+        the event-driven path sees when deciding an entry on bar ``k + 1``.
+        Also returns the feature columns (``atr`` is needed for sizing).
+        """
+        features = vectorized.compute_feature_columns(ohlcv_to_arrays(ohlcv))
+        components = vectorized.detector_columns(features)
+        signals = vectorized.combine_columns(components, weights or WeightConfig(), features)
+        return {**features, **signals}
+    
+    def run_vectorized(
+        self,
+        symbol: str,
+        ohlcv: List[Dict],
+        end_date: datetime,
+        weights: Optional[WeightConfig] = None,
+        entry_rules: Optional[dict] = None,
+        exit_rules: Optional[dict] = None,
+        signals: Optional[Dict[str, np.ndarray]] = None
+    ) -> Tuple[List[Trade], List[float]]:
+        """
+        Fast walk-forward backtest over precomputed signal columns
+        
+        Entries are a boolean mask over the score columns and each exit is a
+        vectorized search over the bars after the entry, so the Python loop
+        runs once per trade instead of once per bar. Trade rules, sizing and
+        fills are the same as the event-driven path; with the same signals
+        both produce the same trades. The default signals (compute_signals)
+        come from detector stand-ins, so they approximate rather than
+        reproduce what scoring_engine would score.
+        
+        Args:
+            signals: {"final_score", "confidence", "direction", "atr"} columns
+                     aligned with ``ohlcv``; computed with compute_signals if omitted
+        """
+        entry_rules = entry_rules or {}
+        exit_rules = exit_rules or {}
+        if signals is None:
+            signals = self.compute_signals(ohlcv, weights)
+        
+        arrays = ohlcv_to_arrays(ohlcv)
+        highs, lows, closes = arrays['high'], arrays['low'], arrays['close']
+        n = len(closes)
+        warmup = vectorized.WARMUP_BARS
+        time_stop = exit_rules.get("time_stop_bars")
+        
+        # Entry on bar i is decided from the window ending at bar i - 1
+        entries = np.flatnonzero(vectorized.entry_mask(signals, entry_rules)[warmup - 1:n - 1]) + warmup
+        atr_values = np.nan_to_num(signals['atr'])
+        
+        equity = self.initial_capital
+        equity_curve = [equity]
+        trades: List[Trade] = []
+        i = warmup
+        
+        while True:
+            k = np.searchsorted(entries, i)
+            if k == len(entries):
+                break
+            entry_bar = int(entries[k])
+            
+            score_direction = "BULLISH" if signals['direction'][entry_bar - 1] == vectorized.BULLISH else "BEARISH"
+            direction = "LONG" if score_direction == "BULLISH" else "SHORT"
+            entry_price = float(closes[entry_bar])
+            atr = float(atr_values[entry_bar - 1])
+            
+            stop_loss = self._calculate_stop_loss(entry_price, score_direction, atr)
+            pos_size = self._calculate_position_size(
+                symbol, entry_price, stop_loss, _SignalView(score_direction), atr, equity
+            )
+            if not pos_size:
+                i = entry_bar + 1
+                continue
+            
+            position = {
+                "direction": direction,
+                "entry_time": datetime.fromtimestamp(ohlcv[entry_bar]['ts'] / 1000),
+                "entry_price": entry_price,
+                "quantity": pos_size['quantity'],
+                "stop_loss": stop_loss,
+                "take_profit": pos_size['take_profit'],
+                "atr": atr
+            }
+            
+            exit_bar, reason = vectorized.find_exit(
+                highs, lows, entry_bar, direction, stop_loss, pos_size['take_profit'], time_stop
+            )
+            if exit_bar is None:
+                trade = self._close_position(position, ohlcv[-1], end_date, "END_OF_TEST")
+            else:
+                exit_time = datetime.fromtimestamp(ohlcv[exit_bar]['ts'] / 1000)
+                trade = self._close_position(position, ohlcv[exit_bar], exit_time, reason)
+            
+            trades.append(trade)
+            equity += trade.pnl
+            equity_curve.append(equity)
+            
+            if exit_bar is None:
+                break
+            # The event-driven path does not look for entries on the exit bar
+            i = exit_bar + 1
+        
+        return trades, equity_curve
+    
     async def _load_historical_data(
         self,
         symbol: str,
@@ -224,55 +374,23 @@ class BacktestEngine:
         start: datetime,
         end: datetime
     ) -> List[Dict]:
-        """Load historical bars with batching"""
-        # In production, this would batch requests
-        # For now, simplified version using data manager
-        
-        from ..data.data_manager import data_manager
+        """Load historical bars from the local history store, downloading only missing ranges"""
+        from ..data.history_store import history_store, fetch_binance_range, view_to_bars
         
         try:
-            # Convert timeframe
-            tf_map = {
-                "1m": "1minute",
-                "5m": "5minute", 
-                "15m": "15minute",
-                "30m": "30minute",
-                "1h": "1hour",
-                "4h": "4hour",
-                "1d": "1day"
-            }
-            
-            kucoin_timeframe = tf_map.get(timeframe, "1hour")
-            
-            # Get data from data manager
-            ohlcv_data = await data_manager.get_ohlcv_data(symbol, kucoin_timeframe, 1000)
+            view = await history_store.get_range(
+                "binance",
+                symbol,
+                timeframe,
+                int(start.timestamp() * 1000),
+                int(end.timestamp() * 1000) + 1,
+                fetch_binance_range
+            )
             
-            if ohlcv_data is None or ohlcv_data.empty:
+            if len(view) == 0:
                 raise ValueError(f"No data available for {symbol}")
             
-            # Convert to our format
-            bars = []
-            for _, row in ohlcv_data.iterrows():
-                bar = {
-                    'ts': int(row.get('timestamp', 0) * 1000),
-                    'open': float(row['open']),
-                    'high': float(row['high']),
-                    'low': float(row['low']),
-                    'close': float(row['close']),
-                    'volume': float(row['volume'])
-                }
-                bars.append(bar)
-            
-            # Filter to date range
-            start_ts = int(start.timestamp() * 1000)
-            end_ts = int(end.timestamp() * 1000)
-            
-            filtered = [
-                bar for bar in bars
-                if start_ts <= bar['ts'] <= end_ts
-            ]
-            
-            return filtered
+            return view_to_bars(view)
             
         except Exception as e:
             logger.error(f"Failed to load historical data: {e}")
@@ -390,9 +508,9 @@ class BacktestEngine:
         else:  # SHORT
             pnl = (entry_price - exit_price) * quantity
         
-        # Calculate fees and slippage
+        # Calculate fees and slippage (both charged per side on the fill notional)
         fees = (entry_price + exit_price) * quantity * self.fee_bps
-        slippage = abs(exit_price - current_bar['close']) * quantity
+        slippage = (entry_price + exit_price) * quantity * self.slippage_bps
         
         net_pnl = pnl - fees - slippage
         pnl_pct = net_pnl / (entry_price * quantity) * 100
@@ -713,6 +831,12 @@ class BacktestEngine:
         
         return "\n".join(csv_lines)
 
+class _SignalView:
+    """Minimal score object for sizing helpers that only read ``direction``"""
+    
+    def __init__(self, direction: str):
+        self.direction = direction
+
 # Global logger
 import logging
 logger = logging.getLogger(__name__)
\ No newline at end of file
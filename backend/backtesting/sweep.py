@@ -0,0 +1,267 @@
+"""
+Parallel parameter sweeps over the vectorized backtester
+Loads history and precomputes feature columns once, then fans configurations
+out over a process pool and streams results as they finish
+"""
+
+import asyncio
+import itertools
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from ..analytics.pivots import ohlcv_to_arrays
+from ..scoring.engine import WeightConfig
+from . import vectorized
+from .engine import BacktestEngine
+
+# Sweepable parameters by where they apply
+WEIGHT_PARAMS = tuple(WeightConfig().dict())
+ENTRY_PARAMS = ("min_score", "min_confidence")
+EXIT_PARAMS = ("time_stop_bars",)
+ENGINE_PARAMS = ("fee_bps", "slippage_bps")
+SWEEP_PARAMS = WEIGHT_PARAMS + ENTRY_PARAMS + EXIT_PARAMS + ENGINE_PARAMS
+
+# Most configurations one sweep may evaluate (after sampling)
+MAX_SWEEP_CONFIGS = 5_000
+
+# Metrics reported per configuration
+RESULT_METRICS = (
+    "total_trades", "win_rate", "total_pnl", "total_return_pct", "sharpe_ratio",
+    "sortino_ratio", "max_drawdown_pct", "profit_factor", "expectancy"
+)
+
+
+@dataclass
+class SweepResult:
+    """One evaluated configuration"""
+    index: int
+    params: Dict[str, Any]
+    metrics: Dict[str, float]
+    final_equity: float
+    error: Optional[str] = None
+
+
+@dataclass
+class SweepSpace:
+    """
+    Parameter grid, or a random sample of it
+
+    Example:
+        SweepSpace(
+            grid={"smc": [0.1, 0.2, 0.3], "min_score": [0.6, 0.65, 0.7],
+                  "time_stop_bars": [12, 24, 48]},
+            samples=20
+        )
+    """
+    grid: Dict[str, List[Any]]
+    samples: Optional[int] = None
+    seed: int = 0
+    base: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # use_trailing is an accepted exit rule, but the engine has no trailing stop,
+        # so sweeping it would report identical cells as different configurations
+        unknown = set(self.grid) | set(self.base)
+        unknown -= set(SWEEP_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        empty = [name for name, values in self.grid.items() if not isinstance(values, list) or not values]
+        if empty:
+            raise ValueError(f"Sweep parameters need a non-empty list of values: {sorted(empty)}")
+        if self.samples is not None and self.samples < 1:
+            raise ValueError("samples must be at least 1")
+        if len(self) > MAX_SWEEP_CONFIGS:
+            raise ValueError(f"Sweep has {len(self)} configurations; at most {MAX_SWEEP_CONFIGS} are allowed "
+                             f"(narrow the grid or set samples)")
+
+    @property
+    def grid_size(self) -> int:
+        return math.prod(len(values) for values in self.grid.values())
+
+    def __len__(self) -> int:
+        return min(self.grid_size, self.samples) if self.samples else self.grid_size
+
+    def configs(self) -> List[Dict[str, Any]]:
+        """Expanded configurations (grid order, or a reproducible random sample)"""
+        names = list(self.grid)
+        axes = [self.grid[name] for name in names]
+        if self.samples and self.samples < self.grid_size:
+            # Sample flat grid indices and decode them, so the product is never built
+            indices = random.Random(self.seed).sample(range(self.grid_size), self.samples)
+            combos = [self._combo(axes, index) for index in indices]
+        else:
+            combos = itertools.product(*axes)
+        return [{**self.base, **dict(zip(names, combo))} for combo in combos]
+
+    @staticmethod
+    def _combo(axes: List[List[Any]], index: int) -> tuple:
+        """Grid point ``index`` in itertools.product order (the last axis varies fastest)"""
+        combo = []
+        for values in reversed(axes):
+            index, position = divmod(index, len(values))
+            combo.append(values[position])
+        return tuple(reversed(combo))
+
+
+def split_params(params: Dict[str, Any]):
+    """Split a flat configuration into (weights, entry_rules, exit_rules, engine kwargs)"""
+    weights = {k: float(v) for k, v in params.items() if k in WEIGHT_PARAMS}
+    if weights:
+        # Unswept detectors keep their defaults; renormalize so the total is 1
+        merged = {**WeightConfig().dict(), **weights}
+        total = sum(merged.values())
+        weights = {k: v / total for k, v in merged.items()} if total > 0 else merged
+    entry_rules = {k: params[k] for k in ENTRY_PARAMS if k in params}
+    exit_rules = {k: params[k] for k in EXIT_PARAMS if k in params}
+    engine_kwargs = {k: float(params[k]) for k in ENGINE_PARAMS if k in params}
+    return WeightConfig(**weights), entry_rules, exit_rules, engine_kwargs
+
+
+# Worker-process state: history and weight-independent columns, sent once per worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(ohlcv: List[Dict], start_date: datetime, end_date: datetime, initial_capital: float):
+    features = vectorized.compute_feature_columns(ohlcv_to_arrays(ohlcv))
+    _worker_state.update(
+        ohlcv=ohlcv,
+        features=features,
+        components=vectorized.detector_columns(features),
+        start_date=start_date,
+        end_date=end_date,
+        initial_capital=initial_capital,
+    )
+
+
+def _finite(value) -> Optional[float]:
+    """JSON-safe metric value (inf/NaN, e.g. a profit factor with no losses, become None)"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _evaluate(index: int, params: Dict[str, Any]) -> SweepResult:
+    """Backtest one configuration against the worker's shared history"""
+    try:
+        weights, entry_rules, exit_rules, engine_kwargs = split_params(params)
+        engine = BacktestEngine(initial_capital=_worker_state['initial_capital'], **engine_kwargs)
+        features = _worker_state['features']
+        signals = {
+            **features,
+            **vectorized.combine_columns(_worker_state['components'], weights, features)
+        }
+        trades, equity_curve = engine.run_vectorized(
+            "SWEEP", _worker_state['ohlcv'], _worker_state['end_date'],
+            entry_rules=entry_rules, exit_rules=exit_rules, signals=signals
+        )
+        metrics = engine._calculate_metrics(
+            trades, equity_curve, _worker_state['start_date'], _worker_state['end_date']
+        )
+        return SweepResult(
+            index=index,
+            params=params,
+            metrics={name: _finite(getattr(metrics, name)) for name in RESULT_METRICS},
+            final_equity=float(equity_curve[-1])
+        )
+    except Exception as e:
+        return SweepResult(index=index, params=params, metrics={}, final_equity=0.0, error=str(e))
+
+
+class ParameterSweep:
+    """
+    Grid/random search over weights, entry/exit rules and costs
+
+    Example:
+        sweep = ParameterSweep(max_workers=8)
+        async for result in sweep.stream(ohlcv, space, start, end):
+            ...  # partial results as configurations finish
+        table = sweep.rank(results, by="sharpe_ratio")
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        initial_capital: float = 10000.0,
+        mp_context: str = "spawn"
+    ):
+        self.max_workers = max_workers
+        self.initial_capital = initial_capital
+        self.mp_context = mp_context
+
+    @staticmethod
+    def check_history(ohlcv: List[Dict]):
+        if len(ohlcv) < vectorized.WARMUP_BARS:
+            raise ValueError(
+                f"Insufficient historical data: {len(ohlcv)} bars, need {vectorized.WARMUP_BARS}"
+            )
+
+    async def stream(
+        self,
+        ohlcv: List[Dict],
+        space: SweepSpace,
+        start_date: datetime,
+        end_date: datetime
+    ) -> AsyncIterator[SweepResult]:
+        """Yield results in completion order"""
+        self.check_history(ohlcv)
+
+        configs = space.configs()
+        initargs = (ohlcv, start_date, end_date, self.initial_capital)
+
+        if self.max_workers == 0:
+            # In-process, for small sweeps and tests
+            _init_worker(*initargs)
+            for index, params in enumerate(configs):
+                yield _evaluate(index, params)
+                await asyncio.sleep(0)
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.mp_context),
+            initializer=_init_worker,
+            initargs=initargs
+        )
+        try:
+            futures = [
+                loop.run_in_executor(pool, _evaluate, index, params)
+                for index, params in enumerate(configs)
+            ]
+            for future in asyncio.as_completed(futures):
+                yield await future
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(
+        self,
+        ohlcv: List[Dict],
+        space: SweepSpace,
+        start_date: datetime,
+        end_date: datetime,
+        rank_by: str = "sharpe_ratio",
+        top: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Evaluate every configuration and return the ranked table"""
+        results = [r async for r in self.stream(ohlcv, space, start_date, end_date)]
+        return self.rank(results, by=rank_by, top=top)
+
+    @staticmethod
+    def rank(results: List[SweepResult], by: str = "sharpe_ratio", top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Sort successful results by a metric (descending; drawdown ascending; missing last)"""
+        if by not in RESULT_METRICS:
+            raise ValueError(f"Unknown ranking metric: {by}")
+        ok = [r for r in results if r.error is None]
+        sign = 1.0 if by == "max_drawdown_pct" else -1.0
+        ok.sort(key=lambda r: (r.metrics[by] is None, sign * (r.metrics[by] or 0.0), r.index))
+        table = [
+            {"rank": i + 1, "index": r.index, "params": r.params, "final_equity": r.final_equity, **r.metrics}
+            for i, r in enumerate(ok)
+        ]
+        return table[:top] if top else table
@@ -0,0 +1,235 @@
+"""
+Vectorized backtest primitives
+Causal feature and score columns computed once over the whole history, and
+exit searches that loop over trades instead of bars
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..analytics.indicators import calculate_atr
+from ..analytics.indicators_numba import (
+    calculate_ema_numba, calculate_rsi_numba, calculate_macd_numba, calculate_psar_numba
+)
+from ..analytics.pivots import find_pivots
+
+# Bars in the scoring window of the event-driven backtest
+WARMUP_BARS = 200
+
+# Direction codes used in signal columns
+BULLISH, NEUTRAL, BEARISH = 1, 0, -1
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs (leading NaNs stay NaN)"""
+    idx = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    return values[idx]
+
+
+def confirmed_swings(values: np.ndarray, lookback: int, kind: str) -> np.ndarray:
+    """
+    Most recent confirmed swing high/low at every bar
+
+    A pivot at ``j`` needs ``lookback`` bars on its right, so it only becomes
+    known at bar ``j + lookback``; using it earlier would leak the future.
+    """
+    pivots = find_pivots(values, lookback, kind)
+    confirmed = np.full(len(values), np.nan)
+    confirmed[pivots + lookback] = values[pivots]
+    return _ffill(confirmed)
+
+
+def compute_feature_columns(arrays: Dict[str, np.ndarray], swing_lookback: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Indicator and structure columns for the whole history
+
+    Every value at bar ``i`` only depends on bars ``<= i``, so a column can be
+    read at ``i`` exactly as a live scan would have seen it.
+    """
+    opens, highs, lows, closes = arrays['open'], arrays['high'], arrays['low'], arrays['close']
+    macd_line, _, _ = calculate_macd_numba(closes, 12, 26, 9)
+
+    return {
+        'open': opens,
+        'high': highs,
+        'low': lows,
+        'close': closes,
+        'ema_12': calculate_ema_numba(closes, 12),
+        'ema_26': calculate_ema_numba(closes, 26),
+        'ema_50': calculate_ema_numba(closes, 50),
+        'rsi': calculate_rsi_numba(closes, 14),
+        'macd': macd_line,
+        'psar': calculate_psar_numba(highs, lows, 0.02, 0.02, 0.2),
+        # Same rolling ATR the event-driven engine uses for stops and sizing
+        'atr': calculate_atr(pd.Series(highs), pd.Series(lows), pd.Series(closes)).to_numpy(),
+        'swing_high': confirmed_swings(highs, swing_lookback, 'high'),
+        'swing_low': confirmed_swings(lows, swing_lookback, 'low'),
+    }
+
+
+def detector_columns(features: Dict[str, np.ndarray]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Per-detector (score, confidence) columns from feature columns
+
+    These are heuristic stand-ins keyed by the WeightConfig names, not the
+    scoring detectors themselves: "harmonic" is RSI exhaustion, "elliott" is
+    EMA alignment, "sentiment" is MACD momentum, and so on. Results built on
+    them approximate the strategy the event-driven path runs; fast-mode
+    backtests are flagged ``approximate`` for that reason. News and whale
+    flow have no history and stay neutral.
+    """
+    close = features['close']
+    n = len(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        trend = np.sign(features['ema_12'] - features['ema_26'])
+
+        # SMC: close breaking the last confirmed swing high/low
+        smc = np.where(close > features['swing_high'], 1.0, np.where(close < features['swing_low'], -1.0, 0.0))
+
+        # Price action: candle body relative to range
+        rng = features['high'] - features['low']
+        body = np.where(rng > 0, (close - features['open']) / rng, 0.0)
+
+        # SAR: side of the parabolic SAR
+        sar = np.where(close > features['psar'], 1.0, np.where(close < features['psar'], -1.0, 0.0))
+
+        # Fibonacci: pullback into the 38.2-61.8% zone of the last swing range, with the trend
+        swing_range = features['swing_high'] - features['swing_low']
+        retrace = np.where(swing_range > 0, (features['swing_high'] - close) / swing_range, np.nan)
+        in_zone = (retrace >= 0.382) & (retrace <= 0.618)
+        fib = np.where(in_zone, 0.5 * trend, 0.0)
+
+        # Elliott: impulse alignment of fast/medium/slow EMAs
+        aligned_up = (features['ema_12'] > features['ema_26']) & (features['ema_26'] > features['ema_50'])
+        aligned_down = (features['ema_12'] < features['ema_26']) & (features['ema_26'] < features['ema_50'])
+        elliott = np.where(aligned_up, 0.6, np.where(aligned_down, -0.6, 0.0))
+
+        # Harmonic: RSI exhaustion at the extremes (mean reversion)
+        rsi = features['rsi']
+        harmonic = np.where(rsi < 30, (30 - rsi) / 30, np.where(rsi > 70, -(rsi - 70) / 30, 0.0))
+
+        # Sentiment proxy: MACD momentum in ATR units
+        momentum = np.clip(np.nan_to_num(features['macd'] / features['atr']), -1.0, 1.0)
+
+    def _col(score, confidence):
+        score = np.clip(np.nan_to_num(score), -1.0, 1.0)
+        confidence = np.where(score != 0, confidence, 0.0)
+        return score, np.broadcast_to(confidence, (n,)).astype(np.float64)
+
+    zeros = np.zeros(n)
+    return {
+        'harmonic': _col(harmonic, 0.5),
+        'elliott': _col(elliott, 0.5),
+        'fibonacci': _col(fib, 0.6),
+        'price_action': _col(body, np.abs(np.nan_to_num(body))),
+        'smc': _col(smc, 0.7),
+        'sar': _col(sar, 0.6),
+        'sentiment': _col(momentum, 0.5),
+        'news': (zeros, zeros),
+        'whales': (zeros, zeros),
+    }
+
+
+def combine_columns(
+    components: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    weights,
+    features: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Array version of DynamicScoringEngine's context gates and weighted combination
+
+    Returns:
+        {"final_score", "confidence", "direction"} columns, direction as
+        BULLISH/NEUTRAL/BEARISH codes
+    """
+    n = len(next(iter(components.values()))[0])
+    high_vol = np.zeros(n, dtype=bool)
+    trending = np.zeros(n, dtype=bool)
+    ranging = np.zeros(n, dtype=bool)
+    if features is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            atr_pct = np.nan_to_num(features['atr'] / features['close'])
+            fast, slow = features['ema_12'], features['ema_26']
+            trending = (fast > slow * 1.02) | (fast < slow * 0.98)
+            ranging = ~trending
+        high_vol = atr_pct > 0.03
+
+    bull_mass = np.zeros(n)
+    bear_mass = np.zeros(n)
+    confidence = np.zeros(n)
+
+    for name, (score, conf) in components.items():
+        weight = getattr(weights, name, 0.0)
+        score = score.copy()
+        if name in ('fibonacci', 'harmonic'):
+            score[high_vol] *= 0.7
+        if name in ('smc', 'elliott', 'sar'):
+            score[trending] *= 1.2
+        if name in ('elliott', 'sar'):
+            score[ranging] *= 0.5
+
+        weighted = (score + 1.0) / 2.0 * weight * conf
+        bull_mass += np.where(score > 0, weighted, 0.0)
+        bear_mass += np.where(score < 0, weighted, 0.0)
+        confidence += conf * weight
+
+    total = bull_mass + bear_mass
+    final_score = np.divide(bull_mass, total, out=np.full(n, 0.5), where=total > 0)
+    direction = np.where(final_score >= 0.6, BULLISH, np.where(final_score <= 0.4, BEARISH, NEUTRAL)).astype(np.int8)
+
+    return {'final_score': final_score, 'confidence': confidence, 'direction': direction}
+
+
+def entry_mask(signals: Dict[str, np.ndarray], rules: dict) -> np.ndarray:
+    """Array version of BacktestEngine._check_entry_conditions"""
+    min_score = rules.get("min_score", 0.65)
+    min_confidence = rules.get("min_confidence", 0.6)
+    score, direction = signals['final_score'], signals['direction']
+
+    return (signals['confidence'] >= min_confidence) & (
+        ((direction == BULLISH) & (score >= min_score)) |
+        ((direction == BEARISH) & (score <= 1 - min_score))
+    )
+
+
+def find_exit(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    entry_bar: int,
+    direction: str,
+    stop_loss: float,
+    take_profit: float,
+    time_stop_bars: Optional[int] = None
+) -> Tuple[Optional[int], Optional[str]]:
+    """
+    First bar after ``entry_bar`` where the position exits
+
+    Same precedence as BacktestEngine._check_exit_conditions on each bar:
+    stop loss, then take profit, then the time stop.
+
+    Returns:
+        (exit_bar, reason) or (None, None) if the position is still open at the end
+    """
+    n = len(highs)
+    start = entry_bar + 1
+    end = n if not time_stop_bars else min(n, entry_bar + time_stop_bars + 1)
+
+    if direction == "LONG":
+        sl_hit = lows[start:end] <= stop_loss
+        tp_hit = highs[start:end] >= take_profit
+    else:
+        sl_hit = highs[start:end] >= stop_loss
+        tp_hit = lows[start:end] <= take_profit
+
+    hit = sl_hit | tp_hit
+    if hit.any():
+        k = int(np.argmax(hit))
+        return start + k, "SL" if sl_hit[k] else "TP"
+
+    if time_stop_bars and entry_bar + time_stop_bars < n:
+        return entry_bar + time_stop_bars, "TIME"
+
+    return None, None
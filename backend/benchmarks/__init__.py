@@ -0,0 +1 @@
+# Hot-path benchmarks with JSON baselines and regression checks
@@ -0,0 +1,81 @@
+"""
+Run the hot-path benchmarks and check them against a baseline
+
+    python -m benchmarks                          # compare with benchmarks/baseline.json
+    python -m benchmarks --sizes 200,1000 --cases 'indicator.*'
+    python -m benchmarks --update                 # record a new baseline
+
+Exits 1 when a case regresses past --tolerance or stops working.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.suite import (  # noqa: E402
+    DEFAULT_CALL_TIMEOUT, DEFAULT_MIN_DELTA_MS, DEFAULT_SIZES, DEFAULT_TOLERANCE,
+    compare, default_cases, load_baseline, run_suite, save_baseline, select
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _print_result(key, result):
+    if 'median_ms' in result:
+        line = f"{result['median_ms']:>12.3f} ms  (min {result['min_ms']:.3f}, {result['runs']} runs)"
+    else:
+        line = f"{'-':>12}     {result.get('skipped') or result.get('error')}"
+    print(f"{key:<48}{line}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated bar counts")
+    parser.add_argument("--cases", action="append", help="Case name glob or tag (repeatable)")
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds of timed runs per case and size")
+    parser.add_argument("--min-runs", type=int, default=3)
+    parser.add_argument("--max-runs", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_CALL_TIMEOUT,
+                        help="Seconds a single async run may take before the case fails")
+    parser.add_argument("--all-sizes", action="store_true", help="Ignore per-case size limits")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown as a fraction of the baseline median")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument("--update", action="store_true", help="Write this run into the baseline instead of checking")
+    parser.add_argument("--output", help="Also write the raw report here")
+    parser.add_argument("--list", action="store_true", help="List cases and exit")
+    args = parser.parse_args(argv)
+
+    cases = select(default_cases(), args.cases)
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<40}{case.unit:<10}{','.join(case.tags)}")
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = run_suite(sizes, cases, min_runs=args.min_runs, max_runs=args.max_runs, budget=args.budget,
+                       ignore_limits=args.all_sizes, progress=_print_result, timeout=args.timeout)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update:
+        save_baseline(report, args.baseline)
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; record one with --update", file=sys.stderr)
+        return 0
+
+    verdict = compare(report, load_baseline(args.baseline), args.tolerance, args.min_delta_ms)
+    print(json.dumps(verdict, indent=2))
+    return 0 if verdict['passed'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the analysis hot paths
+
+Times every detector, the advanced SMC analyzer, each indicator kernel
+(numba and pandas), DynamicScoringEngine.score, a multi-timeframe scan over
+N symbols and a vectorized backtest on fixed synthetic data at several bar
+counts. Results are keyed ``case@size`` and saved as JSON baselines. A later
+run is compared against a baseline and fails when a case's median time
+regresses past the tolerance.
+
+Each case imports what it measures when it runs. A case that cannot import
+or raises is reported with its error rather than aborting the run.
+
+Example:
+    report = run_suite(sizes=[200, 1000])
+    verdict = compare(report, load_baseline('benchmarks/baseline.json'))
+"""
+
+import asyncio
+import importlib
+import inspect
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = (200, 1_000, 10_000, 100_000)
+DEFAULT_TOLERANCE = 0.25
+# Differences below this are timer noise whatever the ratio
+DEFAULT_MIN_DELTA_MS = 0.5
+# A single awaited run taking longer than this fails the case instead of hanging the suite
+DEFAULT_CALL_TIMEOUT = 60.0
+
+SCAN_TIMEFRAMES = ('15m', '1h', '4h')
+SCAN_BARS = 200
+
+
+def synthetic_ohlcv(n: int, seed: int = 7) -> pd.DataFrame:
+    """Deterministic hourly random-walk candles; the same ``n`` always gives the same data"""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    spread = np.abs(rng.normal(0, 0.005, n)) * closes
+    return pd.DataFrame({
+        'timestamp': 1_600_000_000_000 + np.arange(n, dtype=np.int64) * 3_600_000,
+        'open': opens,
+        'high': np.maximum(opens, closes) + spread,
+        'low': np.minimum(opens, closes) - spread,
+        'close': closes,
+        'volume': rng.uniform(500, 1500, n),
+    })
+
+
+def to_bars(df: pd.DataFrame) -> List[Dict[str, float]]:
+    """OHLCVBar dicts as taken by the scoring engine and the backtester"""
+    return [
+        {'ts': int(ts), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for ts, o, h, l, c, v in zip(df['timestamp'], df['open'], df['high'], df['low'], df['close'], df['volume'])
+    ]
+
+
+def _load(attr: str, module: str):
+    """``attr`` from ``module``, imported as ``backend.<module>`` or from the backend directory"""
+    try:
+        imported = importlib.import_module(f"backend.{module}")
+    except ImportError as e:
+        try:
+            imported = importlib.import_module(module)
+        except ImportError:
+            raise ImportError(f"{module} unavailable: {e}") from e
+    return getattr(imported, attr)
+
+
+@dataclass
+class Case:
+    """
+    One timed path
+
+    ``setup(size)`` does the untimed preparation and returns the callable to
+    time (sync, or async returning an awaitable). ``max_size`` skips sizes a
+    path is too slow for; ``sizes`` replaces the suite sizes (e.g. symbol
+    counts for the scanner), with ``unit`` naming what the size counts.
+    """
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+    max_size: Optional[int] = None
+    sizes: Optional[Sequence[int]] = None
+    unit: str = 'bars'
+    tags: Sequence[str] = field(default_factory=tuple)
+
+
+def _detector_case(name: str, module: str, cls: str) -> Case:
+    def setup(n: int):
+        detector = _load(cls, f"detectors.{module}")()
+        df = synthetic_ohlcv(n)
+        return lambda: detector.detect(df, {})
+    return Case(f"detector.{name}", setup, max_size=10_000, tags=('detector',))
+
+
+def _advanced_smc(n: int):
+    analyzer = _load('AdvancedSMCAnalyzer', 'analytics.advanced_smc')()
+    df = synthetic_ohlcv(n)
+    return lambda: analyzer.analyze_comprehensive_smc(df)
+
+
+def _kernel_case(name: str, impl: str, call: Callable[[Dict[str, Any]], Any]) -> Case:
+    module = 'analytics.indicators_numba' if impl == 'numba' else 'analytics.indicators'
+
+    def setup(n: int):
+        df = synthetic_ohlcv(n)
+        inputs = {
+            'module': importlib.import_module(module),
+            'df': df,
+            **{column: df[column].to_numpy(dtype=np.float64) for column in ('open', 'high', 'low', 'close', 'volume')},
+        }
+        return lambda: call(inputs)
+    return Case(f"indicator.{name}.{impl}", setup, tags=('indicator', impl))
+
+
+def _indicator_cases() -> List[Case]:
+    return [
+        _kernel_case('rsi', 'pandas', lambda x: x['module'].calculate_rsi(x['df']['close'])),
+        _kernel_case('rsi', 'numba', lambda x: x['module'].calculate_rsi_numba(x['close'])),
+        _kernel_case('ema', 'pandas', lambda x: x['module'].calculate_ema(x['df']['close'], 20)),
+        _kernel_case('ema', 'numba', lambda x: x['module'].calculate_ema_numba(x['close'], 20)),
+        _kernel_case('macd', 'pandas', lambda x: x['module'].calculate_macd(x['df']['close'])),
+        _kernel_case('macd', 'numba', lambda x: x['module'].calculate_macd_numba(x['close'])),
+        _kernel_case('atr', 'pandas',
+                     lambda x: x['module'].calculate_atr(x['df']['high'], x['df']['low'], x['df']['close'])),
+        _kernel_case('atr', 'numba', lambda x: x['module'].calculate_atr_numba(x['high'], x['low'], x['close'])),
+        _kernel_case('bollinger', 'pandas', lambda x: x['module'].calculate_bollinger_bands(x['df']['close'])),
+        _kernel_case('bollinger', 'numba', lambda x: x['module'].calculate_bollinger_bands_numba(x['close'])),
+        _kernel_case('sma', 'numba', lambda x: x['module'].calculate_sma_numba(x['close'], 20)),
+        _kernel_case('stochastic', 'numba',
+                     lambda x: x['module'].calculate_stochastic_numba(x['high'], x['low'], x['close'])),
+        _kernel_case('psar', 'numba', lambda x: x['module'].calculate_psar_numba(x['high'], x['low'])),
+        _kernel_case('adx', 'numba', lambda x: x['module'].calculate_adx_numba(x['high'], x['low'], x['close'])),
+    ]
+
+
+def _indicator_engine(n: int):
+    engine = _load('IndicatorEngine', 'analytics.indicator_engine')()
+    df = synthetic_ohlcv(n)
+
+    def compute():
+        engine.clear_cache()  # time the computation, not the hash lookup
+        return engine.compute_all(df)
+    return compute
+
+
+async def _check_detectors(detectors: Dict[str, Any], bars: List[Dict[str, float]]):
+    """Run each detector once; one that errors would only time its fallback result"""
+    for name, detector in detectors.items():
+        result = await detector.detect(bars, {})
+        if result.meta.get('error'):
+            raise RuntimeError(f"detector {name} failed during warm-up: {result.meta['error']}")
+
+
+def _scoring_engine(bars: List[Dict[str, float]]):
+    DynamicScoringEngine = _load('DynamicScoringEngine', 'scoring.engine')
+    WeightConfig = _load('WeightConfig', 'scoring.engine')
+    # The self-contained adapters; scoring.detector_adapters depends on detectors that do not import
+    detectors = _load('create_detectors', 'scoring.simple_detector_adapters')()
+    asyncio.run(_check_detectors(detectors, bars))
+    return DynamicScoringEngine(detectors, WeightConfig()), WeightConfig
+
+
+def _engine_score(n: int):
+    bars = to_bars(synthetic_ohlcv(n))
+    engine, _ = _scoring_engine(bars)
+    # No symbol/timeframe in the context, so the feature bundle is rebuilt every call
+    return lambda: engine.score(bars, {})
+
+
+class _SyntheticData:
+    """Stands in for the data manager: every symbol gets the same fixed candles"""
+
+    def __init__(self, bars: int):
+        self.ohlcv = synthetic_ohlcv(bars)
+
+    async def get_ohlcv_data(self, symbol: str, timeframe: str, limit: int = 200):
+        return self.ohlcv.tail(limit)
+
+
+async def _check_scanner(scanner, symbol: str, timeframes: List[str]):
+    """Scan one symbol; a timeframe that fell back to the neutral error score fails the case"""
+    result = await scanner._scan_symbol_all_timeframes(symbol, timeframes)
+    failed = [tf for tf in timeframes if not getattr(result.timeframe_scores.get(tf), 'components', None)]
+    if failed:
+        raise RuntimeError(f"scanner failed on {', '.join(failed)} during warm-up")
+
+
+def _scanner_scan(symbols: int):
+    Scanner = _load('MultiTimeframeScanner', 'scanner.mtf_scanner')
+    ScanScheduler = _load('ScanScheduler', 'scanner.scheduler')
+    data = _SyntheticData(SCAN_BARS)
+    engine, WeightConfig = _scoring_engine(to_bars(data.ohlcv))
+    names = [f"SYM{i}/USDT" for i in range(symbols)]
+
+    def scanner():
+        # The scheduler's rate limit is lifted to measure scoring, not the exchange limit
+        return Scanner(data, engine, WeightConfig(), scheduler=ScanScheduler(rate_limit=1_000_000, name="benchmark"))
+
+    asyncio.run(_check_scanner(scanner(), names[0], list(SCAN_TIMEFRAMES)))
+    # A fresh scanner per run so no result is served from the freshness cache
+    return lambda: scanner().scan(names, list(SCAN_TIMEFRAMES))
+
+
+def _backtest(n: int):
+    BacktestEngine = _load('BacktestEngine', 'backtesting.engine')
+    bars = to_bars(synthetic_ohlcv(n))
+    engine = BacktestEngine()
+    end = datetime(2100, 1, 1)
+    rules = {"min_score": 0.6, "min_confidence": 0.3}
+    return lambda: engine.run_vectorized("BENCHUSDT", bars, end, entry_rules=rules, exit_rules={"time_stop_bars": 24})
+
+
+def default_cases() -> List[Case]:
+    detectors = [
+        ('harmonic', 'harmonic', 'HarmonicDetector'),
+        ('elliott', 'elliott', 'ElliottWaveDetector'),
+        ('smc', 'smc', 'SMCDetector'),
+        ('fibonacci', 'fibonacci', 'FibonacciDetector'),
+        ('price_action', 'price_action', 'PriceActionDetector'),
+        ('sar', 'sar', 'SARDetector'),
+        ('sentiment', 'sentiment', 'SentimentDetector'),
+        ('news', 'news', 'NewsDetector'),
+        ('whales', 'whales', 'WhaleDetector'),
+    ]
+    return [
+        *(_detector_case(*spec) for spec in detectors),
+        Case('analytics.advanced_smc', _advanced_smc, max_size=10_000, tags=('detector',)),
+        *_indicator_cases(),
+        Case('indicator_engine.compute_all', _indicator_engine, tags=('indicator',)),
+        Case('scoring_engine.score', _engine_score, max_size=10_000, tags=('scoring',)),
+        Case('scanner.scan', _scanner_scan, sizes=(10, 50), unit='symbols', tags=('scoring',)),
+        Case('backtest.vectorized', _backtest, max_size=10_000, tags=('backtest',)),
+    ]
+
+
+def _is_async(fn: Callable) -> bool:
+    return inspect.iscoroutinefunction(fn)
+
+
+async def _measure(fn: Callable[[], Any], min_runs: int, max_runs: int, budget: float,
+                   timeout: float = DEFAULT_CALL_TIMEOUT) -> List[float]:
+    """Warm up once (JIT, lazy imports), then time until ``budget`` seconds or ``max_runs``"""
+    async def call():
+        result = fn()
+        if inspect.isawaitable(result):
+            try:
+                async with asyncio.timeout(timeout):
+                    result = await result
+            except TimeoutError:
+                raise TimeoutError(f"run exceeded {timeout}s") from None
+        return result
+
+    await call()
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        if samples and samples[0] > budget * 1000:
+            break  # a single run overruns the budget; one sample will do
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _summarize(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        'median_ms': round(statistics.median(ordered), 4),
+        'min_ms': round(ordered[0], 4),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'max_ms': round(ordered[-1], 4),
+        'runs': len(ordered),
+    }
+
+
+def select(cases: Iterable[Case], patterns: Optional[Sequence[str]]) -> List[Case]:
+    """Cases whose name or a tag matches any glob in ``patterns`` (all if none)"""
+    if not patterns:
+        return list(cases)
+    return [c for c in cases if any(fnmatch(c.name, p) or p in c.tags for p in patterns)]
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, cases: Optional[Sequence[Case]] = None,
+              min_runs: int = 3, max_runs: int = 50, budget: float = 1.0,
+              ignore_limits: bool = False, progress: Optional[Callable[[str, Dict], None]] = None,
+              timeout: float = DEFAULT_CALL_TIMEOUT) -> Dict[str, Any]:
+    """
+    Time every case at every size
+
+    Args:
+        sizes: Bar counts (cases with their own ``sizes`` ignore this)
+        cases: Cases to run (default_cases() if omitted)
+        min_runs / max_runs: Timed runs per case and size, after one warmup
+        budget: Seconds of timed runs per case and size beyond ``min_runs``
+        ignore_limits: Also run sizes above a case's ``max_size``
+        timeout: Seconds an awaited run may take before the case fails
+        progress: Called with (key, result) after each measurement
+    """
+    cases = default_cases() if cases is None else cases
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        for size in case.sizes or sizes:
+            key = f"{case.name}@{size}"
+            if case.max_size is not None and size > case.max_size and not ignore_limits:
+                results[key] = {'skipped': f"above max_size {case.max_size}"}
+                continue
+            try:
+                fn = case.setup(size)
+                samples = asyncio.run(_measure(fn, min_runs, max_runs, budget, timeout))
+                result = {**_summarize(samples), 'unit': case.unit}
+            except Exception as e:
+                result = {'error': f"{type(e).__name__}: {e}"}
+            results[key] = result
+            if progress is not None:
+                progress(key, result)
+    return {
+        'meta': {
+            'created': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> Dict[str, Any]:
+    """
+    Compare a run with a baseline
+
+    A case regresses when its median exceeds the baseline median by more
+    than ``tolerance`` (a fraction) and by at least ``min_delta_ms``. A case
+    that timed in the baseline but now errors is broken. Either fails the run.
+    """
+    current, previous = report.get('results', {}), baseline.get('results', {})
+    verdict: Dict[str, List[Dict[str, Any]]] = {'regressions': [], 'improvements': [], 'broken': [], 'new': []}
+    for key, result in current.items():
+        before = previous.get(key)
+        if before is None or 'median_ms' not in before:
+            if 'median_ms' in result:
+                verdict['new'].append({'case': key, 'median_ms': result['median_ms']})
+            continue
+        if 'error' in result:
+            verdict['broken'].append({'case': key, 'error': result['error']})
+            continue
+        if 'median_ms' not in result:
+            continue
+        old, new = before['median_ms'], result['median_ms']
+        ratio = new / old if old > 0 else math.inf
+        entry = {'case': key, 'baseline_ms': old, 'median_ms': new, 'ratio': round(ratio, 3)}
+        if new - old >= min_delta_ms and ratio > 1 + tolerance:
+            verdict['regressions'].append(entry)
+        elif old - new >= min_delta_ms and ratio < 1 / (1 + tolerance):
+            verdict['improvements'].append(entry)
+    verdict['passed'] = not verdict['regressions'] and not verdict['broken']
+    verdict['tolerance'] = tolerance
+    return verdict
+
+
+def load_baseline(path) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(report: Dict[str, Any], path, merge: bool = True):
+    """Write ``report`` as the baseline, keeping cases this run did not measure"""
+    path = Path(path)
+    if merge and path.exists():
+        previous = load_baseline(path)
+        report = {'meta': report['meta'], 'results': {**previous.get('results', {}), **report['results']}}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -1,22 +1,290 @@
+"""
+Shared in-process cache
+LRU eviction under entry-count and byte-size bounds, per-key TTL, single-flight
+loading, stale-while-revalidate and hit/miss/eviction counters
+"""
+
+import asyncio
+import logging
+import sys
 import time
-from typing import Any, Dict, Tuple
-
-class TTLCache:
-    def __init__(self, ttl_seconds: int = 30):
-        self.ttl = ttl_seconds
-        self.store: Dict[str, Tuple[float, Any]] = {}
-
-    def get(self, key: str):
-        rec = self.store.get(key)
-        if not rec:
-            return None
-        ts, val = rec
-        if time.time() - ts > self.ttl:
-            self.store.pop(key, None)
-            return None
-        return val
-
-    def set(self, key: str, val: Any):
-        self.store[key] = (time.time(), val)
-
-cache = TTLCache(ttl_seconds=30)
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Every live cache, read by the metrics collectors at scrape time
+_caches: "weakref.WeakSet[AsyncLRUCache]" = weakref.WeakSet()
+
+
+def approx_sizeof(value: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of JSON-like values, numpy arrays and DataFrames"""
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except Exception:
+            pass
+
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(approx_sizeof(k, _depth + 1) + approx_sizeof(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_sizeof(v, _depth + 1) for v in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'stale_until', 'size')
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+
+
+class AsyncLRUCache:
+    """
+    Bounded LRU cache with per-key TTL
+
+    - ``max_entries`` / ``max_bytes`` bound the cache; least recently used
+      entries are evicted first
+    - ``ttl`` is the default freshness window, overridable per key
+    - ``stale_ttl`` keeps expired entries around for that long: get_or_set
+      serves them immediately and refreshes in the background, and
+      get(..., allow_stale=True) can fall back to them
+    - get_or_set coalesces concurrent misses for a key into one load
+
+    Example:
+        prices = await cache.get_or_set(f"prices:{ids}", lambda: market.prices_simple(ids))
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: float = 30.0,
+        stale_ttl: float = 0.0,
+        sizeof: Callable[[Any], int] = approx_sizeof,
+        name: str = "cache"
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.sizeof = sizeof
+        self.name = name
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.bytes = 0
+        self.counters = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+        }
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def _remove(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+        return entry
+
+    def _lookup(self, key: Hashable, now: float):
+        """Return (entry, fresh) and drop entries past their stale window"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        if entry.expires_at > now:
+            return entry, True
+        if entry.stale_until > now:
+            return entry, False
+        self._remove(key)
+        self.counters['expirations'] += 1
+        return None, False
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        """Fresh value (or a stale one with ``allow_stale``), else ``default``"""
+        entry, fresh = self._lookup(key, time.monotonic())
+        if entry is not None and (fresh or allow_stale):
+            self._entries.move_to_end(key)
+            self.counters['hits' if fresh else 'stale_hits'] += 1
+            return entry.value
+        self.counters['misses'] += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        self._remove(key)
+        self._entries[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl, size)
+        self.bytes += size
+        self._enforce_bounds(now)
+
+    def delete(self, key: Hashable):
+        self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def purge_expired(self) -> int:
+        """Drop every entry past its stale window"""
+        now = time.monotonic()
+        dead = [k for k, e in self._entries.items() if e.stale_until <= now]
+        for key in dead:
+            self._remove(key)
+        self.counters['expirations'] += len(dead)
+        return len(dead)
+
+    def _enforce_bounds(self, now: float):
+        # Dead entries at the LRU end go first, without counting as evictions
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.stale_until > now:
+                break
+            self._remove(key)
+            self.counters['expirations'] += 1
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.counters['evictions'] += 1
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Cached value for ``key``, loading it with ``loader()`` on a miss
+
+        Concurrent misses share one load. An expired entry inside its stale
+        window is returned at once while a single background load refreshes it.
+        """
+        entry, fresh = self._lookup(key, time.monotonic())
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if fresh:
+                self.counters['hits'] += 1
+            else:
+                self.counters['stale_hits'] += 1
+                if key not in self._inflight:
+                    self.counters['refreshes'] += 1
+                    self._start_load(key, loader, ttl).add_done_callback(self._log_refresh_error)
+            return entry.value
+
+        self.counters['misses'] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.counters['coalesced'] += 1
+        else:
+            future = self._start_load(key, loader, ttl)
+        return await asyncio.shield(future)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> asyncio.Future:
+        async def _load():
+            self.counters['loads'] += 1
+            try:
+                value = await loader()
+            except Exception:
+                self.counters['load_errors'] += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            self.set(key, value, ttl)
+            return value
+
+        future = asyncio.ensure_future(_load())
+        self._inflight[key] = future
+        return future
+
+    def _log_refresh_error(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"{self.name}: background refresh failed: {future.exception()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.counters['hits'] + self.counters['stale_hits'] + self.counters['misses']
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'inflight': len(self._inflight),
+            **self.counters,
+            'hit_rate': (self.counters['hits'] + self.counters['stale_hits']) / lookups if lookups else 0.0,
+        }
+
+
+class TTLCache(AsyncLRUCache):
+    """AsyncLRUCache with the original ``TTLCache(ttl_seconds=...)`` constructor"""
+
+    def __init__(self, ttl_seconds: int = 30, **kwargs):
+        super().__init__(ttl=ttl_seconds, **kwargs)
+
+
+def _cache_totals() -> Dict[str, Dict[str, float]]:
+    """Counters summed over caches sharing a name (e.g. one per IndicatorEngine)"""
+    totals: Dict[str, Dict[str, float]] = {}
+    for instance in list(_caches):
+        entry = totals.setdefault(instance.name, {'entries': 0, 'bytes': 0, **dict.fromkeys(instance.counters, 0)})
+        entry['entries'] += len(instance)
+        entry['bytes'] += instance.bytes
+        for name, value in instance.counters.items():
+            entry[name] += value
+    return totals
+
+
+def _cache_metric(field: str) -> Callable[[], Dict[tuple, float]]:
+    return lambda: {(name,): totals[field] for name, totals in _cache_totals().items()}
+
+
+def _cache_hit_ratio() -> Dict[tuple, float]:
+    ratios = {}
+    for name, totals in _cache_totals().items():
+        hits = totals['hits'] + totals['stale_hits']
+        lookups = hits + totals['misses']
+        ratios[(name,)] = hits / lookups if lookups else 0.0
+    return ratios
+
+
+for _field in ('hits', 'stale_hits', 'misses', 'evictions', 'loads', 'load_errors'):
+    metrics.counter(f"hts_cache_{_field}_total", f"Cache {_field.replace('_', ' ')}", ["cache"],
+                    collect=_cache_metric(_field))
+metrics.gauge("hts_cache_entries", "Entries held per cache", ["cache"], collect=_cache_metric('entries'))
+metrics.gauge("hts_cache_bytes", "Approximate bytes held per cache", ["cache"], collect=_cache_metric('bytes'))
+metrics.gauge("hts_cache_hit_ratio", "Fresh and stale hits over lookups", ["cache"], collect=_cache_hit_ratio)
+
+
+cache = TTLCache(ttl_seconds=30, max_entries=2048, max_bytes=64 * 1024 * 1024, stale_ttl=300, name="api")
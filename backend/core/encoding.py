@@ -0,0 +1,159 @@
+"""
+Compact message encodings for WebSocket and REST payloads
+JSON (via orjson when installed) or MessagePack, negotiated per client, with
+native numpy/datetime handling and encode-once fan-out
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+JSON = "json"
+MSGPACK = "msgpack"
+DEFAULT_ENCODING = JSON
+
+# Accepted names, mapped to the encoding that serves them
+_ALIASES = {"json": JSON, "orjson": JSON, "msgpack": MSGPACK, "messagepack": MSGPACK}
+
+MEDIA_TYPES = {JSON: "application/json", MSGPACK: "application/msgpack"}
+_MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+Frame = Union[str, bytes]
+
+
+def available_encodings() -> List[str]:
+    return [JSON, MSGPACK] if MSGPACK_AVAILABLE else [JSON]
+
+
+def negotiate(requested: Optional[str]) -> str:
+    """First supported encoding from a comma-separated preference list, else JSON"""
+    for name in (requested or "").split(","):
+        encoding = _ALIASES.get(name.strip().lower())
+        if encoding is not None and encoding in available_encodings():
+            return encoding
+    return DEFAULT_ENCODING
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types neither encoder handles natively"""
+    if isinstance(obj, (datetime, date, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if hasattr(obj, 'dict'):
+        return obj.dict()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def encode_json(obj: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+else:
+    def encode_json(obj: Any) -> str:
+        return json.dumps(obj, default=_default)
+
+
+def encode(obj: Any, encoding: str = DEFAULT_ENCODING) -> Frame:
+    """Text frame for JSON, binary frame for MessagePack"""
+    if encoding == MSGPACK:
+        return msgpack.packb(obj, default=_default, use_bin_type=True, datetime=False)
+    return encode_json(obj)
+
+
+def decode(frame: Frame, encoding: str = DEFAULT_ENCODING) -> Any:
+    if encoding == MSGPACK:
+        return msgpack.unpackb(frame, raw=False)
+    return orjson.loads(frame) if ORJSON_AVAILABLE else json.loads(frame)
+
+
+class EncodedMessage:
+    """
+    One message, encoded at most once per encoding
+
+    Fan-out code builds one of these per broadcast and every subscriber takes
+    ``get(its_encoding)``, so 500 JSON clients and 20 MessagePack clients cost
+    two encodes instead of 520.
+    """
+
+    __slots__ = ('message', '_frames')
+
+    def __init__(self, message: Any):
+        self.message = message
+        self._frames: Dict[str, Frame] = {}
+
+    def get(self, encoding: str = DEFAULT_ENCODING) -> Frame:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            frame = self._frames[encoding] = encode(self.message, encoding)
+        return frame
+
+    @property
+    def nbytes(self) -> int:
+        """Size of an already-encoded frame (JSON if none yet)"""
+        frame = next(iter(self._frames.values()), None)
+        if frame is None:
+            frame = self.get(DEFAULT_ENCODING)
+        return len(frame)
+
+
+def to_columns(rows: Union[pd.DataFrame, Sequence[Dict[str, Any]]], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Columnar layout for bar and equity series
+
+    ``[{"t": 1, "c": 2.0}, ...]`` becomes
+    ``{"columns": ["t", "c"], "data": {"t": [...], "c": [...]}, "length": n}``,
+    with numeric columns kept as numpy arrays so the encoders pack them in bulk.
+    """
+    if isinstance(rows, pd.DataFrame):
+        frame = rows
+    else:
+        frame = pd.DataFrame(list(rows))
+    if fields is not None:
+        frame = frame[[f for f in fields if f in frame.columns]]
+
+    data = {}
+    for name in frame.columns:
+        column = frame[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            # Epoch milliseconds: compact and unambiguous across encodings
+            data[str(name)] = column.values.astype('datetime64[ms]').astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(column):
+            data[str(name)] = column.to_numpy()
+        else:
+            data[str(name)] = column.tolist()
+    return {"columns": [str(c) for c in frame.columns], "data": data, "length": len(frame)}
+
+
+def encoded_response(content: Any, request: Optional[Request] = None, status_code: int = 200) -> Response:
+    """REST response in the encoding named by the Accept header (MessagePack or JSON)"""
+    accept = request.headers.get("accept", "") if request is not None else ""
+    encoding = MSGPACK if MSGPACK_AVAILABLE and any(t in accept for t in _MSGPACK_MEDIA_TYPES) else JSON
+    return Response(content=encode(content, encoding), status_code=status_code, media_type=MEDIA_TYPES[encoding])
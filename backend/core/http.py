@@ -1,7 +1,11 @@
 import asyncio
+import time
 from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 import httpx
 
+from .metrics import UPSTREAM_SECONDS
+
 # Strict, short timeouts + HTTP/2
 DEFAULT_TIMEOUT = 8.0
 
@@ -13,8 +17,11 @@ class Http:
         last_exc = None
         async with httpx.AsyncClient(timeout=self.timeout, http2=True, follow_redirects=True) as client:
             for url in urls:
+                provider = urlsplit(url).hostname or url
+                start = time.perf_counter()
                 try:
                     r = await client.get(url, headers=headers)
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, provider=provider, status=r.status_code)
                     if r.status_code == 200:
                         try:
                             json_data = r.json()
@@ -27,6 +34,7 @@ class Http:
                             # Try to re-parse as needed on the caller side if necessary.
                             return {"raw": r.text, "source": "text"}
                 except Exception as e:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, provider=provider, status=type(e).__name__)
                     last_exc = e
                     await asyncio.sleep(0.2)
         if last_exc:
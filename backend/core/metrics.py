@@ -0,0 +1,277 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms
+Rendered in the Prometheus text exposition format for scraping, and as JSON
+summaries for the dashboard. Memory is constant per label set: a histogram
+keeps one count per bucket plus a running sum, never the raw samples.
+
+Example:
+    SCAN_SECONDS = metrics.histogram("hts_scan_seconds", "Per-symbol scan time", ["scanner"])
+    with SCAN_SECONDS.time(scanner="mtf"):
+        await scan(symbol)
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from sub-millisecond in-process work up to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, ...]
+Collector = Callable[[], Dict[LabelKey, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Collector] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def values(self) -> Dict[LabelKey, float]:
+        """Current value per label set (from the collector if there is one)"""
+        if self.collect is not None:
+            return dict(self.collect())
+        with self._lock:
+            return dict(self._values)
+
+    def get(self, **labels) -> float:
+        return self.values().get(self._key(labels), 0.0)
+
+    def _render_samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self.values().items())]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}",
+                *self._render_samples()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from ``collect`` at scrape time"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class _Buckets:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """
+    Distribution over fixed upper bounds
+
+    Quantiles in ``summary`` are interpolated within a bucket, so they are
+    as precise as the bucket layout.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        self._series: Dict[LabelKey, _Buckets] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Buckets(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the ``with`` block, including awaits inside it"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _snapshot(self) -> Dict[LabelKey, Tuple[List[int], float, int]]:
+        with self._lock:
+            return {key: (list(s.counts), s.sum, s.count) for key, s in self._series.items()}
+
+    def values(self) -> Dict[LabelKey, float]:
+        return {key: count for key, (_, _, count) in self._snapshot().items()}
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> float:
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower  # past the last bound; best we can say
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1] if self.buckets else 0.0
+
+    def summary(self, **labels) -> Dict[str, float]:
+        """Count, mean and estimated p50/p90/p99, for one label set or all of them merged"""
+        series = self._snapshot()
+        if labels:
+            series = {k: v for k, v in series.items() if k == self._key(labels)}
+        counts = [0] * (len(self.buckets) + 1)
+        total_sum, total = 0.0, 0
+        for bucket_counts, s, n in series.values():
+            counts = [a + b for a, b in zip(counts, bucket_counts)]
+            total_sum += s
+            total += n
+        if not total:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
+        return {
+            'count': total,
+            'mean': total_sum / total,
+            'p50': self._quantile(counts, total, 0.5),
+            'p90': self._quantile(counts, total, 0.9),
+            'p99': self._quantile(counts, total, 0.99),
+        }
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total_sum, total) in sorted(self._snapshot().items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics; asking twice for the same name returns the same metric"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                collect: Optional[Collector] = None) -> Counter:
+        return self._register(Counter, name, documentation, labelnames, collect)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              collect: Optional[Collector] = None) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, collect)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def __iter__(self) -> Iterable[_Metric]:
+        return iter(list(self._metrics.values()))
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        lines: List[str] = []
+        for metric in self:
+            try:
+                lines += metric.render()
+            except Exception as e:
+                # A broken collector must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """JSON-friendly view: values per label set, histogram summaries"""
+        report: Dict[str, Dict[str, object]] = {}
+        for metric in self:
+            try:
+                if isinstance(metric, Histogram):
+                    keys = metric.values().keys()
+                    values = {','.join(key) or 'all': metric.summary(**dict(zip(metric.labelnames, key)))
+                              for key in keys}
+                else:
+                    values = {','.join(key) or 'value': value for key, value in metric.values().items()}
+            except Exception as e:
+                values = {'error': str(e)}
+            report[metric.name] = {'type': metric.kind, 'labels': list(metric.labelnames), 'values': values}
+        return report
+
+
+# Process-wide registry scraped by /metrics
+metrics = MetricsRegistry()
+
+# Shared by every upstream client (pooled exchange clients, mirror fallbacks, API fallbacks)
+UPSTREAM_SECONDS = metrics.histogram(
+    "hts_upstream_request_seconds", "Upstream API call time by provider and outcome", ["provider", "status"]
+)
@@ -10,6 +10,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from .api_config import API_CONFIG, API_HEALTH_STATUS
+from ..core.cache import AsyncLRUCache
+from ..core.metrics import UPSTREAM_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +22,11 @@ class APIFallbackManager:
         self.max_retries = 3
         self.circuit_breaker_threshold = 5  # failures before circuit opens
         self.circuit_breaker_timeout = 300  # seconds to wait before retry
-        self.cache = {}  # Simple in-memory cache
         self.cache_ttl = 300  # 5 minutes
+        # Expired entries stay servable for an hour: refreshed in the background,
+        # and returned as a last resort when every API fails
+        self.cache = AsyncLRUCache(max_entries=512, max_bytes=32 * 1024 * 1024,
+                                   ttl=self.cache_ttl, stale_ttl=3600, name="api_fallback")
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession(
@@ -43,18 +48,21 @@ class APIFallbackManager:
         if not config:
             raise ValueError(f"Unknown service: {service_name}")
         
-        # Check cache first
+        # Within the stale window the cache answers with the expired value while it
+        # refreshes in the background, so a failing upstream still serves stale data
         cache_key = f"{service_name}:{endpoint}:{str(params)}"
-        cached_data = self._get_from_cache(cache_key)
-        if cached_data:
-            return cached_data
-        
+        return await self.cache.get_or_set(
+            cache_key,
+            lambda: self._fetch_uncached(service_name, config, endpoint, params, headers)
+        )
+
+    async def _fetch_uncached(self, service_name: str, config: Dict, endpoint: str, params: Dict = None, headers: Dict = None) -> Dict:
+        """Try the primary API, then each fallback in order"""
         # Try primary API first
         if "primary" in config:
             try:
                 data = await self._fetch_from_api(config["primary"], endpoint, params, headers)
                 self._update_api_health(service_name, "primary", True, None)
-                self._set_cache(cache_key, data)
                 return data
             except Exception as e:
                 logger.warning(f"Primary API {service_name} failed: {str(e)}")
@@ -65,7 +73,6 @@ class APIFallbackManager:
             try:
                 data = await self._fetch_from_api(fallback_config, endpoint, params, headers)
                 self._update_api_health(service_name, f"fallback_{i}", True, None)
-                self._set_cache(cache_key, data)
                 logger.info(f"Successfully used fallback {i} for {service_name}")
                 return data
             except Exception as e:
@@ -73,12 +80,6 @@ class APIFallbackManager:
                 self._update_api_health(service_name, f"fallback_{i}", False, str(e))
                 continue
         
-        # If all APIs failed, try to return cached data (even if expired)
-        expired_cache = self._get_from_cache(cache_key, ignore_expiry=True)
-        if expired_cache:
-            logger.warning(f"All APIs failed for {service_name}, returning expired cache")
-            return expired_cache
-        
         raise Exception(f"All APIs failed for service {service_name}")
 
     async def _fetch_from_api(self, api_config: Dict, endpoint: str, params: Dict = None, headers: Dict = None) -> Dict:
@@ -105,6 +106,7 @@ class APIFallbackManager:
             raise Exception(f"Circuit breaker open for {api_config['name']}")
         
         start_time = time.time()
+        responded = False
         
         try:
             async with self.session.get(
@@ -114,6 +116,8 @@ class APIFallbackManager:
                 timeout=aiohttp.ClientTimeout(total=api_config.get("timeout", 15))
             ) as response:
                 response_time = time.time() - start_time
+                responded = True
+                UPSTREAM_SECONDS.observe(response_time, provider=api_config["name"], status=response.status)
                 
                 if response.status == 200:
                     data = await response.json()
@@ -123,6 +127,8 @@ class APIFallbackManager:
                     raise Exception(f"HTTP {response.status}: {await response.text()}")
                     
         except Exception as e:
+            if not responded:
+                UPSTREAM_SECONDS.observe(time.time() - start_time, provider=api_config["name"], status=type(e).__name__)
             self._record_failure(api_config["name"])
             raise e
 
@@ -169,6 +175,7 @@ class APIFallbackManager:
                 timeout=aiohttp.ClientTimeout(total=10)
             ) as response:
                 response_time = time.time() - start_time
+                UPSTREAM_SECONDS.observe(response_time, provider=api_config["name"], status=response.status)
                 
                 return {
                     "status": "healthy" if response.status == 200 else "unhealthy",
@@ -185,18 +192,6 @@ class APIFallbackManager:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def _get_from_cache(self, key: str, ignore_expiry: bool = False) -> Optional[Dict]:
-        """Get data from cache"""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if ignore_expiry or (time.time() - timestamp) < self.cache_ttl:
-                return data
-        return None
-
-    def _set_cache(self, key: str, data: Dict):
-        """Set data in cache"""
-        self.cache[key] = (data, time.time())
-
     def _update_api_health(self, service_name: str, api_type: str, success: bool, error: str = None):
         """Update API health status"""
         if service_name not in API_HEALTH_STATUS:
@@ -5,7 +5,7 @@ Production-grade implementation with rate limiting and retry logic
 
 import asyncio
 import json
-import requests
+import httpx
 from datetime import datetime
 from typing import Dict, List, Optional
 import pandas as pd
@@ -26,6 +26,7 @@ from .exceptions import (
     InsufficientDataError
 )
 from .rate_limiter import RateLimiter
+from .http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,7 @@ class BinanceClient:
     
     Features:
     - Rate limiting (1200 req/min = 20 req/sec)
+    - Shared non-blocking connection pool (keep-alive, HTTP/2)
     - Automatic retry with exponential backoff
     - Comprehensive error handling
     - Data validation
@@ -51,11 +53,15 @@ class BinanceClient:
         
         # Rate limiter: 20 requests per second (conservative)
         self._rate_limiter = RateLimiter(calls=20, period=1.0)
-        self._session = requests.Session()
-        self._session.headers.update({
+        self._headers = {
             'User-Agent': 'AiSmartHTS-Trading-System/1.0',
             'Accept': 'application/json'
-        })
+        }
+    
+    @property
+    def _session(self) -> httpx.AsyncClient:
+        """Pooled async client for this host"""
+        return http_pool.get_client(self.base_url, headers=self._headers)
     
     @retry(
         stop=stop_after_attempt(3),
@@ -82,10 +88,10 @@ class BinanceClient:
         """
         async with self._rate_limiter:
             try:
-                url = f"{self.base_url}/api/v3/ticker/price"
+                url = "/api/v3/ticker/price"
                 params = {"symbol": symbol}
                 
-                response = self._session.get(url, params=params, timeout=10)
+                response = await self._session.get(url, params=params, timeout=10)
                 
                 # Handle rate limiting
                 if response.status_code == 429:
@@ -110,10 +116,10 @@ class BinanceClient:
                     'source': 'binance'
                 }
                 
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 logger.error(f"Timeout fetching ticker for {symbol}")
                 raise DataTimeoutError(f"Request timeout for {symbol}")
-            except requests.exceptions.ConnectionError as e:
+            except httpx.TransportError as e:
                 logger.error(f"Connection error for {symbol}: {e}")
                 raise DataConnectionError(f"Failed to connect to Binance: {e}")
             except (RateLimitError, SymbolNotFoundError, InvalidResponseError):
@@ -125,10 +131,10 @@ class BinanceClient:
     async def get_24hr_ticker(self, symbol: str) -> dict:
         """Get 24hr ticker statistics"""
         try:
-            url = f"{self.base_url}/api/v3/ticker/24hr"
+            url = "/api/v3/ticker/24hr"
             params = {"symbol": symbol}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await self._session.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -161,7 +167,14 @@ class BinanceClient:
             f"Retrying klines fetch, attempt {retry_state.attempt_number}"
         )
     )
-    async def get_klines(self, symbol: str, interval: str = "1h", limit: int = 100) -> pd.DataFrame:
+    async def get_klines(
+        self,
+        symbol: str,
+        interval: str = "1h",
+        limit: int = 100,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Get candlestick/kline data with validation
         
@@ -169,6 +182,7 @@ class BinanceClient:
             symbol: Trading pair symbol (e.g., 'BTCUSDT')
             interval: Kline interval (1m, 5m, 15m, 1h, 4h, 1d, etc.)
             limit: Number of bars to fetch (max 1000)
+            start_time, end_time: Optional open-time range in ms (inclusive)
         
         Returns:
             DataFrame with columns: timestamp, open, high, low, close, volume
@@ -181,14 +195,18 @@ class BinanceClient:
         """
         async with self._rate_limiter:
             try:
-                url = f"{self.base_url}/api/v3/klines"
+                url = "/api/v3/klines"
                 params = {
                     "symbol": symbol,
                     "interval": interval,
                     "limit": min(limit, 1000)  # Binance max is 1000
                 }
+                if start_time is not None:
+                    params["startTime"] = int(start_time)
+                if end_time is not None:
+                    params["endTime"] = int(end_time)
                 
-                response = self._session.get(url, params=params, timeout=15)
+                response = await self._session.get(url, params=params, timeout=15)
                 
                 # Handle rate limiting
                 if response.status_code == 429:
@@ -205,8 +223,8 @@ class BinanceClient:
                 if not data:
                     raise InsufficientDataError(f"No klines data returned for {symbol}")
                 
-                # Validate minimum data requirements
-                if len(data) < 10:
+                # A short tail is normal for incremental (start_time) fetches
+                if start_time is None and len(data) < limit:
                     logger.warning(f"Only {len(data)} bars returned for {symbol}, expected {limit}")
                 
                 df = pd.DataFrame(data, columns=[
@@ -233,10 +251,10 @@ class BinanceClient:
                 logger.info(f"Fetched {len(result_df)} klines for {symbol} {interval}")
                 return result_df
                 
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 logger.error(f"Timeout fetching klines for {symbol}")
                 raise DataTimeoutError(f"Request timeout for {symbol} klines")
-            except requests.exceptions.ConnectionError as e:
+            except httpx.TransportError as e:
                 logger.error(f"Connection error for {symbol} klines: {e}")
                 raise DataConnectionError(f"Failed to connect to Binance: {e}")
             except (RateLimitError, SymbolNotFoundError, InvalidResponseError, InsufficientDataError):
@@ -285,8 +303,8 @@ class BinanceClient:
     async def get_exchange_info(self) -> dict:
         """Get exchange trading rules and symbol information"""
         try:
-            url = f"{self.base_url}/api/v3/exchangeInfo"
-            response = requests.get(url, timeout=10)
+            url = "/api/v3/exchangeInfo"
+            response = await self._session.get(url, timeout=10)
             response.raise_for_status()
             return response.json()
         except Exception as e:
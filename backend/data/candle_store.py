@@ -0,0 +1,338 @@
+"""
+Incremental OHLCV candle store
+Keeps a columnar float64 ring buffer per (exchange, symbol, interval) and only
+fetches bars newer than the last stored candle
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Async fetcher signature: (symbol, interval, limit) -> DataFrame with timestamp + OHLCV
+KlineFetcher = Callable[[str, str, int], Awaitable[pd.DataFrame]]
+
+_INTERVAL_UNITS_MS = {
+    'min': 60_000,
+    'm': 60_000,
+    'hour': 3_600_000,
+    'h': 3_600_000,
+    'day': 86_400_000,
+    'd': 86_400_000,
+    'week': 604_800_000,
+    'w': 604_800_000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Convert '15m', '1h', '1hour', '1day', ... to milliseconds"""
+    digits = ''.join(ch for ch in interval if ch.isdigit())
+    unit = interval[len(digits):]
+    if not digits or unit not in _INTERVAL_UNITS_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return int(digits) * _INTERVAL_UNITS_MS[unit]
+
+
+# Epoch (1970-01-01) was a Thursday; weekly bars open on Monday
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def bar_open_ms(ts_ms: int, interval_ms: int) -> int:
+    """Open time of the bar of length ``interval_ms`` containing ``ts_ms``"""
+    offset = _WEEK_OFFSET_MS if interval_ms % _INTERVAL_UNITS_MS['w'] == 0 else 0
+    return ts_ms - (ts_ms - offset) % interval_ms
+
+
+class CandleView(NamedTuple):
+    """Read-only zero-copy views over the most recent candles"""
+    timestamp: np.ndarray  # int64 open time in ms
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+class CandleSeries:
+    """
+    Columnar ring buffer of candles for one (exchange, symbol, interval)
+
+    Every value is written twice (at ``i`` and ``i + capacity``) so the most
+    recent ``n`` candles are always one contiguous slice and can be handed out
+    as views without copying.
+    """
+
+    def __init__(self, interval: str, capacity: int = 1000):
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._cols = {name: np.zeros(2 * capacity, dtype=np.float64) for name in OHLCV_COLUMNS}
+        self._count = 0      # total candles written (monotonic)
+        self.full_limit = 0  # largest window fetched in one full download
+        self.last_fetch = 0.0
+        self.version = 0     # bumped on every append/update
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self._ts[self._pos(self._count - 1)])
+
+    def _pos(self, n: int) -> int:
+        return n % self.capacity
+
+    def _write(self, pos: int, ts: int, values: Tuple[float, ...]):
+        self._ts[pos] = ts
+        self._ts[pos + self.capacity] = ts
+        for name, value in zip(OHLCV_COLUMNS, values):
+            col = self._cols[name]
+            col[pos] = value
+            col[pos + self.capacity] = value
+
+    def append(self, ts: int, values: Tuple[float, ...]):
+        """Append a new candle, overwriting the oldest when full"""
+        self._write(self._pos(self._count), ts, values)
+        self._count += 1
+        self.version += 1
+
+    def last_values(self) -> Optional[Tuple[float, ...]]:
+        """OHLCV of the newest candle"""
+        if self._count == 0:
+            return None
+        pos = self._pos(self._count - 1)
+        return tuple(float(self._cols[name][pos]) for name in OHLCV_COLUMNS)
+
+    def update_last(self, values: Tuple[float, ...]):
+        """Mutate the still-forming last candle in place"""
+        pos = self._pos(self._count - 1)
+        self._write(pos, int(self._ts[pos]), values)
+        self.version += 1
+
+    def clear(self):
+        self._count = 0
+        self.full_limit = 0
+        self.version += 1
+
+    def grow(self, capacity: int):
+        """Reallocate to a larger capacity, keeping stored candles"""
+        if capacity <= self.capacity:
+            return
+        view = self.view()
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._cols = {name: np.zeros(2 * capacity, dtype=np.float64) for name in OHLCV_COLUMNS}
+        self._count = 0
+        for i in range(len(view)):
+            self.append(int(view.timestamp[i]), tuple(float(getattr(view, c)[i]) for c in OHLCV_COLUMNS))
+
+    def view(self, limit: Optional[int] = None) -> CandleView:
+        """Read-only views of the last ``limit`` candles (oldest first)"""
+        n = len(self) if limit is None else min(limit, len(self))
+        end = self._pos(self._count - 1) + 1 + self.capacity if self._count else self.capacity
+        start = end - n
+
+        def _ro(arr: np.ndarray) -> np.ndarray:
+            v = arr[start:end]
+            v.flags.writeable = False
+            return v
+
+        return CandleView(_ro(self._ts), *(_ro(self._cols[name]) for name in OHLCV_COLUMNS))
+
+    def merge(self, ts: np.ndarray, values: np.ndarray) -> int:
+        """
+        Merge fetched candles (sorted by ts) into the buffer
+
+        Candles older than the last stored one are ignored, the last stored
+        candle is updated in place, newer candles are appended.
+
+        Returns:
+            Number of appended candles
+        """
+        appended = 0
+        last = self.last_ts
+        for i in range(len(ts)):
+            t = int(ts[i])
+            row = tuple(float(x) for x in values[i])
+            if last is None or t > last:
+                self.append(t, row)
+                last = t
+                appended += 1
+            elif t == last:
+                self.update_last(row)
+        return appended
+
+
+def frame_to_columns(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Split a kline DataFrame into (int64 ms timestamps, float64 OHLCV matrix)"""
+    ts = df['timestamp']
+    if pd.api.types.is_datetime64_any_dtype(ts):
+        ts_ms = ts.values.astype('datetime64[ms]').astype(np.int64)
+    else:
+        ts_ms = ts.to_numpy(dtype=np.int64)
+    values = df[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64)
+    return ts_ms, values
+
+
+class CandleStore:
+    """
+    Candle cache keyed by (exchange, symbol, interval)
+
+    The first request downloads the full window; later requests only ask the
+    exchange for candles since the last stored open time, append closed bars
+    and mutate the live candle.
+
+    Example:
+        view = await candle_store.get_view('binance', 'BTCUSDT', '1h', 200,
+                                           binance_client.get_klines)
+        closes = view.close  # zero-copy, read-only
+    """
+
+    def __init__(self, capacity: int = 1000, refresh_seconds: float = 1.0):
+        self.capacity = capacity
+        self.refresh_seconds = refresh_seconds
+        self._series: Dict[Tuple[str, str, str], CandleSeries] = {}
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self.stats = {'full_fetches': 0, 'incremental_fetches': 0, 'fresh_hits': 0, 'bars_fetched': 0}
+
+    def get_series(self, exchange: str, symbol: str, interval: str) -> Optional[CandleSeries]:
+        return self._series.get((exchange, symbol, interval))
+
+    def ensure_series(self, exchange: str, symbol: str, interval: str, limit: int = 0) -> CandleSeries:
+        """Get the series, creating it if needed (for streaming writers)"""
+        return self._series_for((exchange, symbol, interval), limit)
+
+    def _series_for(self, key: Tuple[str, str, str], limit: int) -> CandleSeries:
+        series = self._series.get(key)
+        if series is None:
+            series = CandleSeries(key[2], capacity=max(self.capacity, limit))
+            self._series[key] = series
+        elif limit > series.capacity:
+            series.grow(limit)
+        return series
+
+    async def refresh(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+        fetcher: KlineFetcher,
+        max_age: Optional[float] = None,
+    ) -> CandleSeries:
+        """Bring the series up to date, fetching as few candles as possible"""
+        key = (exchange, symbol, interval)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        max_age = self.refresh_seconds if max_age is None else max_age
+
+        async with lock:
+            series = self._series_for(key, limit)
+            now = time.time()
+            has_window = len(series) >= limit or series.full_limit >= limit
+
+            if has_window and now - series.last_fetch < max_age:
+                self.stats['fresh_hits'] += 1
+                return series
+
+            if has_window and series.last_ts is not None:
+                # Candles opened since the last stored one, plus the stored one itself
+                elapsed = int(now * 1000) - series.last_ts
+                needed = max(2, elapsed // series.interval_ms + 2)
+                if needed < limit:
+                    df = await fetcher(symbol, interval, int(needed))
+                    if df is not None and not df.empty:
+                        ts, values = frame_to_columns(df)
+                        if ts[0] <= series.last_ts:
+                            series.merge(ts, values)
+                            series.last_fetch = now
+                            self.stats['incremental_fetches'] += 1
+                            self.stats['bars_fetched'] += len(ts)
+                            return series
+                    # No overlap with the stored window: fall through to a full download
+                    logger.debug(f"Gap detected for {key}, refetching full window")
+
+            df = await fetcher(symbol, interval, limit)
+            if df is None or df.empty:
+                return series
+            ts, values = frame_to_columns(df)
+            series.clear()
+            series.merge(ts, values)
+            series.full_limit = limit
+            series.last_fetch = now
+            self.stats['full_fetches'] += 1
+            self.stats['bars_fetched'] += len(ts)
+            return series
+
+    async def get_view(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+        fetcher: KlineFetcher,
+        max_age: Optional[float] = None,
+    ) -> CandleView:
+        """Refresh and return zero-copy views of the last ``limit`` candles"""
+        series = await self.refresh(exchange, symbol, interval, limit, fetcher, max_age)
+        return series.view(limit)
+
+    async def get_frame(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+        fetcher: KlineFetcher,
+        max_age: Optional[float] = None,
+        copy: bool = True,
+    ) -> pd.DataFrame:
+        """Refresh and return the last ``limit`` candles as a DataFrame"""
+        view = await self.get_view(exchange, symbol, interval, limit, fetcher, max_age)
+        return view_to_frame(view, copy=copy)
+
+    def clear(self):
+        self._series.clear()
+        self._locks.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'series': len(self._series),
+            'total_bars': sum(len(s) for s in self._series.values()),
+        }
+
+
+def view_to_frame(view: CandleView, copy: bool = True) -> pd.DataFrame:
+    """
+    Wrap a CandleView in a DataFrame with the kline column layout
+
+    Views alias the ring buffer, so by default the columns are copied (a flat
+    memcpy per column) to keep pandas callers from seeing later live-candle
+    updates or tripping over read-only arrays. Pass ``copy=False`` for
+    short-lived read-only use.
+    """
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(view.timestamp, unit='ms'),
+        'open': view.open,
+        'high': view.high,
+        'low': view.low,
+        'close': view.close,
+        'volume': view.volume,
+    }, copy=copy)
+
+
+# Global candle store instance
+candle_store = CandleStore()
@@ -1,68 +1,51 @@
 import asyncio
-from datetime import datetime, timedelta
 from .binance_client import binance_client
+from .candle_store import candle_store, CandleView
 from ..analytics.sentiment import SentimentAnalyzer
+from ..core.cache import AsyncLRUCache
 
 class DataManager:
     def __init__(self):
         self.sentiment_analyzer = SentimentAnalyzer()
-        self.cache = {}
         self.cache_ttl = 60  # 1 minute cache for market data
         self.sentiment_cache_ttl = 300  # 5 minute cache for sentiment
+        self.cache = AsyncLRUCache(max_entries=1024, ttl=self.cache_ttl, name="data_manager")
+        self.ohlcv_refresh_ttl = 5  # incremental kline refreshes are cheap
+        self.candle_store = candle_store
     
     async def get_market_data(self, symbol: str) -> dict:
         """Get cached or fresh market data"""
-        cache_key = f"market_{symbol}"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if (datetime.now() - timestamp).seconds < self.cache_ttl:
-                return cached_data
-        
-        # Fetch fresh data
-        ticker_data = await binance_client.get_24hr_ticker(symbol)
-        
-        # Cache result
-        self.cache[cache_key] = (ticker_data, datetime.now())
-        
-        return ticker_data
+        return await self.cache.get_or_set(
+            f"market_{symbol}",
+            lambda: binance_client.get_24hr_ticker(symbol),
+            ttl=self.cache_ttl
+        )
+    
+    def update_market_data(self, symbol: str, data: dict):
+        """Store a pushed (streamed) ticker so reads skip the REST call"""
+        self.cache.set(f"market_{symbol}", data, ttl=self.cache_ttl)
     
     async def get_ohlcv_data(self, symbol: str, interval: str = "1h", limit: int = 100):
-        """Get cached or fresh OHLCV data"""
-        cache_key = f"ohlcv_{symbol}_{interval}_{limit}"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if (datetime.now() - timestamp).seconds < self.cache_ttl:
-                return cached_data
-        
-        # Fetch fresh data
-        ohlcv_data = await binance_client.get_klines(symbol, interval, limit)
-        
-        # Cache result
-        self.cache[cache_key] = (ohlcv_data, datetime.now())
-        
-        return ohlcv_data
+        """Get OHLCV data from the incremental candle store"""
+        return await self.candle_store.get_frame(
+            'binance', symbol, interval, limit,
+            binance_client.get_klines, max_age=self.ohlcv_refresh_ttl
+        )
+    
+    async def get_ohlcv_view(self, symbol: str, interval: str = "1h", limit: int = 100) -> CandleView:
+        """Get zero-copy OHLCV array views from the incremental candle store"""
+        return await self.candle_store.get_view(
+            'binance', symbol, interval, limit,
+            binance_client.get_klines, max_age=self.ohlcv_refresh_ttl
+        )
     
     async def get_sentiment_data(self, symbol: str = 'BTC') -> dict:
         """Get cached or fresh sentiment data"""
-        cache_key = f"sentiment_{symbol}"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if (datetime.now() - timestamp).seconds < self.sentiment_cache_ttl:
-                return cached_data
-        
-        # Fetch fresh data
-        sentiment_data = await self.sentiment_analyzer.analyze_market_sentiment(symbol)
-        
-        # Cache result
-        self.cache[cache_key] = (sentiment_data, datetime.now())
-        
-        return sentiment_data
+        return await self.cache.get_or_set(
+            f"sentiment_{symbol}",
+            lambda: self.sentiment_analyzer.analyze_market_sentiment(symbol),
+            ttl=self.sentiment_cache_ttl
+        )
     
     async def get_multiple_market_data(self, symbols: list) -> list:
         """Get market data for multiple symbols"""
@@ -80,13 +63,15 @@ class DataManager:
     def clear_cache(self):
         """Clear all cached data"""
         self.cache.clear()
+        self.candle_store.clear()
     
     def get_cache_stats(self) -> dict:
         """Get cache statistics"""
         return {
             'total_entries': len(self.cache),
-            'cache_keys': list(self.cache.keys()),
-            'last_updated': max([timestamp for _, timestamp in self.cache.values()]) if self.cache else None
+            'cache_keys': self.cache.keys(),
+            **self.cache.get_stats(),
+            'candle_store': self.candle_store.get_stats()
         }
 
 # Global data manager instance
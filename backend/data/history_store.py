@@ -0,0 +1,365 @@
+"""
+On-disk columnar candle history for backtests
+One directory per (exchange, symbol, interval) holding one memory-mapped file
+per calendar month; only missing ranges are ever downloaded
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import CandleView, OHLCV_COLUMNS, frame_to_columns, interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Async range fetcher: (symbol, interval, start_ms, end_ms) -> DataFrame with timestamp + OHLCV
+RangeFetcher = Callable[[str, str, int, int], Awaitable[pd.DataFrame]]
+
+# Slot markers in the timestamp column
+EMPTY = 0    # never downloaded
+NO_BAR = -1  # downloaded, exchange has no candle there (before listing, outages)
+
+# Weekly candles open on Monday; 1970-01-01 was a Thursday
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def _month_start(ms: int) -> datetime:
+    dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return datetime(dt.year + (dt.month == 12), dt.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+class MonthPartition:
+    """
+    One month of candles for one series, stored column after column
+
+    File layout: ``slots`` int64 open times followed by ``slots`` float64
+    values for each of open, high, low, close, volume. Slot ``k`` holds the
+    candle opening in ``[month_start + k * interval, month_start + (k+1) * interval)``,
+    so lookups are index arithmetic and columns map straight to numpy.
+    """
+
+    def __init__(self, path: str, month_start_ms: int, month_end_ms: int, interval_ms: int):
+        self.path = path
+        self.start_ms = month_start_ms
+        self.end_ms = month_end_ms
+        self.interval_ms = interval_ms
+        self.slots = -(-(month_end_ms - month_start_ms) // interval_ms)
+        self._ts: Optional[np.memmap] = None
+        self._cols: Dict[str, np.memmap] = {}
+        self._writable = False
+
+    @property
+    def nbytes(self) -> int:
+        return self.slots * 8 * (1 + len(OHLCV_COLUMNS))
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _open(self, writable: bool = False):
+        if self._ts is not None and (self._writable or not writable):
+            return
+        if writable and not self.exists():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.truncate(self.nbytes)  # sparse, zero-filled: every slot EMPTY
+        mode = 'r+' if writable else 'r'
+        self._ts = np.memmap(self.path, dtype=np.int64, mode=mode, shape=(self.slots,))
+        self._cols = {
+            name: np.memmap(self.path, dtype=np.float64, mode=mode, shape=(self.slots,),
+                            offset=8 * self.slots * (i + 1))
+            for i, name in enumerate(OHLCV_COLUMNS)
+        }
+        self._writable = writable
+
+    def slot(self, ts_ms):
+        return (np.asarray(ts_ms) - self.start_ms) // self.interval_ms
+
+    def timestamps(self) -> np.ndarray:
+        if not self.exists():
+            return np.zeros(self.slots, dtype=np.int64)
+        self._open()
+        return self._ts
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        self._open()
+        return self._cols
+
+    def write(self, ts: np.ndarray, values: np.ndarray):
+        """Store candles (ts within this month) and flush"""
+        self._open(writable=True)
+        slots = self.slot(ts)
+        self._ts[slots] = ts
+        for i, name in enumerate(OHLCV_COLUMNS):
+            self._cols[name][slots] = values[:, i]
+        self._ts.flush()
+        for col in self._cols.values():
+            col.flush()
+
+    def mark_empty(self, slots: np.ndarray):
+        self._open(writable=True)
+        self._ts[slots] = NO_BAR
+        self._ts.flush()
+
+    def close(self):
+        """Drop the memory maps; views already handed out keep their own mapping"""
+        if self._ts is not None and self._writable:
+            self._ts.flush()
+            for col in self._cols.values():
+                col.flush()
+        self._ts = None
+        self._cols = {}
+        self._writable = False
+
+
+class HistoryStore:
+    """
+    Persistent candle history keyed by (exchange, symbol, interval)
+
+    get_range() downloads only the candles missing on disk, then serves the
+    range from memory-mapped columns. Once a range is complete, repeated
+    backtests over it read the local files only.
+
+    Example:
+        view = await history_store.get_range('binance', 'BTCUSDT', '1h',
+                                             start_ms, end_ms, fetch_binance_range)
+        closes = view.close
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_fetch_bars: int = 1000,
+        max_open_partitions: int = 64
+    ):
+        self.root = root or os.getenv('HISTORY_CACHE_DIR', 'history_cache')
+        self.max_fetch_bars = max_fetch_bars
+        self.max_open_partitions = max_open_partitions
+        # LRU of month partitions; evicted ones are closed to release their maps
+        self._partitions: "OrderedDict[Tuple[str, str, str, int], MonthPartition]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self.stats = {'range_queries': 0, 'fetches': 0, 'bars_fetched': 0, 'bars_served': 0}
+
+    def _partition(self, exchange: str, symbol: str, interval: str, month: datetime) -> MonthPartition:
+        start_ms = _ms(month)
+        key = (exchange, symbol, interval, start_ms)
+        part = self._partitions.get(key)
+        if part is None:
+            path = os.path.join(
+                self.root, exchange, symbol.replace('/', ''), interval, f"{month:%Y-%m}.bin"
+            )
+            part = MonthPartition(path, start_ms, _ms(_next_month(month)), interval_to_ms(interval))
+            self._partitions[key] = part
+            while len(self._partitions) > self.max_open_partitions:
+                _, evicted = self._partitions.popitem(last=False)
+                evicted.close()
+        else:
+            self._partitions.move_to_end(key)
+        return part
+
+    def _partitions_for(self, exchange, symbol, interval, start_ms, end_ms) -> List[MonthPartition]:
+        parts = []
+        month = _month_start(start_ms)
+        while _ms(month) < end_ms:
+            parts.append(self._partition(exchange, symbol, interval, month))
+            month = _next_month(month)
+        return parts
+
+    @staticmethod
+    def expected_times(interval: str, start_ms: int, end_ms: int) -> np.ndarray:
+        """Candle open times the exchange should have in ``[start_ms, end_ms)``"""
+        interval_ms = interval_to_ms(interval)
+        offset = _WEEK_OFFSET_MS if interval_ms == 7 * 86_400_000 else 0
+        first = -(-(start_ms - offset) // interval_ms) * interval_ms + offset
+        return np.arange(first, end_ms, interval_ms, dtype=np.int64)
+
+    def missing_ranges(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int
+    ) -> List[Tuple[int, int]]:
+        """Contiguous ``[start, end)`` ranges of candles not yet on disk"""
+        interval_ms = interval_to_ms(interval)
+        # The still-forming candle is never persisted
+        closed_end = min(end_ms, (int(time.time() * 1000) // interval_ms) * interval_ms)
+        expected = self.expected_times(interval, start_ms, closed_end)
+        if len(expected) == 0:
+            return []
+
+        missing = np.zeros(len(expected), dtype=bool)
+        for part in self._partitions_for(exchange, symbol, interval, start_ms, closed_end):
+            inside = (expected >= part.start_ms) & (expected < part.end_ms)
+            missing[inside] = part.timestamps()[part.slot(expected[inside])] == EMPTY
+
+        ranges = []
+        idx = np.flatnonzero(missing)
+        if len(idx):
+            breaks = np.flatnonzero(np.diff(idx) > 1)
+            for lo, hi in zip(np.r_[0, breaks + 1], np.r_[breaks, len(idx) - 1]):
+                ranges.append((int(expected[idx[lo]]), int(expected[idx[hi]]) + interval_ms))
+        return ranges
+
+    def write(self, exchange: str, symbol: str, interval: str, ts: np.ndarray, values: np.ndarray):
+        """Persist fetched candles (sorted ts in ms, (n, 5) OHLCV matrix)"""
+        for part in self._partitions_for(exchange, symbol, interval, int(ts[0]), int(ts[-1]) + 1):
+            inside = (ts >= part.start_ms) & (ts < part.end_ms)
+            if inside.any():
+                part.write(ts[inside], values[inside])
+
+    def _mark_fetched(self, exchange, symbol, interval, start_ms, end_ms):
+        """Record slots the exchange returned nothing for, so they are not refetched"""
+        for part in self._partitions_for(exchange, symbol, interval, start_ms, end_ms):
+            lo, hi = max(start_ms, part.start_ms), min(end_ms, part.end_ms)
+            expected = self.expected_times(interval, lo, hi)
+            slots = part.slot(expected)
+            empty = slots[part.timestamps()[slots] == EMPTY]
+            if len(empty):
+                part.mark_empty(empty)
+
+    async def fill(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        fetcher: RangeFetcher
+    ) -> int:
+        """Download the missing parts of ``[start_ms, end_ms)``; returns bars fetched"""
+        key = (exchange, symbol, interval)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        interval_ms = interval_to_ms(interval)
+        fetched = 0
+
+        async with lock:
+            for lo, hi in self.missing_ranges(exchange, symbol, interval, start_ms, end_ms):
+                chunk = self.max_fetch_bars * interval_ms
+                for chunk_start in range(lo, hi, chunk):
+                    chunk_end = min(chunk_start + chunk, hi)
+                    df = await fetcher(symbol, interval, chunk_start, chunk_end - 1)
+                    self.stats['fetches'] += 1
+                    if df is not None and not df.empty:
+                        ts, values = frame_to_columns(df)
+                        keep = (ts >= chunk_start) & (ts < chunk_end)
+                        if keep.any():
+                            self.write(exchange, symbol, interval, ts[keep], values[keep])
+                            fetched += int(keep.sum())
+                    self._mark_fetched(exchange, symbol, interval, chunk_start, chunk_end)
+
+        self.stats['bars_fetched'] += fetched
+        if fetched:
+            logger.info(f"Gap-filled {fetched} {symbol} {interval} candles from {exchange}")
+        return fetched
+
+    def read_range(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int
+    ) -> CandleView:
+        """
+        Candles in ``[start_ms, end_ms)`` from disk, oldest first
+
+        A range inside one month with no holes is returned as read-only views
+        of the memory map; otherwise the months are concatenated (one copy
+        per column, no parsing).
+        """
+        self.stats['range_queries'] += 1
+        pieces = []
+        for part in self._partitions_for(exchange, symbol, interval, start_ms, end_ms):
+            if not part.exists():
+                continue
+            lo = max(0, int(part.slot(max(start_ms, part.start_ms))))
+            hi = min(part.slots, int(part.slot(min(end_ms, part.end_ms) - 1)) + 1)
+            ts = part.timestamps()[lo:hi]
+            cols = part.columns()
+            present = ts > 0
+            if present.all():
+                pieces.append((ts, *(cols[name][lo:hi] for name in OHLCV_COLUMNS)))
+            else:
+                pieces.append((ts[present], *(cols[name][lo:hi][present] for name in OHLCV_COLUMNS)))
+
+        if not pieces:
+            view = CandleView(np.empty(0, dtype=np.int64), *(np.empty(0) for _ in OHLCV_COLUMNS))
+        elif len(pieces) == 1:
+            view = CandleView(*pieces[0])
+            for column in view:
+                column.flags.writeable = False
+        else:
+            view = CandleView(*(np.concatenate(column) for column in zip(*pieces)))
+
+        # Trim bars outside the requested range (coarse slots at the edges)
+        if len(view) and (view.timestamp[0] < start_ms or view.timestamp[-1] >= end_ms):
+            keep = (view.timestamp >= start_ms) & (view.timestamp < end_ms)
+            view = CandleView(*(column[keep] for column in view))
+
+        self.stats['bars_served'] += len(view)
+        return view
+
+    async def get_range(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        fetcher: Optional[RangeFetcher] = None
+    ) -> CandleView:
+        """Gap-fill (if a fetcher is given) and return ``[start_ms, end_ms)``"""
+        if fetcher is not None:
+            try:
+                await self.fill(exchange, symbol, interval, start_ms, end_ms, fetcher)
+            except Exception as e:
+                # Offline or rate limited: serve whatever is already on disk
+                logger.warning(f"Gap fill failed for {symbol} {interval}: {e}")
+        return self.read_range(exchange, symbol, interval, start_ms, end_ms)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'partitions_open': len(self._partitions), 'root': self.root}
+
+
+async def fetch_binance_range(symbol: str, interval: str, start_ms: int, end_ms: int) -> pd.DataFrame:
+    """RangeFetcher backed by Binance klines (at most 1000 bars per call)"""
+    from .binance_client import binance_client
+    from .exceptions import InsufficientDataError
+
+    try:
+        return await binance_client.get_klines(
+            symbol.replace('/', ''), interval, limit=1000, start_time=start_ms, end_time=end_ms
+        )
+    except InsufficientDataError:
+        # Nothing traded in this range (e.g. before listing)
+        return pd.DataFrame(columns=['timestamp', *OHLCV_COLUMNS])
+
+
+def view_to_bars(view: CandleView) -> List[Dict]:
+    """Convert a CandleView to the list-of-dicts bar format used by the backtest engine"""
+    ts = view.timestamp.tolist()
+    columns = [getattr(view, name).tolist() for name in OHLCV_COLUMNS]
+    return [
+        {'ts': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for t, o, h, l, c, v in zip(ts, *columns)
+    ]
+
+
+# Global history store instance
+history_store = HistoryStore()
@@ -0,0 +1,151 @@
+"""
+Shared HTTP connection pool for exchange clients
+One pooled, non-blocking httpx client per upstream host with keep-alive and HTTP/2
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    from ..core.metrics import UPSTREAM_SECONDS
+except ImportError:
+    from core.metrics import UPSTREAM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Times every request through ``transport`` into the upstream latency histogram"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, provider: str):
+        self.transport = transport
+        self.provider = provider
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, provider=self.provider, status=type(e).__name__)
+            raise
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, provider=self.provider, status=response.status_code)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HttpPool:
+    """
+    Lazily created ``httpx.AsyncClient`` per host
+
+    Each host gets its own client so connection limits apply per host
+    (httpx limits are per client). Clients are bound to the event loop
+    that created them and are transparently recreated if the loop changes.
+
+    Example:
+        client = http_pool.get_client("https://api.binance.com")
+        response = await client.get("/api/v3/time")
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 15.0,
+        http2: bool = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, Optional[asyncio.AbstractEventLoop]]] = {}
+        self._retiring: Set[asyncio.Future] = set()
+
+    def get_client(self, base_url: str, headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+        """Get (or create) the pooled client for ``base_url``"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.get(base_url)
+        if entry is not None:
+            client, client_loop = entry
+            if not client.is_closed and client_loop is loop:
+                return client
+            self._retire(client, client_loop)
+
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits)
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            transport=MeteredTransport(transport, urlsplit(base_url).hostname or base_url),
+            timeout=self.timeout,
+            follow_redirects=True,
+        )
+        self._clients[base_url] = (client, loop)
+        logger.debug(f"Created pooled HTTP client for {base_url} (http2={self.http2})")
+        return client
+
+    def _retire(self, client: httpx.AsyncClient, client_loop: Optional[asyncio.AbstractEventLoop]):
+        """Close a client replaced for another event loop so its connections don't leak"""
+        if client.is_closed:
+            return
+        if client_loop is not None and client_loop.is_running() and not client_loop.is_closed():
+            # Its sockets belong to that loop; close them there
+            future = asyncio.run_coroutine_threadsafe(self._close_quietly(client), client_loop)
+        else:
+            try:
+                future = asyncio.get_running_loop().create_task(self._close_quietly(client))
+            except RuntimeError:
+                asyncio.run(self._close_quietly(client))
+                return
+        self._retiring.add(future)
+        future.add_done_callback(self._retiring.discard)
+
+    @staticmethod
+    async def _close_quietly(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing replaced HTTP client: {e}")
+
+    async def aclose(self):
+        """Close every pooled client"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client, _ in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing pooled HTTP client: {e}")
+
+    def get_stats(self) -> Dict:
+        """Pool configuration and open hosts"""
+        return {
+            'hosts': list(self._clients.keys()),
+            'http2': self.http2,
+            'max_connections_per_host': self.limits.max_connections,
+            'max_keepalive_per_host': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+        }
+
+
+# Global pool shared by all exchange clients
+http_pool = HttpPool()
@@ -6,12 +6,14 @@ Replaces Binance with KuCoin for all market data operations
 import asyncio
 import json
 import websockets
-import requests
+import httpx
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from .http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
 class KuCoinClient:
@@ -23,11 +25,15 @@ class KuCoinClient:
             self.base_url = "https://api.kucoin.com"
             self.ws_url = "wss://ws-api.kucoin.com/endpoint"
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._headers = {
             'User-Agent': 'HTS-Trading-System/1.0',
             'Content-Type': 'application/json'
-        })
+        }
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Pooled async client shared with the other exchange clients"""
+        return http_pool.get_client(self.base_url, headers=self._headers)
 
     async def get_ticker_price(self, symbol: str) -> Dict:
         """Get current ticker price for a symbol"""
@@ -35,10 +41,10 @@ class KuCoinClient:
             # Convert symbol format (BTCUSDT -> BTC-USDT)
             kucoin_symbol = self._convert_symbol_format(symbol)
             
-            url = f"{self.base_url}/api/v1/market/orderbook/level1"
+            url = "/api/v1/market/orderbook/level1"
             params = {"symbol": kucoin_symbol}
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = await self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -68,10 +74,10 @@ class KuCoinClient:
         try:
             kucoin_symbol = self._convert_symbol_format(symbol)
             
-            url = f"{self.base_url}/api/v1/market/stats"
+            url = "/api/v1/market/stats"
             params = {"symbol": kucoin_symbol}
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = await self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -114,7 +120,7 @@ class KuCoinClient:
             end_time = int(datetime.now().timestamp())
             start_time = end_time - (limit * self._get_interval_seconds(kucoin_interval))
             
-            url = f"{self.base_url}/api/v1/market/candles"
+            url = "/api/v1/market/candles"
             params = {
                 "symbol": kucoin_symbol,
                 "type": kucoin_interval,
@@ -122,7 +128,7 @@ class KuCoinClient:
                 "endAt": end_time
             }
             
-            response = self.session.get(url, params=params, timeout=15)
+            response = await self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
             data = response.json()
             
@@ -154,12 +160,28 @@ class KuCoinClient:
             # Return empty DataFrame with correct structure
             return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
 
+    async def get_ws_token(self) -> Dict:
+        """Public WebSocket token and endpoint for market-data streams"""
+        response = await self.session.post("/api/v1/bullet-public", timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("code") != "200000" or not data.get("data"):
+            raise Exception(f"KuCoin API error: {data.get('msg', 'Unknown error')}")
+        
+        token_data = data["data"]
+        server = (token_data.get("instanceServers") or [{}])[0]
+        return {
+            'token': token_data['token'],
+            'endpoint': server.get('endpoint', self.ws_url),
+            'ping_interval': server.get('pingInterval', 18000) / 1000
+        }
+    
     async def get_symbols(self) -> List[Dict]:
         """Get list of available trading symbols"""
         try:
-            url = f"{self.base_url}/api/v1/symbols"
+            url = "/api/v1/symbols"
             
-            response = self.session.get(url, timeout=10)
+            response = await self.session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -187,9 +209,9 @@ class KuCoinClient:
     async def get_server_time(self) -> Dict:
         """Get server time for synchronization"""
         try:
-            url = f"{self.base_url}/api/v1/timestamp"
+            url = "/api/v1/timestamp"
             
-            response = self.session.get(url, timeout=5)
+            response = await self.session.get(url, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -0,0 +1,444 @@
+"""
+Exchange WebSocket market-data ingestion
+
+Subscribes to trade, kline and ticker streams and folds every trade into the
+forming candle of each configured interval in the shared candle store. Bars
+stay current to the last trade, so scanners and indicators read them without
+REST polling. Exchange kline updates overwrite the locally aggregated bar to
+reconcile it.
+
+On every (re)connect the store is backfilled over REST, which fills whatever
+gap the outage left. A silent socket counts as dead after ``stale_after``
+seconds. Reconnects back off exponentially with jitter.
+
+Example:
+    stream = MarketStreamIngestor(BinanceStreamProtocol(), ['BTCUSDT'], ['1m', '1h'],
+                                  backfill=binance_client.get_klines)
+    stream.add_listener(on_event)
+    stream.start()
+"""
+
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import websockets
+
+from .candle_store import CandleStore, KlineFetcher, bar_open_ms, candle_store
+from .kucoin_client import kucoin_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TradeEvent:
+    symbol: str
+    timestamp: int  # ms
+    price: float
+    quantity: float
+
+
+@dataclass
+class KlineEvent:
+    symbol: str
+    interval: str
+    open_time: int  # ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+    timestamp: int  # ms, event time
+
+
+@dataclass
+class TickerEvent:
+    symbol: str
+    timestamp: int  # ms
+    price: float
+    volume: float
+    high_24h: float
+    low_24h: float
+    change_24h: float  # percent
+
+
+@dataclass
+class CandleClosed:
+    symbol: str
+    interval: str
+    open_time: int  # ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class BinanceStreamProtocol:
+    """Binance combined streams: aggTrade, kline_<interval> and miniTicker per symbol"""
+
+    exchange = 'binance'
+    ping_interval = None  # the server pings, websockets answers
+
+    def __init__(self, base_url: str = 'wss://stream.binance.com:9443'):
+        self.base_url = base_url.rstrip('/')
+
+    async def connect_url(self, symbols: List[str], intervals: List[str]) -> str:
+        streams = []
+        for symbol in symbols:
+            name = symbol.lower()
+            streams += [f"{name}@aggTrade", f"{name}@miniTicker"]
+            streams += [f"{name}@kline_{interval}" for interval in intervals]
+        return f"{self.base_url}/stream?streams={'/'.join(streams)}"
+
+    def subscribe_messages(self, symbols: List[str], intervals: List[str]) -> List[Dict]:
+        return []
+
+    def ping_message(self) -> Optional[Dict]:
+        return None
+
+    def parse(self, message: Dict) -> List[Any]:
+        data = message.get('data', message)
+        kind = data.get('e')
+        if kind in ('aggTrade', 'trade'):
+            return [TradeEvent(data['s'], int(data['T']), float(data['p']), float(data['q']))]
+        if kind == 'kline':
+            k = data['k']
+            return [KlineEvent(data['s'], k['i'], int(k['t']), float(k['o']), float(k['h']), float(k['l']),
+                               float(k['c']), float(k['v']), bool(k['x']), int(data['E']))]
+        if kind in ('24hrMiniTicker', '24hrTicker'):
+            open_price, close = float(data['o']), float(data['c'])
+            change = (close - open_price) / open_price * 100 if open_price else 0.0
+            return [TickerEvent(data['s'], int(data['E']), close, float(data['v']),
+                                float(data['h']), float(data['l']), change)]
+        return []
+
+
+class KuCoinStreamProtocol:
+    """KuCoin public streams: match, snapshot and candles topics"""
+
+    exchange = 'kucoin'
+
+    def __init__(self, client=None):
+        self.client = client or kucoin_client
+        self.ping_interval = 18.0
+        self._ids = itertools.count(1)
+        self._symbols: Dict[str, str] = {}
+        self._intervals: Dict[str, str] = {}
+
+    async def connect_url(self, symbols: List[str], intervals: List[str]) -> str:
+        token = await self.client.get_ws_token()
+        self.ping_interval = token['ping_interval']
+        return f"{token['endpoint']}?token={token['token']}&connectId={uuid.uuid4().hex}"
+
+    def _subscribe(self, topic: str) -> Dict:
+        return {"id": str(next(self._ids)), "type": "subscribe", "topic": topic,
+                "privateChannel": False, "response": True}
+
+    def subscribe_messages(self, symbols: List[str], intervals: List[str]) -> List[Dict]:
+        self._symbols = {self.client._convert_symbol_format(s): s for s in symbols}
+        self._intervals = {self.client._convert_interval_format(i): i for i in intervals}
+        markets = ','.join(self._symbols)
+        messages = [self._subscribe(f"/market/match:{markets}"), self._subscribe(f"/market/snapshot:{markets}")]
+        for kucoin_interval in self._intervals:
+            candles = ','.join(f"{market}_{kucoin_interval}" for market in self._symbols)
+            messages.append(self._subscribe(f"/market/candles:{candles}"))
+        return messages
+
+    def ping_message(self) -> Optional[Dict]:
+        return {"id": str(next(self._ids)), "type": "ping"}
+
+    def parse(self, message: Dict) -> List[Any]:
+        if message.get('type') != 'message':
+            return []
+        topic, data = message.get('topic', ''), message.get('data', {})
+        if topic.startswith('/market/match:'):
+            symbol = self._symbols.get(data['symbol'], data['symbol'])
+            # Trade time is in nanoseconds
+            return [TradeEvent(symbol, int(data['time']) // 1_000_000, float(data['price']), float(data['size']))]
+        if topic.startswith('/market/snapshot:'):
+            snap = data.get('data', data)
+            symbol = self._symbols.get(snap['symbol'], snap['symbol'])
+            return [TickerEvent(symbol, int(snap['datetime']), float(snap['lastTradedPrice']), float(snap['vol']),
+                                float(snap['high']), float(snap['low']), float(snap['changeRate']) * 100)]
+        if topic.startswith('/market/candles:'):
+            market, kucoin_interval = topic.split(':', 1)[1].rsplit('_', 1)
+            start, open_price, close, high, low, volume = data['candles'][:6]
+            return [KlineEvent(self._symbols.get(market, market), self._intervals.get(kucoin_interval, kucoin_interval),
+                               int(start) * 1000, float(open_price), float(high), float(low), float(close),
+                               float(volume), False, int(data['time']) // 1_000_000)]
+        return []
+
+
+class MarketStreamIngestor:
+    """
+    Streaming candle aggregation into the candle store
+
+    Args:
+        protocol: Exchange adapter (BinanceStreamProtocol, KuCoinStreamProtocol)
+        symbols: Symbols to subscribe, in the store's naming (BTCUSDT)
+        intervals: Candle intervals to maintain ('1m', '15m', '1h', ...)
+        store: Candle store to write into
+        backfill: REST kline fetcher used on (re)connect to fill gaps
+        backfill_limit: Bars per series to backfill on first connect
+        stale_after: Seconds without a message before reconnecting
+    """
+
+    def __init__(self, protocol, symbols: Iterable[str], intervals: Iterable[str],
+                 store: Optional[CandleStore] = None, backfill: Optional[KlineFetcher] = None,
+                 backfill_limit: int = 500, backfill_concurrency: int = 4,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 stale_after: float = 30.0):
+        self.protocol = protocol
+        self.exchange = protocol.exchange
+        self.symbols = list(dict.fromkeys(symbols))
+        self.intervals = list(dict.fromkeys(intervals))
+        self.store = store or candle_store
+        self.backfill = backfill
+        self.backfill_limit = backfill_limit
+        self.backfill_concurrency = backfill_concurrency
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stale_after = stale_after
+        self.connected = False
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[Any], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._backfill_cutoff: Dict[str, int] = {}
+        self._last_closed: Dict[Tuple[str, str], int] = {}
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "messages": 0,
+            "trades": 0,
+            "klines": 0,
+            "tickers": 0,
+            "candles_closed": 0,
+            "late_trades": 0,
+            "backfilled_trades": 0,
+            "backfills": 0,
+            "backfill_errors": 0,
+            "parse_errors": 0,
+            "listener_errors": 0,
+            "last_lag_ms": None,
+            "max_lag_ms": 0,
+            "last_message_at": None,
+        }
+
+    def add_listener(self, callback: Callable[[Any], Any]):
+        """Call ``callback(event)`` (sync or async) for every parsed event and candle close"""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    def latest_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Most recent streamed 24h ticker (shaped like the REST ticker) while connected"""
+        return self.tickers.get(symbol) if self.connected else None
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while self._running:
+            received = self.stats["messages"]
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"{self.exchange} stream silent for {self.stale_after}s, reconnecting")
+            except Exception as e:
+                logger.warning(f"{self.exchange} stream disconnected: {e}")
+            finally:
+                self.connected = False
+            if not self._running:
+                break
+            if self.stats["messages"] > received:
+                delay = self.reconnect_delay  # the session was healthy; start backoff over
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(self.max_reconnect_delay, delay * 2)
+
+    async def _session(self):
+        url = await self.protocol.connect_url(self.symbols, self.intervals)
+        async with websockets.connect(url, max_size=2 ** 22, close_timeout=5) as ws:
+            for message in self.protocol.subscribe_messages(self.symbols, self.intervals):
+                await ws.send(json.dumps(message))
+            self.connected = True
+            self.stats["connects"] += 1
+            logger.info(f"{self.exchange} stream connected ({len(self.symbols)} symbols, {len(self.intervals)} intervals)")
+
+            # Frames queue up in the socket while the gap is filled
+            await self._backfill()
+
+            keepalive = asyncio.create_task(self._keepalive(ws)) if self.protocol.ping_interval else None
+            try:
+                while self._running:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_after)
+                    await self._handle(raw)
+            finally:
+                if keepalive is not None:
+                    keepalive.cancel()
+
+    async def _keepalive(self, ws):
+        while True:
+            await asyncio.sleep(self.protocol.ping_interval)
+            await ws.send(json.dumps(self.protocol.ping_message()))
+
+    async def _backfill(self):
+        """Fill every series over REST up to now; later trades come from the stream"""
+        if self.backfill is None:
+            return
+        cutoff = int(time.time() * 1000)
+        semaphore = asyncio.Semaphore(self.backfill_concurrency)
+
+        async def fill(symbol: str, interval: str):
+            async with semaphore:
+                try:
+                    await self.store.refresh(self.exchange, symbol, interval, self.backfill_limit,
+                                             self.backfill, max_age=0)
+                    self.stats["backfills"] += 1
+                except Exception as e:
+                    self.stats["backfill_errors"] += 1
+                    logger.warning(f"Backfill failed for {symbol} {interval}: {e}")
+
+        await asyncio.gather(*(fill(s, i) for s in self.symbols for i in self.intervals))
+        for symbol in self.symbols:
+            self._backfill_cutoff[symbol] = cutoff
+
+    async def _handle(self, raw):
+        self.stats["messages"] += 1
+        now_ms = int(time.time() * 1000)
+        self.stats["last_message_at"] = now_ms
+        try:
+            events = self.protocol.parse(json.loads(raw))
+        except Exception as e:
+            self.stats["parse_errors"] += 1
+            logger.debug(f"Unparseable {self.exchange} frame: {e}")
+            return
+
+        for event in events:
+            lag = now_ms - event.timestamp
+            self.stats["last_lag_ms"] = lag
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag)
+            if isinstance(event, TradeEvent):
+                closed = self._apply_trade(event)
+            elif isinstance(event, KlineEvent):
+                closed = self._apply_kline(event)
+            elif isinstance(event, TickerEvent):
+                closed = self._apply_ticker(event)
+            else:
+                continue
+            for item in (*closed, event):
+                await self._dispatch(item)
+
+    def _close(self, symbol: str, interval: str, open_time: int, values: Tuple[float, ...]) -> List[CandleClosed]:
+        """Close event for a bar, once per bar whichever of trade or kline reports it first"""
+        key = (symbol, interval)
+        if open_time <= self._last_closed.get(key, -1):
+            return []
+        self._last_closed[key] = open_time
+        self.stats["candles_closed"] += 1
+        return [CandleClosed(symbol, interval, open_time, *values)]
+
+    def _apply_trade(self, trade: TradeEvent) -> List[CandleClosed]:
+        if trade.symbol not in self.symbols:
+            return []
+        if trade.timestamp <= self._backfill_cutoff.get(trade.symbol, -1):
+            # Already counted in the REST backfill
+            self.stats["backfilled_trades"] += 1
+            return []
+        self.stats["trades"] += 1
+        now = time.time()
+        price, quantity = trade.price, trade.quantity
+        closed: List[CandleClosed] = []
+        for interval in self.intervals:
+            series = self.store.ensure_series(self.exchange, trade.symbol, interval)
+            bar_open = bar_open_ms(trade.timestamp, series.interval_ms)
+            last = series.last_ts
+            if last is None or bar_open > last:
+                if last is not None:
+                    closed += self._close(trade.symbol, interval, last, series.last_values())
+                series.append(bar_open, (price, price, price, price, quantity))
+            elif bar_open == last:
+                open_price, high, low, _, volume = series.last_values()
+                series.update_last((open_price, max(high, price), min(low, price), price, volume + quantity))
+            else:
+                self.stats["late_trades"] += 1
+                continue
+            series.last_fetch = now  # keeps REST refreshes away while the stream is live
+        return closed
+
+    def _apply_kline(self, kline: KlineEvent) -> List[CandleClosed]:
+        if kline.symbol not in self.symbols or kline.interval not in self.intervals:
+            return []
+        self.stats["klines"] += 1
+        series = self.store.ensure_series(self.exchange, kline.symbol, kline.interval)
+        closed: List[CandleClosed] = []
+        last = series.last_ts
+        if last is not None and kline.open_time > last:
+            closed += self._close(kline.symbol, kline.interval, last, series.last_values())
+        values = (kline.open, kline.high, kline.low, kline.close, kline.volume)
+        series.merge(np.array([kline.open_time], dtype=np.int64), np.array([values], dtype=np.float64))
+        series.last_fetch = time.time()
+        if kline.closed:
+            closed += self._close(kline.symbol, kline.interval, kline.open_time, values)
+        return closed
+
+    def _apply_ticker(self, ticker: TickerEvent) -> List[CandleClosed]:
+        if ticker.symbol not in self.symbols:
+            return []
+        self.stats["tickers"] += 1
+        self.tickers[ticker.symbol] = {
+            'symbol': ticker.symbol,
+            'price': ticker.price,
+            'volume': ticker.volume,
+            'high_24h': ticker.high_24h,
+            'low_24h': ticker.low_24h,
+            'change_24h': ticker.change_24h,
+            'timestamp': datetime.fromtimestamp(ticker.timestamp / 1000),
+            'source': f"{self.exchange}_stream"
+        }
+        return []
+
+    async def _dispatch(self, event):
+        for callback in self._listeners:
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.stats["listener_errors"] += 1
+                logger.error(f"Market stream listener failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "exchange": self.exchange,
+            "connected": self.connected,
+            "symbols": len(self.symbols),
+            "intervals": self.intervals,
+        }
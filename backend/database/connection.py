@@ -1,29 +1,125 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 from .models import Base
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+    ASYNC_SQLALCHEMY_AVAILABLE = True
+except ImportError:
+    ASYNC_SQLALCHEMY_AVAILABLE = False
+
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hts_trading.db")
 
+# Pool tuning for server databases (SQLite files use their own pool defaults)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Sync URL scheme -> async driver
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def async_url(url: str) -> str:
+    """Async-driver form of a sync database URL (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def _engine_options(url: str) -> dict:
+    if _is_memory_sqlite(url):
+        # One shared connection, or every checkout would see a fresh empty database
+        return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False, "timeout": POOL_TIMEOUT}}
+    return {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def enable_sqlite_wal(engine):
+    """WAL journaling on every SQLite connection: readers no longer block the writer"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not _is_memory_sqlite(str(sync_engine.url)):
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(POOL_TIMEOUT * 1000)}")
+        cursor.close()
+
+
+def make_engine(url: str = DATABASE_URL, **options):
+    engine = create_engine(url, echo=False, **{**_engine_options(url), **options})
+    enable_sqlite_wal(engine)
+    return engine
+
+
+def make_async_engine(url: str = DATABASE_URL, **options) -> "AsyncEngine":
+    """Async engine for ``url`` with the same pool settings; needs aiosqlite or asyncpg installed"""
+    url = async_url(url)
+    engine = create_async_engine(url, echo=False, **{**_engine_options(url), **options})
+    enable_sqlite_wal(engine)
+    return engine
+
+
 # Create engine
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=False
-    )
-else:
-    engine = create_engine(DATABASE_URL, echo=False)
+engine = make_engine(DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def create_indexes(bind):
+    """create_all() skips tables that already exist; add indexes defined since they were created"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+create_indexes(engine)
+
+# Async engine is created on first use so a missing async driver only affects async callers
+_async_engine: Optional["AsyncEngine"] = None
+_async_sessions = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    global _async_engine, _async_sessions
+    if _async_engine is None:
+        if not ASYNC_SQLALCHEMY_AVAILABLE:
+            raise RuntimeError("sqlalchemy.ext.asyncio is unavailable")
+        _async_engine = make_async_engine(DATABASE_URL)
+        _async_sessions = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> "AsyncSession":
+    get_async_engine()
+    return _async_sessions()
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency to get database session"""
@@ -33,6 +129,17 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """Dependency to get an async database session; round-trips never block the event loop"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
 def init_db():
     """Initialize database with default data"""
     db = SessionLocal()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -67,6 +67,13 @@ class SignalRecord(Base):
     session = relationship("TradingSession", back_populates="signals")
     trade = relationship("TradeRecord", back_populates="signal", uselist=False)
 
+    # Keyset listing walks (timestamp, id); history filters by symbol or session first
+    __table_args__ = (
+        Index("ix_signal_records_timestamp_id", "timestamp", "id"),
+        Index("ix_signal_records_symbol_timestamp", "symbol", "timestamp"),
+        Index("ix_signal_records_session_timestamp", "session_id", "timestamp"),
+    )
+
 class TradeRecord(Base):
     __tablename__ = "trade_records"
     
@@ -108,6 +115,13 @@ class TradeRecord(Base):
     session = relationship("TradingSession", back_populates="trades")
     signal = relationship("SignalRecord", back_populates="trade")
 
+    __table_args__ = (
+        Index("ix_trade_records_entry_time_id", "entry_time", "id"),
+        Index("ix_trade_records_symbol_entry_time", "symbol", "entry_time"),
+        Index("ix_trade_records_session_entry_time", "session_id", "entry_time"),
+        Index("ix_trade_records_status_symbol", "status", "symbol"),
+    )
+
 class BacktestResult(Base):
     __tablename__ = "backtest_results"
     
@@ -175,6 +189,42 @@ class SystemMetrics(Base):
     api_errors_count = Column(Integer, default=0)
     websocket_reconnects = Column(Integer, default=0)
 
+    __table_args__ = (
+        Index("ix_system_metrics_timestamp", "timestamp"),
+    )
+
+class SymbolRollup(Base):
+    """
+    Per-symbol hourly and daily aggregates, maintained as records are written
+
+    Stores sums and counts only, so concurrent writers can add to a bucket
+    with one upsert; averages and win rate are derived on read.
+    """
+    __tablename__ = "symbol_rollups"
+
+    period = Column(String, primary_key=True)  # hour, day
+    bucket_start = Column(DateTime, primary_key=True)
+    symbol = Column(String, primary_key=True)
+
+    # Signals, bucketed by signal timestamp
+    signals = Column(Integer, nullable=False, default=0)
+    buy_signals = Column(Integer, nullable=False, default=0)
+    sell_signals = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+    # Trades: opens bucketed by entry time, closes by exit time
+    trades_opened = Column(Integer, nullable=False, default=0)
+    trades_closed = Column(Integer, nullable=False, default=0)
+    winning_trades = Column(Integer, nullable=False, default=0)
+    net_pnl = Column(Float, nullable=False, default=0.0)
+    gross_profit = Column(Float, nullable=False, default=0.0)
+    gross_loss = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("ix_symbol_rollups_symbol_bucket", "period", "symbol", "bucket_start"),
+    )
+
 class RiskLimit(Base):
     __tablename__ = "risk_limits"
     
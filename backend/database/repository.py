@@ -0,0 +1,354 @@
+"""
+Bulk writes and keyset pagination for the record tables
+
+The statement builders are plain SQLAlchemy statements. The coroutines
+take an AsyncSession, as the routes do. write_batch() is the sync core of
+record_batch() and takes a Session, so the journal's writer thread calls it
+directly and record_batch() runs it through AsyncSession.run_sync().
+
+Every write path goes through write_batch(), which also adds the new
+records to the hourly/daily symbol_rollups in the same transaction.
+
+Example:
+    await upsert_signals(db, rows)
+    page = await fetch_page(db, SignalRecord, SignalRecord.timestamp, limit=100, cursor=request_cursor)
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import DateTime, and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import SignalRecord, SymbolRollup, SystemMetrics, TradeRecord
+from .rollups import COUNTERS, PERIODS, bucket_start, combine, rollup_rows, summarize
+
+Row = Dict[str, Any]
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# Rows per statement; keeps bound parameters under SQLite's limit
+CHUNK_ROWS = 500
+
+
+def _chunks(rows: Sequence, size: int = CHUNK_ROWS):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _dedupe(model, rows: Iterable[Row]) -> List[Row]:
+    """Last row wins per primary key; one upsert statement may not touch a row twice"""
+    key = model.__table__.primary_key.columns.keys()[0]
+    latest = {}
+    for row in rows:
+        latest[row[key]] = row
+    return list(latest.values())
+
+
+def upsert_statement(model, rows: Iterable[Row], dialect: str = 'sqlite'):
+    """
+    INSERT ... ON CONFLICT (pk) DO UPDATE for ``rows`` in one statement
+
+    Columns missing from the rows keep their stored (or default) values.
+    Dialects without ON CONFLICT get a plain multi-row INSERT.
+    """
+    rows = _dedupe(model, rows)
+    make_insert = _UPSERT_DIALECTS.get(dialect)
+    if make_insert is None:
+        return insert(model).values(rows)
+    stmt = make_insert(model).values(rows)
+    keys = model.__table__.primary_key.columns.keys()
+    columns = {name for row in rows for name in row} - set(keys)
+    return stmt.on_conflict_do_update(index_elements=keys, set_={name: stmt.excluded[name] for name in columns})
+
+
+def accumulate_statement(model, rows: Iterable[Row], dialect: str = 'sqlite', counters=COUNTERS):
+    """
+    INSERT ... ON CONFLICT (pk) DO UPDATE SET c = c + excluded.c
+
+    Adds the rows' counters to existing buckets instead of replacing them,
+    so writers never read a bucket before updating it.
+    """
+    make_insert = _UPSERT_DIALECTS.get(dialect)
+    if make_insert is None:
+        return insert(model).values(list(rows))
+    stmt = make_insert(model).values(list(rows))
+    table = model.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=table.primary_key.columns.keys(),
+        set_={name: table.c[name] + stmt.excluded[name] for name in counters}
+    )
+
+
+def dialect_name(db) -> str:
+    bind = db.get_bind()
+    return getattr(bind, 'dialect', bind).name
+
+
+async def bulk_upsert(db, model, rows: Sequence[Row]) -> int:
+    """Upsert ``rows`` into ``model``'s table in one round-trip; the caller commits"""
+    dialect = dialect_name(db)
+    for chunk in _chunks(rows):
+        await db.execute(upsert_statement(model, chunk, dialect))
+    return len(rows)
+
+
+def _stored_status(db, model, column, ids: Sequence[str]) -> Dict[str, Any]:
+    """id -> ``column`` for the ids already stored"""
+    stored = {}
+    for chunk in _chunks(list(ids)):
+        result = db.execute(select(model.id, column).where(model.id.in_(chunk)))
+        stored.update(result.all())
+    return stored
+
+
+def write_batch(db, signals: Sequence[Row] = (), trades: Sequence[Row] = (),
+                closes: Sequence[Row] = ()) -> int:
+    """
+    Write signals, trades and trade closes, and add them to the rollups
+
+    Signals and trades are upserted by id; closes are updates by id and must
+    carry exit_time and net_pnl and only apply to trades not yet CLOSED.
+    Only records that are new (or trades that newly reach CLOSED) reach the
+    rollups, so re-delivering a batch does not double count. The caller commits.
+    """
+    dialect = dialect_name(db)
+    stored_signals = _stored_status(db, SignalRecord, SignalRecord.id, [row['id'] for row in signals])
+    stored_trades = _stored_status(db, TradeRecord, TradeRecord.status, [row['id'] for row in trades])
+
+    for model, rows in ((SignalRecord, signals), (TradeRecord, trades)):
+        for chunk in _chunks(rows):
+            db.execute(upsert_statement(model, chunk, dialect))
+
+    closed = [row for row in _dedupe(TradeRecord, trades)
+              if row.get('status') == 'CLOSED' and stored_trades.get(row['id']) != 'CLOSED']
+    if closes:
+        # Symbols of the trades these closes actually close, including ones inserted above
+        open_trades = {}
+        for chunk in _chunks([row['id'] for row in closes]):
+            result = db.execute(select(TradeRecord.id, TradeRecord.symbol).where(
+                TradeRecord.id.in_(chunk), TradeRecord.status.is_distinct_from('CLOSED')
+            ))
+            open_trades.update(result.all())
+        # A repeated close leaves the first exit in place
+        closing = [{**row, 'status': 'CLOSED'} for row in _dedupe(TradeRecord, closes) if row['id'] in open_trades]
+        if closing:
+            db.execute(update(TradeRecord), closing)
+        closed.extend({**row, 'symbol': open_trades[row['id']]} for row in closing)
+
+    deltas = rollup_rows(
+        signals=[row for row in _dedupe(SignalRecord, signals) if row['id'] not in stored_signals],
+        opened=[row for row in _dedupe(TradeRecord, trades) if row['id'] not in stored_trades],
+        closed=closed
+    )
+    for chunk in _chunks(deltas):
+        db.execute(accumulate_statement(SymbolRollup, chunk, dialect))
+    return len(signals) + len(trades) + len(closes)
+
+
+async def record_batch(db, signals: Sequence[Row] = (), trades: Sequence[Row] = (),
+                       closes: Sequence[Row] = ()) -> int:
+    """write_batch() on an AsyncSession; the caller commits"""
+    return await db.run_sync(write_batch, signals, trades, closes)
+
+
+async def upsert_signals(db, rows: Sequence[Row]) -> int:
+    return await record_batch(db, signals=rows)
+
+
+async def upsert_trades(db, rows: Sequence[Row]) -> int:
+    return await record_batch(db, trades=rows)
+
+
+async def close_trades(db, rows: Sequence[Row]) -> int:
+    return await record_batch(db, closes=rows)
+
+
+async def insert_system_metrics(db, rows: Sequence[Row]) -> int:
+    """Metrics are append-only snapshots: plain multi-row INSERT"""
+    if not rows:
+        return 0
+    await db.execute(insert(SystemMetrics), list(rows))
+    return len(rows)
+
+
+async def bulk_update(db, model, rows: Sequence[Row]) -> int:
+    """UPDATE by primary key for each row (executemany), e.g. closing trades"""
+    if not rows:
+        return 0
+    await db.execute(update(model), list(rows))
+    return len(rows)
+
+
+def encode_cursor(sort_value: Any, row_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return sort_value, row_id
+
+
+def keyset_query(model, sort_column, limit: int, cursor: Optional[str] = None):
+    """
+    Newest-first page after ``cursor``
+
+    Orders by (sort_column, id) descending and continues strictly after the
+    cursor's pair, so each page is an index range scan instead of an OFFSET
+    over everything before it. Fetches one extra row to tell if more follow.
+    Rows with a NULL sort value come last on every backend, ordered by id.
+    """
+    stmt = select(model).order_by(sort_column.desc().nulls_last(), model.id.desc()).limit(limit + 1)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            return stmt.where(sort_column.is_(None), model.id < row_id)
+        if isinstance(sort_column.type, DateTime):
+            try:
+                sort_value = datetime.fromisoformat(sort_value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+        stmt = stmt.where(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, model.id < row_id),
+            sort_column.is_(None)
+        ))
+    return stmt
+
+
+async def fetch_page(db, model, sort_column, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """{"items": [...], "next_cursor": str | None} for one keyset page"""
+    result = await db.execute(keyset_query(model, sort_column, limit, cursor))
+    items = list(result.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+async def rollup_series(db, period: str = 'hour', symbol: Optional[str] = None, since: Optional[datetime] = None,
+                        until: Optional[datetime] = None, limit: int = 500) -> List[Row]:
+    """Newest-first rollup buckets, one per (bucket, symbol), with derived ratios"""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown rollup period: {period!r}")
+    stmt = select(*SymbolRollup.__table__.c).where(SymbolRollup.period == period)
+    if symbol:
+        stmt = stmt.where(SymbolRollup.symbol == symbol)
+    if since:
+        stmt = stmt.where(SymbolRollup.bucket_start >= since)
+    if until:
+        stmt = stmt.where(SymbolRollup.bucket_start < until)
+    stmt = stmt.order_by(SymbolRollup.bucket_start.desc(), SymbolRollup.symbol).limit(limit)
+    result = await db.execute(stmt)
+    return [summarize(dict(row)) for row in result.mappings().all()]
+
+
+async def rollup_totals(db, since: Optional[datetime] = None, symbol: Optional[str] = None) -> Dict[str, Row]:
+    """
+    Per-symbol totals since ``since`` (rounded down to the hour), summed from the rollups
+
+    Whole days come from the daily buckets and the rest of the first day
+    from the hourly ones, so the scan stays small whatever the history size.
+    """
+    windows = [('day', None)]
+    if since is not None:
+        hour, day = bucket_start(since, 'hour'), bucket_start(since, 'day')
+        if hour == day:
+            windows = [('day', SymbolRollup.bucket_start >= day)]
+        else:
+            next_day = day + timedelta(days=1)
+            windows = [('hour', and_(SymbolRollup.bucket_start >= hour, SymbolRollup.bucket_start < next_day)),
+                       ('day', SymbolRollup.bucket_start >= next_day)]
+
+    sums = [func.sum(SymbolRollup.__table__.c[name]).label(name) for name in COUNTERS]
+    parts: Dict[str, List[Row]] = {}
+    for period, window in windows:
+        stmt = select(SymbolRollup.symbol, *sums).where(SymbolRollup.period == period)
+        if window is not None:
+            stmt = stmt.where(window)
+        if symbol:
+            stmt = stmt.where(SymbolRollup.symbol == symbol)
+        result = await db.execute(stmt.group_by(SymbolRollup.symbol))
+        for row in result.mappings().all():
+            parts.setdefault(row['symbol'], []).append(row)
+    return {name: summarize({'symbol': name, **combine(rows)}) for name, rows in sorted(parts.items())}
+
+
+def _truncate(column, period: str, dialect: str):
+    if dialect == 'postgresql':
+        return func.date_trunc(period, column)
+    return func.strftime('%Y-%m-%d %H:00:00' if period == 'hour' else '%Y-%m-%d 00:00:00', column)
+
+
+async def rebuild_rollups(db) -> int:
+    """
+    Recompute symbol_rollups from the record tables with GROUP BY queries
+
+    Backfill for databases written before the rollups existed; normal writes
+    keep the rollups current through record_batch(). The caller commits.
+    """
+    dialect = dialect_name(db)
+    pnl = func.coalesce(TradeRecord.net_pnl, 0.0)
+    sources = (
+        (SignalRecord.timestamp, [SignalRecord.symbol], {
+            'signals': func.count(),
+            'buy_signals': func.sum(case((SignalRecord.action == 'BUY', 1), else_=0)),
+            'sell_signals': func.sum(case((SignalRecord.action == 'SELL', 1), else_=0)),
+            'score_sum': func.sum(SignalRecord.final_score),
+            'confidence_sum': func.sum(SignalRecord.confidence)
+        }),
+        (TradeRecord.entry_time, [TradeRecord.symbol], {'trades_opened': func.count()}),
+        (TradeRecord.exit_time, [TradeRecord.symbol, TradeRecord.status == 'CLOSED'], {
+            'trades_closed': func.count(),
+            'winning_trades': func.sum(case((pnl > 0, 1), else_=0)),
+            'net_pnl': func.sum(pnl),
+            'gross_profit': func.sum(case((pnl > 0, pnl), else_=0.0)),
+            'gross_loss': func.sum(case((pnl < 0, -pnl), else_=0.0))
+        })
+    )
+
+    buckets: Dict[tuple, Row] = {}
+    for period in PERIODS:
+        for time_column, (symbol_column, *filters), aggregates in sources:
+            start = _truncate(time_column, period, dialect).label('bucket_start')
+            stmt = (select(symbol_column.label('symbol'), start,
+                           *(value.label(name) for name, value in aggregates.items()))
+                    .where(time_column.is_not(None), *filters)
+                    .group_by(symbol_column, start))
+            result = await db.execute(stmt)
+            for row in result.mappings().all():
+                at = row['bucket_start']
+                at = datetime.fromisoformat(at) if isinstance(at, str) else at
+                bucket = buckets.setdefault((period, at, row['symbol']), {
+                    'period': period, 'bucket_start': at, 'symbol': row['symbol'], **dict.fromkeys(COUNTERS, 0)
+                })
+                bucket.update({name: row[name] or 0 for name in aggregates})
+
+    await db.execute(delete(SymbolRollup))
+    rows = list(buckets.values())
+    for chunk in _chunks(rows):
+        await db.execute(insert(SymbolRollup).values(chunk))
+    return len(rows)
+
+
+async def ensure_rollups(db) -> bool:
+    """Backfill the rollups once if records exist but no rollups do; True when it rebuilt"""
+    has_rollups = (await db.execute(select(SymbolRollup.symbol).limit(1))).first() is not None
+    if has_rollups:
+        return False
+    for model in (SignalRecord, TradeRecord):
+        if (await db.execute(select(model.id).limit(1))).first() is not None:
+            await rebuild_rollups(db)
+            return True
+    return False
@@ -0,0 +1,109 @@
+"""
+Hourly and daily per-symbol rollups of signal and trade history
+
+Writers turn the rows they have just stored into additive deltas with
+rollup_rows(); repository.accumulate_statement() adds them to the
+symbol_rollups table in one upsert, so a bucket is never recomputed from the
+raw records. Readers call summarize() for averages, win rate and profit
+factor derived from the stored sums.
+
+Example:
+    deltas = rollup_rows(signals=new_signal_rows, closed=closed_trade_rows)
+    db.execute(accumulate_statement(SymbolRollup, deltas, 'sqlite'))
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+Row = Dict[str, Any]
+
+PERIODS = ('hour', 'day')
+
+# Additive columns of SymbolRollup
+COUNTERS = (
+    'signals', 'buy_signals', 'sell_signals', 'score_sum', 'confidence_sum',
+    'trades_opened', 'trades_closed', 'winning_trades', 'net_pnl', 'gross_profit', 'gross_loss'
+)
+
+
+def bucket_start(at: datetime, period: str) -> datetime:
+    if period == 'hour':
+        return at.replace(minute=0, second=0, microsecond=0)
+    if period == 'day':
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup period: {period!r}")
+
+
+class _Buckets:
+    """(period, bucket_start, symbol) -> delta row, for every period at once"""
+
+    def __init__(self):
+        self.rows: Dict[tuple, Row] = {}
+
+    def add(self, symbol: str, at: Optional[datetime], **delta):
+        at = at or datetime.now()  # matches the column default for rows written without a time
+        for period in PERIODS:
+            start = bucket_start(at, period)
+            row = self.rows.get((period, start, symbol))
+            if row is None:
+                row = self.rows[(period, start, symbol)] = {
+                    'period': period, 'bucket_start': start, 'symbol': symbol, **dict.fromkeys(COUNTERS, 0)
+                }
+            for name, value in delta.items():
+                row[name] += value
+
+
+def rollup_rows(signals: Iterable[Row] = (), opened: Iterable[Row] = (),
+                closed: Iterable[Row] = ()) -> List[Row]:
+    """
+    Rollup deltas for newly stored records
+
+    Args:
+        signals: signal_records rows (symbol, timestamp, action, final_score, confidence)
+        opened: trade_records rows just inserted (symbol, entry_time)
+        closed: trades that just became CLOSED (symbol, exit_time, net_pnl)
+    """
+    buckets = _Buckets()
+    for signal in signals:
+        buckets.add(
+            signal['symbol'], signal.get('timestamp'),
+            signals=1,
+            buy_signals=int(signal['action'] == 'BUY'),
+            sell_signals=int(signal['action'] == 'SELL'),
+            score_sum=signal['final_score'],
+            confidence_sum=signal['confidence']
+        )
+    for trade in opened:
+        buckets.add(trade['symbol'], trade.get('entry_time'), trades_opened=1)
+    for trade in closed:
+        pnl = trade.get('net_pnl') or 0.0
+        buckets.add(
+            trade['symbol'], trade.get('exit_time'),
+            trades_closed=1,
+            winning_trades=int(pnl > 0),
+            net_pnl=pnl,
+            gross_profit=max(pnl, 0.0),
+            gross_loss=max(-pnl, 0.0)
+        )
+    return list(buckets.rows.values())
+
+
+def combine(rows: Iterable[Row]) -> Row:
+    """Sum counters over several buckets, e.g. a week of daily rollups"""
+    total = dict.fromkeys(COUNTERS, 0)
+    for row in rows:
+        for name in COUNTERS:
+            total[name] += row[name] or 0
+    return total
+
+
+def summarize(row: Row) -> Row:
+    """Stored counters plus the ratios derived from them"""
+    signals, closed = row['signals'], row['trades_closed']
+    return {
+        **row,
+        'avg_score': row['score_sum'] / signals if signals else 0.0,
+        'avg_confidence': row['confidence_sum'] / signals if signals else 0.0,
+        'win_rate': row['winning_trades'] / closed if closed else 0.0,
+        'profit_factor': row['gross_profit'] / row['gross_loss'] if row['gross_loss'] else None
+    }
@@ -3,10 +3,16 @@ Base detector interface and common functionality
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+try:
+    from ..analytics.pivots import OHLCV_FIELDS, ohlcv_to_arrays, find_pivots, window_pivots
+except ImportError:
+    from analytics.pivots import OHLCV_FIELDS, ohlcv_to_arrays, find_pivots, window_pivots
+
 @dataclass
 class DetectionResult:
     """Standard result format for all detectors"""
@@ -35,6 +41,45 @@ class BaseDetector(ABC):
         """
         pass
     
+    def _get_features(self, ohlcv, context: Optional[Dict[str, Any]] = None):
+        """Shared feature bundle from the scoring engine, if it describes ``ohlcv``"""
+        features = (context or {}).get('features')
+        if features is not None and len(features) == len(ohlcv):
+            return features
+        return None
+    
+    def _get_arrays(self, ohlcv, context: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """OHLCV column arrays, reusing the shared feature bundle when available"""
+        features = self._get_features(ohlcv, context)
+        if features is not None:
+            return features.arrays
+        return ohlcv_to_arrays(ohlcv)
+    
+    def _find_pivots(
+        self,
+        ohlcv,
+        source: str,
+        kind: str,
+        lookback: int = 3,
+        window: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[int]:
+        """
+        Strict pivots of ``source`` over the trailing ``window`` bars
+        
+        Indices are relative to the window. Pivots come from the shared
+        feature bundle when the scoring engine provided one.
+        """
+        n = len(ohlcv)
+        window = n if window is None else min(window, n)
+        features = self._get_features(ohlcv, context)
+        if features is not None:
+            pivots = features.pivots(source, kind, lookback)
+        else:
+            values = ohlcv_to_arrays(ohlcv)[source][n - window:]
+            return find_pivots(values, lookback, kind).tolist()
+        return window_pivots(pivots, n, window, lookback)
+    
     def _normalize_score(self, raw_score: float, min_val: float = -1, max_val: float = 1) -> float:
         """Normalize score to 0-1 range"""
         return max(0, min(1, (raw_score - min_val) / (max_val - min_val)))
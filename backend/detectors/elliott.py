@@ -108,7 +108,7 @@ class ElliottWaveDetector:
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
-from .base import BaseDetector, DetectionResult
+from .base import BaseDetector, DetectionResult, find_pivots
 
 class ElliottWaveDetector(BaseDetector):
     """Detects Elliott Wave patterns"""
@@ -123,17 +123,24 @@ class ElliottWaveDetector(BaseDetector):
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"error": "Insufficient data"})
             
             # Get price data
-            closes = ohlcv['close'].values
-            highs = ohlcv['high'].values
-            lows = ohlcv['low'].values
+            arrays = self._get_arrays(ohlcv, context)
+            closes = arrays['close']
+            highs = arrays['high']
+            lows = arrays['low']
             
             # Analyze recent price action for wave patterns
             recent_closes = closes[-50:]
             recent_highs = highs[-50:]
             recent_lows = lows[-50:]
+            turning_points = sorted(
+                self._find_pivots(ohlcv, 'close', 'high', 2, window=50, context=context) +
+                self._find_pivots(ohlcv, 'close', 'low', 2, window=50, context=context)
+            )
             
             # Detect wave structure
-            wave_analysis = self._analyze_wave_structure(recent_closes, recent_highs, recent_lows)
+            wave_analysis = self._analyze_wave_structure(
+                recent_closes, recent_highs, recent_lows, turning_points
+            )
             
             if not wave_analysis:
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"waves": []})
@@ -467,10 +474,12 @@ class ElliottWaveDetector(BaseDetector):
             logger.error(f"Error calculating wave score: {e}")
             return 0.0
     
-    def _analyze_wave_structure(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray) -> Dict[str, Any]:
+    def _analyze_wave_structure(self, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                                turning_points: List[int] = None) -> Dict[str, Any]:
         """Analyze Elliott Wave structure"""
         # Find significant turning points
-        turning_points = self._find_turning_points(closes)
+        if turning_points is None:
+            turning_points = self._find_turning_points(closes)
         
         if len(turning_points) < 4:
             return None
@@ -488,20 +497,9 @@ class ElliottWaveDetector(BaseDetector):
     
     def _find_turning_points(self, closes: np.ndarray, min_change: float = 0.02) -> List[int]:
         """Find significant turning points in price"""
-        turning_points = []
-        
-        for i in range(2, len(closes) - 2):
-            # Check for local maxima
-            if (closes[i] > closes[i-1] and closes[i] > closes[i+1] and
-                closes[i] > closes[i-2] and closes[i] > closes[i+2]):
-                turning_points.append(i)
-            
-            # Check for local minima
-            elif (closes[i] < closes[i-1] and closes[i] < closes[i+1] and
-                  closes[i] < closes[i-2] and closes[i] < closes[i+2]):
-                turning_points.append(i)
-        
-        return turning_points
+        return sorted(
+            find_pivots(closes, 2, 'high').tolist() + find_pivots(closes, 2, 'low').tolist()
+        )
     
     def _identify_waves(self, turning_points: List[int], closes: np.ndarray) -> List[Dict[str, Any]]:
         """Identify Elliott Wave patterns from turning points"""
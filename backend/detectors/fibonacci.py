@@ -20,12 +20,13 @@ class FibonacciDetector(BaseDetector):
             if len(ohlcv) < 20:
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"error": "Insufficient data"})
             
-            highs = ohlcv['high'].values
-            lows = ohlcv['low'].values
-            closes = ohlcv['close'].values
+            arrays = self._get_arrays(ohlcv, context)
+            highs = arrays['high']
+            lows = arrays['low']
+            closes = arrays['close']
             
             # Find recent swing high and low
-            swing_points = self._find_swing_points(highs, lows)
+            swing_points = self._find_swing_points(ohlcv, highs, lows, context)
             
             if len(swing_points) < 2:
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"swing_points": []})
@@ -55,31 +56,17 @@ class FibonacciDetector(BaseDetector):
         except Exception as e:
             return DetectionResult(0.5, "NEUTRAL", 0.0, {"error": str(e)})
     
-    def _find_swing_points(self, highs: np.ndarray, lows: np.ndarray) -> List[Dict[str, Any]]:
+    def _find_swing_points(self, ohlcv, highs: np.ndarray, lows: np.ndarray,
+                           context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Find recent swing high and low points"""
-        swing_points = []
-        
-        # Find swing highs
-        for i in range(3, len(highs) - 3):
-            if (highs[i] > highs[i-1] and highs[i] > highs[i+1] and
-                highs[i] > highs[i-2] and highs[i] > highs[i+2] and
-                highs[i] > highs[i-3] and highs[i] > highs[i+3]):
-                swing_points.append({
-                    'type': 'high',
-                    'index': i,
-                    'price': highs[i]
-                })
-        
-        # Find swing lows
-        for i in range(3, len(lows) - 3):
-            if (lows[i] < lows[i-1] and lows[i] < lows[i+1] and
-                lows[i] < lows[i-2] and lows[i] < lows[i+2] and
-                lows[i] < lows[i-3] and lows[i] < lows[i+3]):
-                swing_points.append({
-                    'type': 'low',
-                    'index': i,
-                    'price': lows[i]
-                })
+        swing_points = [
+            {'type': 'high', 'index': i, 'price': highs[i]}
+            for i in self._find_pivots(ohlcv, 'high', 'high', 3, context=context)
+        ]
+        swing_points += [
+            {'type': 'low', 'index': i, 'price': lows[i]}
+            for i in self._find_pivots(ohlcv, 'low', 'low', 3, context=context)
+        ]
         
         # Sort by index and return recent points
         swing_points.sort(key=lambda x: x['index'])
@@ -201,7 +201,7 @@ class HarmonicDetector:
 import pandas as pd
 import numpy as np
 from typing import Dict, Any
-from .base import BaseDetector, DetectionResult
+from .base import BaseDetector, DetectionResult, find_pivots
 
 class HarmonicDetector(BaseDetector):
     """Detects harmonic trading patterns"""
@@ -216,15 +216,18 @@ class HarmonicDetector(BaseDetector):
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"error": "Insufficient data"})
             
             # Get recent price data
-            highs = ohlcv['high'].values
-            lows = ohlcv['low'].values
-            closes = ohlcv['close'].values
+            arrays = self._get_arrays(ohlcv, context)
+            highs = arrays['high']
+            lows = arrays['low']
+            closes = arrays['close']
             
             # Look for harmonic patterns in the last 20 bars
             recent_data = {
                 'highs': highs[-20:],
                 'lows': lows[-20:],
-                'closes': closes[-20:]
+                'closes': closes[-20:],
+                'pivot_highs': self._find_pivots(ohlcv, 'high', 'high', 3, window=20, context=context),
+                'pivot_lows': self._find_pivots(ohlcv, 'low', 'low', 3, window=20, context=context)
             }
             
             # Detect patterns
@@ -429,8 +432,12 @@ class HarmonicDetector(BaseDetector):
         lows = data['lows']
         
         # Simple pivot detection
-        pivot_highs = self._find_pivot_highs(highs)
-        pivot_lows = self._find_pivot_lows(lows)
+        pivot_highs = data.get('pivot_highs')
+        if pivot_highs is None:
+            pivot_highs = find_pivots(highs, 3, 'high').tolist()
+        pivot_lows = data.get('pivot_lows')
+        if pivot_lows is None:
+            pivot_lows = find_pivots(lows, 3, 'low').tolist()
         
         # Check for Gartley patterns
         gartley_bull = self._check_gartley_bull(pivot_highs, pivot_lows)
@@ -452,24 +459,6 @@ class HarmonicDetector(BaseDetector):
         
         return patterns
     
-    def _find_pivot_highs(self, highs: np.ndarray, lookback: int = 3) -> List[int]:
-        """Find pivot high points"""
-        pivots = []
-        for i in range(lookback, len(highs) - lookback):
-            if all(highs[i] > highs[i-j] for j in range(1, lookback+1)) and \
-               all(highs[i] > highs[i+j] for j in range(1, lookback+1)):
-                pivots.append(i)
-        return pivots
-    
-    def _find_pivot_lows(self, lows: np.ndarray, lookback: int = 3) -> List[int]:
-        """Find pivot low points"""
-        pivots = []
-        for i in range(lookback, len(lows) - lookback):
-            if all(lows[i] < lows[i-j] for j in range(1, lookback+1)) and \
-               all(lows[i] < lows[i+j] for j in range(1, lookback+1)):
-                pivots.append(i)
-        return pivots
-    
     def _check_gartley_bull(self, pivot_highs: List[int], pivot_lows: List[int]) -> Dict[str, Any]:
         """Check for bullish Gartley pattern"""
         if len(pivot_lows) < 3 or len(pivot_highs) < 2:
@@ -366,7 +366,7 @@ class SMCDetector:
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Tuple
-from .base import BaseDetector, DetectionResult
+from .base import BaseDetector, DetectionResult, find_pivots
 
 class SMCDetector(BaseDetector):
     """Detects Smart Money Concepts patterns"""
@@ -381,17 +381,20 @@ class SMCDetector(BaseDetector):
                 return DetectionResult(0.5, "NEUTRAL", 0.0, {"error": "Insufficient data"})
             
             # Get price data
-            highs = ohlcv['high'].values
-            lows = ohlcv['low'].values
-            closes = ohlcv['close'].values
-            volumes = ohlcv['volume'].values
+            arrays = self._get_arrays(ohlcv, context)
+            highs = arrays['high']
+            lows = arrays['low']
+            closes = arrays['close']
+            volumes = arrays['volume']
             
             # Analyze recent data for SMC patterns
             recent_data = {
                 'highs': highs[-30:],
                 'lows': lows[-30:],
                 'closes': closes[-30:],
-                'volumes': volumes[-30:]
+                'volumes': volumes[-30:],
+                'swing_highs': self._find_pivots(ohlcv, 'high', 'high', 3, window=30, context=context),
+                'swing_lows': self._find_pivots(ohlcv, 'low', 'low', 3, window=30, context=context)
             }
             
             # Detect various SMC patterns
@@ -596,8 +599,12 @@ class SMCDetector(BaseDetector):
         closes = data['closes']
         
         # Find recent swing highs and lows
-        swing_highs = self._find_swing_highs(highs)
-        swing_lows = self._find_swing_lows(lows)
+        swing_highs = data.get('swing_highs')
+        if swing_highs is None:
+            swing_highs = find_pivots(highs, 3, 'high').tolist()
+        swing_lows = data.get('swing_lows')
+        if swing_lows is None:
+            swing_lows = find_pivots(lows, 3, 'low').tolist()
         
         # Determine trend
         trend = self._determine_trend(swing_highs, swing_lows, closes)
@@ -612,24 +619,6 @@ class SMCDetector(BaseDetector):
             'swing_lows': swing_lows[-3:]
         }
     
-    def _find_swing_highs(self, highs: np.ndarray, lookback: int = 3) -> List[int]:
-        """Find swing high points"""
-        swing_highs = []
-        for i in range(lookback, len(highs) - lookback):
-            if all(highs[i] > highs[i-j] for j in range(1, lookback+1)) and \
-               all(highs[i] > highs[i+j] for j in range(1, lookback+1)):
-                swing_highs.append(i)
-        return swing_highs
-    
-    def _find_swing_lows(self, lows: np.ndarray, lookback: int = 3) -> List[int]:
-        """Find swing low points"""
-        swing_lows = []
-        for i in range(lookback, len(lows) - lookback):
-            if all(lows[i] < lows[i-j] for j in range(1, lookback+1)) and \
-               all(lows[i] < lows[i+j] for j in range(1, lookback+1)):
-                swing_lows.append(i)
-        return swing_lows
-    
     def _determine_trend(self, swing_highs: List[int], swing_lows: List[int], 
                         closes: np.ndarray) -> str:
         """Determine current trend"""
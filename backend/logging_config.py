@@ -5,6 +5,11 @@ from pathlib import Path
 import json
 from typing import Dict, Any
 
+from core.metrics import metrics
+
+# Latest value of each ad-hoc performance metric, scraped alongside the rest
+PERFORMANCE_METRIC = metrics.gauge("hts_performance_metric", "Last value logged per performance metric", ["metric"])
+
 class StructuredLogger:
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
@@ -84,6 +89,7 @@ class StructuredLogger:
         })
     
     def log_performance_metric(self, metric_name: str, value: float, metadata: Dict[str, Any] = None):
+        PERFORMANCE_METRIC.set(value, metric=metric_name)
         self.logger.info("PERFORMANCE_METRIC", extra={
             "event_type": "performance_metric",
             "metric_name": metric_name,
@@ -1,16 +1,19 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 import asyncio
 import json
+import time
 import pandas as pd
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
 
 from models import TradingSignal, MarketData, RiskSettings
 from auth.jwt_auth import verify_token, get_current_user, require_admin, create_access_token, authenticate_user
 from logging_config import app_logger, log_signal, log_trade, log_error, log_api_call, log_risk_alert
 from data.data_manager import data_manager
+from data.binance_client import binance_client
+from data.market_stream import MarketStreamIngestor, BinanceStreamProtocol, TickerEvent
 from data.kucoin_client import kucoin_client
 from data.api_fallback_manager import api_fallback_manager
 from data.api_config import API_CONFIG, get_all_api_endpoints, count_total_endpoints
@@ -25,6 +28,7 @@ from backtesting.backtester import backtest_engine, BacktestConfig
 from notifications.telegram_bot import telegram_notifier
 from trading.trade_logger import trade_logger
 from trading.pnl_calculator import pnl_calculator
+from trading.journal import DatabaseSink, TradeJournal
 from risk.advanced_risk_manager import advanced_risk_manager
 
 # Import new advanced analytics components
@@ -41,7 +45,10 @@ from scoring.engine import DynamicScoringEngine
 from scoring.scanner import MultiTimeframeScanner
 from backtesting.engine import BacktestEngine
 from websocket.manager import manager as ws_manager
-from websocket.live_scanner import initialize_live_scanner
+from websocket.feed_pump import feed_pumps
+from core.encoding import encoded_response, to_columns
+from core.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from websocket.live_scanner import initialize_live_scanner, get_live_scanner
 
 # Import Phase 4 scoring system
 from scoring.api import router as scoring_router
@@ -50,8 +57,12 @@ from scoring.api import router as scoring_router
 from routers.data import router as data_router
 
 # Import database components
-from database.connection import get_db, init_db
+from database.connection import AsyncSessionLocal, SessionLocal, dispose_async_engine, get_async_db, get_db, init_db
 from database.models import TradingSession, SignalRecord, TradeRecord, SystemMetrics, RiskLimit
+from database.repository import ensure_rollups, fetch_page, rollup_series, rollup_totals
+from database.rollups import combine, summarize
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -62,40 +73,78 @@ app = FastAPI(title="HTS Trading System", version="1.0.0")
 # Initialize security
 security = HTTPBearer()
 
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "hts_http_request_seconds", "HTTP handler time by route template", ["method", "route", "status"]
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request under its route template, so path parameters don't explode label sets"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
+def _track_scan_importance(scheduler):
+    """Rank scans by open positions and live WebSocket subscriptions"""
+    scheduler.importance.positions = lambda: [trade.symbol for trade in trade_logger.open_positions.values()]
+    scheduler.importance.subscriptions = lambda: {
+        symbol: len(sockets) for symbol, sockets in ws_manager.symbol_subscribers.items()
+    }
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
     app_logger.log_system_event("startup", "HTS Trading System started")
     
+    # Backfill the hourly/daily rollups once for history written before they existed
+    try:
+        async with AsyncSessionLocal() as db:
+            if await ensure_rollups(db):
+                await db.commit()
+                app_logger.log_system_event("startup", "Rebuilt symbol rollups from stored records")
+    except Exception as e:
+        app_logger.log_system_event("startup_error", f"Failed to backfill symbol rollups: {e}")
+    
+    # Rebuild signals and trades from the journal, then journal (and persist) every change
+    try:
+        journal = TradeJournal(
+            batch_size=int(os.getenv('TRADE_JOURNAL_BATCH', '256')),
+            flush_interval=float(os.getenv('TRADE_JOURNAL_FLUSH_MS', '50')) / 1000
+        )
+        journal.add_sink(DatabaseSink(SessionLocal))
+        replayed = await trade_logger.attach_journal(journal)
+        app_logger.log_system_event("startup", f"Trade journal replayed {replayed} records from {journal.path}")
+    except Exception as e:
+        app_logger.log_system_event("startup_error", f"Failed to open trade journal: {e}")
+    
     # Initialize Phase 7, 8, 9 components
     try:
-        # Initialize detectors and scoring engine
-        from detectors.harmonic import HarmonicDetector
-        from detectors.elliott import ElliottWaveDetector
-        from detectors.smc import SMCDetector
-        from detectors.fibonacci import FibonacciDetector
-        from detectors.price_action import PriceActionDetector
-        from detectors.sar import SARDetector
-        from detectors.sentiment import SentimentDetector
-        from detectors.news import NewsDetector
-        from detectors.whales import WhaleDetector
-        
-        detectors = {
-            "harmonic": HarmonicDetector(),
-            "elliott": ElliottWaveDetector(),
-            "smc": SMCDetector(),
-            "fibonacci": FibonacciDetector(),
-            "price_action": PriceActionDetector(),
-            "sar": SARDetector(),
-            "sentiment": SentimentDetector(),
-            "news": NewsDetector(),
-            "whales": WhaleDetector()
-        }
-        
+        # Every default detector that imports; raises when none do, so startup fails here
+        # rather than on every scoring job (in-process or in the worker pool alike)
+        from scoring.executor import build_default_engine
+        scoring_engine = build_default_engine()
         default_weights = WeightConfig()
-        scoring_engine = DynamicScoringEngine(detectors, default_weights)
+        
+        # Optionally run detector scoring in worker processes (0 = in-process)
+        process_workers = int(os.getenv('SCORING_PROCESS_WORKERS', '0'))
+        if process_workers > 0:
+            from scoring.executor import ScoringExecutor
+            # Workers build their engine with the same build_default_engine
+            scoring_engine.executor = ScoringExecutor(
+                max_workers=process_workers,
+                job_timeout=float(os.getenv('SCORING_JOB_TIMEOUT', '30'))
+            )
+            app.state.scoring_executor = scoring_engine.executor
         scanner = MultiTimeframeScanner(data_manager, scoring_engine, default_weights)
+        _track_scan_importance(scanner.scheduler)
         
         # Initialize live scanner
         await initialize_live_scanner(scoring_engine, scanner)
@@ -104,6 +153,10 @@ async def startup_event():
         
     except Exception as e:
         app_logger.log_system_event("startup_error", f"Failed to initialize enhanced components: {e}")
+    
+    if market_stream is not None:
+        market_stream.add_listener(_on_market_event)
+        market_stream.start()
 
 app.add_middleware(
     CORSMiddleware,
@@ -126,27 +179,8 @@ app.include_router(scoring_router)
 app.include_router(data_router)
 app.include_router(agent_router)
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-    
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-    
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections[:]:
-            try:
-                await connection.send_text(json.dumps(message, default=str))
-            except:
-                self.disconnect(connection)
-
-manager = ConnectionManager()
+# WebSocket connection manager (shared with the feed pumps and the live scanner)
+manager = ws_manager
 
 # Global variables
 sentiment_analyzer = SentimentAnalyzer()
@@ -202,6 +236,17 @@ async def health_check():
         "data_source": "kucoin_primary"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    from fastapi.responses import Response
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/metrics")
+async def get_metrics_summary():
+    """Every metric as JSON, with p50/p90/p99 estimates for histograms"""
+    return metrics.snapshot()
+
 # KuCoin Market Data Endpoints (Replace Binance)
 @app.get("/api/kucoin/price/{symbol}")
 async def get_kucoin_price(symbol: str):
@@ -212,17 +257,30 @@ async def get_kucoin_price(symbol: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _ohlcv_payload(ohlcv_data: pd.DataFrame, layout: str):
+    """Bars as a list of records, or packed columns with layout=columnar"""
+    if layout == "columnar":
+        return to_columns(ohlcv_data)
+    return ohlcv_data.to_dict('records') if not ohlcv_data.empty else []
+
 @app.get("/api/kucoin/ohlcv/{symbol}")
-async def get_kucoin_ohlcv(symbol: str, interval: str = "1hour", limit: int = 100):
-    """Get OHLCV data from KuCoin API"""
+async def get_kucoin_ohlcv(
+    request: Request,
+    symbol: str,
+    interval: str = "1hour",
+    limit: int = 100,
+    layout: Literal["records", "columnar"] = "records"
+):
+    """Get OHLCV data from KuCoin API (Accept: application/msgpack for MessagePack)"""
     try:
         ohlcv_data = await kucoin_client.get_klines(symbol, interval, limit)
-        return {
+        return encoded_response({
             "symbol": symbol,
             "interval": interval,
-            "data": ohlcv_data.to_dict('records') if not ohlcv_data.empty else [],
+            "layout": layout,
+            "data": _ohlcv_payload(ohlcv_data, layout),
             "source": "kucoin"
-        }
+        }, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -303,7 +361,13 @@ async def get_price(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/ohlcv/{symbol}")
-async def get_ohlcv(symbol: str, interval: str = "1h", limit: int = 100):
+async def get_ohlcv(
+    request: Request,
+    symbol: str,
+    interval: str = "1h",
+    limit: int = 100,
+    layout: Literal["records", "columnar"] = "records"
+):
     try:
         # Use KuCoin as primary, fallback to data_manager
         try:
@@ -312,17 +376,18 @@ async def get_ohlcv(symbol: str, interval: str = "1h", limit: int = 100):
         except:
             ohlcv_data = await data_manager.get_ohlcv_data(symbol, interval, limit)
             
-        return {
+        return encoded_response({
             "symbol": symbol,
             "interval": interval,
-            "data": ohlcv_data.to_dict('records') if not ohlcv_data.empty else [],
+            "layout": layout,
+            "data": _ohlcv_payload(ohlcv_data, layout),
             "source": "kucoin_primary"
-        }
+        }, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/signals/generate")
-async def generate_signal(request: dict, db: Session = Depends(get_db)):
+async def generate_signal(request: dict):
     try:
         symbol = request.get('symbol', 'BTCUSDT')
         interval = request.get('interval', '1h')
@@ -429,49 +494,26 @@ async def generate_signal(request: dict, db: Session = Depends(get_db)):
         # Store active signal
         active_signals[symbol] = signal
         
-        # Save signal to database
-        try:
-            # Get or create active trading session
-            active_session = db.query(TradingSession).filter(TradingSession.is_active == True).first()
-            if not active_session:
-                active_session = TradingSession(
-                    initial_balance=10000.0,
-                    start_time=datetime.now(),
-                    is_active=True
-                )
-                db.add(active_session)
-                db.commit()
-                db.refresh(active_session)
-            
-            # Create signal record
-            signal_record = SignalRecord(
-                session_id=active_session.id,
-                symbol=symbol,
-                action=action,
-                confidence=confidence,
-                final_score=final_score,
-                rsi_macd_score=rsi_macd_score,
-                smc_score=smc_score,
-                pattern_score=pattern_score,
-                sentiment_score=sentiment_score,
-                ml_score=ml_score,
-                price=market_data['price'],
-                volume=market_data.get('volume', 0),
-                atr=float(atr) if not pd.isna(atr) else 0.0,
-                volatility=ohlcv_data['close'].pct_change().std() * 100 if len(ohlcv_data) > 1 else 0.0,
-                signal_strength="STRONG" if confidence > 0.8 else "MODERATE" if confidence > 0.6 else "WEAK",
-                market_condition="TRENDING"  # Could be enhanced with trend analysis
-            )
-            
-            db.add(signal_record)
-            db.commit()
-            db.refresh(signal_record)
-            
-            print(f"Signal saved to database with ID: {signal_record.id}")
-            
-        except Exception as db_error:
-            print(f"Error saving signal to database: {db_error}")
-            db.rollback()
+        # Journal the signal; the journal's database sink writes it in the next batch
+        await trade_logger.log_signal({
+            'symbol': symbol,
+            'action': action,
+            'confidence': confidence,
+            'final_score': final_score,
+            'rsi_macd_score': rsi_macd_score,
+            'smc_score': smc_score,
+            'pattern_score': pattern_score,
+            'sentiment_score': sentiment_score,
+            'ml_score': ml_score,
+            'timestamp': signal.timestamp,
+            'price': market_data['price'],
+            'metadata': {
+                'volume': market_data.get('volume', 0),
+                'atr': float(atr) if not pd.isna(atr) else 0.0,
+                'volatility': ohlcv_data['close'].pct_change().std() * 100 if len(ohlcv_data) > 1 else 0.0,
+                'market_condition': "TRENDING"  # Could be enhanced with trend analysis
+            }
+        })
         
         # Broadcast to WebSocket clients
         await manager.broadcast({
@@ -571,55 +613,114 @@ async def get_settings():
         "risk_status": risk_manager.get_risk_status()
     }
 
-@app.websocket("/ws/signals")
-async def websocket_signals(websocket: WebSocket):
+DEFAULT_PRICE_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT", "XRPUSDT"]
+
+# Symbols /ws/prices clients may ask for, and how many per connection
+PRICE_SYMBOL_UNIVERSE = {
+    s.strip().upper() for s in os.getenv('PRICE_SYMBOL_UNIVERSE', ','.join(DEFAULT_PRICE_SYMBOLS)).split(',') if s.strip()
+}
+MAX_PRICE_SYMBOLS = int(os.getenv('WS_MAX_PRICE_SYMBOLS', '20'))
+
+# Exchange WebSocket ingestion keeps candles and tickers live without REST
+# polling; MARKET_STREAM=off falls back to polling only
+STREAM_INTERVALS = ["1m", "5m", "15m", "1h", "4h", "1d"]
+market_stream = MarketStreamIngestor(
+    BinanceStreamProtocol(),
+    DEFAULT_PRICE_SYMBOLS,
+    STREAM_INTERVALS,
+    backfill=binance_client.get_klines
+) if os.getenv('MARKET_STREAM', 'on').lower() != 'off' else None
+
+if market_stream is not None:
+    metrics.gauge("hts_market_stream_lag_ms", "Exchange event time to ingest of the latest message",
+                  collect=lambda: {(): market_stream.stats["last_lag_ms"] or 0})
+    metrics.gauge("hts_market_stream_connected", "1 while the exchange stream is connected",
+                  collect=lambda: {(): int(market_stream.connected)})
+
+async def _on_market_event(event):
+    """Push streamed tickers to the price cache, subscribers and live scanner"""
+    if not isinstance(event, TickerEvent):
+        return
+    ticker = market_stream.tickers[event.symbol]
+    data_manager.update_market_data(event.symbol, ticker)
+    await ws_manager.send_price_update(event.symbol, {**ticker, "volume_24h": ticker["volume"]})
+    live_scanner = await get_live_scanner()
+    if live_scanner is not None:
+        live_scanner.on_price(event.symbol, event.price)
+
+def _signals_producer():
+    async def produce():
+        if not active_signals:
+            return None
+        return {
+            "type": "signals_update",
+            "data": [signal.dict() for signal in active_signals.values()],
+            "timestamp": datetime.now().isoformat()
+        }
+    return produce
+
+def _prices_producer(symbols: List[str]):
+    async def fetch(symbol: str):
+        streamed = market_stream.latest_ticker(symbol) if market_stream is not None else None
+        if streamed is not None:
+            return streamed
+        # Use KuCoin as primary
+        try:
+            return await kucoin_client.get_24hr_ticker(symbol)
+        except Exception:
+            return await data_manager.get_market_data(symbol)
+
+    async def produce():
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+        price_updates = [r for r in results if not isinstance(r, Exception)]
+        if not price_updates:
+            return None
+        return {
+            "type": "price_update",
+            "data": price_updates,
+            "timestamp": datetime.now().isoformat()
+        }
+    return produce
+
+async def _serve_feed(websocket: WebSocket, pump):
+    """Attach a socket to a shared feed pump until the client goes away"""
     await manager.connect(websocket)
+    pump.attach(websocket)
     try:
         while True:
-            # Send periodic updates
-            await asyncio.sleep(5)
-            
-            if active_signals:
-                await websocket.send_text(json.dumps({
-                    "type": "signals_update",
-                    "data": [signal.dict() for signal in active_signals.values()],
-                    "timestamp": datetime.now().isoformat()
-                }, default=str))
-                
+            # Updates come from the pump; reading only detects disconnects
+            await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
+        pump.detach(websocket)
         manager.disconnect(websocket)
 
+@app.websocket("/ws/signals")
+async def websocket_signals(websocket: WebSocket):
+    pump = feed_pumps.get("signals", _signals_producer, interval=5)
+    await _serve_feed(websocket, pump)
+
 @app.websocket("/ws/prices")
-async def websocket_prices(websocket: WebSocket):
-    await manager.connect(websocket)
-    symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT", "XRPUSDT"]
-    
-    try:
-        while True:
-            price_updates = []
-            
-            for symbol in symbols:
-                try:
-                    # Use KuCoin as primary
-                    try:
-                        market_data = await kucoin_client.get_24hr_ticker(symbol)
-                    except:
-                        market_data = await data_manager.get_market_data(symbol)
-                    price_updates.append(market_data)
-                except:
-                    pass
-            
-            if price_updates:
-                await websocket.send_text(json.dumps({
-                    "type": "price_update",
-                    "data": price_updates,
-                    "timestamp": datetime.now().isoformat()
-                }, default=str))
-            
-            await asyncio.sleep(3)  # Update every 3 seconds
-            
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+async def websocket_prices(websocket: WebSocket, symbols: Optional[str] = None):
+    # One pump per symbol set, shared by every client asking for that set
+    symbol_list = sorted({s.strip().upper() for s in symbols.split(",") if s.strip()}) if symbols else DEFAULT_PRICE_SYMBOLS
+    unknown = [s for s in symbol_list if s not in PRICE_SYMBOL_UNIVERSE]
+    if unknown or not symbol_list or len(symbol_list) > MAX_PRICE_SYMBOLS:
+        reason = f"Unknown symbols: {','.join(unknown)}" if unknown else f"Request 1-{MAX_PRICE_SYMBOLS} symbols"
+        await websocket.close(code=1008, reason=reason[:120])
+        return
+    pump = feed_pumps.get(f"prices:{','.join(symbol_list)}", lambda: _prices_producer(symbol_list), interval=3)
+    await _serve_feed(websocket, pump)
+
+@app.get("/api/ws/feeds")
+async def websocket_feed_stats():
+    """Shared feed pump and connection statistics"""
+    return {
+        "feeds": feed_pumps.get_stats(),
+        "connections": manager.get_connection_stats(),
+        "market_stream": market_stream.get_stats() if market_stream is not None else None
+    }
 
 @app.post("/api/reset")
 async def reset_system():
@@ -833,18 +934,24 @@ async def get_portfolio_summary():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/pnl/equity-curve")
-async def get_equity_curve(timeframe: str = "1D", days_back: int = 30):
+async def get_equity_curve(
+    request: Request,
+    timeframe: str = "1D",
+    days_back: int = 30,
+    layout: Literal["records", "columnar"] = "records"
+):
     """Get equity curve data for portfolio visualization"""
     try:
         equity_curve = await pnl_calculator.generate_equity_curve(timeframe, days_back)
         
-        return {
+        return encoded_response({
             "status": "success",
-            "data": equity_curve,
+            "layout": layout,
+            "data": to_columns(equity_curve) if layout == "columnar" else equity_curve,
             "timeframe": timeframe,
             "days_back": days_back,
             "timestamp": datetime.now()
-        }
+        }, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1240,13 +1347,14 @@ async def get_trading_sessions(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/database/signals")
-async def get_signal_records(limit: int = 100, db: Session = Depends(get_db)):
-    """Get recent signal records"""
+async def get_signal_records(limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None,
+                             db: AsyncSession = Depends(get_async_db)):
+    """Get recent signal records, newest first; pass next_cursor back as cursor for the next page"""
     try:
-        signals = db.query(SignalRecord).order_by(SignalRecord.timestamp.desc()).limit(limit).all()
+        page = await fetch_page(db, SignalRecord, SignalRecord.timestamp, limit, cursor)
         
         signals_data = []
-        for signal in signals:
+        for signal in page['items']:
             signals_data.append({
                 "id": signal.id,
                 "symbol": signal.symbol,
@@ -1268,19 +1376,23 @@ async def get_signal_records(limit: int = 100, db: Session = Depends(get_db)):
             "status": "success",
             "data": signals_data,
             "count": len(signals_data),
+            "next_cursor": page['next_cursor'],
             "timestamp": datetime.now()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/database/trades")
-async def get_trade_records(limit: int = 100, db: Session = Depends(get_db)):
-    """Get recent trade records"""
+async def get_trade_records(limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None,
+                            db: AsyncSession = Depends(get_async_db)):
+    """Get recent trade records, newest first; pass next_cursor back as cursor for the next page"""
     try:
-        trades = db.query(TradeRecord).order_by(TradeRecord.entry_time.desc()).limit(limit).all()
+        page = await fetch_page(db, TradeRecord, TradeRecord.entry_time, limit, cursor)
         
         trades_data = []
-        for trade in trades:
+        for trade in page['items']:
             trades_data.append({
                 "id": trade.id,
                 "symbol": trade.symbol,
@@ -1302,8 +1414,11 @@ async def get_trade_records(limit: int = 100, db: Session = Depends(get_db)):
             "status": "success",
             "data": trades_data,
             "count": len(trades_data),
+            "next_cursor": page['next_cursor'],
             "timestamp": datetime.now()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1339,10 +1454,11 @@ async def create_trading_session(initial_balance: float = 10000.0, db: Session =
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/database/system-metrics")
-async def get_system_metrics(db: Session = Depends(get_db)):
+async def get_system_metrics(db: AsyncSession = Depends(get_async_db)):
     """Get recent system metrics"""
     try:
-        metrics = db.query(SystemMetrics).order_by(SystemMetrics.timestamp.desc()).limit(24).all()
+        result = await db.execute(select(SystemMetrics).order_by(SystemMetrics.timestamp.desc()).limit(24))
+        metrics = result.scalars().all()
         
         metrics_data = []
         for metric in metrics:
@@ -1367,6 +1483,44 @@ async def get_system_metrics(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/database/rollups")
+async def get_symbol_rollups(period: str = "hour", symbol: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             limit: int = Query(500, ge=1, le=1000),
+                             db: AsyncSession = Depends(get_async_db)):
+    """Hourly or daily per-symbol signal and trade history, newest bucket first"""
+    try:
+        buckets = await rollup_series(db, period, symbol, since, until, limit)
+        
+        return {
+            "status": "success",
+            "period": period,
+            "data": buckets,
+            "count": len(buckets),
+            "timestamp": datetime.now()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/database/analytics")
+async def get_symbol_analytics(days: int = Query(30, ge=1), symbol: Optional[str] = None,
+                               db: AsyncSession = Depends(get_async_db)):
+    """Signal counts, average score, P&L and win rate per symbol over the last ``days`` days"""
+    try:
+        by_symbol = await rollup_totals(db, datetime.now() - timedelta(days=days), symbol)
+        
+        return {
+            "status": "success",
+            "days": days,
+            "symbols": by_symbol,
+            "total": summarize(combine(by_symbol.values())),
+            "timestamp": datetime.now()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/database/risk-limits")
 async def get_database_risk_limits(db: Session = Depends(get_db)):
     """Get current risk limits from database"""
@@ -1613,7 +1767,7 @@ async def get_performance_metrics():
             "cached_symbols": len(stream_manager.market_data_cache),
             "message_rate": stream_manager.message_count,
             "uptime": time.time() - stream_manager.last_performance_check,
-            "latency_avg": np.mean(stream_manager.latency_measurements) if stream_manager.latency_measurements else 0,
+            "latency_avg": stream_manager.latency.summary()["mean"] * 1000,
             "timestamp": time.time()
         }
         
@@ -1994,6 +2148,8 @@ async def startup_event():
         
         # Initialize the stream manager
         await stream_manager.initialize()
+        if market_stream is not None:
+            stream_manager.attach_ingestor(market_stream)
         
         # Initialize Hugging Face AI models
         await huggingface_ai.initialize_models()
@@ -2016,6 +2172,26 @@ async def shutdown_event():
         logger.info("Analytics services stopped")
     except Exception as e:
         logger.error(f"Error stopping analytics services: {e}")
+    
+    try:
+        from data.http_pool import http_pool
+        await http_pool.aclose()
+    except Exception as e:
+        logger.error(f"Error closing HTTP pool: {e}")
+    
+    executor = getattr(app.state, 'scoring_executor', None)
+    if executor is not None:
+        executor.shutdown(wait=False)
+    
+    feed_pumps.stop_all()
+    
+    if market_stream is not None:
+        await market_stream.stop()
+    
+    if trade_logger.journal is not None:
+        await trade_logger.journal.stop()
+    
+    await dispose_async_engine()
 
 # ===============================
 # PHASE 5 & 6 API ENDPOINTS
@@ -2055,6 +2231,7 @@ try:
     mock_weights = MockWeights()
     
     mtf_scanner = MultiTimeframeScanner(mock_data_aggregator, mock_scoring_engine, mock_weights)
+    _track_scan_importance(mtf_scanner.scheduler)
     enhanced_risk_manager = EnhancedRiskManager(10000.0)
     
     print("Phase 5 & 6 services initialized successfully")
@@ -2119,6 +2296,16 @@ async def run_mtf_scanner(request: dict):
         logger.error(f"Scanner endpoint failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/scanner/freshness")
+async def scanner_freshness():
+    """Per-symbol result age against each symbol's freshness budget"""
+    if not mtf_scanner:
+        raise HTTPException(status_code=500, detail="Scanner not available")
+    return {
+        "stats": mtf_scanner.scheduler.get_stats(),
+        "symbols": mtf_scanner.scheduler.get_freshness()
+    }
+
 @app.get("/api/scanner/symbol/{symbol}")
 async def scan_single_symbol(symbol: str, timeframes: str = "15m,1h,4h"):
     """Scan a single symbol across multiple timeframes"""
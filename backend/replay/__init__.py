@@ -0,0 +1 @@
+# Recorded market data replay for load and latency testing
@@ -0,0 +1,51 @@
+"""
+Command-line replay: ``python -m replay ticks.csv --clients 200 --speed 10``
+
+Run from ``backend/`` (or ``python -m backend.replay`` from the repo root).
+Prints the latency/throughput report as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+try:
+    from .harness import run_replay
+    from ..websocket.manager import OVERFLOW_POLICIES, OVERFLOW_DROP_OLDEST
+except ImportError:
+    from replay.harness import run_replay
+    from websocket.manager import OVERFLOW_POLICIES, OVERFLOW_DROP_OLDEST
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded ticks or candles through the live ingestion path")
+    parser.add_argument("recording", help="CSV ticks, CSV candles or JSONL stream frames")
+    parser.add_argument("--clients", type=int, default=10, help="simulated WebSocket clients")
+    parser.add_argument("--speed", type=float, default=0.0, help="playback rate, 1 = real time, 0 = max")
+    parser.add_argument("--interval", default="1m", help="candle interval of a candle CSV")
+    parser.add_argument("--symbol", help="symbol for recordings without a symbol column")
+    parser.add_argument("--slow-clients", type=int, default=0, help="clients that stall on every frame")
+    parser.add_argument("--slow-delay", type=float, default=0.05, help="seconds a slow client stalls per frame")
+    parser.add_argument("--max-queue", type=int, default=256, help="per-client queue bound")
+    parser.add_argument("--overflow-policy", choices=sorted(OVERFLOW_POLICIES), default=OVERFLOW_DROP_OLDEST)
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_replay(
+        args.recording, clients=args.clients, speed=args.speed, interval=args.interval, symbol=args.symbol,
+        slow_clients=args.slow_clients, slow_delay=args.slow_delay, max_queue=args.max_queue,
+        overflow_policy=args.overflow_policy
+    ))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
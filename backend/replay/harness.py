@@ -0,0 +1,359 @@
+"""
+Deterministic replay of recorded market data through the live ingestion path
+
+Recorded ticks or candles are served by a local WebSocket server that speaks
+the Binance combined-stream format, paced at 1x, Nx or as fast as the socket
+accepts them. A ``MarketStreamIngestor`` consumes them exactly as it would the
+exchange feed and every event is fanned out through a ``ConnectionManager``
+to simulated clients. Each frame carries the time the server emitted it, so
+the report gives tick-to-ingest and tick-to-client latency percentiles along
+with throughput, drops and slow-consumer evictions.
+
+Input files:
+    - CSV ticks: ``timestamp, symbol, price, quantity``
+    - CSV candles: ``timestamp, [symbol], open, high, low, close, volume``
+      (replayed as closed klines of ``interval``)
+    - JSONL: recorded Binance stream frames, one per line
+
+Timestamps may be epoch milliseconds, epoch seconds or ISO strings.
+
+Example:
+    report = await run_replay('ticks.csv', clients=100, speed=10)
+    print(report['delivery']['latency_ms']['p99'])
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import websockets
+
+try:
+    from ..data.candle_store import CandleStore, interval_to_ms
+    from ..data.market_stream import BinanceStreamProtocol, CandleClosed, MarketStreamIngestor
+    from ..websocket.manager import ConnectionManager, OVERFLOW_DROP_OLDEST
+except ImportError:
+    from data.candle_store import CandleStore, interval_to_ms
+    from data.market_stream import BinanceStreamProtocol, CandleClosed, MarketStreamIngestor
+    from websocket.manager import ConnectionManager, OVERFLOW_DROP_OLDEST
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+_TIMESTAMP_COLUMNS = ('timestamp', 'time', 'open_time', 'datetime', 'date')
+_QUANTITY_COLUMNS = ('quantity', 'qty', 'size', 'amount', 'volume')
+
+
+def _epoch_ms(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(values):
+        ms = values.to_numpy(dtype=np.float64)
+        # Epoch seconds are below 1e11 until the year 5138
+        if len(ms) and np.nanmax(ms) < 1e11:
+            ms = ms * 1000
+        return ms.astype(np.int64)
+    return (pd.to_datetime(values, utc=True).astype('int64') // 1_000_000).to_numpy()
+
+
+def _column(df: pd.DataFrame, names: Sequence[str]) -> Optional[str]:
+    return next((name for name in names if name in df.columns), None)
+
+
+def _trade_frame(symbol: str, ts: int, price: float, quantity: float) -> Dict[str, Any]:
+    return {"stream": f"{symbol.lower()}@aggTrade",
+            "data": {"e": "aggTrade", "E": ts, "s": symbol, "p": str(price), "q": str(quantity), "T": ts}}
+
+
+def _kline_frame(symbol: str, interval: str, open_time: int, close_time: int,
+                 values: Tuple[float, ...]) -> Dict[str, Any]:
+    o, h, l, c, v = values
+    return {"stream": f"{symbol.lower()}@kline_{interval}",
+            "data": {"e": "kline", "E": close_time, "s": symbol,
+                     "k": {"t": open_time, "T": close_time, "i": interval, "o": str(o), "h": str(h),
+                           "l": str(l), "c": str(c), "v": str(v), "x": True}}}
+
+
+def _frames_from_csv(path: Path, interval: str, symbol: Optional[str]) -> List[Dict[str, Any]]:
+    df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    ts_column = _column(df, _TIMESTAMP_COLUMNS)
+    if ts_column is None:
+        raise ValueError(f"{path}: no timestamp column (expected one of {', '.join(_TIMESTAMP_COLUMNS)})")
+    if 'symbol' in df.columns:
+        symbols = df['symbol'].astype(str).str.replace('/', '').str.replace('-', '').str.upper().tolist()
+    elif symbol:
+        symbols = [symbol] * len(df)
+    else:
+        raise ValueError(f"{path}: no symbol column; pass symbol=")
+    stamps = _epoch_ms(df[ts_column]).tolist()
+
+    if {'open', 'high', 'low', 'close'} <= set(df.columns):
+        interval_ms = interval_to_ms(interval)
+        volume = df['volume'] if 'volume' in df.columns else pd.Series(0.0, index=df.index)
+        rows = zip(df['open'], df['high'], df['low'], df['close'], volume)
+        return [_kline_frame(sym, interval, ts, ts + interval_ms - 1, tuple(map(float, values)))
+                for sym, ts, values in zip(symbols, stamps, rows)]
+
+    if 'price' not in df.columns:
+        raise ValueError(f"{path}: expected a price column (ticks) or open/high/low/close (candles)")
+    qty_column = _column(df, _QUANTITY_COLUMNS)
+    quantities = df[qty_column].astype(float).tolist() if qty_column else [0.0] * len(df)
+    return [_trade_frame(sym, ts, float(price), qty)
+            for sym, ts, price, qty in zip(symbols, stamps, df['price'], quantities)]
+
+
+def load_frames(path, interval: str = '1m', symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Read a recording into Binance combined-stream frames
+
+    Args:
+        path: CSV (ticks or candles) or JSONL (recorded stream frames)
+        interval: Candle interval of a candle CSV
+        symbol: Symbol for files without a symbol column
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.jsonl', '.ndjson'):
+        with path.open() as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return _frames_from_csv(path, interval, symbol)
+
+
+class SimulatedClient:
+    """
+    In-process stand-in for a browser WebSocket
+
+    Implements the subset of the Starlette WebSocket the connection manager
+    uses. ``delay`` seconds per frame simulates a slow consumer.
+    """
+
+    def __init__(self, name: str, on_frame: Callable[[str, float], None], delay: float = 0.0):
+        self.client = name
+        self.delay = delay
+        self.on_frame = on_frame
+        self.expected = 0
+        self.received = 0
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.on_frame(data, time.perf_counter())
+
+    async def send_bytes(self, data: bytes):
+        await self.send_text(data.decode())
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Percentiles in milliseconds of latencies given in seconds"""
+    if not len(samples):
+        return {**{f"p{p:g}".replace('.', ''): None for p in PERCENTILES}, "mean": None, "max": None}
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    summary = {f"p{p:g}".replace('.', ''): round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))}
+    summary["mean"] = round(float(ms.mean()), 3)
+    summary["max"] = round(float(ms.max()), 3)
+    return summary
+
+
+class ReplayHarness:
+    """
+    Plays a recording into ``MarketStreamIngestor`` -> ``ConnectionManager``
+
+    Args:
+        frames: Binance combined-stream frames (see ``load_frames``)
+        clients: Simulated WebSocket clients, each subscribed to every symbol
+        speed: Playback rate relative to the recording (0 = as fast as possible)
+        intervals: Candle intervals the ingestor maintains
+        slow_clients: How many of the clients sleep ``slow_delay`` per frame
+        max_queue: Per-client queue bound of the connection manager
+        overflow_policy: Connection manager overflow policy
+        drain_timeout: Seconds to wait for client queues after the last frame
+        ingest_timeout: Seconds, beyond the playback time, to wait for every frame
+            to reach the ingestor before the run fails
+    """
+
+    def __init__(self, frames: Iterable[Dict[str, Any]], clients: int = 10, speed: float = 0.0,
+                 intervals: Iterable[str] = ('1m',), slow_clients: int = 0, slow_delay: float = 0.0,
+                 max_queue: int = 256, overflow_policy: str = OVERFLOW_DROP_OLDEST,
+                 drain_timeout: float = 30.0, ingest_timeout: float = 30.0):
+        parser = BinanceStreamProtocol()
+        # One event per frame keeps emit times and ingested events in step
+        timed = []
+        for frame in frames:
+            events = parser.parse(frame)
+            if len(events) == 1:
+                timed.append((events[0].timestamp, events[0].symbol, json.dumps(frame)))
+        timed.sort(key=lambda item: item[0])
+        if not timed:
+            raise ValueError("Recording has no replayable frames")
+        self.timestamps = [ts for ts, _, _ in timed]
+        self.payloads = [payload for _, _, payload in timed]
+        self.symbols = list(dict.fromkeys(symbol for _, symbol, _ in timed))
+        self.clients = clients
+        self.speed = speed
+        self.intervals = list(intervals)
+        self.slow_clients = min(slow_clients, clients)
+        self.slow_delay = slow_delay
+        self.drain_timeout = drain_timeout
+        self.ingest_timeout = ingest_timeout
+
+        self.manager = ConnectionManager(max_queue=max_queue, overflow_policy=overflow_policy)
+        self.store = CandleStore()
+        self.ingestor: Optional[MarketStreamIngestor] = None
+        self._listeners: List[Callable[[Any], Any]] = []
+        self._origins: deque = deque()
+        self._channels = []
+        self._ingest_latency: List[float] = []
+        self._delivery_latency: List[float] = []
+        self._expected = 0
+        self._events = 0
+        self._started = 0.0
+        self._last_emit = 0.0
+        self._last_ingest = 0.0
+        self._last_delivery = 0.0
+
+    def add_listener(self, callback: Callable[[Any], Any]):
+        """Attach another consumer (stream manager, live scanner) to the ingestor"""
+        self._listeners.append(callback)
+
+    async def _serve(self, websocket):
+        ts0 = self.timestamps[0]
+        start = time.perf_counter()
+        self._started = start
+        for ts, payload in zip(self.timestamps, self.payloads):
+            if self.speed:
+                delay = start + (ts - ts0) / 1000 / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            now = time.perf_counter()
+            self._origins.append(now)
+            await websocket.send(payload)
+            self._last_emit = now
+            if not self.speed:
+                await asyncio.sleep(0)
+        await websocket.wait_closed()
+
+    async def _on_event(self, event):
+        if isinstance(event, CandleClosed):
+            return
+        now = time.perf_counter()
+        origin = self._origins.popleft()
+        self._ingest_latency.append(now - origin)
+        self._last_ingest = now
+        self._events += 1
+        for client in self.manager.symbol_subscribers.get(event.symbol, ()):
+            client.expected += 1
+            self._expected += 1
+        data = {"type": type(event).__name__, "price": getattr(event, 'price', getattr(event, 'close', None)),
+                "event_time": event.timestamp, "origin": origin}
+        await self.manager.send_to_subscribed(event.symbol, data)
+
+    def _on_frame(self, frame: str, received_at: float):
+        self._delivery_latency.append(received_at - json.loads(frame)["data"]["origin"])
+        self._last_delivery = received_at
+
+    def _settled(self) -> bool:
+        """Every fanned-out frame was delivered, dropped or replaced, or its client evicted"""
+        return all(
+            c.closed or c.websocket.received + c.stats['dropped'] + c.stats['coalesced'] >= c.websocket.expected
+            for c in self._channels
+        )
+
+    async def run(self) -> Dict[str, Any]:
+        for i in range(self.clients):
+            client = SimulatedClient(f"replay-{i}", self._on_frame,
+                                     self.slow_delay if i < self.slow_clients else 0.0)
+            await self.manager.connect(client, encoding='json')
+            self._channels.append(self.manager.channels[client])
+            for symbol in self.symbols:
+                await self.manager.subscribe(client, symbol)
+
+        server = await websockets.serve(self._serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        self.ingestor = MarketStreamIngestor(BinanceStreamProtocol(f"ws://127.0.0.1:{port}"), self.symbols,
+                                             self.intervals, store=self.store, stale_after=None)
+        self.ingestor.add_listener(self._on_event)
+        for listener in self._listeners:
+            self.ingestor.add_listener(listener)
+
+        try:
+            self.ingestor.start()
+            playback = (self.timestamps[-1] - self.timestamps[0]) / 1000 / self.speed if self.speed else 0.0
+            ingested = await self._wait_for(lambda: self._events >= len(self.payloads),
+                                            playback + self.ingest_timeout)
+            if not ingested:
+                raise TimeoutError(f"Replay stalled: {self._events}/{len(self.payloads)} frames ingested "
+                                   f"after {playback + self.ingest_timeout:.1f}s")
+            drained = await self._wait_for(self._settled, self.drain_timeout)
+            if not drained:
+                logger.warning(f"Replay clients did not drain within {self.drain_timeout}s")
+        finally:
+            await self.ingestor.stop()
+            for channel in self._channels:
+                self.manager.disconnect(channel.websocket)
+            server.close()
+            await server.wait_closed()
+        return self.report()
+
+    async def _wait_for(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            if self.ingestor._task is not None and self.ingestor._task.done():
+                self.ingestor._task.result()
+            if time.perf_counter() > deadline:
+                return False
+            await asyncio.sleep(0.005)
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        frames = len(self.payloads)
+        end = max(self._last_delivery, self._last_ingest)
+        duration = max(end - self._started, 1e-9)
+        ingest_seconds = max(self._last_ingest - self._started, 1e-9)
+        delivered = len(self._delivery_latency)
+        stream_stats = self.ingestor.get_stats() if self.ingestor is not None else {}
+        return {
+            "frames": frames,
+            "symbols": self.symbols,
+            "clients": self.clients,
+            "slow_clients": self.slow_clients,
+            "speed": self.speed or "max",
+            "recording_seconds": round((self.timestamps[-1] - self.timestamps[0]) / 1000, 3),
+            "duration_seconds": round(duration, 4),
+            "ingest": {
+                "events": self._events,
+                "candles_closed": stream_stats.get("candles_closed", 0),
+                "events_per_sec": round(self._events / ingest_seconds, 1),
+                "latency_ms": latency_summary(self._ingest_latency),
+            },
+            "delivery": {
+                "expected": self._expected,
+                "delivered": delivered,
+                "dropped": sum(c.stats['dropped'] for c in self._channels),
+                "coalesced": sum(c.stats['coalesced'] for c in self._channels),
+                "evictions": self.manager.evictions,
+                "frames_per_sec": round(delivered / duration, 1),
+                "max_queue_depth": max((c.stats['max_depth'] for c in self._channels), default=0),
+                "latency_ms": latency_summary(self._delivery_latency),
+            },
+        }
+
+
+async def run_replay(path, clients: int = 10, speed: float = 0.0, interval: str = '1m',
+                     symbol: Optional[str] = None, **options) -> Dict[str, Any]:
+    """Load a recording, replay it and return the latency/throughput report"""
+    frames = load_frames(path, interval=interval, symbol=symbol)
+    harness = ReplayHarness(frames, clients=clients, speed=speed, intervals=[interval], **options)
+    return await harness.run()
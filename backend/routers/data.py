@@ -6,166 +6,106 @@ from services import market, sentiment, news, whales, defi
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-def set_or_get(key: str, getter):
-    v = cache.get(key)
-    if v: return v
-    # NOTE: getter is a coroutine function; we await it at call site.
-    return None
+@router.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    return cache.get_stats()
 
 @router.get("/market/global")
 async def market_global() -> Dict[str, Any]:
     key = "market_global"
-    v = cache.get(key)
-    if v: return v
-    data = await market.global_overview()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, market.global_overview)
 
 @router.get("/market/prices")
 async def market_prices(ids: str = Query("bitcoin,ethereum,binancecoin")) -> Dict[str, Any]:
     key = f"prices:{ids}"
-    v = cache.get(key)
-    if v: return v
-    data = await market.prices_simple(ids)
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, lambda: market.prices_simple(ids))
 
 @router.get("/market/paprika/tickers")
 async def paprika_tickers(limit: int = 15) -> Dict[str, Any]:
     key = f"paprika_tickers:{limit}"
-    v = cache.get(key)
-    if v: return v
-    data = await market.paprika_tickers(limit=limit)
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, lambda: market.paprika_tickers(limit=limit))
 
 @router.get("/exchange/coinbase/stats")
 async def coinbase_stats() -> Dict[str, Any]:
     key = "coinbase_stats"
-    v = cache.get(key)
-    if v: return v
-    data = await market.coinbase_stats()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, market.coinbase_stats)
 
 @router.get("/sentiment/fng")
 async def fng() -> Dict[str, Any]:
     key = "fng"
-    v = cache.get(key)
-    if v: return v
-    data = await sentiment.fear_greed()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, sentiment.fear_greed)
 
 @router.get("/news/cryptopanic")
 async def news_cryptopanic() -> Dict[str, Any]:
     key = "news_cp"
-    v = cache.get(key)
-    if v: return v
-    data = await news.cryptopanic_latest()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, news.cryptopanic_latest)
 
 @router.get("/news/cryptocompare")
 async def news_cc() -> Dict[str, Any]:
     key = "news_cc"
-    v = cache.get(key)
-    if v: return v
-    data = await news.cryptocompare_latest()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, news.cryptocompare_latest)
 
 @router.get("/news/cryptonews")
 async def news_cn() -> Dict[str, Any]:
     key = "news_cn"
-    v = cache.get(key)
-    if v: return v
-    data = await news.cryptonews_latest()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, news.cryptonews_latest)
 
 @router.get("/news/rss")
 async def news_rss() -> Dict[str, Any]:
     key = "news_rss"
-    v = cache.get(key)
-    if v: return v
-    data = await news.rss_aggregated()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, news.rss_aggregated)
 
 @router.get("/whales/btc")
 async def whales_btc() -> Dict[str, Any]:
     key = "whales_btc"
-    v = cache.get(key)
-    if v: return v
-    data = await whales.btc_unconfirmed()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, whales.btc_unconfirmed)
 
 @router.get("/whales/alert")
 async def whales_alert(min_value_usd: int = 500000) -> Dict[str, Any]:
     key = f"whales_alert:{min_value_usd}"
-    v = cache.get(key)
-    if v: return v
-    data = await whales.whale_alert(min_value_usd=min_value_usd)
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, lambda: whales.whale_alert(min_value_usd=min_value_usd))
 
 @router.get("/onchain/btc/tx/{tx_hash}")
 async def onchain_btc_tx(tx_hash: str) -> Dict[str, Any]:
     key = f"btc_tx:{tx_hash}"
-    v = cache.get(key)
-    if v: return v
-    data = await whales.btc_tx(tx_hash)
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, lambda: whales.btc_tx(tx_hash))
 
 @router.get("/defi/llama/protocols")
 async def llama_protocols() -> Dict[str, Any]:
     key = "llama_protocols"
-    v = cache.get(key)
-    if v: return v
-    data = await defi.protocols()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, defi.protocols)
 
 @router.get("/defi/llama/overview")
 async def llama_overview() -> Dict[str, Any]:
     key = "llama_overview"
-    v = cache.get(key)
-    if v: return v
-    data = await defi.overview()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, defi.overview)
 
 @router.get("/defi/defipulse/demo")
 async def defipulse_demo() -> Dict[str, Any]:
     key = "defipulse_demo"
-    v = cache.get(key)
-    if v: return v
-    data = await defi.defipulse_demo()
-    cache.set(key, data)
-    return data
+    return await cache.get_or_set(key, defi.defipulse_demo)
 
 @router.get("/summary")
 async def summary(ids: str = "bitcoin,ethereum,binancecoin", news_limit: int = 20, whale_min_usd: int = 500000) -> Dict[str, Any]:
     key = f"summary:{ids}:{news_limit}:{whale_min_usd}"
-    v = cache.get(key)
-    if v: return v
+    return await cache.get_or_set(key, lambda: _build_summary(ids, whale_min_usd))
 
+async def _build_summary(ids: str, whale_min_usd: int) -> Dict[str, Any]:
+    # Sections share cache keys with their own endpoints, so a summary miss
+    # only goes upstream for the pieces nobody has fetched recently
     results = await asyncio.gather(
-        market.global_overview(),
-        market.prices_simple(ids),
-        sentiment.fear_greed(),
-        news.cryptopanic_latest(),
-        news.cryptocompare_latest(),
-        news.cryptonews_latest(),
-        news.rss_aggregated(),
-        whales.btc_unconfirmed(),
-        whales.whale_alert(min_value_usd=whale_min_usd),
-        defi.protocols(),
-        defi.overview(),
-        market.coinbase_stats(),
+        cache.get_or_set("market_global", market.global_overview),
+        cache.get_or_set(f"prices:{ids}", lambda: market.prices_simple(ids)),
+        cache.get_or_set("fng", sentiment.fear_greed),
+        cache.get_or_set("news_cp", news.cryptopanic_latest),
+        cache.get_or_set("news_cc", news.cryptocompare_latest),
+        cache.get_or_set("news_cn", news.cryptonews_latest),
+        cache.get_or_set("news_rss", news.rss_aggregated),
+        cache.get_or_set("whales_btc", whales.btc_unconfirmed),
+        cache.get_or_set(f"whales_alert:{whale_min_usd}", lambda: whales.whale_alert(min_value_usd=whale_min_usd)),
+        cache.get_or_set("llama_protocols", defi.protocols),
+        cache.get_or_set("llama_overview", defi.overview),
+        cache.get_or_set("coinbase_stats", market.coinbase_stats),
         return_exceptions=True
     )
 
@@ -189,5 +129,4 @@ async def summary(ids: str = "bitcoin,ethereum,binancecoin", news_limit: int = 2
         "defi_overview": serialize_result(results[10]),
         "coinbase_stats": serialize_result(results[11]),
     }
-    cache.set(key, data)
     return data
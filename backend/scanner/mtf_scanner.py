@@ -10,6 +10,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import structlog
 
+from .scheduler import ScanScheduler, weights_key
+
 logger = structlog.get_logger()
 
 # Import existing modules
@@ -58,10 +60,12 @@ class ScanResult:
 class MultiTimeframeScanner:
     """Scan multiple symbols across multiple timeframes"""
     
-    def __init__(self, data_aggregator, scoring_engine, weights):
+    def __init__(self, data_aggregator, scoring_engine, weights, scheduler: Optional[ScanScheduler] = None):
         self.data = data_aggregator
         self.engine = scoring_engine
         self.weights = weights
+        # Bounded, priority-ordered dispatch instead of one task per symbol
+        self.scheduler = scheduler or ScanScheduler(name="mtf")
         
         # Timeframe weights (higher TF = more weight)
         self.tf_weights = {
@@ -99,18 +103,19 @@ class MultiTimeframeScanner:
             mode=rules.mode
         )
         
-        # Scan all symbol-timeframe combinations in parallel
-        scan_tasks = []
-        for symbol in symbols:
-            scan_tasks.append(
-                self._scan_symbol_all_timeframes(symbol, timeframes)
-            )
-        
-        results = await asyncio.gather(*scan_tasks, return_exceptions=True)
+        # Scan through the scheduler: one OHLCV request per timeframe.
+        # Results cached under other weights are never reused.
+        outcomes = await self.scheduler.run(
+            symbols,
+            lambda symbol: self._scan_symbol_all_timeframes(symbol, timeframes),
+            variant=(tuple(timeframes), weights_key(self.weights),
+                     weights_key(getattr(self.engine, 'weights', None))),
+            cost=len(timeframes)
+        )
         
         # Process results
         valid_results = []
-        for symbol, result in zip(symbols, results):
+        for symbol, result in outcomes.items():
             if isinstance(result, Exception):
                 logger.error(f"Scan failed for {symbol}", error=str(result))
                 continue
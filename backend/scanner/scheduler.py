@@ -0,0 +1,298 @@
+"""
+Priority scan scheduling with per-symbol freshness budgets
+
+Symbols are dispatched through a bounded worker pool sized to the exchange
+rate-limit budget, most urgent first. Urgency is staleness x importance,
+where importance comes from open positions, live subscriptions and how
+extreme the last score was. A symbol's freshness budget shrinks as its
+importance grows, so a hot symbol is rescanned every ``freshness / importance``
+seconds. A cold symbol can reuse its last result for up to ``freshness``
+seconds, and falls back to an older result when a batch runs out of time.
+"""
+
+import asyncio
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import structlog
+
+try:
+    from ..core.metrics import metrics
+    from ..data.rate_limiter import RateLimiter
+except ImportError:
+    from core.metrics import metrics
+    from data.rate_limiter import RateLimiter
+
+logger = structlog.get_logger()
+
+SCAN_SECONDS = metrics.histogram("hts_scan_seconds", "Per-symbol scan time", ["scanner", "outcome"])
+SCAN_BATCH_SECONDS = metrics.histogram("hts_scan_batch_seconds", "Whole scan batch time", ["scanner"])
+SCAN_RESULTS = metrics.counter("hts_scan_results_total", "Batch results by where they came from",
+                               ["scanner", "source"])
+
+
+def normalize_symbol(symbol: str) -> str:
+    """``BTC/USDT``, ``btc-usdt`` and ``BTCUSDT`` refer to the same market"""
+    return symbol.replace('/', '').replace('-', '').upper()
+
+
+def weights_key(weights: Any) -> Hashable:
+    """Hashable snapshot of a weight config, so a ``variant`` changes with the weights"""
+    if weights is None:
+        return None
+    values = weights.model_dump() if hasattr(weights, 'model_dump') else dict(weights)
+    return tuple(sorted(values.items()))
+
+
+class SymbolImportance:
+    """
+    Importance weight per symbol, 1.0 for a symbol nobody is watching
+
+    Args:
+        positions: Callable returning symbols with open positions
+        subscriptions: Callable returning live subscriber counts per symbol
+    """
+
+    def __init__(self, positions: Optional[Callable[[], Iterable[str]]] = None,
+                 subscriptions: Optional[Callable[[], Dict[str, int]]] = None,
+                 position_weight: float = 3.0, subscription_weight: float = 1.0,
+                 extremity_weight: float = 2.0):
+        self.positions = positions
+        self.subscriptions = subscriptions
+        self.position_weight = position_weight
+        self.subscription_weight = subscription_weight
+        self.extremity_weight = extremity_weight
+        self.extremity: Dict[str, float] = {}
+
+    def observe_score(self, symbol: str, score: Optional[float]):
+        """Scores near 0 or 1 are actionable; 0.5 is noise"""
+        if score is not None:
+            self.extremity[normalize_symbol(symbol)] = min(1.0, abs(float(score) - 0.5) * 2)
+
+    def snapshot(self) -> Callable[[str], float]:
+        """Importance function over one consistent view of positions and subscriptions"""
+        open_symbols = {normalize_symbol(s) for s in self.positions()} if self.positions else set()
+        subscribers = {normalize_symbol(s): n for s, n in self.subscriptions().items()} if self.subscriptions else {}
+
+        def importance(symbol: str) -> float:
+            key = normalize_symbol(symbol)
+            return (1.0
+                    + self.position_weight * (key in open_symbols)
+                    + self.subscription_weight * math.log1p(subscribers.get(key, 0))
+                    + self.extremity_weight * self.extremity.get(key, 0.0))
+        return importance
+
+
+@dataclass
+class _Freshness:
+    result: Any = None
+    scanned_at: float = float('-inf')
+    duration: float = 0.0
+    scans: int = 0
+    failures: int = 0
+    importance: float = 1.0
+    inflight: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class ScanScheduler:
+    """
+    Rate-limited, priority-ordered dispatch of per-symbol scans
+
+    Args:
+        rate_limit: Exchange requests allowed per ``period``
+        period: Rate-limit window in seconds
+        max_workers: Upper bound on concurrent scans
+        freshness: Seconds a result for an importance-1 symbol stays usable
+        deadline: Default seconds a batch may run before stale results are
+            served for whatever is still queued (None waits for all)
+        name: Scanner label on the scan metrics
+    """
+
+    def __init__(self, rate_limit: int = 20, period: float = 1.0, max_workers: int = 16,
+                 freshness: float = 30.0, deadline: Optional[float] = None,
+                 importance: Optional[SymbolImportance] = None, name: str = "scan"):
+        self.name = name
+        self.rate_limit = rate_limit
+        self.max_workers = max_workers
+        self.freshness = freshness
+        self.deadline = deadline
+        self.importance = importance or SymbolImportance()
+        self.limiter = RateLimiter(calls=rate_limit, period=period)
+        self._state: Dict[Tuple[str, Hashable], _Freshness] = {}
+        self.stats = {
+            "batches": 0,
+            "scans": 0,
+            "reused": 0,
+            "coalesced": 0,
+            "degraded": 0,
+            "missed": 0,
+            "failures": 0,
+        }
+
+    def workers_for(self, cost: int) -> int:
+        """Concurrent scans the budget affords when each scan makes ``cost`` requests"""
+        return max(1, min(self.max_workers, self.rate_limit // max(1, cost)))
+
+    def target_age(self, importance: float) -> float:
+        return self.freshness / max(1.0, importance)
+
+    async def run(self, symbols: Iterable[str], scan_fn: Callable[[str], Awaitable[Any]],
+                  variant: Hashable = None, cost: int = 1, force: bool = False,
+                  deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Scan ``symbols`` most urgent first and return ``{symbol: result}``
+
+        ``variant`` separates results for the same symbol scanned differently
+        (e.g. another timeframe set). ``cost`` is the number of exchange
+        requests one scan makes. Fresh results are reused unless ``force``.
+        Failed scans map to their exception. Symbols still queued at the
+        deadline get their previous result or are left out.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        self.stats["batches"] += 1
+        batch_started = time.monotonic()
+        now = time.monotonic()
+        importance = self.importance.snapshot()
+        outcomes: Dict[str, Any] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        queue: List[Tuple[float, float, int, str]] = []
+
+        for order, symbol in enumerate(dict.fromkeys(symbols)):
+            state = self._state.setdefault((symbol, variant), _Freshness())
+            state.importance = importance(symbol)
+            age = now - state.scanned_at
+            if not force and state.result is not None and age < self.target_age(state.importance):
+                outcomes[symbol] = state.result
+                self.stats["reused"] += 1
+                SCAN_RESULTS.inc(scanner=self.name, source="reused")
+            elif state.inflight is not None:
+                waiting[symbol] = state.inflight
+                self.stats["coalesced"] += 1
+                SCAN_RESULTS.inc(scanner=self.name, source="coalesced")
+            else:
+                # Most negative first: staleness x importance, never-scanned first
+                urgency = age * state.importance if math.isfinite(age) else math.inf
+                heapq.heappush(queue, (-urgency, -state.importance, order, symbol))
+                state.inflight = asyncio.get_running_loop().create_future()
+
+        queued = [entry[-1] for entry in queue]
+
+        async def worker():
+            while queue:
+                symbol = heapq.heappop(queue)[-1]
+                outcomes[symbol] = await self._scan(symbol, variant, scan_fn, cost)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(len(queue), self.workers_for(cost)))]
+        try:
+            if workers:
+                done, pending = await asyncio.wait(workers, timeout=deadline)
+                if pending:
+                    # Out of time: stop dispatching; the scans in flight are cancelled below
+                    queue.clear()
+                for task in done:
+                    task.result()
+        finally:
+            # Also reached when the caller is cancelled: never leave workers scanning
+            unfinished = [task for task in workers if not task.done()]
+            if unfinished:
+                queue.clear()
+                for task in unfinished:
+                    task.cancel()
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            for symbol in queued:
+                state = self._state[(symbol, variant)]
+                if state.inflight is not None and not state.inflight.done():
+                    state.inflight.cancel()
+                state.inflight = None
+                if symbol not in outcomes:
+                    if state.result is not None:
+                        outcomes[symbol] = state.result
+                        self.stats["degraded"] += 1
+                        SCAN_RESULTS.inc(scanner=self.name, source="degraded")
+                    else:
+                        self.stats["missed"] += 1
+                        SCAN_RESULTS.inc(scanner=self.name, source="missed")
+
+        for symbol, future in waiting.items():
+            try:
+                outcomes[symbol] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The batch that owned this scan ran out of time
+                if self._state[(symbol, variant)].result is not None:
+                    outcomes[symbol] = self._state[(symbol, variant)].result
+            except Exception as e:
+                outcomes[symbol] = e
+
+        SCAN_BATCH_SECONDS.observe(time.monotonic() - batch_started, scanner=self.name)
+        return outcomes
+
+    async def _scan(self, symbol: str, variant: Hashable, scan_fn: Callable[[str], Awaitable[Any]], cost: int) -> Any:
+        state = self._state[(symbol, variant)]
+        for _ in range(cost):
+            async with self.limiter:
+                pass
+        started = time.monotonic()
+        try:
+            result = await scan_fn(symbol)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            SCAN_SECONDS.observe(time.monotonic() - started, scanner=self.name, outcome="error")
+            state.failures += 1
+            self.stats["failures"] += 1
+            logger.warning("Scheduled scan failed", symbol=symbol, error=str(e))
+            if state.inflight is not None and not state.inflight.done():
+                state.inflight.set_exception(e)
+                state.inflight.exception()  # mark retrieved when nobody is waiting
+            return e
+
+        state.result = result
+        state.scanned_at = time.monotonic()
+        state.duration = state.scanned_at - started
+        state.scans += 1
+        self.stats["scans"] += 1
+        SCAN_SECONDS.observe(state.duration, scanner=self.name, outcome="ok")
+        SCAN_RESULTS.inc(scanner=self.name, source="scanned")
+        self.importance.observe_score(symbol, getattr(result, 'overall_score', None))
+        if state.inflight is not None and not state.inflight.done():
+            state.inflight.set_result(result)
+        return result
+
+    def get_freshness(self) -> Dict[str, Dict[str, Any]]:
+        """Per-symbol age of the newest result against its freshness budget"""
+        now = time.monotonic()
+        report: Dict[str, Dict[str, Any]] = {}
+        for (symbol, _variant), state in self._state.items():
+            if not math.isfinite(state.scanned_at):
+                continue
+            age = now - state.scanned_at
+            entry = report.get(symbol)
+            if entry is not None and entry["age_seconds"] <= age:
+                continue
+            target = self.target_age(state.importance)
+            report[symbol] = {
+                "age_seconds": round(age, 3),
+                "target_seconds": round(target, 3),
+                "fresh": age <= target,
+                "importance": round(state.importance, 3),
+                "last_scan_ms": round(state.duration * 1000, 2),
+                "scans": state.scans,
+                "failures": state.failures,
+            }
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        freshness = self.get_freshness()
+        return {
+            **self.stats,
+            "rate_limit": self.rate_limit,
+            "max_workers": self.max_workers,
+            "freshness_seconds": self.freshness,
+            "tracked_symbols": len(freshness),
+            "stale_symbols": sum(1 for entry in freshness.values() if not entry["fresh"]),
+        }
@@ -3,12 +3,16 @@ Detector Protocol and Detection Result Models
 Implements the universal interface for all trading signal detectors
 """
 
-from typing import Protocol, TypedDict, Literal
+from typing import Protocol, TypedDict, Literal, Optional
 from pydantic import BaseModel, Field, validator
 import structlog
 
+from core.metrics import metrics
+
 logger = structlog.get_logger()
 
+DETECTOR_SECONDS = metrics.histogram("hts_detector_seconds", "Time spent in each detector's detect()", ["detector"])
+
 class OHLCVBar(TypedDict):
     """Single OHLCV candle - immutable contract"""
     ts: int          # Unix timestamp milliseconds
@@ -50,4 +54,10 @@ class DetectorProtocol(Protocol):
             ValueError: If ohlcv insufficient or malformed
             TimeoutError: If computation exceeds 500ms
         """
-        ...
\ No newline at end of file
+        ...
+
+
+async def timed_detect(name: str, detector, ohlcv, context: Optional[dict] = None):
+    """``detector.detect(ohlcv, context)``, timed into the per-detector histogram"""
+    with DETECTOR_SECONDS.time(detector=name):
+        return await detector.detect(ohlcv, context)
@@ -10,8 +10,8 @@ import asyncio
 import numpy as np
 import structlog
 
-from scoring.detector_protocol import DetectionResult, OHLCVBar, DetectorProtocol
-# from analytics.indicators import IndicatorEngine
+from scoring.detector_protocol import DetectionResult, OHLCVBar, DetectorProtocol, timed_detect
+from scoring.features import FeatureCache
 
 logger = structlog.get_logger()
 
@@ -51,10 +51,18 @@ class CombinedScore:
 class DynamicScoringEngine:
     """Context-aware multi-detector scoring"""
     
-    def __init__(self, detectors: dict, weights: WeightConfig):
+    def __init__(self, detectors: dict, weights: WeightConfig, feature_cache: Optional[FeatureCache] = None):
         self.detectors = detectors
         self.weights = weights
         self.weights.validate_sum()
+        self.feature_cache = feature_cache or FeatureCache()
+        # Optional scoring.executor.ScoringExecutor: when set, score() runs in a worker process
+        self.executor = None
+    
+    def update_weights(self, weights: WeightConfig):
+        """Replace the detector weights used by subsequent scores"""
+        weights.validate_sum()
+        self.weights = weights
     
     async def score(
         self,
@@ -66,7 +74,8 @@ class DynamicScoringEngine:
         
         Args:
             ohlcv: Price data (minimum 100 bars)
-            context: Optional market context {"trend": "up"|"down"|"ranging", "volatility": "high"|"normal"|"low"}
+            context: Optional market context {"symbol", "timeframe", "trend": "up"|"down"|"ranging", "volatility": "high"|"normal"|"low"}
+                     symbol/timeframe key the shared feature bundle passed to detectors as context["features"]
         
         Returns:
             CombinedScore with full breakdown
@@ -74,6 +83,9 @@ class DynamicScoringEngine:
         if len(ohlcv) < 100:
             raise ValueError("Minimum 100 bars required for scoring")
         
+        if self.executor is not None:
+            return await self.executor.score(ohlcv, context, self.weights)
+        
         # Enrich context with indicators
         if context is None:
             context = {}
@@ -82,7 +94,7 @@ class DynamicScoringEngine:
         
         # Run all detectors in parallel
         detector_tasks = {
-            name: detector.detect(ohlcv, context)
+            name: timed_detect(name, detector, ohlcv, context)
             for name, detector in self.detectors.items()
         }
         
@@ -120,31 +132,30 @@ class DynamicScoringEngine:
         return combined
     
     async def _enrich_context(self, ohlcv: List[OHLCVBar], context: dict) -> dict:
-        """Add computed indicators to context"""
+        """Add computed indicators and the shared feature bundle to context"""
+        context = dict(context)
         try:
-            # Mock indicators for now - would use real IndicatorEngine in production
-            indicators = {
-                'rsi': [50.0] * len(ohlcv),
-                'atr': [100.0] * len(ohlcv),
-                'bb_upper': [ohlcv[-1]['close'] * 1.02] * len(ohlcv),
-                'bb_lower': [ohlcv[-1]['close'] * 0.98] * len(ohlcv),
-                'ema_fast': [ohlcv[-1]['close']] * len(ohlcv),
-                'ema_slow': [ohlcv[-1]['close']] * len(ohlcv)
-            }
-            
+            bundle = self.feature_cache.get(
+                ohlcv,
+                symbol=context.get('symbol'),
+                timeframe=context.get('timeframe')
+            )
+            context['features'] = bundle
+            close = float(bundle.arrays['close'][-1])
+
             # Add key indicators to context
-            context['rsi'] = float(indicators['rsi'][-1])
-            context['atr'] = float(indicators['atr'][-1])
+            context['rsi'] = bundle.latest('rsi', 50.0)
+            context['atr'] = bundle.latest('atr', 0.0)
             context['bb_position'] = self._calculate_bb_position(
-                ohlcv[-1]['close'],
-                indicators['bb_upper'][-1],
-                indicators['bb_lower'][-1]
+                close,
+                bundle.latest('bb_upper', close),
+                bundle.latest('bb_lower', close)
             )
             
             # Determine trend regime
             if 'trend' not in context:
-                ema_fast = indicators['ema_fast'][-1]
-                ema_slow = indicators['ema_slow'][-1]
+                ema_fast = bundle.latest('ema_12', close)
+                ema_slow = bundle.latest('ema_26', close)
                 
                 if ema_fast > ema_slow * 1.02:
                     context['trend'] = 'up'
@@ -155,7 +166,7 @@ class DynamicScoringEngine:
             
             # Determine volatility regime
             if 'volatility' not in context:
-                atr_pct = context['atr'] / ohlcv[-1]['close']
+                atr_pct = context['atr'] / close
                 if atr_pct > 0.03:
                     context['volatility'] = 'high'
                 elif atr_pct < 0.01:
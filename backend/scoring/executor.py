@@ -0,0 +1,294 @@
+"""
+Process-pool execution for CPU-bound scoring jobs
+Ships (symbol, timeframe) scoring jobs to worker processes with the OHLCV
+window in shared memory, so detector work runs on all cores instead of
+blocking the event loop
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from analytics.pivots import OHLCV_FIELDS
+from core.metrics import metrics
+from scoring.engine import DynamicScoringEngine, WeightConfig, CombinedScore
+
+logger = structlog.get_logger()
+
+# Detector timings stay in the worker processes; the parent sees whole jobs
+SCORING_JOB_SECONDS = metrics.histogram(
+    "hts_scoring_job_seconds", "Process-pool scoring job time, queueing included", ["outcome"]
+)
+
+# Row layout of the shared OHLCV matrix: timestamp (ms) followed by OHLCV
+SHARED_ROWS = ('ts',) + OHLCV_FIELDS
+
+
+class ScoringQueueFull(Exception):
+    """Raised when the executor cannot accept a job within the queue timeout"""
+    pass
+
+
+class ScoringTimeout(Exception):
+    """Raised when a scoring job exceeds its timeout"""
+    pass
+
+
+# name -> (module, class) of the detectors the default engine runs
+DEFAULT_DETECTORS = {
+    "harmonic": ("detectors.harmonic", "HarmonicDetector"),
+    "elliott": ("detectors.elliott", "ElliottWaveDetector"),
+    "smc": ("detectors.smc", "SMCDetector"),
+    "fibonacci": ("detectors.fibonacci", "FibonacciDetector"),
+    "price_action": ("detectors.price_action", "PriceActionDetector"),
+    "sar": ("detectors.sar", "SARDetector"),
+    "sentiment": ("detectors.sentiment", "SentimentDetector"),
+    "news": ("detectors.news", "NewsDetector"),
+    "whales": ("detectors.whales", "WhaleDetector")
+}
+
+
+def load_default_detectors() -> Dict[str, object]:
+    """
+    Instances of every default detector that imports
+
+    A detector that fails to import is skipped with a warning; if none load,
+    RuntimeError is raised so a misconfigured deployment fails at startup
+    instead of on every scoring job.
+    """
+    detectors, errors = {}, {}
+    for name, (module, cls) in DEFAULT_DETECTORS.items():
+        try:
+            detectors[name] = getattr(importlib.import_module(module), cls)()
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            logger.warning("Skipping detector that failed to load", detector=name, error=errors[name])
+    if not detectors:
+        raise RuntimeError(f"No scoring detectors could be loaded: {errors}")
+    return detectors
+
+
+def build_default_engine() -> DynamicScoringEngine:
+    """Engine with every loadable default detector, used in the API process and in workers"""
+    return DynamicScoringEngine(load_default_detectors(), WeightConfig())
+
+
+def _ohlcv_matrix(ohlcv) -> np.ndarray:
+    """Pack a DataFrame or list of OHLCV bars into a (6, n) float64 matrix"""
+    n = len(ohlcv)
+    matrix = np.empty((len(SHARED_ROWS), n), dtype=np.float64)
+    if isinstance(ohlcv, pd.DataFrame):
+        ts = ohlcv['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(ts):
+            matrix[0] = ts.values.astype('datetime64[ms]').astype(np.int64)
+        else:
+            matrix[0] = ts.to_numpy(dtype=np.float64)
+        for row, name in enumerate(OHLCV_FIELDS, start=1):
+            matrix[row] = ohlcv[name].to_numpy(dtype=np.float64)
+    else:
+        for row, name in enumerate(SHARED_ROWS):
+            matrix[row] = np.fromiter((bar[name] for bar in ohlcv), dtype=np.float64, count=n)
+    return matrix
+
+
+# Worker-process state
+_worker_engine: Optional[DynamicScoringEngine] = None
+
+
+def _init_worker(engine_factory: Callable[[], DynamicScoringEngine]):
+    global _worker_engine
+    _worker_engine = engine_factory()
+
+
+def _run_job(shm_name: str, n_bars: int, context: dict, weights: Optional[dict]) -> CombinedScore:
+    """Score one OHLCV window read from shared memory (runs in a worker)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shared = np.ndarray((len(SHARED_ROWS), n_bars), dtype=np.float64, buffer=shm.buf)
+        # One memcpy out of the segment; detectors may keep references past the job
+        matrix = shared.copy()
+        del shared
+    finally:
+        shm.close()
+
+    ohlcv = pd.DataFrame({
+        'timestamp': pd.to_datetime(matrix[0].astype(np.int64), unit='ms'),
+        **{name: matrix[row] for row, name in enumerate(OHLCV_FIELDS, start=1)}
+    })
+
+    if weights is not None and weights != _worker_engine.weights.dict():
+        _worker_engine.weights = WeightConfig(**weights)
+
+    return asyncio.run(_worker_engine.score(ohlcv, context))
+
+
+class ScoringExecutor:
+    """
+    Bounded process pool for DynamicScoringEngine.score
+
+    At most ``max_pending`` jobs are queued or running at once; callers wait
+    for a slot (backpressure) and get ScoringQueueFull if none frees up within
+    ``queue_timeout``. Each job is bounded by ``job_timeout``. A slot is only
+    released when the worker actually finishes, so timed-out jobs still count
+    against the bound until they stop using a core.
+
+    Example:
+        executor = ScoringExecutor(build_default_engine, max_workers=4)
+        scoring_engine.executor = executor
+        result = await scoring_engine.score(ohlcv, {"symbol": "BTCUSDT", "timeframe": "1h"})
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], DynamicScoringEngine] = build_default_engine,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        job_timeout: float = 30.0,
+        queue_timeout: Optional[float] = 10.0,
+        mp_context: str = "spawn"
+    ):
+        self.engine_factory = engine_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.mp_context = mp_context
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'pool_restarts': 0,
+            'max_in_flight': 0
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=(self.engine_factory,)
+            )
+        return self._pool
+
+    def _restart_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self.stats['pool_restarts'] += 1
+
+    async def _acquire_slot(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        try:
+            if self.queue_timeout is None:
+                await self._slots.acquire()
+            else:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats['rejected'] += 1
+            raise ScoringQueueFull(f"Scoring queue full ({self.max_pending} pending jobs)")
+
+    async def score(
+        self,
+        ohlcv,
+        context: Optional[dict] = None,
+        weights: Optional[WeightConfig] = None
+    ) -> CombinedScore:
+        """Score one OHLCV window in a worker process"""
+        # Packed before taking a slot: malformed input must never hold one
+        matrix = _ohlcv_matrix(ohlcv)
+        await self._acquire_slot()
+        loop = asyncio.get_running_loop()
+
+        shm = None
+
+        def _release(_future):
+            shm.close()
+            shm.unlink()
+            self.in_flight -= 1
+            self._slots.release()
+
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+            np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+            future = self._get_pool().submit(
+                _run_job,
+                shm.name,
+                matrix.shape[1],
+                dict(context or {}),
+                weights.dict() if weights is not None else None
+            )
+        except BaseException:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            self._slots.release()
+            raise
+
+        self.stats['submitted'] += 1
+        self.in_flight += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(_release, f))
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            SCORING_JOB_SECONDS.observe(time.perf_counter() - started, outcome="timeout")
+            raise ScoringTimeout(f"Scoring job exceeded {self.job_timeout}s")
+        except BrokenProcessPool:
+            self.stats['failed'] += 1
+            SCORING_JOB_SECONDS.observe(time.perf_counter() - started, outcome="error")
+            self._restart_pool()
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            SCORING_JOB_SECONDS.observe(time.perf_counter() - started, outcome="error")
+            raise
+
+        self.stats['completed'] += 1
+        SCORING_JOB_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+        return result
+
+    async def score_many(
+        self,
+        jobs: List[Tuple[object, dict]],
+        weights: Optional[WeightConfig] = None
+    ) -> List:
+        """Score (ohlcv, context) jobs concurrently; failures are returned as exceptions"""
+        return await asyncio.gather(
+            *(self.score(ohlcv, context, weights) for ohlcv, context in jobs),
+            return_exceptions=True
+        )
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'in_flight': self.in_flight,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'job_timeout': self.job_timeout
+        }
@@ -0,0 +1,143 @@
+"""
+Shared per-window feature bundle for the scoring engine
+Computed once per (symbol, timeframe, last-bar-ts) and handed to every detector
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from analytics.indicator_engine import IndicatorEngine
+from analytics.pivots import ohlcv_to_arrays, find_pivots
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class FeatureBundle:
+    """
+    Everything detectors need from one OHLCV window
+
+    - arrays: float64 OHLCV column arrays (open/high/low/close/volume)
+    - indicators: IndicatorEngine.compute_all output (may be empty)
+    - pivots(source, kind, lookback): memoized strict swing pivots
+    """
+    symbol: Optional[str]
+    timeframe: Optional[str]
+    last_ts: Optional[int]
+    arrays: Dict[str, np.ndarray]
+    indicators: Dict[str, np.ndarray] = field(default_factory=dict)
+    _pivots: Dict[Tuple[str, str, int], np.ndarray] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.arrays['close'])
+
+    def pivots(self, source: str, kind: str, lookback: int = 3) -> np.ndarray:
+        """Indices of strict pivot highs/lows of ``source`` over the whole window"""
+        key = (source, kind, lookback)
+        if key not in self._pivots:
+            self._pivots[key] = find_pivots(self.arrays[source], lookback, kind)
+        return self._pivots[key]
+
+    def latest(self, name: str, default: float = float('nan')) -> float:
+        """Last value of an indicator, or ``default`` if missing/NaN"""
+        values = self.indicators.get(name)
+        if values is None or len(values) == 0 or np.isnan(values[-1]):
+            return default
+        return float(values[-1])
+
+
+def _last_timestamp(ohlcv) -> Optional[int]:
+    """Last bar open time in ms for a DataFrame or list of OHLCV bars"""
+    try:
+        if isinstance(ohlcv, pd.DataFrame):
+            if 'timestamp' in ohlcv.columns:
+                return int(pd.Timestamp(ohlcv['timestamp'].iloc[-1]).value // 1_000_000)
+            if 'ts' in ohlcv.columns:
+                return int(ohlcv['ts'].iloc[-1])
+            return None
+        return int(ohlcv[-1]['ts'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class FeatureCache:
+    """
+    Memoizes FeatureBundles by (symbol, timeframe, last-bar-ts)
+
+    Entries also record (length, last close) so a live candle that ticks
+    without a new open time is recomputed instead of served stale.
+    """
+
+    def __init__(self, indicator_engine: Optional[IndicatorEngine] = None, max_entries: int = 256):
+        self.indicator_engine = indicator_engine or IndicatorEngine()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[tuple, FeatureBundle]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ohlcv, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> FeatureBundle:
+        """Return the bundle for this window, computing it on first use"""
+        last_ts = _last_timestamp(ohlcv)
+        key = None
+
+        if symbol is not None and last_ts is not None:
+            key = (symbol, timeframe, last_ts)
+            cached = self._entries.get(key)
+            if cached is not None:
+                signature, bundle = cached
+                if signature == self._signature(ohlcv):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return bundle
+
+        self.misses += 1
+        arrays = ohlcv_to_arrays(ohlcv)
+        bundle = FeatureBundle(
+            symbol=symbol,
+            timeframe=timeframe,
+            last_ts=last_ts,
+            arrays=arrays,
+            indicators=self._compute_indicators(ohlcv, arrays),
+        )
+
+        if key is not None:
+            self._entries[key] = (self._signature(ohlcv), bundle)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return bundle
+
+    def _signature(self, ohlcv) -> tuple:
+        if isinstance(ohlcv, pd.DataFrame):
+            return (len(ohlcv), float(ohlcv['close'].iloc[-1]))
+        return (len(ohlcv), float(ohlcv[-1]['close']))
+
+    def _compute_indicators(self, ohlcv, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        if isinstance(ohlcv, pd.DataFrame) and 'timestamp' in ohlcv.columns:
+            frame = ohlcv
+        else:
+            timestamps = [bar['ts'] for bar in ohlcv] if not isinstance(ohlcv, pd.DataFrame) else np.arange(len(ohlcv))
+            frame = pd.DataFrame({'timestamp': timestamps, **arrays})
+        try:
+            return self.indicator_engine.compute_all(frame)
+        except Exception as e:
+            logger.warning("Indicator computation failed for feature bundle", error=str(e))
+            return {}
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
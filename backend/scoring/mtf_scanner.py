@@ -121,7 +121,7 @@ class MultiTimeframeScanner:
             try:
                 ohlcv = await self.data.get_ohlcv(symbol, tf, limit=200)
                 
-                score = await self.engine.score(ohlcv)
+                score = await self.engine.score(ohlcv, {"symbol": symbol, "timeframe": tf})
                 tf_scores[tf] = score
                 
             except Exception as e:
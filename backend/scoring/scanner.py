@@ -5,19 +5,24 @@ Multi-Timeframe Scanner for market opportunities
 import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from ..api.models import ScanRequest, ScanResult, ScanRule, WeightConfig
 from .engine import DynamicScoringEngine
 from ..data.data_manager import data_manager
+from ..scanner.scheduler import ScanScheduler, weights_key
 
 class MultiTimeframeScanner:
     """Scans multiple symbols across timeframes for trading opportunities"""
     
-    def __init__(self, data_aggregator, scoring_engine: DynamicScoringEngine, default_weights: WeightConfig):
+    def __init__(self, data_aggregator, scoring_engine: DynamicScoringEngine, default_weights: WeightConfig,
+                 scheduler: Optional[ScanScheduler] = None):
         self.data_aggregator = data_aggregator
         self.scoring_engine = scoring_engine
         self.default_weights = default_weights
+        # Bounded, priority-ordered dispatch instead of one task per symbol
+        self.scheduler = scheduler or ScanScheduler(name="scoring")
     
     async def scan(self, symbols: List[str], timeframes: List[str], rules: Optional[ScanRule] = None) -> List[ScanResult]:
         """
@@ -34,16 +39,44 @@ class MultiTimeframeScanner:
         if rules is None:
             rules = ScanRule()
         
-        # Create tasks for parallel scanning
-        scan_tasks = []
-        for symbol in symbols:
-            task = asyncio.create_task(self._scan_symbol(symbol, timeframes, rules))
-            scan_tasks.append(task)
+        # Scan through the scheduler: one OHLCV request per timeframe.
+        # Results scored under other weights are never reused.
+        outcomes = await self.scheduler.run(
+            symbols,
+            lambda symbol: self._scan_symbol(symbol, timeframes, rules),
+            variant=(tuple(timeframes), weights_key(self.scoring_engine.weights)),
+            cost=len(timeframes)
+        )
+        
+        return self.filter_results(list(outcomes.values()), rules)
+    
+    async def rescan(self, due: Dict[str, List[str]],
+                     previous: Optional[Dict[str, ScanResult]] = None) -> List[ScanResult]:
+        """
+        Rescore only the given timeframes per symbol
+        
+        Scores for timeframes not listed are carried over from ``previous``, so a
+        symbol whose 15m bar closed keeps its unchanged 1h score. Results are not
+        filtered; pass them through ``filter_results`` to apply scan rules.
+        """
+        previous = previous or {}
         
-        # Wait for all scans to complete
-        results = await asyncio.gather(*scan_tasks, return_exceptions=True)
+        def scan_due(symbol: str):
+            return self._scan_symbol(
+                symbol, due[symbol], ScanRule(),
+                previous=previous[symbol].timeframe_scores if symbol in previous else None
+            )
         
-        # Filter out exceptions and apply rules
+        # New bars closed, so never reuse a cached result here
+        outcomes = await self.scheduler.run(
+            due, scan_due, variant="rescan",
+            cost=max((len(timeframes) for timeframes in due.values()), default=1),
+            force=True
+        )
+        return [result for result in outcomes.values() if not isinstance(result, Exception)]
+    
+    def filter_results(self, results: List[Any], rules: ScanRule) -> List[ScanResult]:
+        """Drop failed scans and results outside the rules, best score first"""
         valid_results = []
         for result in results:
             if isinstance(result, Exception):
@@ -57,12 +90,10 @@ class MultiTimeframeScanner:
         
         return valid_results
     
-    async def _scan_symbol(self, symbol: str, timeframes: List[str], rules: ScanRule) -> ScanResult:
+    async def _scan_symbol(self, symbol: str, timeframes: List[str], rules: ScanRule,
+                           previous: Optional[Dict[str, Any]] = None) -> ScanResult:
         """Scan a single symbol across multiple timeframes"""
-        timeframe_scores = {}
-        all_scores = []
-        all_directions = []
-        all_confidences = []
+        timeframe_scores = dict(previous or {})
         
         # Scan each timeframe
         for timeframe in timeframes:
@@ -74,14 +105,11 @@ class MultiTimeframeScanner:
                     continue  # Skip if insufficient data
                 
                 # Score the timeframe
-                score_result = await self.scoring_engine.score(ohlcv)
+                score_result = await self.scoring_engine.score(
+                    ohlcv, {"symbol": symbol, "timeframe": timeframe}
+                )
                 timeframe_scores[timeframe] = score_result
                 
-                # Collect data for overall calculation
-                all_scores.append(score_result.final_score)
-                all_directions.append(score_result.direction)
-                all_confidences.append(score_result.confidence)
-                
             except Exception as e:
                 # Skip this timeframe if it fails
                 continue
@@ -99,6 +127,9 @@ class MultiTimeframeScanner:
             )
         
         # Calculate overall metrics
+        all_scores = [score.final_score for score in timeframe_scores.values()]
+        all_directions = [score.direction for score in timeframe_scores.values()]
+        all_confidences = [score.confidence for score in timeframe_scores.values()]
         overall_score = np.mean(all_scores) if all_scores else 0.5
         overall_direction = self._determine_overall_direction(all_directions)
         recommended_action = self._determine_action(overall_score, overall_direction)
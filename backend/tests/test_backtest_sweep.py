@@ -0,0 +1,90 @@
+"""
+Tests for backtest parameter sweeps
+"""
+
+from datetime import datetime
+
+import pytest
+
+from backend.backtesting.sweep import MAX_SWEEP_CONFIGS, WEIGHT_PARAMS, ParameterSweep, SweepSpace, split_params
+from backend.tests.test_vectorized_backtest import _bars
+
+
+class TestSweepSpace:
+
+    def test_grid_and_sample(self):
+        space = SweepSpace(grid={"smc": [0.1, 0.3], "min_score": [0.6, 0.7], "time_stop_bars": [12, 24, 48]})
+        assert len(space) == 12 and len(space.configs()) == 12
+
+        sampled = SweepSpace(grid=space.grid, samples=5, seed=1)
+        assert len(sampled.configs()) == 5
+        assert sampled.configs() == SweepSpace(grid=space.grid, samples=5, seed=1).configs()
+        full = space.configs()
+        assert all(config in full for config in sampled.configs())
+        assert len({tuple(config.values()) for config in sampled.configs()}) == 5
+
+        with pytest.raises(ValueError):
+            SweepSpace(grid={"not_a_param": [1]})
+        with pytest.raises(ValueError):
+            SweepSpace(grid={"use_trailing": [True, False]})  # the engine has no trailing stop
+        with pytest.raises(ValueError):
+            SweepSpace(grid={"min_score": []})
+
+    def test_large_grid_sampled_without_expanding(self):
+        grid = {name: [round(0.05 * i, 2) for i in range(1, 21)] for name in WEIGHT_PARAMS}  # 20^9 points
+        configs = SweepSpace(grid=grid, samples=50, seed=3).configs()
+        assert len(configs) == 50 and len({tuple(c.values()) for c in configs}) == 50
+
+        with pytest.raises(ValueError, match="at most"):
+            SweepSpace(grid=grid)
+        with pytest.raises(ValueError, match="at most"):
+            SweepSpace(grid=grid, samples=MAX_SWEEP_CONFIGS + 1)
+
+    def test_split_params_renormalizes_weights(self):
+        weights, entry, exit_, engine = split_params(
+            {"smc": 0.9, "min_score": 0.7, "time_stop_bars": 12, "fee_bps": 5}
+        )
+        total = sum(weights.dict().values())
+        assert total == pytest.approx(1.0)
+        assert weights.smc > weights.sar
+        assert entry == {"min_score": 0.7}
+        assert exit_ == {"time_stop_bars": 12}
+        assert engine == {"fee_bps": 5.0}
+
+
+class TestParameterSweep:
+
+    @pytest.mark.asyncio
+    async def test_pool_matches_in_process_and_ranks(self):
+        bars = _bars(1500)
+        space = SweepSpace(grid={
+            "min_score": [0.6, 0.65],
+            "min_confidence": [0.3],
+            "time_stop_bars": [12, 48],
+            "smc": [0.2, 0.5],
+        })
+        start, end = datetime(2023, 11, 14), datetime(2030, 1, 1)
+
+        streamed = [r async for r in ParameterSweep(max_workers=2).stream(bars, space, start, end)]
+        inline = [r async for r in ParameterSweep(max_workers=0).stream(bars, space, start, end)]
+
+        assert sorted(r.index for r in streamed) == list(range(len(space)))
+        by_index = {r.index: r for r in streamed}
+        for r in inline:
+            assert r.error is None
+            assert by_index[r.index].metrics == r.metrics
+
+        table = ParameterSweep.rank(streamed, by="total_return_pct", top=3)
+        assert [row["rank"] for row in table] == [1, 2, 3]
+        returns = [row["total_return_pct"] for row in table]
+        assert returns == sorted(returns, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_cost_axes_change_results(self):
+        space = SweepSpace(grid={"slippage_bps": [0.0, 50.0], "fee_bps": [0.0, 20.0]},
+                           base={"min_confidence": 0.3, "min_score": 0.6})
+        start, end = datetime(2023, 11, 14), datetime(2030, 1, 1)
+        results = [r async for r in ParameterSweep(max_workers=0).stream(_bars(1500), space, start, end)]
+
+        assert all(r.error is None and r.metrics["total_trades"] > 0 for r in results)
+        assert len({r.final_equity for r in results}) == len(space)
@@ -0,0 +1,87 @@
+"""
+Tests for the benchmark suite's measurement and regression checks
+"""
+
+import asyncio
+
+from backend.benchmarks.suite import (
+    Case, compare, default_cases, load_baseline, run_suite, save_baseline, select, synthetic_ohlcv
+)
+
+
+def _report(**medians):
+    return {'meta': {}, 'results': {k: {'median_ms': v} for k, v in medians.items()}}
+
+
+class TestCompare:
+
+    def test_regression_past_tolerance_fails(self):
+        verdict = compare(_report(a=13.0, b=11.0), _report(a=10.0, b=10.0), tolerance=0.25)
+        assert [r['case'] for r in verdict['regressions']] == ['a']
+        assert not verdict['passed']
+
+    def test_small_absolute_deltas_ignored(self):
+        verdict = compare(_report(fast=0.02), _report(fast=0.01), tolerance=0.25, min_delta_ms=0.5)
+        assert verdict['passed'] and not verdict['regressions']
+
+    def test_improvements_new_and_broken(self):
+        current = _report(a=5.0, new=1.0)
+        current['results']['gone'] = {'error': 'ImportError: boom'}
+        verdict = compare(current, _report(a=10.0, gone=2.0))
+        assert [r['case'] for r in verdict['improvements']] == ['a']
+        assert [r['case'] for r in verdict['new']] == ['new']
+        assert [r['case'] for r in verdict['broken']] == ['gone']
+        assert not verdict['passed']
+
+    def test_baseline_merges_unmeasured_cases(self, tmp_path):
+        path = tmp_path / 'baseline.json'
+        save_baseline(_report(a=1.0, b=2.0), path)
+        save_baseline(_report(a=3.0), path)
+        assert load_baseline(path)['results'] == {'a': {'median_ms': 3.0}, 'b': {'median_ms': 2.0}}
+
+
+class TestSuite:
+
+    def test_synthetic_data_is_deterministic(self):
+        a, b = synthetic_ohlcv(300), synthetic_ohlcv(300)
+        assert a.equals(b)
+        assert (a['high'] >= a[['open', 'close']].max(axis=1)).all()
+        assert (a['low'] <= a[['open', 'close']].min(axis=1)).all()
+
+    def test_runs_cases_and_records_failures(self):
+        async def work():
+            return sum(range(100))
+
+        def broken(n):
+            raise ImportError("missing")
+
+        cases = [
+            Case('sync', lambda n: (lambda: sum(range(n)))),
+            Case('async', lambda n: work),
+            Case('broken', broken),
+            Case('capped', lambda n: (lambda: None), max_size=100),
+        ]
+        report = run_suite([200], cases, min_runs=2, max_runs=2, budget=0.01)
+        results = report['results']
+        assert results['sync@200']['runs'] == 2 and results['async@200']['median_ms'] >= 0
+        assert results['broken@200']['error'] == 'ImportError: missing'
+        assert 'skipped' in results['capped@200']
+
+    def test_indicator_kernels_measured(self):
+        cases = select(default_cases(), ['indicator.rsi.*'])
+        assert {c.name for c in cases} == {'indicator.rsi.pandas', 'indicator.rsi.numba'}
+        results = run_suite([200], cases, min_runs=1, max_runs=1, budget=0)['results']
+        assert all('median_ms' in r for r in results.values()), results
+
+    def test_hung_run_fails_its_case(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        results = run_suite([200], [Case('hang', lambda n: hang)], min_runs=1, max_runs=1, budget=0,
+                            timeout=0.05)['results']
+        assert results['hang@200']['error'] == 'TimeoutError: run exceeded 0.05s'
+
+    def test_scoring_engine_measured(self):
+        results = run_suite([200], select(default_cases(), ['scoring_engine.*']), min_runs=1, max_runs=1,
+                            budget=0)['results']
+        assert 'median_ms' in results['scoring_engine.score@200'], results
@@ -0,0 +1,159 @@
+"""
+Tests for the shared LRU + TTL cache
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core import cache as cache_module
+from backend.core.cache import AsyncLRUCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Only the cache's clock; the event loop keeps the real one
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+class TestBounds:
+
+    def test_lru_eviction_by_count(self):
+        cache = AsyncLRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = AsyncLRUCache(max_entries=100, max_bytes=250, sizeof=lambda v: len(v))
+        for key in "abc":
+            cache.set(key, "x" * 100)
+
+        assert len(cache) == 2
+        assert cache.get("a") is None
+        assert cache.bytes == 200
+
+    def test_overwrite_keeps_byte_total(self):
+        cache = AsyncLRUCache(max_bytes=1000, sizeof=lambda v: len(v))
+        cache.set("a", "x" * 100)
+        cache.set("a", "x" * 10)
+        assert cache.bytes == 10
+
+
+class TestTTL:
+
+    def test_per_key_ttl(self, clock):
+        cache = TTLCache(ttl_seconds=30)
+        cache.set("short", 1, ttl=5)
+        cache.set("default", 2)
+
+        clock.now += 10
+        assert cache.get("short") is None
+        assert cache.get("default") == 2
+
+        clock.now += 30
+        assert cache.get("default") is None
+
+    def test_stale_fallback(self, clock):
+        cache = AsyncLRUCache(ttl=10, stale_ttl=60)
+        cache.set("k", "v")
+        clock.now += 30
+
+        assert cache.get("k") is None
+        assert cache.get("k", allow_stale=True) == "v"
+
+        clock.now += 60
+        assert cache.get("k", allow_stale=True) is None
+
+
+class TestGetOrSet:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesce(self):
+        cache = AsyncLRUCache()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"bitcoin": {"usd": 1}}
+
+        results = await asyncio.gather(*(cache.get_or_set("prices:bitcoin", upstream) for _ in range(30)))
+
+        assert calls == 1
+        assert all(r == {"bitcoin": {"usd": 1}} for r in results)
+        stats = cache.get_stats()
+        assert stats["loads"] == 1 and stats["coalesced"] == 29
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self):
+        cache = AsyncLRUCache()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*(cache.get_or_set("k", failing) for _ in range(5)), return_exceptions=True)
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert "k" not in cache
+
+        async def ok():
+            return 42
+
+        assert await cache.get_or_set("k", ok) == 42
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, clock):
+        cache = AsyncLRUCache(ttl=10, stale_ttl=60)
+        cache.set("k", "old")
+        clock.now += 20
+        refreshed = asyncio.Event()
+
+        async def refresh():
+            await refreshed.wait()
+            return "new"
+
+        # Stale value served immediately, one background refresh started
+        assert await cache.get_or_set("k", refresh) == "old"
+        assert await cache.get_or_set("k", refresh) == "old"
+        assert cache.get_stats()["refreshes"] == 1
+
+        refreshed.set()
+        await asyncio.sleep(0.01)
+        assert cache.get("k") == "new"
+
+    @pytest.mark.asyncio
+    async def test_hit_rate(self):
+        cache = AsyncLRUCache()
+
+        async def load():
+            return 1
+
+        await cache.get_or_set("k", load)
+        await cache.get_or_set("k", load)
+        await cache.get_or_set("k", load)
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
@@ -0,0 +1,91 @@
+"""
+Tests for candle-close driven scan scheduling
+"""
+
+import pytest
+
+from backend.websocket.candle_schedule import CandleCloseSchedule, next_close
+
+HOUR = 3600.0
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT", "XRPUSDT"]
+
+
+def _drain(schedule, now):
+    due = schedule.due(now)
+    for symbol, timeframes in due.items():
+        schedule.mark_scanned(symbol, timeframes, now)
+    return due
+
+
+class TestNextClose:
+
+    def test_aligned_to_bar_boundaries(self):
+        assert next_close(0, "15m") == 900
+        assert next_close(899.9, "15m") == 900
+        assert next_close(900, "15m") == 1800
+        assert next_close(10 * HOUR + 5, "1d") == 86400
+
+    def test_weekly_bars_close_monday(self):
+        # 1970-01-05 was the first Monday
+        assert next_close(0, "1w") == 4 * 86400
+        assert next_close(4 * 86400, "1w") == 11 * 86400
+
+    def test_unknown_timeframe_rejected(self):
+        with pytest.raises(ValueError):
+            CandleCloseSchedule(["BTCUSDT"], ["7m"])
+
+
+class TestCandleCloseSchedule:
+
+    def test_rescans_only_after_close(self):
+        schedule = CandleCloseSchedule(["BTCUSDT"], ["15m", "1h"], spread=0, close_delay=2, now=0)
+        assert _drain(schedule, 0) == {"BTCUSDT": ["15m", "1h"]}
+
+        assert schedule.due(600) == {}
+        assert schedule.due(902) == {"BTCUSDT": ["15m"]}
+        schedule.mark_scanned("BTCUSDT", ["15m"], 902)
+        assert schedule.due(1000) == {}
+        assert schedule.due(3602) == {"BTCUSDT": ["15m", "1h"]}
+
+    def test_symbols_spread_across_window(self):
+        schedule = CandleCloseSchedule(SYMBOLS, ["1h"], spread=30, close_delay=0, now=0)
+        _drain(schedule, 30)
+
+        fired = {}
+        for second in range(int(HOUR), int(HOUR) + 31):
+            for symbol in _drain(schedule, second):
+                fired[symbol] = second - HOUR
+        assert sorted(fired.values()) == [0, 5, 10, 15, 20, 25]
+
+    def test_price_move_rescans_all_timeframes(self):
+        schedule = CandleCloseSchedule(["BTCUSDT", "ETHUSDT"], ["15m", "1h"], spread=0,
+                                       price_threshold=0.01, now=0)
+        schedule.observe_price("BTCUSDT", 100.0)
+        schedule.observe_price("ETHUSDT", 10.0)
+        _drain(schedule, 0)
+
+        schedule.observe_price("BTCUSDT", 100.5)
+        schedule.observe_price("ETHUSDT", 10.2)
+        assert schedule.due(60) == {"ETHUSDT": ["15m", "1h"]}
+        schedule.mark_scanned("ETHUSDT", ["15m", "1h"], 60)
+        assert schedule.due(61) == {}
+        assert schedule.get_stats(61)["price_triggers"] == 1
+
+    def test_scans_saved_against_fixed_sweep(self):
+        schedule = CandleCloseSchedule(SYMBOLS, ["15m", "1h", "1d"], spread=30, close_delay=0, now=0)
+        for second in range(0, 86400, 5):
+            _drain(schedule, second)
+
+        stats = schedule.get_stats(86400)
+        pairs = len(SYMBOLS) * 3
+        # A 30 s sweep scores every pair 2,880 times a day
+        assert stats["sweep_equivalent_scans"] == pytest.approx(pairs * 2880, rel=0.01)
+        # Initial scan plus one per closed bar: 95 x 15m, 23 x 1h, no 1d close yet
+        assert stats["scans"] == len(SYMBOLS) * ((1 + 95) + (1 + 23) + 1)
+        assert stats["scans_saved"] == stats["sweep_equivalent_scans"] - stats["scans"]
+
+    def test_reconfigure_keeps_existing_pairs(self):
+        schedule = CandleCloseSchedule(["BTCUSDT"], ["1h"], spread=0, now=0)
+        _drain(schedule, 0)
+        schedule.configure(["BTCUSDT", "ETHUSDT"], ["1h"], now=10)
+        assert schedule.due(10) == {"ETHUSDT": ["1h"]}
@@ -0,0 +1,95 @@
+"""
+Tests for the incremental OHLCV candle store
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.data.candle_store import CandleSeries, CandleStore, interval_to_ms
+
+HOUR_MS = 3_600_000
+
+
+class FakeExchange:
+    """Serves the last ``limit`` candles of a growing series"""
+
+    def __init__(self, n_bars: int, start_ms: int):
+        self.ts = [start_ms + i * HOUR_MS for i in range(n_bars)]
+        self.close = [100.0 + i for i in range(n_bars)]
+        self.requests = []
+
+    def add_bar(self):
+        self.ts.append(self.ts[-1] + HOUR_MS)
+        self.close.append(self.close[-1] + 1)
+
+    async def get_klines(self, symbol, interval, limit):
+        self.requests.append(limit)
+        ts = self.ts[-limit:]
+        close = np.array(self.close[-limit:])
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(ts, unit='ms'),
+            'open': close, 'high': close + 1, 'low': close - 1,
+            'close': close, 'volume': np.ones(len(close)),
+        })
+
+
+class TestCandleSeries:
+
+    def test_interval_parsing(self):
+        assert interval_to_ms('15m') == 15 * 60_000
+        assert interval_to_ms('1hour') == HOUR_MS
+        assert interval_to_ms('1d') == 24 * HOUR_MS
+        with pytest.raises(ValueError):
+            interval_to_ms('abc')
+
+    def test_ring_buffer_wraps_with_contiguous_views(self):
+        series = CandleSeries('1h', capacity=5)
+        for i in range(12):
+            series.append(i * HOUR_MS, (i, i, i, float(i), 1.0))
+
+        view = series.view()
+        assert len(view) == 5
+        np.testing.assert_array_equal(view.close, [7, 8, 9, 10, 11])
+        assert view.close.base is not None  # a view, not a copy
+        assert not view.close.flags.writeable
+
+        series.update_last((11, 12, 10, 11.5, 2.0))
+        assert view.close[-1] == 11.5  # views see in-place live updates
+
+
+class TestCandleStore:
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh(self):
+        import time
+        now_ms = int(time.time() * 1000)
+        exchange = FakeExchange(300, now_ms - 299 * HOUR_MS)
+        store = CandleStore(refresh_seconds=0)
+
+        view = await store.get_view('fake', 'BTCUSDT', '1h', 200, exchange.get_klines)
+        assert len(view) == 200
+        assert exchange.requests == [200]
+
+        # Live candle ticks: only a couple of bars are re-requested
+        exchange.close[-1] += 0.5
+        view = await store.get_view('fake', 'BTCUSDT', '1h', 200, exchange.get_klines)
+        assert exchange.requests[-1] <= 3
+        assert view.close[-1] == exchange.close[-1]
+
+        # A new candle opens and gets appended
+        exchange.add_bar()
+        frame = await store.get_frame('fake', 'BTCUSDT', '1h', 200, exchange.get_klines)
+        assert len(frame) == 200
+        assert frame['close'].iloc[-1] == exchange.close[-1]
+        assert frame['timestamp'].iloc[-1] == pd.to_datetime(exchange.ts[-1], unit='ms')
+        assert store.get_stats()['full_fetches'] == 1
+
+    @pytest.mark.asyncio
+    async def test_fresh_hits_skip_fetch(self):
+        exchange = FakeExchange(100, 0)
+        store = CandleStore(refresh_seconds=60)
+        await store.get_view('fake', 'ETHUSDT', '1h', 50, exchange.get_klines)
+        await store.get_view('fake', 'ETHUSDT', '1h', 50, exchange.get_klines)
+        assert len(exchange.requests) == 1
+        assert store.get_stats()['fresh_hits'] == 1
@@ -0,0 +1,201 @@
+"""
+Tests for the async database layer: SQLite WAL, bulk upserts, keyset pages and rollups
+"""
+
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # keep the module-level engine in memory
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.database.connection import async_url, create_indexes, make_async_engine, make_engine
+from backend.database.models import Base, SignalRecord, SymbolRollup, SystemMetrics, TradeRecord
+from backend.database.repository import (
+    bulk_update, decode_cursor, encode_cursor, fetch_page, insert_system_metrics, rebuild_rollups, record_batch,
+    rollup_series, rollup_totals, upsert_signals, upsert_trades
+)
+
+T0 = datetime(2026, 1, 1)
+
+
+def _signal(i, **overrides):
+    row = {
+        'id': f"sig_{i:04d}", 'symbol': 'BTCUSDT', 'timestamp': T0 + timedelta(minutes=i // 3),
+        'action': 'BUY', 'confidence': 0.7, 'final_score': 0.7, 'rsi_macd_score': 0.5, 'smc_score': 0.5,
+        'pattern_score': 0.5, 'sentiment_score': 0.5, 'ml_score': 0.5, 'price': 100.0 + i
+    }
+    row.update(overrides)
+    return row
+
+
+@asynccontextmanager
+async def _database(tmp_path):
+    engine = make_async_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            yield db
+    finally:
+        await engine.dispose()
+
+
+def test_async_url():
+    assert async_url("sqlite:///./hts_trading.db") == "sqlite+aiosqlite:///./hts_trading.db"
+    assert async_url("postgresql://u:p@db/hts") == "postgresql+asyncpg://u:p@db/hts"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_runs_in_wal_mode(tmp_path):
+    async with _database(tmp_path) as db:
+        assert (await db.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_inserts_then_updates(tmp_path):
+    async with _database(tmp_path) as db:
+        await upsert_signals(db, [_signal(i) for i in range(1200)])  # spans several statements
+        await db.commit()
+        await upsert_signals(db, [_signal(1, price=1.0, executed=True), _signal(1200)])
+        await db.commit()
+
+        assert (await db.execute(select(SignalRecord).where(SignalRecord.id == 'sig_0001'))).scalar_one().price == 1.0
+        count = (await db.execute(text("SELECT COUNT(*) FROM signal_records"))).scalar()
+        assert count == 1201
+
+
+@pytest.mark.asyncio
+async def test_trades_and_metrics(tmp_path):
+    async with _database(tmp_path) as db:
+        await upsert_trades(db, [{'id': 'a', 'symbol': 'BTCUSDT', 'direction': 'LONG', 'entry_price': 100.0,
+                                  'quantity': 1.0, 'entry_time': T0, 'status': 'OPEN'}])
+        await bulk_update(db, TradeRecord, [{'id': 'a', 'exit_price': 110.0, 'net_pnl': 10.0, 'status': 'CLOSED'}])
+        await insert_system_metrics(db, [{'timestamp': T0, 'cpu_usage': 0.5}, {'timestamp': T0, 'cpu_usage': 0.6}])
+        await db.commit()
+
+        trade = await db.get(TradeRecord, 'a')
+        assert trade.status == 'CLOSED' and trade.net_pnl == 10.0
+        metrics = (await db.execute(select(SystemMetrics))).scalars().all()
+        assert len({m.id for m in metrics}) == 2
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_everything_once(tmp_path):
+    async with _database(tmp_path) as db:
+        await upsert_signals(db, [_signal(i) for i in range(250)])
+        await db.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = await fetch_page(db, SignalRecord, SignalRecord.timestamp, limit=40, cursor=cursor)
+            seen.extend(signal.id for signal in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        # Newest first, ties on timestamp broken by id, no gaps or repeats across pages
+        assert seen == sorted((_signal(i)['id'] for i in range(250)), key=lambda s: (int(s[4:]) // 3, s),
+                              reverse=True)
+
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_include_null_sort_values(tmp_path):
+    async with _database(tmp_path) as db:
+        await upsert_trades(db, [_trade(f"t{i:02d}", 'BTCUSDT', i, **({'entry_time': None} if i % 3 == 0 else {}))
+                                 for i in range(20)])
+        await db.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = await fetch_page(db, TradeRecord, TradeRecord.entry_time, limit=4, cursor=cursor)
+            seen.extend(trade.id for trade in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        dated = [f"t{i:02d}" for i in reversed(range(20)) if i % 3]
+        assert seen == dated + [f"t{i:02d}" for i in reversed(range(20)) if i % 3 == 0]
+
+        with pytest.raises(ValueError):
+            await fetch_page(db, TradeRecord, TradeRecord.entry_time, cursor=encode_cursor(5, 't01'))
+
+
+def _trade(trade_id, symbol, hours, **overrides):
+    row = {'id': trade_id, 'symbol': symbol, 'direction': 'LONG', 'entry_price': 100.0, 'quantity': 1.0,
+           'entry_time': T0 + timedelta(hours=hours), 'status': 'OPEN'}
+    row.update(overrides)
+    return row
+
+
+def _close(trade_id, hours, pnl):
+    return {'id': trade_id, 'exit_price': 100.0 + pnl, 'exit_time': T0 + timedelta(hours=hours), 'net_pnl': pnl}
+
+
+async def _history(db):
+    signals = [_signal(i, symbol='ETHUSDT' if i % 4 == 0 else 'BTCUSDT', action='SELL' if i % 5 == 0 else 'BUY',
+                       timestamp=T0 + timedelta(minutes=20 * i), final_score=i / 100) for i in range(90)]
+    await record_batch(db, signals=signals, trades=[_trade('a', 'BTCUSDT', 1), _trade('b', 'BTCUSDT', 2)])
+    # 'c' is opened and closed in one batch; 'a' is closed twice, which must only count once
+    await record_batch(db, trades=[_trade('c', 'ETHUSDT', 3)],
+                       closes=[_close('a', 5, 12.0), _close('c', 26, -4.0)])
+    await record_batch(db, signals=signals[:10], closes=[_close('a', 6, 12.0), _close('b', 27, 3.0)])
+    await db.commit()
+
+
+async def _rollups(db):
+    rows = await rollup_series(db, 'hour', limit=1000) + await rollup_series(db, 'day', limit=1000)
+    return sorted(rows, key=lambda row: (row['period'], row['bucket_start'], row['symbol']))
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_inserts_and_closes(tmp_path):
+    async with _database(tmp_path) as db:
+        await _history(db)
+
+        days = {(row['bucket_start'].day, row['symbol']): row for row in await rollup_series(db, 'day')}
+        btc, eth = days[(1, 'BTCUSDT')], days[(1, 'ETHUSDT')]
+        first_day = [i for i in range(90) if i * 20 < 24 * 60]
+        assert btc['signals'] + eth['signals'] == len(first_day)
+        assert eth['signals'] == len([i for i in first_day if i % 4 == 0])
+        assert btc['trades_opened'] == 2 and btc['trades_closed'] == 1 and btc['net_pnl'] == 12.0
+        assert btc['win_rate'] == 1.0
+        assert days[(2, 'ETHUSDT')]['net_pnl'] == -4.0 and days[(2, 'BTCUSDT')]['winning_trades'] == 1
+
+        hours = await rollup_series(db, 'hour', symbol='ETHUSDT', limit=1000)
+        assert sum(row['signals'] for row in hours) == len([i for i in range(90) if i % 4 == 0])
+        assert all(row['bucket_start'].minute == 0 for row in hours)
+
+        totals = await rollup_totals(db, since=T0 + timedelta(hours=4))
+        assert totals['BTCUSDT']['trades_closed'] == 2 and totals['BTCUSDT']['net_pnl'] == 15.0
+        assert totals['ETHUSDT']['gross_loss'] == 4.0 and totals['ETHUSDT']['profit_factor'] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_rollups(tmp_path):
+    async with _database(tmp_path) as db:
+        await _history(db)
+        incremental = await _rollups(db)
+
+        assert await rebuild_rollups(db) == len(incremental)
+        await db.commit()
+        assert await _rollups(db) == incremental
+
+
+def test_indexes_added_to_existing_tables(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_signal_records_symbol_timestamp"))
+
+    create_indexes(engine)
+    with engine.connect() as conn:
+        names = {row[1] for row in conn.execute(text("PRAGMA index_list(signal_records)"))}
+    assert {"ix_signal_records_symbol_timestamp", "ix_signal_records_timestamp_id"} <= names
+    engine.dispose()
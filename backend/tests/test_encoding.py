@@ -0,0 +1,102 @@
+"""
+Tests for negotiated WebSocket/REST encodings
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core import encoding
+from backend.core.encoding import EncodedMessage, decode, encode, negotiate, to_columns
+from backend.websocket.manager import ConnectionManager
+
+
+class TestEncode:
+
+    def test_numpy_and_datetime_handled(self):
+        message = {
+            "ts": datetime(2024, 1, 2, 3, 4, 5),
+            "price": np.float64(1.5),
+            "count": np.int64(3),
+            "series": np.array([1.0, 2.0]),
+        }
+        decoded = json.loads(encode(message))
+        assert decoded == {"ts": "2024-01-02T03:04:05", "price": 1.5, "count": 3, "series": [1.0, 2.0]}
+
+    def test_negotiate_falls_back_to_json(self):
+        assert negotiate(None) == "json"
+        assert negotiate("cbor, orjson") == "json"
+        if encoding.MSGPACK_AVAILABLE:
+            assert negotiate("msgpack,json") == "msgpack"
+        else:
+            assert negotiate("msgpack") == "json"
+
+    def test_encoded_once_per_encoding(self, monkeypatch):
+        calls = []
+        real_encode = encoding.encode
+        monkeypatch.setattr(encoding, "encode", lambda obj, enc="json": calls.append(enc) or real_encode(obj, enc))
+
+        message = EncodedMessage({"type": "price_update", "price": 1.0})
+        frames = {message.get("json") for _ in range(500)}
+        assert len(frames) == 1 and calls == ["json"]
+
+    def test_msgpack_roundtrip(self):
+        pytest.importorskip("msgpack")
+        frame = encode({"a": np.arange(3), "t": datetime(2024, 1, 1)}, "msgpack")
+        assert isinstance(frame, bytes)
+        assert decode(frame, "msgpack") == {"a": [0, 1, 2], "t": "2024-01-01T00:00:00"}
+
+
+class TestColumns:
+
+    def test_ohlcv_frame_to_columns(self):
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime([0, 3_600_000], unit="ms"),
+            "close": [1.0, 2.0],
+            "symbol": ["BTC", "BTC"],
+        })
+        packed = to_columns(df)
+        assert packed["columns"] == ["timestamp", "close", "symbol"]
+        assert packed["length"] == 2
+
+        decoded = json.loads(encode(packed))
+        assert decoded["data"] == {"timestamp": [0, 3_600_000], "close": [1.0, 2.0], "symbol": ["BTC", "BTC"]}
+
+    def test_records_to_columns_is_smaller(self):
+        records = [{"timestamp": f"2024-01-{d:02d}", "equity": 10000.0 + d, "pnl": float(d)} for d in range(1, 29)]
+        assert len(encode(to_columns(records))) < len(encode(records))
+
+
+class FakeSocket:
+    def __init__(self):
+        self.text, self.binary = [], []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.text.append(frame)
+
+    async def send_bytes(self, frame):
+        self.binary.append(frame)
+
+
+class TestNegotiatedFanOut:
+
+    @pytest.mark.asyncio
+    async def test_clients_receive_their_encoding(self):
+        pytest.importorskip("msgpack")
+        manager = ConnectionManager()
+        json_ws, msgpack_ws = FakeSocket(), FakeSocket()
+        await manager.connect(json_ws)
+        await manager.connect(msgpack_ws, encoding="msgpack")
+
+        await manager.broadcast({"type": "ping", "n": np.int64(1)})
+        await asyncio.sleep(0.01)
+
+        assert json.loads(json_ws.text[0]) == {"type": "ping", "n": 1}
+        assert decode(msgpack_ws.binary[0], "msgpack") == {"type": "ping", "n": 1}
@@ -0,0 +1,105 @@
+"""
+Tests for the searchsorted equity curve engine
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from backend.trading.equity_curve import EquityCurveEngine, bucket_freq
+from backend.trading.pnl_calculator import PnLCalculator
+from backend.trading.trade_logger import ClosedTradeIndex, TradeLogger
+
+NOW = datetime(2026, 3, 15, 13, 30)
+
+
+def _close_random(index, count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        index.add(rng.uniform(-5, 5), 0.1, NOW - timedelta(hours=rng.uniform(0, 24 * 60)))
+
+
+def _loop_curve(rows, start, end, freq):
+    """The per-timestamp filtering generate_equity_curve used to do"""
+    trades = pd.DataFrame(rows, columns=['exit_time', 'pnl'])
+    trades = trades[(trades['exit_time'] >= start) & (trades['exit_time'] <= end)]
+    points = []
+    for timestamp in pd.date_range(start=start, end=end, freq=freq):
+        before = trades[trades['exit_time'] <= timestamp]
+        same_day = before[before['exit_time'].dt.date == timestamp.date()]
+        points.append((before['pnl'].sum(), same_day['pnl'].sum(), len(before)))
+    return points
+
+
+def _rows(index):
+    return [(t, pnl) for t, (pnl, _) in zip(index.exit_times, index.rows)]
+
+
+class TestEquityCurveEngine:
+
+    @pytest.mark.parametrize("freq", ['D', '4h', '90min'])
+    def test_matches_per_timestamp_filtering(self, freq):
+        index = ClosedTradeIndex()
+        _close_random(index, 400, seed=1)
+        start, end = NOW - timedelta(days=30), NOW
+
+        curve = EquityCurveEngine(index).curve(start, end, freq)
+        expected = _loop_curve(_rows(index), start, end, freq)
+        assert len(curve) == len(expected)
+        for point, (total, daily, count) in zip(curve, expected):
+            assert point['total_pnl'] == pytest.approx(total)
+            assert point['daily_pnl'] == pytest.approx(daily)
+            assert point['trade_count'] == count
+            assert point['portfolio_value'] == pytest.approx(10000 + total)
+
+    def test_extends_as_trades_close(self):
+        index = ClosedTradeIndex()
+        engine = EquityCurveEngine(index)
+        start = NOW - timedelta(days=60)
+        assert engine.curve(start, NOW) == []
+
+        _close_random(index, 50, seed=2)
+        engine.curve(start, NOW)
+        _close_random(index, 300, seed=3)  # includes exits before ones already mirrored
+
+        assert engine.curve(start, NOW, 'h') == EquityCurveEngine(index).curve(start, NOW, 'h')
+        assert len(engine.times) == 350
+
+    def test_monthly_periods_match_groupby(self):
+        index = ClosedTradeIndex()
+        _close_random(index, 500, seed=4)
+        frame = pd.DataFrame(_rows(index), columns=['exit_time', 'pnl'])
+        grouped = frame.groupby(frame['exit_time'].dt.to_period('M'))['pnl']
+
+        periods = EquityCurveEngine(index).periods('M')
+        assert [p['period'] for p in periods] == [str(m) for m in grouped.groups]
+        for period, (_, pnl) in zip(periods, grouped):
+            assert period['total_pnl'] == pytest.approx(pnl.sum())
+            assert period['total_trades'] == len(pnl)
+            assert period['winning_trades'] == (pnl > 0).sum()
+            assert period['best_trade'] == pnl.max() and period['worst_trade'] == pnl.min()
+            assert period['total_commission'] == pytest.approx(0.1 * len(pnl))
+
+    def test_bucket_freq(self):
+        assert bucket_freq('1H') == 'h' and bucket_freq('1D') == 'D'
+        assert bucket_freq('15min') == '15min'
+        assert bucket_freq('nonsense') == 'D'
+
+
+@pytest.mark.asyncio
+async def test_calculator_uses_logger_index():
+    logger = TradeLogger()
+    calculator = PnLCalculator()
+    calculator.trade_logger = logger
+    assert (await calculator.generate_equity_curve())[0]['trade_count'] == 0
+
+    await logger.log_trade_execution({'id': 'a', 'symbol': 'BTCUSDT', 'action': 'BUY', 'quantity': 1,
+                                      'entry_price': 100})
+    await logger.close_trade('a', 110, datetime.now() - timedelta(hours=1))
+    curve = await calculator.generate_equity_curve('1H', days_back=1)
+    assert curve[-1]['total_pnl'] == pytest.approx(10) and curve[-1]['trade_count'] == 1
+
+    monthly = await calculator.get_monthly_performance()
+    assert len(monthly) == 1 and monthly[0]['winning_trades'] == 1
@@ -0,0 +1,80 @@
+"""
+Tests for the shared detector feature bundle and pivot helpers
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.analytics.pivots import find_pivots, window_pivots
+from scoring.engine import DynamicScoringEngine, WeightConfig
+from scoring.features import FeatureCache
+
+
+def _sample(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(n, dtype=np.int64) * 3_600_000, unit='ms'),
+        'open': closes, 'high': closes + rng.random(n), 'low': closes - rng.random(n),
+        'close': closes, 'volume': np.ones(n),
+    })
+
+
+def _naive_pivots(values, lookback, kind):
+    out = []
+    for i in range(lookback, len(values) - lookback):
+        neighbours = np.concatenate([values[i - lookback:i], values[i + 1:i + lookback + 1]])
+        if (kind == "high" and (values[i] > neighbours).all()) or (kind == "low" and (values[i] < neighbours).all()):
+            out.append(i)
+    return out
+
+
+class TestPivots:
+
+    def test_matches_naive_scan(self):
+        highs = _sample()['high'].to_numpy()
+        for lookback in (2, 3, 5):
+            for kind in ("high", "low"):
+                assert find_pivots(highs, lookback, kind).tolist() == _naive_pivots(highs, lookback, kind)
+
+    def test_window_pivots_equal_pivots_of_window(self):
+        closes = _sample()['close'].to_numpy()
+        full = find_pivots(closes, 3, "low")
+        for window in (20, 50, 299, 300):
+            expected = find_pivots(closes[-window:], 3, "low").tolist()
+            assert window_pivots(full, len(closes), window, 3) == expected
+
+
+class TestFeatureCache:
+
+    def test_memoized_per_last_bar(self):
+        df = _sample()
+        cache = FeatureCache()
+        bundle = cache.get(df, 'BTCUSDT', '1h')
+        assert cache.get(df, 'BTCUSDT', '1h') is bundle
+        assert bundle.pivots('high', 'high') is bundle.pivots('high', 'high')
+        assert len(bundle) == len(df)
+        assert not np.isnan(bundle.latest('rsi'))
+
+        # Live candle ticks with the same open time: recomputed, not served stale
+        ticked = df.copy()
+        ticked.loc[ticked.index[-1], 'close'] += 1.0
+        assert cache.get(ticked, 'BTCUSDT', '1h') is not bundle
+        assert cache.get_stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_engine_passes_bundle_to_detectors(self):
+        seen = []
+
+        class Probe:
+            async def detect(self, ohlcv, context):
+                seen.append(context.get('features'))
+                raise RuntimeError("probe")
+
+        engine = DynamicScoringEngine({'smc': Probe(), 'sar': Probe()}, WeightConfig())
+        df = _sample()
+        await engine.score(df, {'symbol': 'BTCUSDT', 'timeframe': '1h'})
+
+        assert seen[0] is not None and seen[0] is seen[1]
+        assert len(seen[0]) == len(df)
@@ -0,0 +1,87 @@
+"""
+Tests for shared WebSocket feed pumps
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.websocket.feed_pump import FeedPumpRegistry
+from backend.websocket.manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(text)
+
+
+class TestFeedPump:
+
+    @pytest.mark.asyncio
+    async def test_upstream_load_independent_of_clients(self):
+        manager = ConnectionManager()
+        registry = FeedPumpRegistry(manager)
+        calls = 0
+
+        def factory():
+            async def produce():
+                nonlocal calls
+                calls += 1
+                return {"type": "price_update", "n": calls}
+            return produce
+
+        sockets = [FakeSocket() for _ in range(50)]
+        for ws in sockets:
+            await manager.connect(ws)
+            registry.get("prices:BTCUSDT", factory, interval=0.01).attach(ws)
+
+        await asyncio.sleep(0.035)
+        pump = registry.pumps["prices:BTCUSDT"]
+        assert len(registry.pumps) == 1
+        assert 1 <= calls <= 5
+        assert pump.messages_published == calls
+
+        # Every client got the same serialized frames
+        first = sockets[0].sent
+        assert json.loads(first[0])["n"] == 1
+        assert all(ws.sent[:len(first) - 1] == first[:len(first) - 1] for ws in sockets)
+        assert first[0] is sockets[-1].sent[0]
+
+        for ws in sockets:
+            pump.detach(ws)
+        assert not pump.running
+        assert registry.pumps == {}  # idle pumps don't accumulate per topic
+
+    @pytest.mark.asyncio
+    async def test_failed_socket_is_dropped(self):
+        manager = ConnectionManager()
+        registry = FeedPumpRegistry(manager)
+
+        def factory():
+            async def produce():
+                return {"type": "signals_update"}
+            return produce
+
+        good, bad = FakeSocket(), FakeSocket(fail=True)
+        pump = registry.get("signals", factory, interval=0.01)
+        for ws in (good, bad):
+            await manager.connect(ws)
+            pump.attach(ws)
+
+        await asyncio.sleep(0.025)
+        assert bad not in manager.active_connections
+        assert manager.topic_subscriber_count("signals") == 1
+        assert good.sent
+
+        pump.detach(good)
+        assert not pump.running
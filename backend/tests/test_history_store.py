@@ -0,0 +1,95 @@
+"""
+Tests for the memory-mapped on-disk candle history
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.data.history_store import HistoryStore, view_to_bars
+
+HOUR_MS = 3_600_000
+
+
+def _ms(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class FakeExchange:
+    """Hourly candles with a maintenance hole; records every range request"""
+
+    def __init__(self, hole=()):
+        self.hole = set(hole)
+        self.requests = []
+
+    async def fetch(self, symbol, interval, start_ms, end_ms):
+        self.requests.append((start_ms, end_ms))
+        ts = np.arange(start_ms, end_ms + 1, HOUR_MS)
+        ts = ts[~np.isin(ts, list(self.hole))]
+        close = ts / HOUR_MS % 1000 + 100.0
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(ts, unit='ms'),
+            'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+            'volume': np.ones(len(ts)),
+        })
+
+
+class TestHistoryStore:
+
+    @pytest.mark.asyncio
+    async def test_gap_fill_and_offline_reads(self, tmp_path):
+        hole = _ms(2024, 1, 10, 5)
+        exchange = FakeExchange(hole=[hole])
+        store = HistoryStore(root=str(tmp_path), max_fetch_bars=500)
+        start, end = _ms(2024, 1, 5), _ms(2024, 2, 20)
+
+        view = await store.get_range('fake', 'BTC/USDT', '1h', start, end, exchange.fetch)
+        expected = np.arange(start, end, HOUR_MS)
+        np.testing.assert_array_equal(view.timestamp, expected[expected != hole])
+        np.testing.assert_array_equal(view.close, view.timestamp / HOUR_MS % 1000 + 100.0)
+        assert len(exchange.requests) == 3  # 1104 bars in 500-bar chunks
+
+        # Another process: everything, including the hole, is served from disk
+        exchange.requests.clear()
+        store = HistoryStore(root=str(tmp_path))
+        again = await store.get_range('fake', 'BTC/USDT', '1h', start, end, exchange.fetch)
+        assert exchange.requests == []
+        np.testing.assert_array_equal(again.timestamp, view.timestamp)
+
+        # Extending the range only downloads the new tail
+        await store.get_range('fake', 'BTC/USDT', '1h', start, _ms(2024, 2, 21), exchange.fetch)
+        assert exchange.requests == [(end, _ms(2024, 2, 21) - 1)]
+
+    @pytest.mark.asyncio
+    async def test_single_month_range_is_a_memmap_view(self, tmp_path):
+        exchange = FakeExchange()
+        store = HistoryStore(root=str(tmp_path))
+        start, end = _ms(2024, 3, 1), _ms(2024, 3, 8)
+        await store.get_range('fake', 'ETHUSDT', '1h', start, end, exchange.fetch)
+
+        view = store.read_range('fake', 'ETHUSDT', '1h', _ms(2024, 3, 2), _ms(2024, 3, 3))
+        assert len(view) == 24
+        assert isinstance(view.close.base, np.memmap) or isinstance(view.close, np.memmap)
+        assert not view.close.flags.writeable
+        bars = view_to_bars(view)
+        assert bars[0]['ts'] == _ms(2024, 3, 2) and bars[-1]['close'] == view.close[-1]
+        assert (tmp_path / 'fake' / 'ETHUSDT' / '1h' / '2024-03.bin').exists()
+
+    @pytest.mark.asyncio
+    async def test_open_partitions_are_bounded(self, tmp_path):
+        exchange = FakeExchange()
+        store = HistoryStore(root=str(tmp_path), max_fetch_bars=5000, max_open_partitions=2)
+        start, end = _ms(2024, 1, 1), _ms(2024, 6, 1)
+        january = store._partition('fake', 'BTCUSDT', '1h', datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+        view = await store.get_range('fake', 'BTCUSDT', '1h', start, end, exchange.fetch)
+        np.testing.assert_array_equal(view.timestamp, np.arange(start, end, HOUR_MS))
+        assert store.get_stats()['partitions_open'] == 2
+        assert january._ts is None and january._cols == {}  # evicted and closed
+
+        # Evicted months are reopened from disk on demand
+        again = store.read_range('fake', 'BTCUSDT', '1h', start, end)
+        np.testing.assert_array_equal(again.close, view.close)
+        assert store.get_stats()['partitions_open'] == 2
@@ -0,0 +1,106 @@
+"""
+Tests for the shared exchange HTTP connection pool
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.data.http_pool import HttpPool, http_pool
+from backend.data.binance_client import BinanceClient
+from backend.data.exceptions import TimeoutError as DataTimeoutError
+
+
+class TestHttpPool:
+    """Pool reuse and per-host isolation"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_per_host(self):
+        pool = HttpPool()
+        a = pool.get_client("https://api.binance.com")
+        b = pool.get_client("https://api.binance.com")
+        c = pool.get_client("https://api.kucoin.com")
+
+        assert a is b
+        assert a is not c
+        assert set(pool.get_stats()['hosts']) == {"https://api.binance.com", "https://api.kucoin.com"}
+
+        await pool.aclose()
+        assert a.is_closed and c.is_closed
+        assert pool.get_stats()['hosts'] == []
+
+    @pytest.mark.asyncio
+    async def test_closed_client_recreated(self):
+        pool = HttpPool()
+        a = pool.get_client("https://example.com")
+        await a.aclose()
+        b = pool.get_client("https://example.com")
+        assert b is not a
+        await pool.aclose()
+
+    def test_client_from_previous_loop_closed(self):
+        pool = HttpPool()
+
+        async def get():
+            return pool.get_client("https://example.com")
+
+        old = asyncio.run(get())
+
+        async def replace():
+            new = pool.get_client("https://example.com")
+            await asyncio.sleep(0)
+            return new
+
+        new = asyncio.run(replace())
+        assert new is not old and old.is_closed and not new.is_closed
+        asyncio.run(pool.aclose())
+
+
+class TestBinanceClientPooled:
+    """Binance client over the pooled async transport"""
+
+    def _install(self, client: BinanceClient, handler):
+        mock = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        http_pool._clients[client.base_url] = (mock, asyncio.get_running_loop())
+        return mock
+
+    @pytest.mark.asyncio
+    async def test_get_klines(self):
+        client = BinanceClient(testnet=True)
+        rows = [
+            [1700000000000 + i * 3600000, "100", "101", "99", "100.5", "10",
+             0, "0", 0, "0", "0", "0"]
+            for i in range(20)
+        ]
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json=rows)
+
+        mock = self._install(client, handler)
+        try:
+            df = await client.get_klines("BTCUSDT", "1h", 20)
+        finally:
+            await mock.aclose()
+            http_pool._clients.pop(client.base_url, None)
+
+        assert seen == ["/api/v3/klines"]
+        assert len(df) == 20
+        assert df['close'].iloc[-1] == 100.5
+
+    @pytest.mark.asyncio
+    async def test_timeout_maps_to_data_timeout(self):
+        client = BinanceClient(testnet=True)
+
+        def handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        mock = self._install(client, handler)
+        try:
+            with pytest.raises(DataTimeoutError):
+                await client.get_ticker_price.retry_with(stop=lambda _: True, reraise=True)(client, "BTCUSDT")
+        finally:
+            await mock.aclose()
+            http_pool._clients.pop(client.base_url, None)
@@ -0,0 +1,186 @@
+"""
+Tests for exchange WebSocket ingestion against a local replay server
+"""
+
+import asyncio
+import json
+import time
+
+import pandas as pd
+import pytest
+import websockets
+
+from backend.data.candle_store import CandleStore, bar_open_ms
+from backend.data.market_stream import (
+    BinanceStreamProtocol, CandleClosed, KuCoinStreamProtocol, MarketStreamIngestor, TickerEvent, TradeEvent
+)
+
+MINUTE = 60_000
+
+
+def _trade(ts, price, qty, symbol="BTCUSDT"):
+    return {"stream": f"{symbol.lower()}@aggTrade",
+            "data": {"e": "aggTrade", "E": ts, "s": symbol, "p": str(price), "q": str(qty), "T": ts}}
+
+
+def _kline(open_time, interval, o, h, l, c, v, closed, symbol="BTCUSDT"):
+    return {"stream": f"{symbol.lower()}@kline_{interval}",
+            "data": {"e": "kline", "E": open_time + 1, "s": symbol,
+                     "k": {"t": open_time, "i": interval, "o": str(o), "h": str(h), "l": str(l),
+                           "c": str(c), "v": str(v), "x": closed}}}
+
+
+def _ticker(ts, symbol="BTCUSDT"):
+    return {"stream": f"{symbol.lower()}@miniTicker",
+            "data": {"e": "24hrMiniTicker", "E": ts, "s": symbol, "o": "100", "c": "101", "h": "110",
+                     "l": "90", "v": "1234", "q": "0"}}
+
+
+class ReplayServer:
+    """Serves one recorded frame list per connection, then hangs up"""
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.paths = []
+
+    async def handler(self, websocket):
+        self.paths.append(getattr(getattr(websocket, 'request', None), 'path', None))
+        frames = self.sessions.pop(0) if self.sessions else []
+        for frame in frames:
+            await websocket.send(json.dumps(frame))
+        if self.sessions:
+            return  # drop the connection; the client must reconnect
+        await websocket.wait_closed()
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+def _future_bar():
+    # Replayed trades sit after the backfill cutoff (wall clock at connect)
+    return bar_open_ms(int(time.time() * 1000) + 10 * MINUTE, 5 * MINUTE)
+
+
+class TestMarketStream:
+
+    @pytest.mark.asyncio
+    async def test_trades_aggregate_into_every_interval(self):
+        base = _future_bar()
+        frames = [
+            _trade(base, 100, 1), _trade(base + 10_000, 105, 2), _trade(base + 20_000, 95, 1),
+            _trade(base + MINUTE + 1, 101, 1),
+            _kline(base + MINUTE, "1m", 101, 107, 99, 102, 3.5, True),
+            _trade(base + 2 * MINUTE, 103, 1),
+            _ticker(base),
+        ]
+        store = CandleStore()
+        events = []
+        async with ReplayServer([frames]) as server:
+            stream = MarketStreamIngestor(BinanceStreamProtocol(server.url), ["BTCUSDT"], ["1m", "5m"], store=store)
+            stream.add_listener(events.append)
+            stream.start()
+            await _until(lambda: stream.stats["tickers"] == 1)
+            await stream.stop()
+
+        assert "btcusdt@aggTrade" in server.paths[0] and "btcusdt@kline_5m" in server.paths[0]
+
+        minute = store.get_series("binance", "BTCUSDT", "1m").view()
+        assert minute.timestamp.tolist() == [base, base + MINUTE, base + 2 * MINUTE]
+        assert [minute.open[0], minute.high[0], minute.low[0], minute.close[0], minute.volume[0]] == [100, 105, 95, 95, 4]
+        # The exchange kline reconciled the second bar
+        assert [minute.high[1], minute.close[1], minute.volume[1]] == [107, 102, 3.5]
+
+        # Built from trades only; a 1m kline does not touch the 5m bar
+        five = store.get_series("binance", "BTCUSDT", "5m").view()
+        assert five.timestamp.tolist() == [base]
+        assert [five.open[0], five.high[0], five.low[0], five.close[0], five.volume[0]] == [100, 105, 95, 103, 6]
+
+        closes = [(e.interval, e.open_time) for e in events if isinstance(e, CandleClosed)]
+        assert closes == [("1m", base), ("1m", base + MINUTE)]
+        assert stream.tickers["BTCUSDT"]["change_24h"] == pytest.approx(1.0)
+        assert sum(isinstance(e, TradeEvent) for e in events) == 5
+
+    @pytest.mark.asyncio
+    async def test_reconnect_backfills_gap_and_stops_polling(self):
+        calls = []
+
+        async def fetch_klines(symbol, interval, limit):
+            calls.append(limit)
+            now_bar = bar_open_ms(int(time.time() * 1000), MINUTE)
+            opens = [now_bar - i * MINUTE for i in reversed(range(limit))]
+            return pd.DataFrame({"timestamp": opens, "open": 1.0, "high": 1.0, "low": 1.0,
+                                 "close": 1.0, "volume": 1.0})
+
+        base = _future_bar()
+        sessions = [
+            [_trade(base, 100, 1), _trade(base + 1000, 101, 1)],
+            [_trade(base + 2000, 99, 1)],
+        ]
+        store = CandleStore()
+        async with ReplayServer(sessions) as server:
+            stream = MarketStreamIngestor(BinanceStreamProtocol(server.url), ["BTCUSDT"], ["1m"], store=store,
+                                          backfill=fetch_klines, backfill_limit=50, reconnect_delay=0.01)
+            stream.start()
+            await _until(lambda: stream.stats["trades"] == 3)
+
+            assert stream.stats["connects"] == 2 and stream.stats["reconnects"] == 1
+            # Full window on first connect, only the gap after the reconnect
+            assert calls[0] == 50 and calls[1] < 50
+            assert store.stats["full_fetches"] == 1 and store.stats["incremental_fetches"] == 1
+
+            # A reader within the refresh window is served from the stream, not REST
+            view = await store.get_view("binance", "BTCUSDT", "1m", 50, fetch_klines, max_age=5)
+            assert len(calls) == 2
+            assert view.timestamp[-1] == base and view.close[-1] == 99 and view.volume[-1] == 3
+            await stream.stop()
+
+    @pytest.mark.asyncio
+    async def test_unparseable_frames_counted(self):
+        async with ReplayServer([[{"result": None, "id": 1}, _trade(_future_bar(), 1, 1)]]) as server:
+            stream = MarketStreamIngestor(BinanceStreamProtocol(server.url), ["BTCUSDT"], ["1m"], store=CandleStore())
+            stream.start()
+            await _until(lambda: stream.stats["trades"] == 1)
+            await stream.stop()
+        assert stream.stats["messages"] == 2 and stream.stats["parse_errors"] == 0
+
+
+class TestKuCoinProtocol:
+
+    def test_parse_topics(self):
+        protocol = KuCoinStreamProtocol()
+        messages = protocol.subscribe_messages(["BTCUSDT"], ["1h"])
+        assert [m["topic"] for m in messages] == [
+            "/market/match:BTC-USDT", "/market/snapshot:BTC-USDT", "/market/candles:BTC-USDT_1hour"
+        ]
+
+        trade, = protocol.parse({"type": "message", "topic": "/market/match:BTC-USDT",
+                                 "data": {"symbol": "BTC-USDT", "price": "100.5", "size": "0.2",
+                                          "time": "1700000000123000000"}})
+        assert trade == TradeEvent("BTCUSDT", 1700000000123, 100.5, 0.2)
+
+        candle, = protocol.parse({"type": "message", "topic": "/market/candles:BTC-USDT_1hour",
+                                  "data": {"symbol": "BTC-USDT", "time": 1700000000000000000,
+                                           "candles": ["1699999200", "1", "2", "3", "0.5", "10", "20"]}})
+        assert (candle.symbol, candle.interval, candle.open_time) == ("BTCUSDT", "1h", 1699999200000)
+        assert (candle.open, candle.close, candle.high, candle.low) == (1.0, 2.0, 3.0, 0.5)
+
+        ticker, = protocol.parse({"type": "message", "topic": "/market/snapshot:BTC-USDT",
+                                  "data": {"sequence": 1, "data": {"symbol": "BTC-USDT", "lastTradedPrice": 100,
+                                                                   "vol": 5, "high": 110, "low": 90,
+                                                                   "changeRate": 0.012, "datetime": 1700000000000}}})
+        assert isinstance(ticker, TickerEvent) and ticker.change_24h == pytest.approx(1.2)
@@ -0,0 +1,101 @@
+"""
+Tests for the in-process metrics registry and its instrumentation
+"""
+
+import httpx
+import pytest
+
+from backend.core.cache import AsyncLRUCache
+from backend.core.metrics import MetricsRegistry, UPSTREAM_SECONDS, metrics
+from backend.data.http_pool import MeteredTransport
+
+
+class TestRegistry:
+
+    def test_histogram_buckets_render_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("t_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            latency.observe(value, route="/a")
+
+        text = registry.render()
+        assert "# TYPE t_seconds histogram" in text
+        assert 't_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 't_seconds_bucket{route="/a",le="1"} 3' in text
+        assert 't_seconds_bucket{route="/a",le="+Inf"} 4' in text
+        assert 't_seconds_count{route="/a"} 4' in text and 't_seconds_sum{route="/a"} 2.65' in text
+
+    def test_histogram_memory_is_constant(self):
+        latency = MetricsRegistry().histogram("t_seconds", "Test latency")
+        for i in range(10_000):
+            latency.observe(i / 1000)
+        series, = latency._series.values()
+        assert len(series.counts) == len(latency.buckets) + 1 and series.count == 10_000
+
+    def test_summary_interpolates_quantiles(self):
+        latency = MetricsRegistry().histogram("t_seconds", "Test latency", ["kind"], buckets=(1, 2, 3, 4))
+        for value in (0.5, 1.5, 2.5, 3.5):
+            latency.observe(value, kind="a")
+        latency.observe(10, kind="b")
+
+        a = latency.summary(kind="a")
+        assert a["count"] == 4 and a["mean"] == pytest.approx(2.0)
+        assert a["p50"] == pytest.approx(2.0)
+        merged = latency.summary()
+        assert merged["count"] == 5 and merged["p99"] == 4  # past the last bound
+
+    def test_counters_gauges_and_collectors(self):
+        registry = MetricsRegistry()
+        hits = registry.counter("t_hits_total", "Hits", ["cache"])
+        hits.inc(cache="x")
+        hits.inc(2, cache="x")
+        assert hits.get(cache="x") == 3
+        with pytest.raises(ValueError):
+            hits.inc()
+
+        registry.gauge("t_depth", "Depth", collect=lambda: {(): 7})
+        registry.gauge("t_broken", "Broken", collect=lambda: 1 / 0)
+        text = registry.render()
+        assert 't_hits_total{cache="x"} 3' in text and "t_depth 7" in text
+        assert "t_broken unavailable" in text
+
+        assert registry.counter("t_hits_total", "Hits", ["cache"]) is hits
+        with pytest.raises(ValueError):
+            registry.gauge("t_hits_total", "Hits")
+        assert registry.snapshot()["t_hits_total"]["values"] == {"x": 3}
+
+    def test_labels_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("t_total", "Test", ["path"]).inc(path='a"b\\c')
+        assert 't_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+class TestInstrumentation:
+
+    def test_cache_hit_ratio_collected(self):
+        cache = AsyncLRUCache(max_entries=4, name="metrics_test")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        ratio = metrics.get("hts_cache_hit_ratio").get(cache="metrics_test")
+        assert ratio == pytest.approx(2 / 3)
+        assert metrics.get("hts_cache_misses_total").get(cache="metrics_test") == 1
+        assert 'hts_cache_entries{cache="metrics_test"} 1' in metrics.render()
+
+    @pytest.mark.asyncio
+    async def test_upstream_calls_timed_per_provider(self):
+        def handler(request):
+            if request.url.path == "/boom":
+                raise httpx.ConnectError("refused")
+            return httpx.Response(200, json={})
+
+        transport = MeteredTransport(httpx.MockTransport(handler), "metered.test")
+        async with httpx.AsyncClient(base_url="https://metered.test", transport=transport) as client:
+            await client.get("/ok")
+            with pytest.raises(httpx.ConnectError):
+                await client.get("/boom")
+
+        assert UPSTREAM_SECONDS.summary(provider="metered.test", status="200")["count"] == 1
+        assert UPSTREAM_SECONDS.summary(provider="metered.test", status="ConnectError")["count"] == 1
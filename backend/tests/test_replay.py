@@ -0,0 +1,103 @@
+"""
+Tests for the market data replay harness
+"""
+
+import json
+
+import pytest
+
+from backend.replay.harness import ReplayHarness, latency_summary, load_frames, run_replay
+
+BASE = 1_700_000_000_000
+
+
+def _write_ticks(path, count=50, step_ms=100):
+    lines = ["timestamp,symbol,price,quantity"]
+    for i in range(count):
+        symbol = "BTC/USDT" if i % 2 else "ETHUSDT"
+        lines.append(f"{BASE + i * step_ms},{symbol},{100 + i},0.5")
+    path.write_text("\n".join(lines) + "\n")
+
+
+class TestLoadFrames:
+
+    def test_candle_csv_in_seconds_becomes_closed_klines(self, tmp_path):
+        path = tmp_path / "candles.csv"
+        path.write_text("time,open,high,low,close,volume\n1700000000,1,2,0.5,1.5,10\n1700000060,1.5,3,1,2,5\n")
+        frames = load_frames(path, interval="1m", symbol="BTCUSDT")
+
+        assert [f["data"]["k"]["t"] for f in frames] == [BASE, BASE + 60_000]
+        assert frames[0]["data"]["E"] == BASE + 59_999 and frames[0]["data"]["k"]["x"] is True
+
+    def test_jsonl_and_missing_symbol(self, tmp_path):
+        path = tmp_path / "frames.jsonl"
+        frame = {"stream": "btcusdt@aggTrade",
+                 "data": {"e": "aggTrade", "E": BASE, "s": "BTCUSDT", "p": "1", "q": "1", "T": BASE}}
+        path.write_text(json.dumps(frame) + "\n\n")
+        assert load_frames(path) == [frame]
+
+        csv = tmp_path / "ticks.csv"
+        csv.write_text("timestamp,price\n1,2\n")
+        with pytest.raises(ValueError):
+            load_frames(csv)
+
+
+class TestReplayHarness:
+
+    @pytest.mark.asyncio
+    async def test_max_speed_fans_out_to_every_client(self, tmp_path):
+        path = tmp_path / "ticks.csv"
+        _write_ticks(path)
+        report = await run_replay(path, clients=20, speed=0)
+
+        assert report["frames"] == 50 and report["symbols"] == ["ETHUSDT", "BTCUSDT"]
+        assert report["ingest"]["events"] == 50
+        delivery = report["delivery"]
+        assert delivery["expected"] == delivery["delivered"] == 50 * 20
+        assert delivery["dropped"] == delivery["evictions"] == 0
+        latency = delivery["latency_ms"]
+        assert 0 <= latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["p999"] <= latency["max"]
+        assert delivery["frames_per_sec"] > 0 and report["ingest"]["events_per_sec"] > 0
+
+    @pytest.mark.asyncio
+    async def test_paced_replay_respects_speed(self, tmp_path):
+        path = tmp_path / "ticks.csv"
+        _write_ticks(path, count=11, step_ms=1000)  # 10 s recording
+        report = await run_replay(path, clients=2, speed=50)
+
+        assert report["recording_seconds"] == 10
+        assert report["duration_seconds"] >= 10 / 50
+        assert report["delivery"]["delivered"] == 22
+
+    @pytest.mark.asyncio
+    async def test_slow_clients_shed_frames_without_stalling_others(self, tmp_path):
+        path = tmp_path / "ticks.csv"
+        _write_ticks(path, count=40)
+        frames = load_frames(path)
+        harness = ReplayHarness(frames, clients=4, slow_clients=1, slow_delay=0.05, max_queue=4)
+        events = []
+        harness.add_listener(events.append)
+        report = await harness.run()
+
+        delivery = report["delivery"]
+        assert delivery["dropped"] > 0 and delivery["max_queue_depth"] == 4
+        assert delivery["delivered"] + delivery["dropped"] == delivery["expected"] == 40 * 4
+        assert len(events) == 40 + report["ingest"]["candles_closed"]
+
+    @pytest.mark.asyncio
+    async def test_lost_frames_fail_the_run(self, tmp_path):
+        path = tmp_path / "ticks.csv"
+        _write_ticks(path, count=10)
+        harness = ReplayHarness(load_frames(path), clients=1, ingest_timeout=0.2)
+
+        async def lose(event):
+            pass
+
+        harness._on_event = lose
+        with pytest.raises(TimeoutError, match="0/10 frames ingested"):
+            await harness.run()
+
+    def test_latency_summary(self):
+        assert latency_summary([])["p99"] is None
+        summary = latency_summary([0.001] * 99 + [0.101])
+        assert summary["p50"] == 1.0 and summary["max"] == 101.0
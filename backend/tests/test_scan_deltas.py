@@ -0,0 +1,144 @@
+"""
+Tests for the snapshot + delta scan update protocol
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.websocket.manager import ConnectionManager
+from backend.websocket.scan_deltas import ScanDeltaPublisher, flatten_state
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def _state(score, advice="Hold", smc=0.5):
+    return flatten_state({
+        "overall_score": score,
+        "timeframe_scores": {
+            "1h": {"final_score": score, "advice": advice,
+                   "components": [{"detector": "smc", "score": smc}, {"detector": "sar", "score": 0.4}]}
+        }
+    })
+
+
+class Client:
+    """Reference client: applies deltas in sequence, resyncs on a gap"""
+
+    def __init__(self):
+        self.state = {}
+        self.seq = {}
+        self.gaps = []
+
+    def apply(self, message):
+        if message["type"] == "scan_snapshot":
+            for symbol, entry in message["symbols"].items():
+                self.state[symbol] = dict(entry["state"])
+                self.seq[symbol] = entry["seq"]
+        elif message["type"] == "scan_delta":
+            symbol = message["symbol"]
+            if self.seq.get(symbol, 0) != message["base_seq"]:
+                self.gaps.append(symbol)
+                return
+            state = self.state.setdefault(symbol, {})
+            state.update(message["changes"])
+            for field in message["removed"]:
+                state.pop(field, None)
+            self.seq[symbol] = message["seq"]
+
+
+async def _setup(conflate_interval=0.0):
+    manager = ConnectionManager()
+    publisher = ScanDeltaPublisher(conflate_interval=conflate_interval, connection_manager=manager)
+    ws = FakeSocket()
+    await manager.connect(ws)
+    return manager, publisher, ws
+
+
+class TestScanDeltas:
+
+    def test_flatten_keys_components_by_detector(self):
+        flat = _state(0.7)
+        assert flat["timeframe_scores.1h.components.smc.score"] == 0.5
+        assert flat["timeframe_scores.1h.advice"] == "Hold"
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_changed_fields_only(self):
+        manager, publisher, ws = await _setup()
+        await publisher.update({"BTCUSDT": _state(0.7), "ETHUSDT": _state(0.5)})
+        await publisher.attach(ws)
+
+        await publisher.update({"BTCUSDT": _state(0.7, smc=0.9), "ETHUSDT": _state(0.5)})
+        await asyncio.sleep(0.01)
+
+        snapshot, delta = ws.sent
+        assert snapshot["type"] == "scan_snapshot"
+        assert snapshot["symbols"]["BTCUSDT"]["seq"] == 1
+        assert delta == {**delta, "type": "scan_delta", "symbol": "BTCUSDT", "seq": 2, "base_seq": 1,
+                         "changes": {"timeframe_scores.1h.components.smc.score": 0.9}, "removed": []}
+        assert publisher.stats["unchanged"] == 1
+
+        client = Client()
+        for message in ws.sent:
+            client.apply(message)
+        assert client.state["BTCUSDT"] == _state(0.7, smc=0.9)
+        assert client.gaps == []
+
+    @pytest.mark.asyncio
+    async def test_conflation_limits_rate(self):
+        manager, publisher, ws = await _setup(conflate_interval=0.05)
+        await publisher.attach(ws)
+
+        for i in range(10):
+            await publisher.update({"BTCUSDT": _state(0.5 + i / 100)})
+        await asyncio.sleep(0.1)
+
+        deltas = [m for m in ws.sent if m["type"] == "scan_delta"]
+        # First update goes out immediately, the other nine collapse into one
+        assert [d["seq"] for d in deltas] == [1, 2]
+        assert deltas[-1]["changes"]["overall_score"] == pytest.approx(0.59)
+        assert publisher.stats["conflated"] == 8
+
+    @pytest.mark.asyncio
+    async def test_gap_detected_and_resync_recovers(self):
+        manager, publisher, ws = await _setup()
+        await publisher.attach(ws)
+        for i in range(3):
+            await publisher.update({"BTCUSDT": _state(0.5 + i / 10)})
+        await asyncio.sleep(0.01)
+
+        client = Client()
+        messages = list(ws.sent)
+        del messages[2]  # lose seq 2
+        for message in messages:
+            client.apply(message)
+        assert client.gaps == ["BTCUSDT"]
+
+        await publisher.send_snapshot(ws, ["BTCUSDT"])
+        await asyncio.sleep(0.01)
+        client.apply(ws.sent[-1])
+        assert client.seq["BTCUSDT"] == 3
+        assert client.state["BTCUSDT"] == _state(0.7)
+
+    @pytest.mark.asyncio
+    async def test_full_mode_clients_excluded(self):
+        manager, publisher, delta_ws = await _setup()
+        full_ws = FakeSocket()
+        await manager.connect(full_ws)
+        await publisher.attach(delta_ws)
+
+        await manager.send_market_scan_update([{"symbol": "BTCUSDT"}], exclude=publisher.subscribers)
+        await asyncio.sleep(0.01)
+
+        assert [m["type"] for m in full_ws.sent] == ["market_scan"]
+        assert [m["type"] for m in delta_ws.sent] == ["scan_snapshot"]
@@ -0,0 +1,178 @@
+"""
+Tests for the priority scan scheduler
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.scanner import scheduler as scheduler_module
+from backend.scanner.mtf_scanner import MultiTimeframeScanner
+from backend.scanner.scheduler import ScanScheduler, SymbolImportance
+from scoring.engine import DynamicScoringEngine, WeightConfig
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _result(symbol, score=0.5):
+    return SimpleNamespace(symbol=symbol, overall_score=score)
+
+
+class TestScanScheduler:
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_by_rate_budget(self):
+        scheduler = ScanScheduler(rate_limit=8, period=0.01, max_workers=16)
+        active, peak = 0, 0
+
+        async def scan(symbol):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+            return _result(symbol)
+
+        symbols = [f"SYM{i}USDT" for i in range(200)]
+        outcomes = await scheduler.run(symbols, scan, cost=2)
+
+        assert set(outcomes) == set(symbols)
+        assert peak == scheduler.workers_for(2) == 4
+
+    @pytest.mark.asyncio
+    async def test_hot_symbols_dispatched_first(self):
+        importance = SymbolImportance(positions=lambda: ["SOL/USDT"], subscriptions=lambda: {"ETHUSDT": 3})
+        scheduler = ScanScheduler(rate_limit=1, period=0.001, importance=importance)
+        order = []
+
+        async def scan(symbol):
+            order.append(symbol)
+            return _result(symbol, score=0.95 if symbol == "XRPUSDT" else 0.5)
+
+        await scheduler.run(["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"], scan)
+        # Never-scanned symbols go by importance: position, then subscribers
+        assert order == ["SOLUSDT", "ETHUSDT", "BTCUSDT", "XRPUSDT"]
+        assert importance.snapshot()("XRPUSDT") == pytest.approx(1 + 2 * 0.9)
+
+    @pytest.mark.asyncio
+    async def test_fresh_results_reused_per_importance(self, monkeypatch):
+        clock = Clock()
+        monkeypatch.setattr(scheduler_module, "time", clock)
+        importance = SymbolImportance(positions=lambda: ["BTCUSDT"])
+        scheduler = ScanScheduler(rate_limit=100, freshness=40.0, importance=importance)
+        scans = []
+
+        async def scan(symbol):
+            scans.append(symbol)
+            return _result(symbol)
+
+        await scheduler.run(["BTCUSDT", "ADAUSDT"], scan)
+        clock.now += 15  # past BTC's 10 s budget, inside ADA's 40 s
+        outcomes = await scheduler.run(["BTCUSDT", "ADAUSDT"], scan)
+
+        assert scans == ["BTCUSDT", "ADAUSDT", "BTCUSDT"]
+        assert outcomes["ADAUSDT"].symbol == "ADAUSDT"
+        freshness = scheduler.get_freshness()
+        assert freshness["BTCUSDT"]["target_seconds"] == 10.0
+        assert freshness["ADAUSDT"] == {**freshness["ADAUSDT"], "age_seconds": 15.0, "fresh": True}
+
+        await scheduler.run(["ADAUSDT"], scan, force=True)
+        assert scans[-1] == "ADAUSDT"
+
+    @pytest.mark.asyncio
+    async def test_weights_change_forces_rescore(self, monkeypatch):
+        engine = DynamicScoringEngine({}, WeightConfig())
+        scanner = MultiTimeframeScanner(None, engine, None, scheduler=ScanScheduler(freshness=600.0))
+        scans = []
+
+        async def scan_symbol(symbol, timeframes):
+            scans.append((symbol, engine.weights.smc))
+            return SimpleNamespace(symbol=symbol, overall_score=0.5, overall_direction="BULLISH")
+
+        monkeypatch.setattr(scanner, "_scan_symbol_all_timeframes", scan_symbol)
+        monkeypatch.setattr(scanner, "_passes_filter", lambda result, rules: True)
+
+        await scanner.scan(["BTCUSDT"], ["1h"])
+        await scanner.scan(["BTCUSDT"], ["1h"])
+        assert scans == [("BTCUSDT", 0.20)]  # fresh result reused
+
+        engine.update_weights(WeightConfig(smc=0.25, whales=0.0))
+        await scanner.scan(["BTCUSDT"], ["1h"])
+        assert scans == [("BTCUSDT", 0.20), ("BTCUSDT", 0.25)]
+
+    @pytest.mark.asyncio
+    async def test_deadline_serves_stale_results_for_cold_symbols(self):
+        importance = SymbolImportance(positions=lambda: ["BTCUSDT"])
+        scheduler = ScanScheduler(rate_limit=1, period=0.001, freshness=0.0, importance=importance)
+        generation = 0
+
+        async def scan(symbol):
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(symbol=symbol, overall_score=0.5, generation=generation)
+
+        symbols = ["ADAUSDT", "XRPUSDT", "BTCUSDT", "DOGEUSDT"]
+        await scheduler.run(symbols, scan)
+        generation = 1
+        outcomes = await scheduler.run(symbols, scan, deadline=0.08)
+
+        assert outcomes["BTCUSDT"].generation == 1
+        assert [outcomes[s].generation for s in ("ADAUSDT", "XRPUSDT", "DOGEUSDT")] == [0, 0, 0]
+        assert scheduler.stats["degraded"] == 3
+
+    @pytest.mark.asyncio
+    async def test_overlapping_batches_share_one_scan(self):
+        scheduler = ScanScheduler(rate_limit=10, period=0.001)
+        scans = []
+
+        async def scan(symbol):
+            scans.append(symbol)
+            await asyncio.sleep(0.01)
+            return _result(symbol)
+
+        first, second = await asyncio.gather(
+            scheduler.run(["BTCUSDT"], scan),
+            scheduler.run(["BTCUSDT"], scan)
+        )
+        assert scans == ["BTCUSDT"]
+        assert first["BTCUSDT"] is second["BTCUSDT"]
+
+    @pytest.mark.asyncio
+    async def test_failures_reported_not_raised(self):
+        scheduler = ScanScheduler(rate_limit=10, period=0.001)
+
+        async def scan(symbol):
+            raise RuntimeError("429")
+
+        outcomes = await scheduler.run(["BTCUSDT"], scan)
+        assert isinstance(outcomes["BTCUSDT"], RuntimeError)
+        assert scheduler.stats["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_stops_workers(self):
+        scheduler = ScanScheduler(rate_limit=10, period=0.001)
+        started, cancelled = [], []
+
+        async def scan(symbol):
+            started.append(symbol)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(symbol)
+                raise
+            return _result(symbol)
+
+        batch = asyncio.create_task(scheduler.run(["BTCUSDT", "ETHUSDT"], scan))
+        await asyncio.sleep(0.01)
+        batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batch
+
+        assert started and sorted(cancelled) == sorted(started)
+        assert all(state.inflight is None for state in scheduler._state.values())
@@ -0,0 +1,129 @@
+"""
+Tests for process-pool scoring execution
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring.detector_protocol import DetectionResult
+from scoring.engine import DynamicScoringEngine, WeightConfig
+from scoring import executor as executor_module
+from scoring.executor import ScoringExecutor, ScoringQueueFull, ScoringTimeout, load_default_detectors
+
+
+class TrendDetector:
+    """CPU-only detector: bullish when the window closes above its mean"""
+
+    async def detect(self, ohlcv, context):
+        closes = context['features'].arrays['close']
+        if context.get('sleep'):
+            time.sleep(context['sleep'])
+        bullish = closes[-1] > closes.mean()
+        return DetectionResult(
+            score=0.8 if bullish else -0.8,
+            confidence=0.9,
+            direction="BULLISH" if bullish else "BEARISH",
+            meta={'pid': os.getpid()}
+        )
+
+
+def build_engine():
+    return DynamicScoringEngine({'smc': TrendDetector(), 'sar': TrendDetector()}, WeightConfig())
+
+
+def _sample(n=200, drift=0.5, seed=5):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(drift, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(n, dtype=np.int64) * 3_600_000, unit='ms'),
+        'open': closes, 'high': closes + 1, 'low': closes - 1, 'close': closes,
+        'volume': np.ones(n),
+    })
+
+
+@pytest.fixture
+def executor():
+    executor = ScoringExecutor(build_engine, max_workers=2, max_pending=2, job_timeout=30)
+    yield executor
+    executor.shutdown()
+
+
+class TestScoringExecutor:
+
+    @pytest.mark.asyncio
+    async def test_matches_in_process_scoring(self, executor):
+        engine = build_engine()
+        context = {'symbol': 'BTCUSDT', 'timeframe': '1h'}
+        for drift in (0.5, -0.5):
+            df = _sample(drift=drift)
+            expected = await engine.score(df, context)
+
+            engine.executor = executor
+            result = await engine.score(df, context)
+            engine.executor = None
+
+            assert result.final_score == expected.final_score
+            assert result.direction == expected.direction
+            assert result.components['smc']['meta']['pid'] != os.getpid()
+
+        stats = executor.get_stats()
+        assert stats['completed'] == 2 and stats['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_timeouts(self, executor):
+        df = _sample()
+        await executor.score(df, {'symbol': 'WARMUP'})  # spawn workers first
+
+        executor.queue_timeout = 0.2
+        slow = {'symbol': 'SLOW', 'sleep': 1.0}
+        jobs = [asyncio.create_task(executor.score(df, slow)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert executor.get_stats()['in_flight'] == 2
+
+        with pytest.raises(ScoringQueueFull):
+            await executor.score(df, slow)
+        await asyncio.gather(*jobs)
+
+        executor.job_timeout = 0.2
+        with pytest.raises(ScoringTimeout):
+            await executor.score(df, slow)
+        stats = executor.get_stats()
+        assert stats['rejected'] == 1 and stats['timeouts'] == 1
+        assert stats['max_in_flight'] <= executor.max_pending
+
+    @pytest.mark.asyncio
+    async def test_failed_submissions_release_their_slot(self, executor, monkeypatch):
+        executor.queue_timeout = 0.2
+        bad = _sample().drop(columns=['timestamp'])
+        for _ in range(executor.max_pending + 1):
+            with pytest.raises(KeyError):
+                await executor.score(bad, {'symbol': 'BAD'})
+
+        def no_memory(*args, **kwargs):
+            raise OSError("no shared memory")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(executor_module.shared_memory, 'SharedMemory', no_memory)
+            for _ in range(executor.max_pending + 1):
+                with pytest.raises(OSError):
+                    await executor.score(_sample(), {'symbol': 'NOSHM'})
+
+        result = await executor.score(_sample(), {'symbol': 'OK'})
+        assert result.direction == "BULLISH"
+        assert executor.get_stats()['rejected'] == 0
+
+    def test_default_detectors_skip_failures(self, monkeypatch):
+        monkeypatch.setattr(executor_module, 'DEFAULT_DETECTORS', {
+            'broken': ('scoring.no_such_module', 'Detector'),
+            'trend': (__name__, 'TrendDetector')
+        })
+        assert list(load_default_detectors()) == ['trend']
+
+        monkeypatch.setattr(executor_module, 'DEFAULT_DETECTORS', {'broken': ('scoring.no_such_module', 'Detector')})
+        with pytest.raises(RuntimeError, match="No scoring detectors"):
+            load_default_detectors()
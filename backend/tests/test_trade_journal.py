@@ -0,0 +1,223 @@
+"""
+Tests for the group-committed trade journal and TradeLogger recovery
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database.models import Base, SignalRecord, SymbolRollup, TradeRecord, TradingSession
+from backend.trading.journal import DatabaseSink, TradeJournal
+from backend.trading.trade_logger import TradeLogger
+
+
+def _journal(tmp_path, **options):
+    options.setdefault('fsync', False)
+    return TradeJournal(str(tmp_path / 'trades.jsonl'), **options)
+
+
+SIGNAL = {'id': 'sig_1', 'symbol': 'BTCUSDT', 'action': 'BUY', 'confidence': 0.8, 'final_score': 0.75,
+          'price': 100.0, 'smc_score': 0.6, 'metadata': {'atr': 1.5}}
+
+
+async def _trade_session(logger):
+    await logger.log_signal(SIGNAL)
+    await logger.log_trade_execution({'id': 'a', 'symbol': 'BTCUSDT', 'action': 'BUY', 'quantity': 2,
+                                      'entry_price': 100, 'commission': 0.5}, signal_id='sig_1')
+    await logger.log_trade_execution({'id': 'b', 'symbol': 'ETHUSDT', 'action': 'SELL', 'quantity': 1,
+                                      'entry_price': 50})
+    await logger.close_trade('a', 110, datetime.now() - timedelta(days=2))
+
+
+class TestGroupCommit:
+
+    @pytest.mark.asyncio
+    async def test_commits_when_batch_fills(self, tmp_path):
+        journal = _journal(tmp_path, batch_size=3, flush_interval=30)
+        await journal.start()
+        for i in range(3):
+            journal.append('signal', {'n': i})
+        await asyncio.wait_for(journal.flush(), timeout=2)
+        assert journal.stats['batches'] == 1 and journal.committed_seq == 3
+        await journal.stop()
+
+    @pytest.mark.asyncio
+    async def test_commits_after_interval(self, tmp_path):
+        journal = _journal(tmp_path, batch_size=1000, flush_interval=0.01)
+        await journal.start()
+        journal.append('signal', {'n': 1})
+        journal.append('signal', {'n': 2})
+        assert journal.committed_seq == 0  # append never writes
+
+        for _ in range(100):
+            if journal.committed_seq == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert journal.committed_seq == 2 and journal.stats['batches'] == 1
+        await journal.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_sink_gets_missed_records_again(self, tmp_path):
+        delivered, failures = [], [1]
+
+        def flaky(batch):
+            if failures:
+                failures.pop()
+                raise ConnectionError("database unavailable")
+            delivered.extend(record['data']['n'] for record in batch)
+
+        journal = _journal(tmp_path, batch_size=1000, flush_interval=30)
+        journal.add_sink(flaky)
+        await journal.start()
+        journal.append('signal', {'n': 1})
+        await journal.flush()
+        assert delivered == [] and journal.sink_backlog == 1
+
+        journal.append('signal', {'n': 2})
+        await journal.flush()
+        assert delivered == [1, 2] and journal.sink_backlog == 0
+        assert journal.stats['sink_errors'] == 1
+        await journal.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_buffer(self, tmp_path):
+        journal = _journal(tmp_path, batch_size=1000, flush_interval=30)
+        await journal.start()
+        for i in range(5):
+            journal.append('trade', {'n': i})
+        await journal.stop()
+        assert [r['data']['n'] for r in _journal(tmp_path).replay()] == list(range(5))
+
+    def test_torn_tail_skipped(self, tmp_path):
+        path = tmp_path / 'trades.jsonl'
+        path.write_text('{"seq": 1, "kind": "signal", "at": "2026-01-01T00:00:00", "data": {}}\n{"seq": 2, "ki')
+        journal = TradeJournal(str(path))
+        assert [r['seq'] for r in journal.replay()] == [1]
+        assert journal.append('signal', {}) == 2
+
+
+class TestRecovery:
+
+    @pytest.mark.asyncio
+    async def test_replay_rebuilds_logger(self, tmp_path):
+        logger = TradeLogger()
+        await logger.attach_journal(_journal(tmp_path))
+        await _trade_session(logger)
+        await logger.journal.stop()
+
+        restored = TradeLogger()
+        assert await restored.attach_journal(_journal(tmp_path)) == 4
+        await restored.journal.stop()
+
+        assert set(restored.signals) == {'sig_1'} and restored.signals['sig_1'].executed
+        assert list(restored.open_positions) == ['b']
+        assert restored.trades['a'].pnl == logger.trades['a'].pnl == pytest.approx(19.5)
+        assert restored.get_portfolio_summary() == logger.get_portfolio_summary()
+        assert restored.realized.total == logger.realized.total
+        assert restored.realized.since(datetime.now() - timedelta(days=7)) == logger.realized.since(
+            datetime.now() - timedelta(days=7)
+        )
+        assert restored.daily_stats == logger.daily_stats
+
+    @pytest.mark.asyncio
+    async def test_retried_batch_applied_once(self, tmp_path):
+        logger = TradeLogger()
+        await logger.attach_journal(_journal(tmp_path))
+        await _trade_session(logger)
+        await logger.journal.stop()
+        path = tmp_path / 'trades.jsonl'
+        lines = path.read_text().splitlines(keepends=True)
+        path.write_text(''.join(lines[:3] + lines[1:]))  # a batch written twice
+
+        restored = TradeLogger()
+        assert await restored.attach_journal(_journal(tmp_path)) == 4
+        await restored.journal.stop()
+        assert restored.daily_stats == logger.daily_stats
+        assert restored.get_portfolio_summary() == logger.get_portfolio_summary()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_truncates_log(self, tmp_path):
+        logger = TradeLogger()
+        journal = _journal(tmp_path, batch_size=1, snapshot_every=3)
+        await logger.attach_journal(journal)
+        await _trade_session(logger)
+        await journal.stop()
+
+        assert journal.stats['snapshots'] == 1
+        records = list(_journal(tmp_path).replay())
+        assert records[0]['kind'] == 'snapshot' and records[0]['seq'] >= 3 and len(records) <= 2
+
+        restored = TradeLogger()
+        assert await restored.attach_journal(_journal(tmp_path)) == len(records)
+        assert restored.journal.append('signal', {}) == 5
+        await restored.journal.stop()
+        assert set(restored.signals) == {'sig_1'} and restored.signals['sig_1'].executed
+        assert list(restored.open_positions) == ['b'] and restored.trades['a'].status == 'CLOSED'
+        assert restored.get_portfolio_summary() == logger.get_portfolio_summary()
+        assert restored.realized.total == logger.realized.total
+        assert restored.daily_stats == logger.daily_stats
+
+    @pytest.mark.asyncio
+    async def test_generated_ids_unique(self):
+        logger = TradeLogger()
+        signal = {key: value for key, value in SIGNAL.items() if key != 'id'}
+        ids = {await logger.log_signal(signal) for _ in range(50)}
+        assert len(ids) == 50 and all(ids)
+
+    @pytest.mark.asyncio
+    async def test_database_sink_writes_batches(self, tmp_path):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        sessions = sessionmaker(bind=engine)
+
+        logger = TradeLogger()
+        journal = _journal(tmp_path)
+        journal.add_sink(DatabaseSink(sessions))
+        await logger.attach_journal(journal)
+        await _trade_session(logger)
+        await journal.stop()
+
+        db = sessions()
+        signal = db.get(SignalRecord, 'sig_1')
+        assert signal.smc_score == 0.6 and signal.atr == 1.5 and signal.signal_strength == "MODERATE"
+        closed = db.get(TradeRecord, 'a')
+        assert closed.status == 'CLOSED' and closed.direction == 'LONG' and closed.net_pnl == pytest.approx(19.5)
+        assert db.get(TradeRecord, 'b').status == 'OPEN'
+        days = db.query(SymbolRollup).filter(SymbolRollup.period == 'day').all()
+        assert sum(day.signals for day in days) == 1 and sum(day.trades_opened for day in days) == 2
+        assert sum(day.net_pnl for day in days) == pytest.approx(19.5)
+        assert journal.stats['sink_errors'] == 0
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_database_sink_follows_active_session(self, tmp_path):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        sessions = sessionmaker(bind=engine)
+        sink = DatabaseSink(sessions)
+
+        logger = TradeLogger()
+        journal = _journal(tmp_path)
+        journal.add_sink(sink)
+        await logger.attach_journal(journal)
+        await logger.log_signal(SIGNAL)
+        await journal.flush()
+
+        # What /api/database/create-session does
+        db = sessions()
+        first = db.query(TradingSession).filter(TradingSession.is_active == True).one()
+        first.is_active = False
+        second = TradingSession(initial_balance=5000.0, is_active=True)
+        db.add(second)
+        db.commit()
+
+        await logger.log_signal({**SIGNAL, 'id': 'sig_2'})
+        await journal.stop()
+        db.expire_all()
+        assert db.get(SignalRecord, 'sig_1').session_id == first.id
+        assert db.get(SignalRecord, 'sig_2').session_id == second.id
+        db.close()
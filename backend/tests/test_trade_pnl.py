@@ -0,0 +1,90 @@
+"""
+Tests for the running realized P&L aggregates in TradeLogger
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.trading.trade_logger import TradeLogger
+
+
+def _brute_force(trades, symbol=None, cutoff=None):
+    """The full scan calculate_realized_pnl used to do"""
+    closed = [t for t in trades if t.status == 'CLOSED' and t.pnl is not None]
+    if symbol:
+        closed = [t for t in closed if t.symbol == symbol]
+    if cutoff:
+        closed = [t for t in closed if t.exit_time and t.exit_time >= cutoff]
+    wins = [t.pnl for t in closed if t.pnl > 0]
+    losses = [t.pnl for t in closed if t.pnl < 0]
+    return {
+        'total_realized_pnl': sum(t.pnl for t in closed),
+        'total_commission': sum(t.commission for t in closed),
+        'total_trades': len(closed),
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'average_win': sum(wins) / len(wins) if wins else 0,
+        'average_loss': sum(losses) / len(losses) if losses else 0,
+        'profit_factor': sum(wins) / abs(sum(losses)) if losses else float('inf'),
+        'largest_win': max(t.pnl for t in closed),
+        'largest_loss': min(t.pnl for t in closed),
+    }
+
+
+async def _populate(logger, count=300, seed=3):
+    rng = random.Random(seed)
+    now = datetime.now()
+    for i in range(count):
+        trade_id = f"t{i}"
+        await logger.log_trade_execution({
+            'id': trade_id,
+            'symbol': rng.choice(['BTCUSDT', 'ETHUSDT', 'SOLUSDT']),
+            'action': rng.choice(['BUY', 'SELL']),
+            'quantity': rng.uniform(0.1, 2),
+            'entry_price': 100.0,
+            'commission': 0.1,
+            'entry_time': now - timedelta(days=120),
+        })
+        # Exits arrive out of time order, spread over the last 100 days
+        exit_time = now - timedelta(hours=rng.uniform(0, 2400))
+        await logger.close_trade(trade_id, rng.uniform(90, 110), exit_time)
+
+
+class TestRealizedAggregates:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("symbol", [None, 'ETHUSDT'])
+    @pytest.mark.parametrize("timeframe", [None, '1D', '7D', '30D', '1Y'])
+    async def test_matches_full_scan(self, symbol, timeframe):
+        logger = TradeLogger()
+        await _populate(logger)
+
+        result = await logger.calculate_realized_pnl(symbol=symbol, timeframe=timeframe)
+        cutoff = logger._get_timeframe_cutoff(timeframe) if timeframe else None
+        expected = _brute_force(logger.trades.values(), symbol, cutoff)
+        for key, value in expected.items():
+            assert result[key] == pytest.approx(value), key
+        if symbol:
+            assert list(result['symbol_breakdown']) == [symbol]
+
+    @pytest.mark.asyncio
+    async def test_closed_trades_logged_directly_count_once(self):
+        logger = TradeLogger()
+        trade = {'id': 'x', 'symbol': 'BTCUSDT', 'action': 'BUY', 'quantity': 1, 'entry_price': 100,
+                 'status': 'CLOSED', 'pnl': 5.0, 'exit_time': datetime.now()}
+        await logger.log_trade_execution(trade)
+        await logger.log_trade_execution(trade)
+
+        result = await logger.calculate_realized_pnl()
+        assert result['total_trades'] == 1 and result['total_realized_pnl'] == 5.0
+        assert result['profit_factor'] == float('inf')
+
+    @pytest.mark.asyncio
+    async def test_empty_window(self):
+        logger = TradeLogger()
+        await _populate(logger, count=5)
+        result = await logger.calculate_realized_pnl(symbol='DOGEUSDT', timeframe='7D')
+        assert result['total_trades'] == 0 and result['symbol_breakdown'] == {}
+        assert logger.realized_aggregate(since=datetime.now() + timedelta(days=1)).trades == 0
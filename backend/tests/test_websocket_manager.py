@@ -0,0 +1,131 @@
+"""
+Tests for per-connection outbound queues in the WebSocket ConnectionManager
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.websocket.manager import ConnectionManager, SLOW_CONSUMER_CLOSE_CODE
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+        self.gate = None
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _connect(manager, *sockets):
+    for ws in sockets:
+        await manager.connect(ws)
+
+
+class TestFanOut:
+
+    @pytest.mark.asyncio
+    async def test_stalled_client_does_not_delay_others(self):
+        manager = ConnectionManager()
+        stalled = FakeSocket()
+        stalled.gate = asyncio.Event()
+        fast = [FakeSocket() for _ in range(200)]
+        await _connect(manager, stalled, *fast)
+
+        await asyncio.wait_for(manager.broadcast({"type": "ping", "n": 1}), timeout=0.1)
+        await asyncio.sleep(0.01)
+
+        assert all(ws.sent == [{"type": "ping", "n": 1}] for ws in fast)
+        assert stalled.sent == []
+        assert manager.channels[stalled].depth == 0  # in flight, not queued
+
+        stalled.gate.set()
+        await asyncio.sleep(0.01)
+        assert stalled.sent == [{"type": "ping", "n": 1}]
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_bounds_queue(self):
+        manager = ConnectionManager(max_queue=3, overflow_policy="drop_oldest")
+        ws = FakeSocket()
+        ws.gate = asyncio.Event()
+        await _connect(manager, ws)
+
+        for n in range(10):
+            await manager.broadcast({"n": n})
+        await asyncio.sleep(0)
+
+        channel = manager.channels[ws]
+        assert channel.depth <= 3
+        ws.gate.set()
+        await asyncio.sleep(0.01)
+
+        received = [m["n"] for m in ws.sent]
+        assert received[-3:] == [7, 8, 9]
+        assert channel.stats["dropped"] > 0
+
+    @pytest.mark.asyncio
+    async def test_coalesce_keeps_latest_per_symbol(self):
+        manager = ConnectionManager(max_queue=2, overflow_policy="coalesce")
+        ws = FakeSocket()
+        ws.gate = asyncio.Event()
+        await _connect(manager, ws)
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            await manager.subscribe(ws, symbol)
+
+        # First frame goes in flight; the next two fill the queue
+        await manager.send_price_update("BTCUSDT", {"price": 1})
+        await asyncio.sleep(0)
+        await manager.send_price_update("BTCUSDT", {"price": 2})
+        await manager.send_price_update("ETHUSDT", {"price": 10})
+        await manager.send_price_update("BTCUSDT", {"price": 3})
+
+        ws.gate.set()
+        await asyncio.sleep(0.01)
+
+        prices = [(m["symbol"], m["data"]["price"]) for m in ws.sent]
+        assert prices == [("BTCUSDT", 1), ("BTCUSDT", 3), ("ETHUSDT", 10)]
+        assert manager.channels[ws].stats["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_evicts_slow_consumer(self):
+        manager = ConnectionManager(max_queue=2, overflow_policy="disconnect")
+        slow, fast = FakeSocket(), FakeSocket()
+        slow.gate = asyncio.Event()
+        await _connect(manager, slow, fast)
+
+        for n in range(5):
+            await manager.broadcast({"n": n})
+            await asyncio.sleep(0.001)  # let writers drain between ticks
+        await asyncio.sleep(0.01)
+
+        assert slow not in manager.active_connections
+        assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert [m["n"] for m in fast.sent] == [0, 1, 2, 3, 4]
+        assert manager.get_connection_stats()["slow_consumer_evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_send_latency_tracked(self):
+        manager = ConnectionManager()
+        ws = FakeSocket(delay=0.005)
+        await _connect(manager, ws)
+
+        await manager.broadcast({"type": "ping"})
+        await asyncio.sleep(0.02)
+
+        stats = manager.get_client_stats()[0]
+        assert stats["sent"] == 1
+        assert stats["max_send_ms"] >= 4
@@ -0,0 +1,151 @@
+"""
+Equity curve engine over closed trades
+
+Mirrors a ClosedTradeIndex (trades sorted by exit time) into numpy arrays
+of exit times and cumulative P&L, commission, wins and losses. Any bucketed
+curve or per-period breakdown is then a searchsorted over bucket edges plus
+differences of the cumulative sums: one pass, whatever the bucket size.
+The arrays grow in place as trades close and are only rebuilt when a late
+exit lands before ones already mirrored.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Dashboard timeframes; anything else is tried as a pandas frequency string
+TIMEFRAME_FREQ = {'1H': 'h', '4H': '4h', '1D': 'D', '1W': 'W'}
+
+
+def bucket_freq(timeframe: str) -> str:
+    """pandas frequency for a dashboard timeframe ('1H', '4H', '15min', ...), daily if unknown"""
+    if timeframe in TIMEFRAME_FREQ:
+        return TIMEFRAME_FREQ[timeframe]
+    try:
+        pd.tseries.frequencies.to_offset(timeframe)
+        return timeframe
+    except ValueError:
+        return 'D'
+
+
+class EquityCurveEngine:
+    """Cumulative P&L arrays over a ClosedTradeIndex, extended as trades close"""
+
+    def __init__(self, index):
+        self.index = index
+        self._size = 0
+        self._revision = index.revision
+        self._times = np.empty(0, dtype='datetime64[ns]')
+        self._pnl = np.empty(0)
+        # Cumulative columns carry a leading zero: cum[i] sums the first i trades
+        self._cum = {name: np.zeros(1) for name in ('pnl', 'commission', 'wins', 'losses')}
+
+    def _sync(self):
+        index = self.index
+        if index.revision != self._revision:
+            self._size = 0
+            self._revision = index.revision
+        count = len(index.rows)
+        if count == self._size:
+            return
+
+        start = self._size
+        if count > len(self._times):
+            capacity = max(count, 2 * len(self._times), 64)
+            self._times = np.resize(self._times, capacity)
+            self._pnl = np.resize(self._pnl, capacity)
+            self._cum = {name: np.resize(column, capacity + 1) for name, column in self._cum.items()}
+
+        rows = np.array(index.rows[start:count], dtype=np.float64).reshape(-1, 2)
+        pnl, commission = rows[:, 0], rows[:, 1]
+        self._times[start:count] = np.array(index.exit_times[start:count], dtype='datetime64[ns]')
+        self._pnl[start:count] = pnl
+        for name, values in (('pnl', pnl), ('commission', commission), ('wins', pnl > 0), ('losses', pnl < 0)):
+            column = self._cum[name]
+            column[start + 1:count + 1] = column[start] + np.cumsum(values)
+        self._size = count
+
+    @property
+    def times(self) -> np.ndarray:
+        self._sync()
+        return self._times[:self._size]
+
+    def cumulative(self, name: str = 'pnl') -> np.ndarray:
+        self._sync()
+        return self._cum[name][:self._size + 1]
+
+    def curve(self, start: datetime, end: datetime, freq: str = 'D',
+              initial_capital: float = 10000) -> List[Dict]:
+        """
+        Equity at each bucket boundary in [start, end] from trades exiting since ``start``
+
+        Each point carries the P&L of trades closed between ``start`` and the
+        point, and the P&L of those closed on the point's calendar day.
+        Empty when no trade closed in the window.
+        """
+        times, cum = self.times, self.cumulative()
+        first = np.searchsorted(times, np.datetime64(start, 'ns'), side='left')
+        if first == np.searchsorted(times, np.datetime64(end, 'ns'), side='right'):
+            return []
+
+        stamps = pd.date_range(start=start, end=end, freq=freq)
+        points = stamps.values
+        upto = np.searchsorted(times, points, side='right')
+        day_start = np.maximum(np.searchsorted(times, stamps.normalize().values, side='left'), first)
+        total_pnl = cum[upto] - cum[first]
+        daily_pnl = cum[upto] - cum[np.minimum(day_start, upto)]
+        trade_count = upto - first
+
+        return [
+            {
+                'timestamp': timestamp,
+                'portfolio_value': initial_capital + total,
+                'total_pnl': total,
+                'daily_pnl': daily,
+                'total_return_pct': (total / initial_capital) * 100,
+                'trade_count': int(count)
+            }
+            for timestamp, total, daily, count in zip(
+                stamps, total_pnl.tolist(), daily_pnl.tolist(), trade_count.tolist()
+            )
+        ]
+
+    def periods(self, freq: str = 'M', since: Optional[datetime] = None) -> List[Dict]:
+        """Per-period totals, counts and extremes for every period that has a closed trade"""
+        times = self.times
+        if since is not None:
+            times = times[np.searchsorted(times, np.datetime64(since, 'ns'), side='left'):]
+        if not len(times):
+            return []
+
+        offset = len(self.times) - len(times)
+        labels = pd.DatetimeIndex(times).to_period(freq)
+        # Sorted times give sorted periods, so each period is one contiguous run
+        codes = labels.asi8
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)]
+        lo, hi = starts + offset, ends + offset
+
+        cum = {name: self.cumulative(name) for name in ('pnl', 'commission', 'wins', 'losses')}
+        pnl = self._pnl[offset:self._size]
+        best = np.maximum.reduceat(pnl, starts)
+        worst = np.minimum.reduceat(pnl, starts)
+        sums = {name: column[hi] - column[lo] for name, column in cum.items()}
+        counts = hi - lo
+
+        return [
+            {
+                'period': str(labels[s]),
+                'total_pnl': float(sums['pnl'][i]),
+                'total_commission': float(sums['commission'][i]),
+                'total_trades': int(counts[i]),
+                'winning_trades': int(sums['wins'][i]),
+                'losing_trades': int(sums['losses'][i]),
+                'best_trade': float(best[i]),
+                'worst_trade': float(worst[i]),
+                'avg_trade': float(sums['pnl'][i] / counts[i])
+            }
+            for i, s in enumerate(starts)
+        ]
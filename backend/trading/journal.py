@@ -0,0 +1,390 @@
+"""
+Append-only journal for signals and trades
+
+The hot path calls append(), which only buffers the record. A background
+task group-commits the buffer: one write and one fsync per batch, when
+``batch_size`` records are waiting or ``flush_interval`` seconds after the
+first record of the batch, whichever comes first. Sinks (e.g. the database
+writer) run on the same worker thread after each durable batch, so no
+request ever waits on a commit. A sink that fails is handed the records it
+missed again, ahead of the next batch.
+
+On startup replay() yields every committed record in order so TradeLogger
+can rebuild its in-memory indexes. Records are applied once by sequence
+number, so lines rewritten by a retried batch are skipped.
+
+With a ``snapshot_source``, every ``snapshot_every`` committed records the
+journal writes the source's state to ``<path>.snapshot`` and truncates the
+log. Replay then starts from the snapshot, yielded as a 'snapshot' record,
+followed by the records committed after it.
+
+Example:
+    journal = TradeJournal('journal/trades.jsonl')
+    await trade_logger.attach_journal(journal)   # replays, then starts committing
+    ...
+    await journal.stop()                         # commits what is still buffered
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from ..core.encoding import encode_json
+except ImportError:
+    from core.encoding import encode_json
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+Sink = Callable[[List[Record]], None]
+
+
+class TradeJournal:
+    """
+    Group-committed JSON-lines journal
+
+    Args:
+        path: Journal file (default $TRADE_JOURNAL_PATH or journal/trades.jsonl)
+        batch_size: Records that trigger a commit without waiting for the interval
+        flush_interval: Seconds a record may wait in the buffer
+        fsync: fsync each batch (off trades durability for speed, e.g. in tests)
+        snapshot_every: Committed records between snapshots
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 256,
+                 flush_interval: float = 0.05, fsync: bool = True, snapshot_every: int = 10_000):
+        self.path = path or os.getenv('TRADE_JOURNAL_PATH', os.path.join('journal', 'trades.jsonl'))
+        self.snapshot_path = self.path + '.snapshot'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        self.sinks: List[Sink] = []
+        # Records each failing sink has not accepted yet, oldest first
+        self._unsent: Dict[Sink, List[Record]] = {}
+        # Returns the state every record so far has produced, e.g. TradeLogger._snapshot
+        self.snapshot_source: Optional[Callable[[], Record]] = None
+
+        self._buffer: List[Record] = []
+        self._seq = 0
+        self._committed = 0
+        self._since_snapshot = 0
+        self._file = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._lock: Optional[asyncio.Lock] = None
+        self._pending: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._progress: Optional[asyncio.Condition] = None
+        self.stats = {'records': 0, 'batches': 0, 'bytes': 0, 'snapshots': 0, 'write_errors': 0, 'sink_errors': 0}
+
+    @property
+    def sink_backlog(self) -> int:
+        """Records held for sinks that failed and have not caught up yet"""
+        return sum(len(records) for records in self._unsent.values())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def committed_seq(self) -> int:
+        return self._committed
+
+    def add_sink(self, sink: Sink):
+        """Call ``sink(batch)`` on the writer thread after each durable batch"""
+        self.sinks.append(sink)
+
+    def append(self, kind: str, data: Record, at: Optional[datetime] = None) -> int:
+        """Buffer a record for the next commit and return its sequence number"""
+        self._seq += 1
+        self._buffer.append({
+            'seq': self._seq,
+            'kind': kind,
+            'at': (at or datetime.now()).isoformat(),
+            'data': data
+        })
+        if self._pending is not None:
+            self._pending.set()
+            if len(self._buffer) >= self.batch_size:
+                self._full.set()
+        return self._seq
+
+    def replay(self) -> Iterator[Record]:
+        """The snapshot, then committed records in order; a torn final line from a crash is skipped"""
+        applied = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = json.load(f)
+            applied = snapshot['seq']
+            self._seq = self._committed = applied
+            yield {'seq': applied, 'kind': 'snapshot', 'at': snapshot['at'], 'data': snapshot['data']}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable journal line %d in %s", number, self.path)
+                    continue
+                # Covered by the snapshot, or written again by a retried batch
+                if record.get('seq', 0) <= applied:
+                    continue
+                applied = record['seq']
+                self._seq = self._committed = applied
+                self._since_snapshot += 1
+                yield record
+
+    async def start(self):
+        if self.running:
+            return
+        self._lock = asyncio.Lock()
+        self._closing = False
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._progress = asyncio.Condition()
+        if self._buffer:
+            self._pending.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer after committing everything buffered"""
+        if self._task is not None:
+            # Let the writer drain instead of cancelling it mid-write
+            self._closing = True
+            self._pending.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+    async def flush(self):
+        """Wait until every record appended so far is committed"""
+        target = self._seq
+        if not self.running:
+            while self._committed < target and self._buffer:
+                await self._commit()
+            return
+        self._full.set()
+        async with self._progress:
+            await self._progress.wait_for(lambda: self._committed >= target or not self.running)
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self._commit()
+            if self._closing and not self._buffer:
+                return
+
+    async def _commit(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if self._pending is not None:
+                self._pending.clear()
+                self._full.clear()
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                # Keep the batch for the next attempt rather than lose it
+                self.stats['write_errors'] += 1
+                logger.error(f"Journal commit failed, retrying with next batch: {e}")
+                self._buffer[:0] = batch
+                if self._pending is not None:
+                    self._pending.set()
+                if self._closing or not self.running:
+                    raise
+                await asyncio.sleep(self.flush_interval)
+                return
+            self._committed = batch[-1]['seq']
+            self._since_snapshot += len(batch)
+            if self.snapshot_source is not None and self._since_snapshot >= self.snapshot_every:
+                await self._snapshot()
+        if self._progress is not None:
+            async with self._progress:
+                self._progress.notify_all()
+
+    async def _snapshot(self):
+        """Called with the commit lock held, so the log holds nothing newer than the state"""
+        # Encoded on the loop: the source's objects keep changing once we yield
+        payload = encode_json({'seq': self._seq, 'at': datetime.now().isoformat(), 'data': self.snapshot_source()})
+        try:
+            await asyncio.to_thread(self._write_snapshot, payload.encode())
+        except Exception as e:
+            # The log is still complete; try again after the next batch
+            self.stats['write_errors'] += 1
+            logger.error(f"Journal snapshot failed: {e}")
+            return
+        self._since_snapshot = 0
+        self.stats['snapshots'] += 1
+
+    def _write_snapshot(self, payload: bytes):
+        """Replace the snapshot atomically, then drop the log records it covers"""
+        temp = self.snapshot_path + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temp, self.snapshot_path)
+        # Records still buffered at or below the snapshot's seq are skipped on replay
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _write(self, batch: List[Record]):
+        """Runs on a worker thread: one write and one fsync for the whole batch, then the sinks"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'ab')
+        payload = ''.join(encode_json(record) + '\n' for record in batch).encode()
+        self._file.write(payload)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.stats['records'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['bytes'] += len(payload)
+
+        for sink in self.sinks:
+            records = self._unsent.pop(sink, []) + batch
+            try:
+                sink(records)
+            except Exception as e:
+                # Sinks must accept re-delivery; retry these with the next batch
+                self._unsent[sink] = records
+                self.stats['sink_errors'] += 1
+                logger.error(f"Journal sink {getattr(sink, '__name__', sink)} failed, "
+                             f"{len(records)} records held for retry: {e}")
+
+
+class DatabaseSink:
+    """
+    Mirrors journal batches into the signal_records / trade_records tables
+
+    One session and one commit per batch through repository.write_batch: a
+    multi-row upsert per table, one executemany for closes and one upsert of
+    the hourly/daily rollups. Rows are upserted by id and rollups only count
+    new records, so re-delivering a batch is harmless. Each batch attaches to
+    the session active when it is written.
+    """
+
+    __name__ = 'database'
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        # Session of the batch being written
+        self._session_id: Optional[str] = None
+
+    def __call__(self, batch: List[Record]):
+        try:
+            from ..database.models import TradingSession
+            from ..database.repository import write_batch
+        except ImportError:
+            from database.models import TradingSession
+            from database.repository import write_batch
+
+        db = self.session_factory()
+        try:
+            # Looked up per batch: /api/database/create-session may have replaced it
+            active = db.query(TradingSession).filter(TradingSession.is_active == True).first()
+            if active is None:
+                active = TradingSession(initial_balance=10000.0, start_time=datetime.now(), is_active=True)
+                db.add(active)
+                db.flush()
+            self._session_id = active.id
+
+            rows = {'signal': [], 'trade': [], 'close': []}
+            for record in batch:
+                kind, data = record['kind'], record['data']
+                if kind == 'signal':
+                    rows[kind].append(self._signal_row(data))
+                elif kind == 'trade':
+                    rows[kind].append(self._trade_row(data))
+                elif kind == 'close':
+                    rows[kind].append({
+                        'id': data['id'],
+                        'exit_price': data['exit_price'],
+                        'exit_time': _parse_time(data['exit_time']),
+                        'net_pnl': data.get('pnl')
+                    })
+
+            write_batch(db, rows['signal'], rows['trade'], rows['close'])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _signal_row(self, data: Record) -> Record:
+        components = data.get('components') or {}
+        meta = data.get('metadata') or {}
+        confidence = data['confidence']
+        return {
+            'id': data['id'],
+            'session_id': self._session_id,
+            'symbol': data['symbol'],
+            'timestamp': _parse_time(data['timestamp']),
+            'action': data['action'],
+            'confidence': confidence,
+            'final_score': data['final_score'],
+            'rsi_macd_score': components.get('rsi_macd_score', 0),
+            'smc_score': components.get('smc_score', 0),
+            'pattern_score': components.get('pattern_score', 0),
+            'sentiment_score': components.get('sentiment_score', 0),
+            'ml_score': components.get('ml_score', 0),
+            'price': data['price'],
+            'volume': meta.get('volume'),
+            'atr': meta.get('atr'),
+            'volatility': meta.get('volatility'),
+            'signal_strength': meta.get('signal_strength') or (
+                "STRONG" if confidence > 0.8 else "MODERATE" if confidence > 0.6 else "WEAK"
+            ),
+            'market_condition': meta.get('market_condition'),
+            'executed': data.get('executed', False)
+        }
+
+    def _trade_row(self, data: Record) -> Record:
+        return {
+            'id': data['id'],
+            'session_id': self._session_id,
+            'signal_id': data.get('signal_id'),
+            'symbol': data['symbol'],
+            'entry_time': _parse_time(data['entry_time']),
+            'exit_time': _parse_time(data.get('exit_time')),
+            'direction': 'LONG' if data['action'] == 'BUY' else 'SHORT',
+            'entry_price': data['entry_price'],
+            'exit_price': data.get('exit_price'),
+            'quantity': data['quantity'],
+            'stop_loss': data.get('stop_loss'),
+            'take_profit': data.get('take_profit'),
+            'commission': data.get('commission', 0.0),
+            'net_pnl': data.get('pnl'),
+            'status': data.get('status', 'OPEN')
+        }
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
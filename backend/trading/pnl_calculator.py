@@ -4,11 +4,20 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from .trade_logger import trade_logger
+from .equity_curve import EquityCurveEngine, bucket_freq
 
 
 class PnLCalculator:
     def __init__(self):
         self.trade_logger = trade_logger
+        self._equity: Optional[EquityCurveEngine] = None
+        
+    def _equity_engine(self) -> EquityCurveEngine:
+        """Curve engine over the logger's closed-trade index, kept across calls so it extends incrementally"""
+        index = self.trade_logger.realized
+        if self._equity is None or self._equity.index is not index:
+            self._equity = EquityCurveEngine(index)
+        return self._equity
         
     async def get_portfolio_summary(self, current_prices: Optional[Dict[str, float]] = None) -> Dict:
         """Get comprehensive portfolio summary"""
@@ -81,79 +90,16 @@ class PnLCalculator:
     async def generate_equity_curve(self, timeframe: str = '1D', days_back: int = 30) -> List[Dict]:
         """Generate equity curve data for portfolio visualization"""
         try:
-            # Get all closed trades
-            all_trades = await self.trade_logger.get_trade_history(limit=1000)
-            
-            if not all_trades:
-                return self._get_empty_equity_curve()
-            
-            # Convert to DataFrame for easier processing
-            trades_df = pd.DataFrame(all_trades)
-            
-            # Filter by date range
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
-            
-            # Convert exit_time to datetime if it's string
-            trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'])
-            
-            # Filter trades within date range
-            filtered_trades = trades_df[
-                (trades_df['exit_time'] >= start_date) & 
-                (trades_df['exit_time'] <= end_date) &
-                (trades_df['status'] == 'CLOSED')
-            ].copy()
-            
-            if filtered_trades.empty:
-                return self._get_empty_equity_curve()
-            
-            # Sort by exit time
-            filtered_trades = filtered_trades.sort_values('exit_time')
-            
-            # Calculate cumulative P&L
-            filtered_trades['cumulative_pnl'] = filtered_trades['pnl'].cumsum()
-            
-            # Create time series based on timeframe
-            if timeframe == '1D':
-                freq = 'D'
-            elif timeframe == '1H':
-                freq = 'H'
-            elif timeframe == '4H':
-                freq = '4H'
-            else:
-                freq = 'D'
-            
-            # Resample to create consistent time intervals
-            time_index = pd.date_range(start=start_date, end=end_date, freq=freq)
-            
-            equity_curve = []
             initial_capital = 10000  # This should come from settings
             
-            for timestamp in time_index:
-                # Get all trades that closed before or at this timestamp
-                trades_before = filtered_trades[filtered_trades['exit_time'] <= timestamp]
-                
-                if not trades_before.empty:
-                    total_pnl = trades_before['pnl'].sum()
-                    portfolio_value = initial_capital + total_pnl
-                    daily_pnl = trades_before[trades_before['exit_time'].dt.date == timestamp.date()]['pnl'].sum()
-                    trade_count = len(trades_before)
-                else:
-                    total_pnl = 0
-                    portfolio_value = initial_capital
-                    daily_pnl = 0
-                    trade_count = 0
-                
-                equity_curve.append({
-                    'timestamp': timestamp,
-                    'portfolio_value': portfolio_value,
-                    'total_pnl': total_pnl,
-                    'daily_pnl': daily_pnl,
-                    'total_return_pct': (total_pnl / initial_capital) * 100,
-                    'trade_count': trade_count
-                })
+            # One searchsorted over the closed-trade cumulative sums per bucket boundary
+            equity_curve = self._equity_engine().curve(
+                start_date, end_date, freq=bucket_freq(timeframe), initial_capital=initial_capital
+            )
             
-            return equity_curve
+            return equity_curve or self._get_empty_equity_curve()
             
         except Exception as e:
             print(f"Error generating equity curve: {str(e)}")
@@ -173,39 +119,24 @@ class PnLCalculator:
             performance_by_asset = []
             
             for symbol, total_pnl in symbol_breakdown.items():
-                # Get trades for this symbol
-                symbol_trades = await self.trade_logger.get_trade_history(limit=1000, symbol=symbol)
-                closed_trades = [t for t in symbol_trades if t['status'] == 'CLOSED' and t['pnl'] is not None]
+                # Served from the logger's per-symbol running aggregates
+                stats = await self.trade_logger.calculate_realized_pnl(symbol=symbol, timeframe=timeframe)
                 
-                if not closed_trades:
+                if not stats['total_trades']:
                     continue
                 
-                # Calculate metrics for this symbol
-                winning_trades = [t for t in closed_trades if t['pnl'] > 0]
-                losing_trades = [t for t in closed_trades if t['pnl'] < 0]
-                
-                win_rate = (len(winning_trades) / len(closed_trades)) * 100 if closed_trades else 0
-                avg_win = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-                avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
-                
-                profit_factor = (
-                    sum(t['pnl'] for t in winning_trades) / 
-                    abs(sum(t['pnl'] for t in losing_trades))
-                    if losing_trades else float('inf')
-                )
-                
                 performance_by_asset.append({
                     'symbol': symbol,
                     'total_pnl': total_pnl,
-                    'total_trades': len(closed_trades),
-                    'winning_trades': len(winning_trades),
-                    'losing_trades': len(losing_trades),
-                    'win_rate': win_rate,
-                    'average_win': avg_win,
-                    'average_loss': avg_loss,
-                    'profit_factor': profit_factor,
-                    'largest_win': max([t['pnl'] for t in closed_trades]) if closed_trades else 0,
-                    'largest_loss': min([t['pnl'] for t in closed_trades]) if closed_trades else 0
+                    'total_trades': stats['total_trades'],
+                    'winning_trades': stats['winning_trades'],
+                    'losing_trades': stats['losing_trades'],
+                    'win_rate': stats['win_rate'],
+                    'average_win': stats['average_win'],
+                    'average_loss': stats['average_loss'],
+                    'profit_factor': stats['profit_factor'],
+                    'largest_win': stats['largest_win'],
+                    'largest_loss': stats['largest_loss']
                 })
             
             # Sort by total P&L descending
@@ -227,7 +158,7 @@ class PnLCalculator:
                 return self._get_empty_metrics()
             
             # Calculate daily returns
-            portfolio_values = [point['portfolio_value'] for point in equity_curve]
+            portfolio_values = np.array([point['portfolio_value'] for point in equity_curve])
             daily_returns = np.diff(portfolio_values) / portfolio_values[:-1]
             
             # Remove any infinite or NaN values
@@ -277,7 +208,7 @@ class PnLCalculator:
                 # Drawdown metrics
                 'max_drawdown_pct': max_drawdown,
                 'max_drawdown_duration_days': max_drawdown_duration,
-                'current_drawdown_pct': drawdowns[-1] * 100 if drawdowns else 0,
+                'current_drawdown_pct': drawdowns[-1] * 100 if drawdowns.size else 0,
                 
                 # Trading metrics
                 'win_rate': portfolio_summary['win_rate'],
@@ -299,56 +230,23 @@ class PnLCalculator:
     async def get_monthly_performance(self) -> List[Dict]:
         """Get monthly performance breakdown"""
         try:
-            # Get all trades
-            all_trades = await self.trade_logger.get_trade_history(limit=1000)
-            
-            if not all_trades:
-                return []
-            
-            # Convert to DataFrame
-            trades_df = pd.DataFrame(all_trades)
-            trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'])
-            
-            # Filter closed trades with valid exit times
-            closed_trades = trades_df[
-                (trades_df['status'] == 'CLOSED') & 
-                (trades_df['pnl'].notna()) & 
-                (trades_df['exit_time'].notna())
-            ].copy()
-            
-            if closed_trades.empty:
-                return []
-            
-            # Group by month
-            closed_trades['month'] = closed_trades['exit_time'].dt.to_period('M')
-            monthly_groups = closed_trades.groupby('month')
-            
             monthly_performance = []
             
-            for month, group in monthly_groups:
-                winning_trades = group[group['pnl'] > 0]
-                losing_trades = group[group['pnl'] < 0]
-                
-                monthly_pnl = group['pnl'].sum()
-                monthly_commission = group['commission'].sum()
-                
+            for period in self._equity_engine().periods('M'):
                 monthly_performance.append({
-                    'month': str(month),
-                    'total_pnl': monthly_pnl,
-                    'total_commission': monthly_commission,
-                    'net_pnl': monthly_pnl - monthly_commission,
-                    'total_trades': len(group),
-                    'winning_trades': len(winning_trades),
-                    'losing_trades': len(losing_trades),
-                    'win_rate': (len(winning_trades) / len(group)) * 100,
-                    'best_trade': group['pnl'].max(),
-                    'worst_trade': group['pnl'].min(),
-                    'avg_trade': group['pnl'].mean()
+                    'month': period['period'],
+                    'total_pnl': period['total_pnl'],
+                    'total_commission': period['total_commission'],
+                    'net_pnl': period['total_pnl'] - period['total_commission'],
+                    'total_trades': period['total_trades'],
+                    'winning_trades': period['winning_trades'],
+                    'losing_trades': period['losing_trades'],
+                    'win_rate': (period['winning_trades'] / period['total_trades']) * 100,
+                    'best_trade': period['best_trade'],
+                    'worst_trade': period['worst_trade'],
+                    'avg_trade': period['avg_trade']
                 })
             
-            # Sort by month
-            monthly_performance.sort(key=lambda x: x['month'])
-            
             return monthly_performance
             
         except Exception as e:
@@ -1,7 +1,9 @@
 import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import bisect
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 import pandas as pd
 import numpy as np
@@ -43,6 +45,151 @@ class SignalRecord:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class PnLAggregate:
+    """Running realized P&L over a set of closed trades, updated in O(1) per trade"""
+    trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_pnl: float = 0.0
+    total_commission: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    best_trade: Optional[float] = None
+    worst_trade: Optional[float] = None
+
+    def add(self, pnl: float, commission: float):
+        self.trades += 1
+        self.total_pnl += pnl
+        self.total_commission += commission
+        if pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.gross_loss += pnl
+        self.add_extremes(pnl, pnl)
+
+    def add_extremes(self, best: Optional[float], worst: Optional[float]):
+        if best is not None and (self.best_trade is None or best > self.best_trade):
+            self.best_trade = best
+        if worst is not None and (self.worst_trade is None or worst < self.worst_trade):
+            self.worst_trade = worst
+
+    def summary(self) -> Dict:
+        """The metric fields of calculate_realized_pnl"""
+        return {
+            'total_realized_pnl': self.total_pnl,
+            'total_commission': self.total_commission,
+            'net_pnl': self.total_pnl - self.total_commission,
+            'total_trades': self.trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': self.winning_trades / self.trades * 100 if self.trades else 0,
+            'average_win': self.gross_profit / self.winning_trades if self.winning_trades else 0,
+            'average_loss': self.gross_loss / self.losing_trades if self.losing_trades else 0,
+            'profit_factor': self.gross_profit / abs(self.gross_loss) if self.losing_trades else float('inf'),
+            'largest_win': self.best_trade if self.best_trade is not None else 0,
+            'largest_loss': self.worst_trade if self.worst_trade is not None else 0
+        }
+
+
+class ClosedTradeIndex:
+    """
+    Realized P&L for one scope (all trades or one symbol)
+
+    ``total`` covers every closed trade. Trades with an exit time are also kept
+    sorted by exit time with prefix sums of each aggregate field, so a window
+    since any cutoff costs two lookups instead of a pass over the trades.
+    Extremes come from per-day buckets plus the part of the cutoff's own day.
+    """
+
+    def __init__(self):
+        self.total = PnLAggregate()
+        self.days: Dict[date, PnLAggregate] = {}
+        self.day_keys: List[date] = []
+        self.exit_times: List[datetime] = []
+        self.rows: List[Tuple[float, float]] = []  # (pnl, commission) in exit-time order
+        # prefix[i] sums rows[:i]: (pnl, commission, wins, losses, gross profit, gross loss)
+        self.prefix: List[Tuple[float, float, int, int, float, float]] = [(0.0, 0.0, 0, 0, 0.0, 0.0)]
+        # Bumped when a late exit reorders trades already indexed
+        self.revision = 0
+
+    def add(self, pnl: float, commission: float, exit_time: Optional[datetime]):
+        self.total.add(pnl, commission)
+        if exit_time is None:
+            return
+
+        day_key = exit_time.date()
+        if day_key not in self.days:
+            self.days[day_key] = PnLAggregate()
+            bisect.insort(self.day_keys, day_key)
+        self.days[day_key].add(pnl, commission)
+
+        if not self.exit_times or exit_time >= self.exit_times[-1]:
+            self.exit_times.append(exit_time)
+            self.rows.append((pnl, commission))
+            self.prefix.append(self._step(self.prefix[-1], pnl, commission))
+            return
+
+        # Late close: insert in order and redo the prefix sums after it
+        pos = bisect.bisect_right(self.exit_times, exit_time)
+        self.exit_times.insert(pos, exit_time)
+        self.rows.insert(pos, (pnl, commission))
+        del self.prefix[pos + 1:]
+        self.revision += 1
+        for row_pnl, row_commission in self.rows[pos:]:
+            self.prefix.append(self._step(self.prefix[-1], row_pnl, row_commission))
+
+    @staticmethod
+    def _step(prev: Tuple, pnl: float, commission: float) -> Tuple:
+        total, fees, wins, losses, profit, loss = prev
+        return (
+            total + pnl,
+            fees + commission,
+            wins + (pnl > 0),
+            losses + (pnl < 0),
+            profit + max(pnl, 0.0),
+            loss + min(pnl, 0.0)
+        )
+
+    def since(self, cutoff: datetime) -> PnLAggregate:
+        """Aggregate over trades that exited at or after ``cutoff``"""
+        start = bisect.bisect_left(self.exit_times, cutoff)
+        end_sums, start_sums = self.prefix[-1], self.prefix[start]
+        total, fees, wins, losses, profit, loss = (a - b for a, b in zip(end_sums, start_sums))
+        aggregate = PnLAggregate(
+            trades=len(self.rows) - start,
+            winning_trades=wins,
+            losing_trades=losses,
+            total_pnl=total,
+            total_commission=fees,
+            gross_profit=profit,
+            gross_loss=loss
+        )
+        if not aggregate.trades:
+            return aggregate
+
+        # Whole days after the cutoff's day come from their buckets
+        for day_key in self.day_keys[bisect.bisect_right(self.day_keys, cutoff.date()):]:
+            day = self.days[day_key]
+            aggregate.add_extremes(day.best_trade, day.worst_trade)
+        # and the rest of the cutoff's day from the sorted trades
+        next_day = datetime.combine(cutoff.date() + timedelta(days=1), datetime.min.time())
+        for pnl, _ in self.rows[start:bisect.bisect_left(self.exit_times, next_day)]:
+            aggregate.add_extremes(pnl, pnl)
+        return aggregate
+
+
+def _signal_from_json(data: Dict) -> SignalRecord:
+    return SignalRecord(**{**data, 'timestamp': datetime.fromisoformat(data['timestamp'])})
+
+
+def _trade_from_json(data: Dict) -> TradeRecord:
+    times = {key: datetime.fromisoformat(data[key]) for key in ('entry_time', 'exit_time') if data.get(key)}
+    return TradeRecord(**{**data, **times})
+
+
 class TradeLogger:
     def __init__(self):
         # In-memory storage (in production, this would use a database)
@@ -55,10 +202,74 @@ class TradeLogger:
         self.total_realized_pnl = 0.0
         self.total_commission_paid = 0.0
         
+        # Realized P&L aggregates, kept current as trades close
+        self.realized = ClosedTradeIndex()
+        self.realized_by_symbol: Dict[str, ClosedTradeIndex] = {}
+        # Trade ids in the order they were folded in, so a snapshot restores identical sums
+        self._aggregated_trades: Dict[str, None] = {}
+        
+        # Optional trading.journal.TradeJournal: every change is appended, never awaited
+        self.journal = None
+        
+    async def attach_journal(self, journal) -> int:
+        """Replay ``journal`` into the in-memory indexes, then journal every change to it"""
+        self.journal = None
+        replayed = 0
+        for record in journal.replay():
+            await self._replay(record)
+            replayed += 1
+        self.journal = journal
+        journal.snapshot_source = self._snapshot
+        await journal.start()
+        return replayed
+    
+    def _journal(self, kind: str, data: Dict):
+        if self.journal is not None:
+            self.journal.append(kind, data)
+    
+    async def _replay(self, record: Dict):
+        """Apply one journal record as it was applied when written"""
+        at = datetime.fromisoformat(record['at'])
+        data = record['data']
+        try:
+            if record['kind'] == 'snapshot':
+                self._restore(data)
+            elif record['kind'] == 'signal':
+                await self._apply_signal(_signal_from_json(data), at)
+            elif record['kind'] == 'trade':
+                await self._apply_trade(_trade_from_json(data), at)
+            elif record['kind'] == 'close' and data['id'] in self.trades:
+                await self._apply_close(
+                    self.trades[data['id']], data['exit_price'], datetime.fromisoformat(data['exit_time']), at
+                )
+        except Exception as e:
+            print(f"Error replaying journal record {record.get('seq')}: {str(e)}")
+    
+    def _snapshot(self) -> Dict:
+        """Everything replaying the journal so far would rebuild"""
+        return {
+            'signals': [asdict(signal) for signal in self.signals.values()],
+            'trades': [asdict(trade) for trade in self.trades.values()],
+            'daily_stats': self.daily_stats,
+            'total_realized_pnl': self.total_realized_pnl,
+            'total_commission_paid': self.total_commission_paid,
+            'aggregated_trades': list(self._aggregated_trades)
+        }
+    
+    def _restore(self, state: Dict):
+        self.signals = {data['id']: _signal_from_json(data) for data in state['signals']}
+        self.trades = {data['id']: _trade_from_json(data) for data in state['trades']}
+        self.open_positions = {trade_id: trade for trade_id, trade in self.trades.items() if trade.status == 'OPEN'}
+        self.daily_stats = state['daily_stats']
+        self.total_realized_pnl = state['total_realized_pnl']
+        self.total_commission_paid = state['total_commission_paid']
+        for trade_id in state['aggregated_trades']:
+            self._aggregate_closed_trade(self.trades[trade_id])
+        
     async def log_signal(self, signal: Dict) -> str:
         """Log a trading signal"""
         try:
-            signal_id = signal.get('id') or f"sig_{int(datetime.now().timestamp() * 1000)}"
+            signal_id = signal.get('id') or f"sig_{uuid.uuid4().hex}"
             
             signal_record = SignalRecord(
                 id=signal_id,
@@ -80,8 +291,8 @@ class TradeLogger:
                 metadata=signal.get('metadata', {})
             )
             
-            self.signals[signal_id] = signal_record
-            await self._update_daily_stats('signals_generated', 1)
+            await self._apply_signal(signal_record)
+            self._journal('signal', asdict(signal_record))
             
             return signal_id
             
@@ -92,7 +303,7 @@ class TradeLogger:
     async def log_trade_execution(self, trade: Dict, signal_id: Optional[str] = None) -> str:
         """Log trade execution"""
         try:
-            trade_id = trade.get('id') or f"trade_{int(datetime.now().timestamp() * 1000)}"
+            trade_id = trade.get('id') or f"trade_{uuid.uuid4().hex}"
             
             trade_record = TradeRecord(
                 id=trade_id,
@@ -114,23 +325,8 @@ class TradeLogger:
                 metadata=trade.get('metadata', {})
             )
             
-            self.trades[trade_id] = trade_record
-            
-            # Update signal as executed
-            if signal_id and signal_id in self.signals:
-                self.signals[signal_id].executed = True
-                self.signals[signal_id].trade_id = trade_id
-            
-            # Track open positions
-            if trade_record.status == 'OPEN':
-                self.open_positions[trade_id] = trade_record
-                await self._update_daily_stats('trades_opened', 1)
-            elif trade_record.status == 'CLOSED':
-                if trade_id in self.open_positions:
-                    del self.open_positions[trade_id]
-                await self._close_trade_stats(trade_record)
-            
-            self.total_commission_paid += trade_record.commission
+            await self._apply_trade(trade_record)
+            self._journal('trade', asdict(trade_record))
             
             return trade_id
             
@@ -149,25 +345,10 @@ class TradeLogger:
             if trade.status != 'OPEN':
                 return False
             
-            trade.exit_price = exit_price
-            trade.exit_time = exit_time or datetime.now()
-            trade.status = 'CLOSED'
-            
-            # Calculate P&L
-            if trade.action == 'BUY':
-                trade.pnl = (exit_price - trade.entry_price) * trade.quantity
-            else:  # SELL
-                trade.pnl = (trade.entry_price - exit_price) * trade.quantity
-            
-            # Subtract commission
-            trade.pnl -= trade.commission
-            
-            # Update tracking
-            if trade_id in self.open_positions:
-                del self.open_positions[trade_id]
-            
-            self.total_realized_pnl += trade.pnl
-            await self._close_trade_stats(trade)
+            await self._apply_close(trade, exit_price, exit_time or datetime.now())
+            self._journal('close', {
+                'id': trade_id, 'exit_price': exit_price, 'exit_time': trade.exit_time, 'pnl': trade.pnl
+            })
             
             return True
             
@@ -175,68 +356,74 @@ class TradeLogger:
             print(f"Error closing trade: {str(e)}")
             return False
     
+    async def _apply_signal(self, signal_record: SignalRecord, at: Optional[datetime] = None):
+        self.signals[signal_record.id] = signal_record
+        await self._update_daily_stats('signals_generated', 1, at)
+    
+    async def _apply_trade(self, trade_record: TradeRecord, at: Optional[datetime] = None):
+        trade_id, signal_id = trade_record.id, trade_record.signal_id
+        self.trades[trade_id] = trade_record
+        
+        # Update signal as executed
+        if signal_id and signal_id in self.signals:
+            self.signals[signal_id].executed = True
+            self.signals[signal_id].trade_id = trade_id
+        
+        # Track open positions
+        if trade_record.status == 'OPEN':
+            self.open_positions[trade_id] = trade_record
+            await self._update_daily_stats('trades_opened', 1, at)
+        elif trade_record.status == 'CLOSED':
+            if trade_id in self.open_positions:
+                del self.open_positions[trade_id]
+            await self._close_trade_stats(trade_record, at)
+        
+        self.total_commission_paid += trade_record.commission
+    
+    async def _apply_close(self, trade: TradeRecord, exit_price: float, exit_time: datetime,
+                           at: Optional[datetime] = None):
+        trade.exit_price = exit_price
+        trade.exit_time = exit_time
+        trade.status = 'CLOSED'
+        
+        # Calculate P&L
+        if trade.action == 'BUY':
+            trade.pnl = (exit_price - trade.entry_price) * trade.quantity
+        else:  # SELL
+            trade.pnl = (trade.entry_price - exit_price) * trade.quantity
+        
+        # Subtract commission
+        trade.pnl -= trade.commission
+        
+        # Update tracking
+        if trade.id in self.open_positions:
+            del self.open_positions[trade.id]
+        
+        self.total_realized_pnl += trade.pnl
+        await self._close_trade_stats(trade, at)
+    
     async def calculate_realized_pnl(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> Dict:
         """Calculate realized P&L"""
         try:
-            closed_trades = [
-                trade for trade in self.trades.values() 
-                if trade.status == 'CLOSED' and trade.pnl is not None
-            ]
-            
-            # Filter by symbol if specified
             if symbol:
-                closed_trades = [trade for trade in closed_trades if trade.symbol == symbol]
+                scopes = {symbol: self.realized_by_symbol[symbol]} if symbol in self.realized_by_symbol else {}
+            else:
+                scopes = self.realized_by_symbol
             
-            # Filter by timeframe if specified
             if timeframe:
                 cutoff_date = self._get_timeframe_cutoff(timeframe)
-                closed_trades = [
-                    trade for trade in closed_trades 
-                    if trade.exit_time and trade.exit_time >= cutoff_date
-                ]
+                per_symbol = {name: index.since(cutoff_date) for name, index in scopes.items()}
+                aggregate = per_symbol[symbol] if symbol else self.realized.since(cutoff_date)
+            else:
+                per_symbol = {name: index.total for name, index in scopes.items()}
+                aggregate = per_symbol[symbol] if symbol else self.realized.total
             
-            if not closed_trades:
+            if not aggregate.trades:
                 return self._get_empty_pnl_summary()
             
-            # Calculate metrics
-            total_pnl = sum(trade.pnl for trade in closed_trades)
-            total_commission = sum(trade.commission for trade in closed_trades)
-            
-            winning_trades = [trade for trade in closed_trades if trade.pnl > 0]
-            losing_trades = [trade for trade in closed_trades if trade.pnl < 0]
-            
-            win_rate = len(winning_trades) / len(closed_trades) * 100 if closed_trades else 0
-            
-            avg_win = np.mean([trade.pnl for trade in winning_trades]) if winning_trades else 0
-            avg_loss = np.mean([trade.pnl for trade in losing_trades]) if losing_trades else 0
-            
-            profit_factor = (
-                sum(trade.pnl for trade in winning_trades) / 
-                abs(sum(trade.pnl for trade in losing_trades)) 
-                if losing_trades else float('inf')
-            )
-            
-            # Group by symbol
-            symbol_pnl = {}
-            for trade in closed_trades:
-                if trade.symbol not in symbol_pnl:
-                    symbol_pnl[trade.symbol] = 0
-                symbol_pnl[trade.symbol] += trade.pnl
-            
             return {
-                'total_realized_pnl': total_pnl,
-                'total_commission': total_commission,
-                'net_pnl': total_pnl - total_commission,
-                'total_trades': len(closed_trades),
-                'winning_trades': len(winning_trades),
-                'losing_trades': len(losing_trades),
-                'win_rate': win_rate,
-                'average_win': avg_win,
-                'average_loss': avg_loss,
-                'profit_factor': profit_factor,
-                'largest_win': max([trade.pnl for trade in closed_trades]) if closed_trades else 0,
-                'largest_loss': min([trade.pnl for trade in closed_trades]) if closed_trades else 0,
-                'symbol_breakdown': symbol_pnl,
+                **aggregate.summary(),
+                'symbol_breakdown': {name: agg.total_pnl for name, agg in per_symbol.items() if agg.trades},
                 'timeframe': timeframe or 'all_time',
                 'calculation_time': datetime.now()
             }
@@ -245,6 +432,13 @@ class TradeLogger:
             print(f"Error calculating realized P&L: {str(e)}")
             return self._get_empty_pnl_summary()
     
+    def realized_aggregate(self, symbol: Optional[str] = None, since: Optional[datetime] = None) -> PnLAggregate:
+        """Running realized P&L for all trades or one symbol, optionally only exits since ``since``"""
+        index = self.realized_by_symbol.get(symbol) if symbol else self.realized
+        if index is None:
+            return PnLAggregate()
+        return index.since(since) if since else index.total
+    
     async def calculate_unrealized_pnl(self, current_prices: Dict[str, float]) -> Dict:
         """Calculate unrealized P&L for open positions"""
         try:
@@ -440,10 +634,10 @@ class TradeLogger:
             'total_volume': 0
         }
     
-    async def _update_daily_stats(self, metric: str, value: float):
+    async def _update_daily_stats(self, metric: str, value: float, at: Optional[datetime] = None):
         """Update daily statistics"""
         try:
-            date_key = datetime.now().strftime('%Y-%m-%d')
+            date_key = (at or datetime.now()).strftime('%Y-%m-%d')
             
             if date_key not in self.daily_stats:
                 self.daily_stats[date_key] = {}
@@ -454,33 +648,40 @@ class TradeLogger:
         except Exception as e:
             print(f"Error updating daily stats: {str(e)}")
     
-    async def _close_trade_stats(self, trade: TradeRecord):
+    async def _close_trade_stats(self, trade: TradeRecord, at: Optional[datetime] = None):
         """Update statistics when a trade is closed"""
         try:
-            await self._update_daily_stats('trades_closed', 1)
+            self._aggregate_closed_trade(trade)
+            await self._update_daily_stats('trades_closed', 1, at)
+            day = self.daily_stats[(at or datetime.now()).strftime('%Y-%m-%d')]
             
             if trade.pnl and trade.pnl > 0:
-                await self._update_daily_stats('winning_trades', 1)
-                await self._update_daily_stats('best_trade', max(
-                    self.daily_stats.get(datetime.now().strftime('%Y-%m-%d'), {}).get('best_trade', 0),
-                    trade.pnl
-                ))
+                await self._update_daily_stats('winning_trades', 1, at)
+                day['best_trade'] = max(day.get('best_trade', 0), trade.pnl)
             elif trade.pnl and trade.pnl < 0:
-                await self._update_daily_stats('losing_trades', 1)
-                await self._update_daily_stats('worst_trade', min(
-                    self.daily_stats.get(datetime.now().strftime('%Y-%m-%d'), {}).get('worst_trade', 0),
-                    trade.pnl
-                ))
+                await self._update_daily_stats('losing_trades', 1, at)
+                day['worst_trade'] = min(day.get('worst_trade', 0), trade.pnl)
             
             if trade.pnl:
-                await self._update_daily_stats('daily_pnl', trade.pnl)
+                await self._update_daily_stats('daily_pnl', trade.pnl, at)
             
-            await self._update_daily_stats('daily_commission', trade.commission)
-            await self._update_daily_stats('total_volume', trade.quantity * trade.entry_price)
+            await self._update_daily_stats('daily_commission', trade.commission, at)
+            await self._update_daily_stats('total_volume', trade.quantity * trade.entry_price, at)
             
         except Exception as e:
             print(f"Error updating close trade stats: {str(e)}")
     
+    def _aggregate_closed_trade(self, trade: TradeRecord):
+        """Fold a closed trade into the realized aggregates, once per trade id"""
+        if trade.pnl is None or trade.id in self._aggregated_trades:
+            return
+        self._aggregated_trades[trade.id] = None
+        
+        if trade.symbol not in self.realized_by_symbol:
+            self.realized_by_symbol[trade.symbol] = ClosedTradeIndex()
+        for index in (self.realized, self.realized_by_symbol[trade.symbol]):
+            index.add(trade.pnl, trade.commission, trade.exit_time)
+    
     def get_portfolio_summary(self) -> Dict:
         """Get overall portfolio summary"""
         return {
@@ -0,0 +1,169 @@
+"""
+Candle-close scan scheduling for the live scanner
+
+A (symbol, timeframe) pair only has new information when its bar closes, or
+when the live price has moved far enough that the forming bar changes the
+picture. The schedule tracks the next close per pair and reports which pairs
+are due. Symbols get fixed phase offsets so the post-close rescans are spread
+over a window instead of all landing on the same second.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '2h': 7200,
+    '4h': 14400,
+    '6h': 21600,
+    '8h': 28800,
+    '12h': 43200,
+    '1d': 86400,
+    '1w': 604800,
+}
+
+# Epoch (1970-01-01) was a Thursday; weekly bars open on Monday
+_TIMEFRAME_OFFSETS = {'1w': 4 * 86400}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    try:
+        return TIMEFRAME_SECONDS[timeframe]
+    except KeyError:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def next_close(timestamp: float, timeframe: str) -> float:
+    """Epoch seconds at which the bar containing ``timestamp`` closes"""
+    period = timeframe_seconds(timeframe)
+    offset = _TIMEFRAME_OFFSETS.get(timeframe, 0)
+    return ((timestamp - offset) // period + 1) * period + offset
+
+
+class CandleCloseSchedule:
+    """
+    Next-due times per (symbol, timeframe)
+
+    Args:
+        symbols: Symbols to schedule
+        timeframes: Timeframes scanned for every symbol
+        spread: Window in seconds over which symbols are staggered after a
+            close (capped at half a bar), and the sweep interval the
+            ``scans_saved`` counter compares against
+        close_delay: Seconds to wait after a close for the exchange to
+            publish the final bar
+        price_threshold: Relative move since the last scan that makes a
+            symbol due on all timeframes
+    """
+
+    def __init__(self, symbols: Iterable[str], timeframes: Iterable[str], spread: float = 30.0,
+                 close_delay: float = 2.0, price_threshold: float = 0.005, now: Optional[float] = None):
+        self.spread = spread
+        self.close_delay = close_delay
+        self.price_threshold = price_threshold
+        self.symbols: List[str] = []
+        self.timeframes: List[str] = []
+        self._due_at: Dict[Tuple[str, str], float] = {}
+        self._phase: Dict[str, float] = {}
+        self._scan_price: Dict[str, float] = {}
+        self._last_price: Dict[str, float] = {}
+        self._last_check: Optional[float] = None
+        self.stats = {
+            "scans": 0,
+            "close_triggers": 0,
+            "price_triggers": 0,
+            "sweep_equivalent": 0.0,
+        }
+        self.configure(symbols, timeframes, now)
+
+    def configure(self, symbols: Iterable[str], timeframes: Iterable[str], now: Optional[float] = None):
+        """Set the symbol/timeframe universe; new pairs are due right away (staggered)"""
+        now = time.time() if now is None else now
+        self.symbols = list(dict.fromkeys(symbols))
+        self.timeframes = list(dict.fromkeys(timeframes))
+        for timeframe in self.timeframes:
+            timeframe_seconds(timeframe)  # reject unknown timeframes up front
+        count = len(self.symbols)
+        self._phase = {symbol: index / count for index, symbol in enumerate(self.symbols)}
+
+        due_at = {}
+        for symbol in self.symbols:
+            for timeframe in self.timeframes:
+                key = (symbol, timeframe)
+                due_at[key] = self._due_at.get(key, now + self._stagger(symbol, timeframe))
+        self._due_at = due_at
+        for prices in (self._scan_price, self._last_price):
+            for symbol in set(prices) - set(self.symbols):
+                del prices[symbol]
+
+    def _stagger(self, symbol: str, timeframe: str) -> float:
+        window = min(self.spread, timeframe_seconds(timeframe) / 2)
+        return self._phase.get(symbol, 0.0) * window
+
+    def observe_price(self, symbol: str, price: float):
+        """Record the latest traded price; non-positive prices are ignored"""
+        if price and price > 0 and symbol in self._phase:
+            self._last_price[symbol] = float(price)
+
+    def _price_moved(self, symbol: str) -> bool:
+        reference = self._scan_price.get(symbol)
+        price = self._last_price.get(symbol)
+        if not reference or price is None:
+            return False
+        return abs(price - reference) / reference >= self.price_threshold
+
+    def due(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        """Timeframes to rescan per symbol: closed bars, or all of them after a price move"""
+        now = time.time() if now is None else now
+        if self._last_check is not None and self.spread > 0:
+            # What a fixed sweep every ``spread`` seconds would have scanned meanwhile
+            self.stats["sweep_equivalent"] += len(self._due_at) * max(0.0, now - self._last_check) / self.spread
+        self._last_check = now
+
+        due: Dict[str, List[str]] = {}
+        for symbol in self.symbols:
+            if self._price_moved(symbol):
+                due[symbol] = list(self.timeframes)
+                self.stats["price_triggers"] += 1
+                continue
+            closed = [tf for tf in self.timeframes if self._due_at[(symbol, tf)] <= now]
+            if closed:
+                due[symbol] = closed
+                self.stats["close_triggers"] += len(closed)
+        return due
+
+    def mark_scanned(self, symbol: str, timeframes: Iterable[str], now: Optional[float] = None):
+        """Push the pairs to their next close and reset the price reference"""
+        now = time.time() if now is None else now
+        for timeframe in timeframes:
+            key = (symbol, timeframe)
+            if key not in self._due_at:
+                continue
+            self._due_at[key] = next_close(now, timeframe) + self.close_delay + self._stagger(symbol, timeframe)
+            self.stats["scans"] += 1
+        if symbol in self._last_price:
+            self._scan_price[symbol] = self._last_price[symbol]
+
+    def seconds_until_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the earliest pair is due (None when nothing is scheduled)"""
+        now = time.time() if now is None else now
+        if not self._due_at:
+            return None
+        return max(0.0, min(self._due_at.values()) - now)
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        sweep_equivalent = int(self.stats["sweep_equivalent"])
+        return {
+            "pairs": len(self._due_at),
+            "scans": self.stats["scans"],
+            "close_triggers": self.stats["close_triggers"],
+            "price_triggers": self.stats["price_triggers"],
+            "sweep_equivalent_scans": sweep_equivalent,
+            "scans_saved": max(0, sweep_equivalent - self.stats["scans"]),
+            "next_due_in": self.seconds_until_due(now),
+        }
@@ -0,0 +1,133 @@
+"""
+Shared WebSocket feed pumps
+One background producer per topic polls upstream once per interval and fans
+the serialized message out to every subscriber, so upstream load does not
+grow with the number of open dashboards
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import WebSocket
+
+from .manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+# Returns the next message for the topic, or None to skip this tick
+Producer = Callable[[], Awaitable[Optional[dict]]]
+
+
+class FeedPump:
+    """
+    Periodic producer for one topic
+
+    The pump runs only while the topic has subscribers: the first attach
+    starts it and the last detach stops it.
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        producer: Producer,
+        interval: float,
+        connection_manager: ConnectionManager = manager,
+        on_idle: Optional[Callable[[], None]] = None
+    ):
+        self.topic = topic
+        self.producer = producer
+        self.interval = interval
+        self.manager = connection_manager
+        self.on_idle = on_idle
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.messages_published = 0
+        self.errors = 0
+        self.last_publish: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def attach(self, websocket: WebSocket):
+        """Subscribe a connected socket and make sure the producer is running"""
+        self.manager.subscribe_topic(websocket, self.topic)
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Feed pump started: {self.topic}")
+
+    def detach(self, websocket: WebSocket):
+        """Unsubscribe a socket; stops the producer when nobody is left"""
+        self.manager.unsubscribe_topic(websocket, self.topic)
+        if self.manager.topic_subscriber_count(self.topic) == 0:
+            self.stop()
+            if self.on_idle is not None:
+                self.on_idle()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            logger.info(f"Feed pump stopped: {self.topic}")
+
+    async def _run(self):
+        while self.manager.topic_subscriber_count(self.topic) > 0:
+            self.ticks += 1
+            try:
+                message = await self.producer()
+                if message is not None:
+                    await self.manager.publish(self.topic, message)
+                    self.messages_published += 1
+                    self.last_publish = datetime.now()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Feed pump {self.topic} producer failed: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> dict:
+        return {
+            "topic": self.topic,
+            "running": self.running,
+            "subscribers": self.manager.topic_subscriber_count(self.topic),
+            "interval": self.interval,
+            "ticks": self.ticks,
+            "messages_published": self.messages_published,
+            "errors": self.errors,
+            "last_publish": self.last_publish.isoformat() if self.last_publish else None
+        }
+
+
+class FeedPumpRegistry:
+    """Pumps keyed by topic, created on first use and dropped when their last subscriber leaves"""
+
+    def __init__(self, connection_manager: ConnectionManager = manager):
+        self.manager = connection_manager
+        self.pumps: Dict[str, FeedPump] = {}
+
+    def get(self, topic: str, producer_factory: Callable[[], Producer], interval: float) -> FeedPump:
+        pump = self.pumps.get(topic)
+        if pump is None:
+            pump = FeedPump(topic, producer_factory(), interval, self.manager)
+            pump.on_idle = lambda: self._remove(topic, pump)
+            self.pumps[topic] = pump
+        return pump
+
+    def _remove(self, topic: str, pump: FeedPump):
+        if self.pumps.get(topic) is pump:
+            del self.pumps[topic]
+
+    def stop_all(self):
+        for pump in self.pumps.values():
+            pump.stop()
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {topic: pump.get_stats() for topic, pump in self.pumps.items()}
+
+
+# Global pump registry
+feed_pumps = FeedPumpRegistry()
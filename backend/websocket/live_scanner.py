@@ -4,11 +4,14 @@ Live Scanner for Real-Time Market Monitoring
 
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import List, Dict, Any
 import pandas as pd
 
+from .candle_schedule import CandleCloseSchedule
 from .manager import manager
+from .scan_deltas import ScanDeltaPublisher, scan_result_state
 from ..scoring.engine import DynamicScoringEngine
 from ..scoring.scanner import MultiTimeframeScanner
 from ..data.data_manager import data_manager
@@ -17,17 +20,35 @@ from ..api.models import WeightConfig, ScanRule
 logger = logging.getLogger(__name__)
 
 class LiveScanner:
-    """Continuously scan markets and push real-time updates"""
+    """
+    Rescan markets as candles close and push real-time updates
+    
+    Each (symbol, timeframe) pair is rescored only after its bar closes, or
+    for every timeframe of a symbol whose price moved past
+    ``price_move_threshold`` since its last scan. Post-close rescans are
+    staggered across ``scan_interval`` seconds.
+    """
     
     def __init__(self, scoring_engine: DynamicScoringEngine, scanner: MultiTimeframeScanner):
         self.scoring_engine = scoring_engine
         self.scanner = scanner
         self.is_running = False
-        self.scan_interval = 30  # seconds
+        self.scan_interval = 30  # seconds, window over which rescans are spread
+        self.price_check_interval = 10  # seconds between live price polls
+        self.price_move_threshold = 0.005  # 0.5% move forces a rescan
         self.symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT", "XRPUSDT"]
         self.timeframes = ["15m", "1h"]
         self.last_scan_time = None
         self.scan_results_cache = {}
+        # Unfiltered latest result per symbol; partial rescans merge into these
+        self.latest_results = {}
+        self.schedule = CandleCloseSchedule(
+            self.symbols, self.timeframes,
+            spread=self.scan_interval, price_threshold=self.price_move_threshold
+        )
+        self._last_price_check = float('-inf')
+        # Delta-mode clients get sequenced per-symbol diffs instead of full results
+        self.deltas = ScanDeltaPublisher(conflate_interval=1.0)
         
     async def start(self):
         """Start the live scanner"""
@@ -47,54 +68,80 @@ class LiveScanner:
         logger.info("Live scanner stopped")
     
     async def _scan_loop(self):
-        """Main scanning loop"""
+        """Main scanning loop: wake for the next due pair or price poll"""
         while self.is_running:
             try:
-                start_time = datetime.now()
-                
-                # Perform market scan
-                await self._perform_market_scan()
+                if time.monotonic() - self._last_price_check >= self.price_check_interval:
+                    await self._refresh_prices()
                 
-                # Calculate scan duration
-                scan_duration = (datetime.now() - start_time).total_seconds()
-                logger.debug(f"Market scan completed in {scan_duration:.2f} seconds")
+                due = self.schedule.due()
+                if due:
+                    start_time = datetime.now()
+                    
+                    # Rescore only the pairs that have new information
+                    await self._perform_market_scan(due)
+                    
+                    scan_duration = (datetime.now() - start_time).total_seconds()
+                    logger.debug(f"Scanned {sum(map(len, due.values()))} symbol/timeframe pairs "
+                                 f"in {scan_duration:.2f} seconds")
                 
-                # Wait for next scan
-                await asyncio.sleep(self.scan_interval)
+                # Sleep until the next close is due, but keep polling prices
+                wait = self.schedule.seconds_until_due()
+                price_wait = self.price_check_interval - (time.monotonic() - self._last_price_check)
+                await asyncio.sleep(max(0.5, min(price_wait, wait if wait is not None else price_wait)))
                 
             except Exception as e:
                 logger.error(f"Error in scan loop: {e}")
                 await asyncio.sleep(60)  # Wait longer on error
     
-    async def _perform_market_scan(self):
-        """Perform comprehensive market scan"""
+    async def _refresh_prices(self):
+        """Feed the latest prices to the schedule for move-triggered rescans"""
+        self._last_price_check = time.monotonic()
+        tickers = await data_manager.get_multiple_market_data(self.symbols)
+        for ticker in tickers:
+            if isinstance(ticker, dict) and ticker.get('symbol'):
+                self.schedule.observe_price(ticker['symbol'], ticker.get('price'))
+    
+    def on_price(self, symbol: str, price: float):
+        """Push a live price from a streaming source into the schedule"""
+        self.schedule.observe_price(symbol, price)
+    
+    async def _perform_market_scan(self, due: Dict[str, List[str]], rules: ScanRule = None):
+        """Rescan the due symbol/timeframe pairs and push the updates"""
         try:
-            # Create scan rules
-            scan_rules = ScanRule(
-                min_score=0.6,
-                min_confidence=0.5,
-                max_risk_level="MEDIUM"
-            )
+            if rules is None:
+                rules = ScanRule(
+                    min_score=0.6,
+                    min_confidence=0.5,
+                    max_risk_level="MEDIUM"
+                )
             
-            # Run scanner
-            results = await self.scanner.scan(
-                symbols=self.symbols,
-                timeframes=self.timeframes,
-                rules=scan_rules
-            )
+            # Run scanner on the due pairs, carrying over the other timeframes
+            rescanned = await self.scanner.rescan(due, previous=self.latest_results)
+            for symbol, timeframes in due.items():
+                self.schedule.mark_scanned(symbol, timeframes)
+            for result in rescanned:
+                self.latest_results[result.symbol] = result
             
             # Cache results
+            results = self.scanner.filter_results(list(self.latest_results.values()), rules)
             self.scan_results_cache = {result.symbol: result for result in results}
             self.last_scan_time = datetime.now()
             
             # Send updates to WebSocket clients
             await self._send_scan_updates(results)
             
-            # Send individual symbol updates
-            await self._send_symbol_updates(results)
+            # Send individual symbol updates for what changed
+            changed = {result.symbol for result in rescanned}
+            await self._send_symbol_updates([r for r in results if r.symbol in changed])
+            
+            # Send diffs to delta-mode clients
+            await self._send_scan_deltas(rescanned)
+            return rescanned
             
         except Exception as e:
             logger.error(f"Error performing market scan: {e}")
+            return []
     
     async def _send_scan_updates(self, results: List[Any]):
         """Send market scan results to all clients"""
@@ -119,8 +166,8 @@ class LiveScanner:
                     }
                 })
             
-            # Send to all clients
-            await manager.send_market_scan_update(scan_data)
+            # Send to all full-mode clients
+            await manager.send_market_scan_update(scan_data, exclude=self.deltas.subscribers)
             
         except Exception as e:
             logger.error(f"Error sending scan updates: {e}")
@@ -138,16 +185,23 @@ class LiveScanner:
                     "risk_level": result.risk_level
                 }
                 
-                await manager.send_signal_update(result.symbol, signal_data)
+                await manager.send_signal_update(result.symbol, signal_data, exclude=self.deltas.subscribers)
                 
                 # Send price update (would fetch real price in production)
                 price_data = await self._get_price_data(result.symbol)
                 if price_data:
-                    await manager.send_price_update(result.symbol, price_data)
+                    await manager.send_price_update(result.symbol, price_data, exclude=self.deltas.subscribers)
                 
         except Exception as e:
             logger.error(f"Error sending symbol updates: {e}")
     
+    async def _send_scan_deltas(self, results: List[Any]):
+        """Send changed fields per symbol to delta-mode clients"""
+        try:
+            await self.deltas.update({result.symbol: scan_result_state(result) for result in results})
+        except Exception as e:
+            logger.error(f"Error sending scan deltas: {e}")
+    
     async def _get_price_data(self, symbol: str) -> Dict[str, Any]:
         """Get current price data for symbol"""
         try:
@@ -196,18 +250,13 @@ class LiveScanner:
             
             logger.info(f"Forcing scan for symbols: {symbols}")
             
-            # Perform immediate scan
+            # Perform immediate scan of every timeframe
             scan_rules = ScanRule(min_score=0.5, min_confidence=0.4)
-            results = await self.scanner.scan(
-                symbols=symbols,
-                timeframes=self.timeframes,
+            results = await self._perform_market_scan(
+                {symbol: list(self.timeframes) for symbol in symbols},
                 rules=scan_rules
             )
             
-            # Send updates
-            await self._send_scan_updates(results)
-            await self._send_symbol_updates(results)
-            
             logger.info(f"Force scan completed for {len(results)} symbols")
             
         except Exception as e:
@@ -222,17 +271,24 @@ class LiveScanner:
             "timeframes": self.timeframes,
             "last_scan_time": self.last_scan_time.isoformat() if self.last_scan_time else None,
             "cached_symbols": list(self.scan_results_cache.keys()),
-            "total_cached_results": len(self.scan_results_cache)
+            "total_cached_results": len(self.scan_results_cache),
+            "schedule": self.schedule.get_stats(),
+            "scheduler": self.scanner.scheduler.get_stats() if hasattr(self.scanner, 'scheduler') else None,
+            "deltas": self.deltas.get_stats()
         }
     
     def update_symbols(self, symbols: List[str]):
         """Update the list of symbols to scan"""
         self.symbols = symbols
+        self.schedule.configure(self.symbols, self.timeframes)
+        for symbol in set(self.latest_results) - set(symbols):
+            del self.latest_results[symbol]
         logger.info(f"Updated symbols to scan: {symbols}")
     
     def update_scan_interval(self, interval: int):
-        """Update scan interval in seconds"""
+        """Update scan interval (rescan spread window) in seconds"""
         self.scan_interval = max(10, interval)  # Minimum 10 seconds
+        self.schedule.spread = self.scan_interval
         logger.info(f"Updated scan interval to {self.scan_interval} seconds")
 
 # Global live scanner instance
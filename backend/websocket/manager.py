@@ -3,36 +3,215 @@ WebSocket Connection Manager for Real-Time Updates
 """
 
 import asyncio
-import json
 import logging
+import os
+import time
+from collections import deque
 from datetime import datetime
-from typing import Set, Dict, List, Any
+from typing import Set, Dict, List, Any, Optional, Union
 from fastapi import WebSocket, WebSocketDisconnect
 
+try:
+    from ..core.encoding import DEFAULT_ENCODING, EncodedMessage, Frame, negotiate
+    from ..core.metrics import metrics
+except ImportError:
+    from core.encoding import DEFAULT_ENCODING, EncodedMessage, Frame, negotiate
+    from core.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+# What a full outbound queue does with a new message
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+# Close code for evicted slow consumers (RFC 6455 "Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+WS_SEND_SECONDS = metrics.histogram("hts_ws_send_seconds", "Time to write one frame to a client socket")
+WS_QUEUE_WAIT_SECONDS = metrics.histogram("hts_ws_queue_wait_seconds", "Time a frame waited in a client's outbound queue")
+WS_FRAMES_SHED = metrics.counter("hts_ws_frames_shed_total", "Frames dropped or replaced by a full client queue",
+                                 ["policy"])
+WS_EVICTIONS = metrics.counter("hts_ws_slow_consumer_evictions_total", "Clients disconnected for falling behind")
+
+
+class ClientChannel:
+    """
+    Bounded outbound queue and writer task for one WebSocket
+
+    Producers enqueue frames already encoded in the client's negotiated
+    encoding (text for JSON, binary for MessagePack) without waiting on the socket;
+    the writer drains the queue in order. When the queue is full:
+
+    - drop_oldest: the oldest pending frame is discarded
+    - coalesce: a pending frame with the same key (e.g. symbol) is replaced
+      by the new one in place, falling back to drop_oldest for new keys
+    - disconnect: the client is evicted as a slow consumer
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        owner: "ConnectionManager",
+        max_queue: int = 256,
+        policy: str = OVERFLOW_DROP_OLDEST,
+        send_timeout: Optional[float] = 10.0,
+        encoding: str = DEFAULT_ENCODING
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.websocket = websocket
+        self.encoding = encoding
+        self.owner = owner
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self._queue: deque = deque()  # (key, frame, enqueued_at)
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = asyncio.create_task(self._writer())
+        self.closed = False
+        self.stats = {
+            'sent': 0,
+            'dropped': 0,
+            'coalesced': 0,
+            'max_depth': 0,
+            'last_send_ms': 0.0,
+            'max_send_ms': 0.0,
+            'avg_send_ms': 0.0,
+            'max_queue_wait_ms': 0.0
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, message: Union[EncodedMessage, Frame], key: Optional[str] = None) -> bool:
+        """Queue a frame; returns False if the client was evicted instead"""
+        if self.closed:
+            return False
+        frame = message.get(self.encoding) if isinstance(message, EncodedMessage) else message
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == OVERFLOW_DISCONNECT:
+                logger.warning(f"Evicting slow WebSocket client ({len(self._queue)} frames queued)")
+                self.owner.evict(self.websocket)
+                return False
+            if self.policy == OVERFLOW_COALESCE and key is not None:
+                for i, (pending_key, _, enqueued_at) in enumerate(self._queue):
+                    if pending_key == key:
+                        self._queue[i] = (key, frame, enqueued_at)
+                        self.stats['coalesced'] += 1
+                        WS_FRAMES_SHED.inc(policy=OVERFLOW_COALESCE)
+                        return True
+            self._queue.popleft()
+            self.stats['dropped'] += 1
+            WS_FRAMES_SHED.inc(policy=OVERFLOW_DROP_OLDEST)
+
+        self._queue.append((key, frame, time.perf_counter()))
+        self.stats['max_depth'] = max(self.stats['max_depth'], len(self._queue))
+        self._ready.set()
+        return True
+
+    async def _writer(self):
+        while True:
+            await self._ready.wait()
+            while self._queue:
+                _, frame, enqueued_at = self._queue.popleft()
+                start = time.perf_counter()
+                send = self.websocket.send_text(frame) if isinstance(frame, str) else self.websocket.send_bytes(frame)
+                try:
+                    # asyncio.timeout runs the send in this task, so a cancel from close() can't be
+                    # swallowed the way wait_for() may when its inner task finishes at the same moment
+                    async with asyncio.timeout(self.send_timeout):
+                        await send
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Failed to send to client: {e}")
+                    self.owner.disconnect(self.websocket)
+                    return
+                self._record_send(start, enqueued_at)
+            self._ready.clear()
+
+    def _record_send(self, start: float, enqueued_at: float):
+        now = time.perf_counter()
+        send_ms = (now - start) * 1000
+        stats = self.stats
+        stats['sent'] += 1
+        stats['last_send_ms'] = send_ms
+        stats['max_send_ms'] = max(stats['max_send_ms'], send_ms)
+        # Exponential moving average keeps this O(1) per send
+        stats['avg_send_ms'] = send_ms if stats['sent'] == 1 else 0.9 * stats['avg_send_ms'] + 0.1 * send_ms
+        stats['max_queue_wait_ms'] = max(stats['max_queue_wait_ms'], (start - enqueued_at) * 1000)
+        WS_SEND_SECONDS.observe(now - start)
+        WS_QUEUE_WAIT_SECONDS.observe(start - enqueued_at)
+        self.owner.message_count += 1
+
+    def close(self):
+        """Stop the writer and drop pending frames"""
+        self.closed = True
+        self._queue.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            'depth': self.depth,
+            'max_queue': self.max_queue,
+            'policy': self.policy,
+            'encoding': self.encoding
+        }
+
+
 class ConnectionManager:
     """Manage WebSocket connections and subscriptions"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: int = 256,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        send_timeout: Optional[float] = 10.0
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+        self.evictions = 0
         self.active_connections: Set[WebSocket] = set()
         self.subscriptions: Dict[WebSocket, Set[str]] = {}
         self.symbol_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.topic_subscribers: Dict[str, Set[WebSocket]] = {}
         self.message_count = 0
         self.last_performance_check = datetime.now()
-        self.latency_measurements = []
     
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection"""
+    async def connect(self, websocket: WebSocket, encoding: Optional[str] = None):
+        """Accept new WebSocket connection; encoding defaults to the ?encoding= query param"""
         await websocket.accept()
+        if encoding is None:
+            query_params = getattr(websocket, 'query_params', None) or {}
+            encoding = query_params.get('encoding')
         self.active_connections.add(websocket)
         self.subscriptions[websocket] = set()
+        self.channels[websocket] = ClientChannel(
+            websocket, self, self.max_queue, self.overflow_policy, self.send_timeout, negotiate(encoding)
+        )
         logger.info(f"Client connected. Total clients: {len(self.active_connections)}")
     
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
+        if websocket not in self.active_connections:
+            return
         self.active_connections.discard(websocket)
         
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            channel.close()
+        
         # Remove from all symbol subscriptions
         if websocket in self.subscriptions:
             for symbol in self.subscriptions[websocket]:
@@ -40,6 +219,10 @@ class ConnectionManager:
                     self.symbol_subscribers[symbol].discard(websocket)
             del self.subscriptions[websocket]
         
+        # Remove from feed topics
+        for subscribers in self.topic_subscribers.values():
+            subscribers.discard(websocket)
+        
         logger.info(f"Client disconnected. Total clients: {len(self.active_connections)}")
     
     async def subscribe(self, websocket: WebSocket, symbol: str):
@@ -65,27 +248,81 @@ class ConnectionManager:
             
             logger.info(f"Client unsubscribed from {symbol}")
     
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
+    def set_encoding(self, websocket: WebSocket, encoding: Optional[str]) -> str:
+        """Switch a client's encoding for subsequent frames; returns the one chosen"""
+        chosen = negotiate(encoding)
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.encoding = chosen
+        return chosen
+    
+    def subscribe_topic(self, websocket: WebSocket, topic: str):
+        """Subscribe to a shared feed topic (e.g. one price pump's symbol set)"""
+        self.topic_subscribers.setdefault(topic, set()).add(websocket)
+    
+    def unsubscribe_topic(self, websocket: WebSocket, topic: str):
+        """Unsubscribe from a feed topic"""
+        subscribers = self.topic_subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.topic_subscribers[topic]
+    
+    def topic_subscriber_count(self, topic: str) -> int:
+        return len(self.topic_subscribers.get(topic, ()))
+    
+    def evict(self, websocket: WebSocket):
+        """Drop a slow consumer and close its socket in the background"""
+        self.evictions += 1
+        WS_EVICTIONS.inc()
+        self.disconnect(websocket)
+
+        async def _close():
+            try:
+                await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+
+        asyncio.create_task(_close())
+    
+    async def _send_to_all(self, connections, message: EncodedMessage, key: Optional[str] = None, exclude=None):
+        """Queue one message on every connection's channel; never waits on a socket"""
+        for connection in list(connections):
+            if exclude and connection in exclude:
+                continue
+            channel = self.channels.get(connection)
+            if channel is not None:
+                channel.enqueue(message, key)
+    
+    async def broadcast(self, message: dict, exclude: Optional[Set[WebSocket]] = None):
+        """Broadcast message to all connected clients (except ``exclude``)"""
         if not self.active_connections:
             return
         
-        disconnected = set()
-        message_json = json.dumps(message, default=str)
-        
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_json)
-                self.message_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.add(connection)
+        await self._send_to_all(self.active_connections, EncodedMessage(message), exclude=exclude)
+    
+    async def publish(self, topic: str, message: dict, coalesce: bool = True) -> Optional[EncodedMessage]:
+        """
+        Encode once per encoding and fan out to every subscriber of a feed topic
+
+        Returns the encoded message, or None if nobody is subscribed. Pass
+        ``coalesce=False`` for frames that must not replace each other.
+        """
+        subscribers = self.topic_subscribers.get(topic)
+        if not subscribers:
+            return None
         
-        # Clean up disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+        encoded = EncodedMessage(message)
+        await self._send_to_all(subscribers, encoded, key=topic if coalesce else None)
+        return encoded
+    
+    async def send_to(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client"""
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.enqueue(EncodedMessage(message))
     
-    async def send_to_subscribed(self, symbol: str, data: dict):
+    async def send_to_subscribed(self, symbol: str, data: dict, exclude: Optional[Set[WebSocket]] = None):
         """Send data to clients subscribed to specific symbol"""
         if symbol not in self.symbol_subscribers:
             return
@@ -97,22 +334,11 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        message_json = json.dumps(message, default=str)
-        disconnected = set()
-        
-        for websocket in self.symbol_subscribers[symbol].copy():
-            try:
-                await websocket.send_text(message_json)
-                self.message_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to send to subscribed client: {e}")
-                disconnected.add(websocket)
-        
-        # Clean up disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+        # Coalesce per (update type, symbol) so a price tick never replaces a signal
+        key = f"{data.get('type', 'update')}:{symbol}"
+        await self._send_to_all(self.symbol_subscribers[symbol], EncodedMessage(message), key=key, exclude=exclude)
     
-    async def send_price_update(self, symbol: str, price_data: dict):
+    async def send_price_update(self, symbol: str, price_data: dict, exclude: Optional[Set[WebSocket]] = None):
         """Send price update to subscribed clients"""
         message = {
             "type": "price_update",
@@ -123,9 +349,9 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        await self.send_to_subscribed(symbol, message)
+        await self.send_to_subscribed(symbol, message, exclude=exclude)
     
-    async def send_signal_update(self, symbol: str, signal_data: dict):
+    async def send_signal_update(self, symbol: str, signal_data: dict, exclude: Optional[Set[WebSocket]] = None):
         """Send signal update to subscribed clients"""
         message = {
             "type": "signal_update",
@@ -134,9 +360,9 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        await self.send_to_subscribed(symbol, message)
+        await self.send_to_subscribed(symbol, message, exclude=exclude)
     
-    async def send_market_scan_update(self, scan_results: List[dict]):
+    async def send_market_scan_update(self, scan_results: List[dict], exclude: Optional[Set[WebSocket]] = None):
         """Send market scan results to all clients"""
         message = {
             "type": "market_scan",
@@ -144,7 +370,7 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        await self.broadcast(message)
+        await self.broadcast(message, exclude=exclude)
     
     async def send_system_status(self, status: dict):
         """Send system status update"""
@@ -156,13 +382,29 @@ class ConnectionManager:
         
         await self.broadcast(message)
     
+    def get_client_stats(self) -> List[dict]:
+        """Per-connection queue depth and send latency"""
+        return [
+            {"client": f"{getattr(ws, 'client', None)}", **channel.get_stats()}
+            for ws, channel in self.channels.items()
+        ]
+    
     def get_connection_stats(self) -> dict:
         """Get connection statistics"""
+        channels = list(self.channels.values())
         return {
             "active_connections": len(self.active_connections),
             "total_subscriptions": sum(len(subs) for subs in self.subscriptions.values()),
             "symbol_subscribers": {symbol: len(subs) for symbol, subs in self.symbol_subscribers.items()},
+            "topic_subscribers": {topic: len(subs) for topic, subs in self.topic_subscribers.items()},
             "message_count": self.message_count,
+            "queued_frames": sum(c.depth for c in channels),
+            "max_queue_depth": max((c.depth for c in channels), default=0),
+            "max_send_ms": max((c.stats['max_send_ms'] for c in channels), default=0.0),
+            "dropped_frames": sum(c.stats['dropped'] for c in channels),
+            "coalesced_frames": sum(c.stats['coalesced'] for c in channels),
+            "slow_consumer_evictions": self.evictions,
+            "overflow_policy": self.overflow_policy,
             "uptime": (datetime.now() - self.last_performance_check).total_seconds()
         }
     
@@ -176,4 +418,15 @@ class ConnectionManager:
         await self.broadcast(ping_message)
 
 # Global connection manager instance
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(
+    max_queue=int(os.getenv('WS_MAX_QUEUE', '256')),
+    overflow_policy=os.getenv('WS_OVERFLOW_POLICY', OVERFLOW_DROP_OLDEST),
+    send_timeout=float(os.getenv('WS_SEND_TIMEOUT', '10'))
+)
+
+metrics.gauge("hts_ws_connections", "Connected WebSocket clients",
+              collect=lambda: {(): len(manager.active_connections)})
+metrics.gauge("hts_ws_queued_frames", "Frames waiting in all client queues",
+              collect=lambda: {(): sum(c.depth for c in list(manager.channels.values()))})
+metrics.gauge("hts_ws_max_queue_depth", "Deepest client queue right now",
+              collect=lambda: {(): max((c.depth for c in list(manager.channels.values())), default=0)})
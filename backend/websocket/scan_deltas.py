@@ -0,0 +1,209 @@
+"""
+Delta protocol for live market-scan updates
+
+Clients in delta mode get a snapshot of every symbol's scan state when they
+subscribe, then only per-symbol diffs of the fields that changed. Each symbol
+carries its own sequence number, and a delta applies only on top of
+``base_seq``. A client that sees a gap asks for a resync and gets a fresh
+snapshot. Updates for a symbol are conflated to at most one per
+``conflate_interval``.
+
+Messages:
+    {"type": "scan_snapshot", "symbols": {sym: {"seq": n, "state": {...}}}, "timestamp": ...}
+    {"type": "scan_delta", "symbol": sym, "seq": n, "base_seq": n - 1,
+     "changes": {field: value}, "removed": [field, ...], "timestamp": ...}
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import WebSocket
+
+from .manager import ConnectionManager, manager
+
+try:
+    from ..core.encoding import encode
+except ImportError:
+    from core.encoding import encode
+
+logger = logging.getLogger(__name__)
+
+SCAN_DELTA_TOPIC = "scan:delta"
+
+
+def flatten_state(value: Any, prefix: str = "") -> Dict[str, Any]:
+    """
+    Flatten nested scan results into dotted field paths
+
+    Lists of detector components are keyed by detector name, so a component
+    that changed does not shift the others.
+    """
+    flat: Dict[str, Any] = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(flatten_state(item, f"{prefix}{key}."))
+    elif isinstance(value, list) and value and all(isinstance(v, dict) and 'detector' in v for v in value):
+        for item in value:
+            flat.update(flatten_state(item, f"{prefix}{item['detector']}."))
+    else:
+        flat[prefix[:-1]] = value
+    return flat
+
+
+def scan_result_state(result: Any) -> Dict[str, Any]:
+    """Flat state of one ScanResult (pydantic model, dataclass or dict)"""
+    if hasattr(result, 'dict'):
+        data = result.dict()
+    elif dataclasses.is_dataclass(result):
+        data = dataclasses.asdict(result)
+    else:
+        data = dict(result)
+    data.pop('symbol', None)
+    return flatten_state(data)
+
+
+class _SymbolStream:
+    __slots__ = ('seq', 'published', 'pending', 'last_publish', 'flush_handle')
+
+    def __init__(self):
+        self.seq = 0
+        self.published: Dict[str, Any] = {}
+        self.pending: Optional[Dict[str, Any]] = None
+        self.last_publish = float('-inf')
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class ScanDeltaPublisher:
+    """Per-symbol sequenced, conflated scan deltas over a ConnectionManager topic"""
+
+    def __init__(
+        self,
+        conflate_interval: float = 1.0,
+        float_tolerance: float = 1e-6,
+        connection_manager: ConnectionManager = manager,
+        topic: str = SCAN_DELTA_TOPIC
+    ):
+        self.conflate_interval = conflate_interval
+        self.float_tolerance = float_tolerance
+        self.manager = connection_manager
+        self.topic = topic
+        self.streams: Dict[str, _SymbolStream] = {}
+        self.stats = {
+            'updates': 0,
+            'unchanged': 0,
+            'conflated': 0,
+            'deltas_sent': 0,
+            'snapshots_sent': 0,
+            'delta_bytes': 0,
+            'full_bytes': 0
+        }
+
+    @property
+    def subscribers(self) -> Set[WebSocket]:
+        return self.manager.topic_subscribers.get(self.topic, set())
+
+    # Client side
+
+    async def attach(self, websocket: WebSocket):
+        """Switch a connected client to delta mode and send its snapshot"""
+        self.manager.subscribe_topic(websocket, self.topic)
+        await self.send_snapshot(websocket)
+
+    def detach(self, websocket: WebSocket):
+        self.manager.unsubscribe_topic(websocket, self.topic)
+
+    async def send_snapshot(self, websocket: WebSocket, symbols: Optional[Iterable[str]] = None):
+        """Snapshot of the published state; also the resync path after a sequence gap"""
+        wanted = self.streams.keys() if symbols is None else [s for s in symbols if s in self.streams]
+        await self.manager.send_to(websocket, {
+            "type": "scan_snapshot",
+            "symbols": {
+                symbol: {"seq": self.streams[symbol].seq, "state": self.streams[symbol].published}
+                for symbol in wanted
+            },
+            "timestamp": datetime.now().isoformat()
+        })
+        self.stats['snapshots_sent'] += 1
+
+    # Producer side
+
+    def _changed(self, old: Any, new: Any) -> bool:
+        if isinstance(old, float) and isinstance(new, float):
+            return abs(old - new) > self.float_tolerance
+        return old != new
+
+    def _diff(self, old: Dict[str, Any], new: Dict[str, Any]):
+        changes = {k: v for k, v in new.items() if k not in old or self._changed(old[k], v)}
+        removed = [k for k in old if k not in new]
+        return changes, removed
+
+    async def update(self, states: Dict[str, Dict[str, Any]]):
+        """Feed the latest flat state per symbol; publishes or schedules deltas"""
+        now = time.monotonic()
+        for symbol, state in states.items():
+            self.stats['updates'] += 1
+            stream = self.streams.get(symbol)
+            if stream is None:
+                stream = self.streams[symbol] = _SymbolStream()
+
+            if stream.pending is not None:
+                self.stats['conflated'] += 1
+            stream.pending = state
+
+            due = stream.last_publish + self.conflate_interval
+            if now >= due:
+                await self._flush(symbol)
+            elif stream.flush_handle is None:
+                loop = asyncio.get_running_loop()
+                stream.flush_handle = loop.call_later(
+                    due - now, lambda s=symbol: asyncio.ensure_future(self._flush(s))
+                )
+
+    async def _flush(self, symbol: str):
+        stream = self.streams[symbol]
+        if stream.flush_handle is not None:
+            stream.flush_handle.cancel()
+            stream.flush_handle = None
+
+        state, stream.pending = stream.pending, None
+        if state is None:
+            return
+
+        changes, removed = self._diff(stream.published, state)
+        if not changes and not removed:
+            self.stats['unchanged'] += 1
+            return
+
+        stream.seq += 1
+        stream.published = dict(state)
+        stream.last_publish = time.monotonic()
+
+        message = {
+            "type": "scan_delta",
+            "symbol": symbol,
+            "seq": stream.seq,
+            "base_seq": stream.seq - 1,
+            "changes": changes,
+            "removed": removed,
+            "timestamp": datetime.now().isoformat()
+        }
+        # Deltas are never coalesced: replacing one would break the sequence
+        frame = await self.manager.publish(self.topic, message, coalesce=False)
+        if frame is not None:
+            self.stats['deltas_sent'] += 1
+            self.stats['delta_bytes'] += frame.nbytes
+            self.stats['full_bytes'] += len(encode(state))
+
+    def get_stats(self) -> Dict[str, Any]:
+        full = self.stats['full_bytes']
+        return {
+            **self.stats,
+            'subscribers': len(self.subscribers),
+            'symbols': {symbol: stream.seq for symbol, stream in self.streams.items()},
+            'conflate_interval': self.conflate_interval,
+            'bytes_saved_pct': round(100 * (1 - self.stats['delta_bytes'] / full), 1) if full else 0.0
+        }